@@ -0,0 +1,126 @@
+"""
+YOLODetector CPU benchmark - thread rejasi va CPU optimizatsiyalari bo'yicha o'tkazuvchanlik
+
+Ishlatish:
+    python benchmarks/detector_cpu.py --model models/car_detect.v1.pt [--video videos/x.mp4]
+        [--streams 1,2,4] [--variants fp32,channels_last,bf16,compile] [--frames 100]
+
+Har bir (variant, streams) uchun `streams` ta detector parallel thread'larda ishlaydi va har biri
+execution.plan_threads() bergan thread'lar soni bilan (yadrolar / streams). Natija: umumiy FPS,
+bitta frame kechikishi va yadro boshiga FPS. Birinchi qator (fp32, 1 stream, barcha yadrolar)
+hozirgi holatga yaqin - boshqa qatorlar undan qancha foyda borligini ko'rsatadi.
+"""
+import sys
+import time
+import argparse
+import threading
+import numpy as np
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from railcore.types import ExecutionConfig, ModelConfig
+from railcore.vision.execution import ExecutionProfile, available_cores
+
+VARIANTS = {
+    'fp32': dict(channels_last=False),
+    'channels_last': dict(channels_last=True),
+    'bf16': dict(channels_last=True, bf16=True),
+    'compile': dict(channels_last=True, compile=True),
+}
+
+def load_frames(video: str, count: int, width: int, height: int):
+    """Videodan frame'lar (video bo'lmasa shovqin)"""
+    import cv2
+
+    if video:
+        cap = cv2.VideoCapture(video)
+        frames = []
+        while len(frames) < count:
+            success, frame = cap.read()
+            if not success:
+                break
+            frames.append(frame)
+        cap.release()
+        if frames:
+            return frames
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 255, (height, width, 3), dtype=np.uint8) for _ in range(min(count, 8))]
+
+def run_variant(args, model_config: ModelConfig, name: str, streams: int, frames) -> dict:
+    """streams ta detector'ni parallel ishlatish"""
+    from railcore.vision.yolo_detector import YOLODetector
+
+    config = ExecutionConfig(device='cpu', reserved_cores=0, **VARIANTS[name])
+    profile = ExecutionProfile(config, streams)
+    if name == 'bf16' and not profile.bf16:
+        return {}
+    detectors = [YOLODetector(model_config, camera_id=i, execution=profile) for i in range(streams)]
+
+    latencies = [[] for _ in range(streams)]
+    barrier = threading.Barrier(streams)
+
+    def worker(index: int):
+        detector = detectors[index]
+        profile.bind_thread()
+        barrier.wait()
+        for i in range(args.frames):
+            start = time.perf_counter()
+            detector.detect(frames[(i + index) % len(frames)])
+            latencies[index].append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(streams)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    total = streams * args.frames
+    all_latencies = np.concatenate([np.asarray(l) for l in latencies]) * 1000
+    cores = min(available_cores(), streams * profile.threads)
+    return {
+        'threads': profile.threads,
+        'fps': total / elapsed,
+        'fps_per_core': total / elapsed / cores,
+        'p50': float(np.percentile(all_latencies, 50)),
+        'p95': float(np.percentile(all_latencies, 95)),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="YOLODetector CPU benchmark")
+    parser.add_argument('--model', required=True)
+    parser.add_argument('--video', default='')
+    parser.add_argument('--imgsz', type=int, default=640)
+    parser.add_argument('--frames', type=int, default=100, help="Har bir stream uchun")
+    parser.add_argument('--streams', default='1,2,4')
+    parser.add_argument('--variants', default='fp32,channels_last,bf16,compile')
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    args = parser.parse_args()
+
+    model_config = ModelConfig(path=args.model, target_classes=[0, 2, 3, 5, 7], class_names={},
+                               imgsz=args.imgsz, cache_dir='', warmup_frames=3)
+    frames = load_frames(args.video, args.frames, args.width, args.height)
+    print(f"{available_cores()} yadro, imgsz={args.imgsz}, {len(frames)} xil frame")
+    print(f"{'variant':>14} {'streams':>8} {'thr':>4} {'FPS':>8} {'FPS/yadro':>10} {'p50 ms':>8} {'p95 ms':>8}")
+
+    baseline = None
+    for name in args.variants.split(','):
+        if name not in VARIANTS:
+            print(f"Noma'lum variant: {name}")
+            continue
+        for streams in (int(s) for s in args.streams.split(',')):
+            result = run_variant(args, model_config, name, streams, frames)
+            if not result:
+                print(f"{name:>14} {streams:>8}  CPU qo'llamaydi")
+                break
+            if baseline is None:
+                baseline = result['fps_per_core']
+            gain = result['fps_per_core'] / baseline
+            print(f"{name:>14} {streams:>8} {result['threads']:>4} {result['fps']:>8.1f} "
+                  f"{result['fps_per_core']:>10.2f} {result['p50']:>8.1f} {result['p95']:>8.1f}  x{gain:.2f}")
+
+if __name__ == "__main__":
+    main()
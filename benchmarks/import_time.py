@@ -0,0 +1,97 @@
+"""
+Yengil kirish nuqtalarining import vaqti (python -X importtime) bo'yicha regressiya tekshiruvi
+
+Ishlatish:
+    python benchmarks/import_time.py [--budget-scale 1.0] [--runs 3]
+
+Har bir kirish nuqtasi alohida process'da import qilinadi. Umumiy import vaqti
+byudjetdan oshsa yoki taqiqlangan og'ir modul (torch, ultralytics) yuklansa
+skript 1 kod bilan tugaydi.
+"""
+import re
+import sys
+import argparse
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# (modul, byudjet ms) - config tekshiruvi, hodisalar so'rovi, keshdan replay
+ENTRY_POINTS: List[Tuple[str, float]] = [
+    ('railcore', 50.0),
+    ('railcore.config', 100.0),
+    ('railcore.event_store', 300.0),
+    ('railcore.vision.detection_cache', 300.0),
+    ('railcore.sweep', 300.0),
+]
+
+# Bu kirish nuqtalarida umuman yuklanmasligi kerak
+FORBIDDEN = ('torch', 'ultralytics')
+
+_LINE_RE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$')
+
+def measure(module: str) -> Tuple[float, Dict[str, float]]:
+    """
+    Modulni yangi process'da import qilish
+
+    Args:
+        module: Modul nomi
+
+    Returns:
+        Tuple[float, Dict[str, float]]: (umumiy ms, modul -> cumulative ms)
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{module} import qilinmadi:\n{result.stderr[-2000:]}")
+
+    total = 0.0
+    cumulative: Dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match is None:
+            continue
+        ms = int(match.group(2)) / 1000
+        name = match.group(4)
+        cumulative[name] = ms
+        # Eng yuqori darajadagi importlar (chekinishsiz) yig'indisi
+        if len(match.group(3)) == 1:
+            total += ms
+    return total, cumulative
+
+def main():
+    parser = argparse.ArgumentParser(description="RailSafe import vaqti tekshiruvi")
+    parser.add_argument('--budget-scale', type=float, default=1.0, help="Sekin mashinalar uchun byudjet ko'paytiruvchisi")
+    parser.add_argument('--runs', type=int, default=3, help="Har bir modul uchun o'lchovlar (eng kichigi olinadi)")
+    parser.add_argument('--top', type=int, default=5, help="Eng og'ir importlarni ko'rsatish")
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'modul':<36} {'ms':>8} {'byudjet':>8}")
+    for module, budget in ENTRY_POINTS:
+        budget *= args.budget_scale
+        runs = [measure(module) for _ in range(max(1, args.runs))]
+        total, cumulative = min(runs, key=lambda r: r[0])
+
+        forbidden = sorted(name for name in cumulative if name.split('.')[0] in FORBIDDEN)
+        status = 'OK'
+        if total > budget:
+            status = 'SEKIN'
+        if forbidden:
+            status = 'TAQIQLANGAN: ' + ', '.join(forbidden[:3])
+        failed |= status != 'OK'
+
+        print(f"{module:<36} {total:>8.1f} {budget:>8.0f}  {status}")
+        if status != 'OK':
+            heaviest = sorted(((ms, name) for name, ms in cumulative.items()
+                               if '.' not in name), reverse=True)[:args.top]
+            for ms, name in heaviest:
+                print(f"    {name:<32} {ms:>8.1f}")
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
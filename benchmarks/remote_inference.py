@@ -0,0 +1,111 @@
+"""
+Masofaviy inference benchmark - server'ga parallel oqimlar, kechikish va o'tkazuvchanlik
+
+Ishlatish:
+    python -m railcore.vision.remote --config config/config.yaml --listen 127.0.0.1:7800 &
+    python benchmarks/remote_inference.py --address 127.0.0.1:7800 [--video videos/x.mp4]
+        [--streams 1,4,8] [--encodings jpeg,raw] [--max-side 1280] [--frames 100]
+
+Har bir (encoding, streams) uchun `streams` ta thread bitta umumiy RemoteClient orqali
+(kameralar kabi) ketma-ket frame yuboradi. Natija: umumiy FPS, javob kechikishi (p50/p95),
+server'dagi batch vaqti va timeout'lar. Server logida o'rtacha batch o'lchami ko'rinadi.
+"""
+import sys
+import time
+import argparse
+import threading
+import numpy as np
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from railcore.types import RemoteInferenceConfig
+from railcore.vision.remote import RemoteClient
+
+def load_frames(video: str, count: int, width: int, height: int):
+    """Videodan frame'lar (video bo'lmasa shovqin)"""
+    import cv2
+
+    if video:
+        cap = cv2.VideoCapture(video)
+        frames = []
+        while len(frames) < count:
+            success, frame = cap.read()
+            if not success:
+                break
+            frames.append(frame)
+        cap.release()
+        if frames:
+            return frames
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 255, (height, width, 3), dtype=np.uint8) for _ in range(min(count, 8))]
+
+def run(args, encoding: str, streams: int, frames) -> dict:
+    """streams ta thread bilan bitta ulanish orqali yuborish"""
+    config = RemoteInferenceConfig(enabled=True, address=args.address, encoding=encoding,
+                                   max_side=args.max_side, timeout_ms=args.timeout_ms,
+                                   max_inflight=max(16, streams * 2))
+    client = RemoteClient(config)
+    latencies = [[] for _ in range(streams)]
+    server_ms = [[] for _ in range(streams)]
+    failures = [0] * streams
+    barrier = threading.Barrier(streams)
+
+    def worker(index: int):
+        barrier.wait()
+        for i in range(args.frames):
+            start = time.perf_counter()
+            pending = client.submit(frames[(i + index) % len(frames)])
+            if pending is None or not pending.event.wait(config.timeout_ms / 1000) or pending.error:
+                if pending is not None:
+                    client.cancel(pending)
+                failures[index] += 1
+                continue
+            latencies[index].append(time.perf_counter() - start)
+            server_ms[index].append(pending.server_ms)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(streams)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    client.close()
+
+    all_latencies = np.concatenate([np.asarray(l) for l in latencies]) * 1000
+    all_server = np.concatenate([np.asarray(s) for s in server_ms])
+    if len(all_latencies) == 0:
+        return {'fps': 0.0, 'p50': 0.0, 'p95': 0.0, 'server': 0.0, 'failures': sum(failures)}
+    return {
+        'fps': len(all_latencies) / elapsed,
+        'p50': float(np.percentile(all_latencies, 50)),
+        'p95': float(np.percentile(all_latencies, 95)),
+        'server': float(np.median(all_server)),
+        'failures': sum(failures),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Masofaviy inference benchmark")
+    parser.add_argument('--address', default='127.0.0.1:7800')
+    parser.add_argument('--video', default='')
+    parser.add_argument('--frames', type=int, default=100, help="Har bir oqim uchun")
+    parser.add_argument('--streams', default='1,4,8')
+    parser.add_argument('--encodings', default='jpeg,raw')
+    parser.add_argument('--max-side', type=int, default=1280)
+    parser.add_argument('--timeout-ms', type=float, default=2000.0)
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    args = parser.parse_args()
+
+    frames = load_frames(args.video, args.frames, args.width, args.height)
+    print(f"{args.address}, {len(frames)} xil frame {frames[0].shape[1]}x{frames[0].shape[0]}, max_side={args.max_side}")
+    print(f"{'encoding':>9} {'streams':>8} {'FPS':>8} {'p50 ms':>8} {'p95 ms':>8} {'server ms':>10} {'xato':>6}")
+    for encoding in args.encodings.split(','):
+        for streams in (int(s) for s in args.streams.split(',')):
+            result = run(args, encoding, streams, frames)
+            print(f"{encoding:>9} {streams:>8} {result['fps']:>8.1f} {result['p50']:>8.1f} "
+                  f"{result['p95']:>8.1f} {result['server']:>10.1f} {result['failures']:>6}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+VehicleTracker soak benchmark - minglab track ID bilan uzoq ishlashda frame boshiga xarajat
+
+Ishlatish:
+    python benchmarks/tracker_soak.py [--frames 200000] [--window 20000] [--active 12] [--timeout 3.0]
+
+Har bir oynada frame boshiga o'rtacha vaqt (update_many + cleanup_expired + get_polygon_state)
+chiqariladi. Xarajat tekis bo'lishi kerak - jami track ID soniga bog'liq emas.
+"""
+import sys
+import time
+import argparse
+import random
+import numpy as np
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from railcore.types import ThresholdsConfig
+from railcore.utils_polygon import PolygonUtils
+from railcore.vision.tracking import VehicleTracker
+
+POLYGON_FILE = Path(__file__).resolve().parents[1] / 'paligons' / 'labels_my-project-name_2025-10-15-10-00-23.json'
+
+def main():
+    parser = argparse.ArgumentParser(description="VehicleTracker soak benchmark")
+    parser.add_argument('--frames', type=int, default=200000)
+    parser.add_argument('--window', type=int, default=20000)
+    parser.add_argument('--active', type=int, default=12, help="Bir vaqtdagi tracklar soni")
+    parser.add_argument('--lifetime', type=int, default=250, help="Track umri (frame)")
+    parser.add_argument('--timeout', type=float, default=3.0)
+    parser.add_argument('--fps', type=float, default=25.0)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    width, height = 2688, 1520
+    polygon = PolygonUtils(str(POLYGON_FILE), width, height)
+    tracker = VehicleTracker(1, 'soak', polygon, ThresholdsConfig(warning=10.0, violation=15.0), args.timeout)
+
+    # (track_id, boshlanish frame'i, x)
+    tracks = []
+    next_id = 1
+    window_time = 0.0
+    events = 0
+
+    print(f"{'frame':>9} {'track IDs':>10} {'live':>6} {'us/frame':>10}")
+    for frame_number in range(1, args.frames + 1):
+        current_time = frame_number / args.fps
+
+        # Eski tracklar yo'qoladi, yangilari paydo bo'ladi (ID'lar doim o'sadi)
+        tracks = [t for t in tracks if frame_number - t[1] < args.lifetime]
+        while len(tracks) < args.active:
+            tracks.append((next_id, frame_number - random.randint(0, args.lifetime - 1), random.randint(100, width - 300)))
+            next_id += 1
+
+        # Yuqoridan pastga harakat: polygonga kiradi va chiqadi
+        track_ids = np.array([t[0] for t in tracks], dtype=np.int64)
+        ys = [int((frame_number - born) / args.lifetime * height) for _, born, _ in tracks]
+        boxes = np.array([(x, y, x + 200, y + 120) for (_, _, x), y in zip(tracks, ys)])
+
+        start = time.perf_counter()
+        events += len(tracker.update_many(track_ids, np.zeros(len(tracks), dtype=np.int64),
+                                          boxes, current_time, None))
+        tracker.cleanup_expired(current_time)
+        tracker.get_polygon_state()
+        window_time += time.perf_counter() - start
+
+        if frame_number % args.window == 0:
+            print(f"{frame_number:>9} {next_id - 1:>10} {len(tracker.vehicles):>6} "
+                  f"{window_time / args.window * 1e6:>10.1f}")
+            window_time = 0.0
+
+    print(f"Jami hodisalar: {events}")
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,36 @@
 """
 RailCore - RailSafe tizimining asosiy moduli
+
+Og'ir submodullar (torch/ultralytics'ni yuklovchi system, camera) birinchi
+murojaatda yuklanadi - `import railcore` va yengil CLI'lar (config, event_store,
+replay) tez ishga tushadi.
 """
-from railcore.system import MultiCameraSystem
-from railcore.camera import PolygonCamera
-from railcore.saver import ImageSaver
-from railcore.logging_setup import setup_logger
+import importlib
 
 __version__ = "1.0.0"
 
+# Nom -> modul (birinchi murojaatda import qilinadi)
+_LAZY = {
+    'MultiCameraSystem': 'railcore.system',
+    'PolygonCamera': 'railcore.camera',
+    'ImageSaver': 'railcore.saver',
+    'setup_logger': 'railcore.logging_setup',
+}
+
 __all__ = [
     'MultiCameraSystem',
     'PolygonCamera',
     'ImageSaver',
     'setup_logger'
-]
\ No newline at end of file
+]
+
+def __getattr__(name: str):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module 'railcore' has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
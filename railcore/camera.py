@@ -4,11 +4,26 @@ PolygonCamera - barcha komponentlarni birlashtiradi
 import cv2
 import time
 import numpy as np
-from railcore.types import CameraConfig, ModelConfig, ThresholdsConfig, ProcessingConfig
+from collections import deque
+from typing import Callable, Optional
+from railcore.types import CameraConfig, ModelConfig, ThresholdsConfig, ProcessingConfig, FreezeConfig, CascadeConfig, TilingConfig, FrameTrace
 from railcore.decoder import create_decoder
+from railcore.decoder.freeze import FreezeDetector
 from railcore.utils_polygon import PolygonUtils
 from railcore.vision import YOLODetector, VehicleTracker
+from railcore.vision.motion import create_calibration
+from railcore.vision.cascade import create_gate
+from railcore.vision.tiling import TiledDetector
+from railcore.vision.remote import RemoteClient, RemoteDetector
+from railcore.vision.model_manager import ModelManager
+from railcore.vision.execution import ExecutionProfile
 from railcore.saver import ImageSaver
+from railcore.sinks import EventBus
+from railcore.clip_recorder import ClipRecorder, ClipWriter
+from railcore.scheduler import FrameScheduler, PRIORITY_NAMES, classify_priority
+from railcore.display import MosaicDisplay
+from railcore.preview_server import PreviewServer
+from railcore.tracing import LatencyStats
 from railcore.logging_setup import setup_logger
 
 logger = setup_logger(__name__)
@@ -21,7 +36,19 @@ class PolygonCamera:
                  model_config: ModelConfig,
                  thresholds_config: ThresholdsConfig,
                  processing_config: ProcessingConfig,
-                 image_saver: ImageSaver):
+                 image_saver: ImageSaver,
+                 event_bus: Optional[EventBus] = None,
+                 clip_writer: Optional[ClipWriter] = None,
+                 scheduler: Optional[FrameScheduler] = None,
+                 display: Optional[MosaicDisplay] = None,
+                 preview: Optional[PreviewServer] = None,
+                 freeze_config: Optional[FreezeConfig] = None,
+                 latency: Optional[LatencyStats] = None,
+                 cascade_config: Optional[CascadeConfig] = None,
+                 tiling_config: Optional[TilingConfig] = None,
+                 execution: Optional[ExecutionProfile] = None,
+                 remote: Optional[RemoteClient] = None,
+                 model_manager: Optional[ModelManager] = None):
         """
         Args:
             camera_config: Kamera konfiguratsiyasi
@@ -29,14 +56,34 @@ class PolygonCamera:
             thresholds_config: Vaqt chegaralari
             processing_config: Ishlash sozlamalari
             image_saver: Rasm saqlash
+            event_bus: Hodisalarni tashqi tizimlarga yuborish (ixtiyoriy)
+            clip_writer: Hodisa videokliplarini yozish (ixtiyoriy)
+            scheduler: Umumiy inference byudjeti (ixtiyoriy, adaptiv frame skip o'rniga)
+            display: Operator mozaika oynasi (ixtiyoriy)
+            preview: HTTP MJPEG preview server (ixtiyoriy)
+            freeze_config: Takroriy/muzlagan frame'larni aniqlash (ixtiyoriy)
+            latency: Bosqichlar bo'yicha kechikish statistikasi (ixtiyoriy)
+            cascade_config: Arzon "bor/yo'q" tekshiruvi bilan to'liq detector'ni o'tkazib yuborish (ixtiyoriy)
+            tiling_config: Polygon hududida plitkali inference (ixtiyoriy)
+            execution: Umumiy bajarilish profili (device, CPU thread rejasi; ixtiyoriy)
+            remote: Masofaviy inference server'iga umumiy ulanish (ixtiyoriy)
+            model_manager: Kandidat modelni shadow'da baholash va almashtirish (ixtiyoriy)
         """
         self.camera_id = camera_config.id
         self.camera_name = camera_config.name
         self.image_saver = image_saver
+        self.event_bus = event_bus
+        self.latency = latency
+        self.model_manager = model_manager
+        
+        # Ishga tushish vaqtlari (birinchi qayta ishlangan frame'gacha)
+        self.created_at = time.time()
+        self.startup_stats = {}
         
         # Decoder yaratish
         logger.info(f"Kamera {self.camera_id} uchun decoder ochilmoqda...")
         self.decoder = create_decoder(camera_config.source)
+        self.startup_stats['decoder_open'] = time.time() - self.created_at
         
         if not self.decoder.is_opened():
             raise ValueError(f"Kamera ochilmadi: {camera_config.source}")
@@ -49,6 +96,11 @@ class PolygonCamera:
         
         logger.info(f"Kamera {self.camera_id}: {self.frame_width}x{self.frame_height} @ {self.video_fps} FPS")
         
+        # Hodisa kliplari uchun ring buffer
+        self.clip_recorder = None
+        if clip_writer is not None:
+            self.clip_recorder = ClipRecorder(self.camera_id, self.video_fps, clip_writer)
+        
         # Polygon utils
         self.polygon_utils = PolygonUtils(
             camera_config.polygon_file,
@@ -56,8 +108,31 @@ class PolygonCamera:
             self.frame_height
         )
         
-        # YOLO detector
-        self.detector = YOLODetector(model_config, self.camera_id)
+        # YOLO detector (masofaviy inference'da lokal model faqat fallback uchun)
+        self.remote = None
+        if remote is None or remote.config.local_fallback:
+            self.detector = YOLODetector(model_config, self.camera_id, execution)
+        if remote is not None:
+            fallback = self.detector if remote.config.local_fallback else None
+            self.remote = RemoteDetector(remote, model_config, self.camera_id, self.video_fps,
+                                         fallback=fallback, execution=execution)
+            self.detector = self.remote
+        self.execution = self.detector.execution
+        self._bound_threads = None
+        self.startup_stats['model_load'] = self.detector.load_seconds
+        self.startup_stats['warmup'] = self.detector.warmup_seconds
+        
+        # Plitkali inference (uzoqdagi kichik avtomobillar uchun)
+        self.tiled = None
+        if tiling_config is not None and tiling_config.enabled and self.remote is not None:
+            logger.warning(f"Kamera {self.camera_id}: masofaviy inference'da plitkalash ishlatilmaydi")
+        elif tiling_config is not None and tiling_config.enabled:
+            self.tiled = TiledDetector(self.detector, tiling_config, self.polygon_utils.polygon_points,
+                                       self.frame_width, self.frame_height, self.video_fps)
+            self.detector = self.tiled
+        
+        # Kaskad: polygon atrofi bo'sh bo'lsa to'liq detector ishlamaydi
+        self.gate = create_gate(cascade_config, self.polygon_utils, model_config, self.camera_id, self.execution)
         
         # Vehicle tracker
         self.tracker = VehicleTracker(
@@ -65,15 +140,42 @@ class PolygonCamera:
             self.camera_name,
             self.polygon_utils,
             thresholds_config,
-            processing_config.timeout_seconds
+            processing_config.timeout_seconds,
+            calibration=create_calibration(self.polygon_utils, processing_config),
+            trajectory_size=processing_config.trajectory_size,
+            slow_min_points=processing_config.slow_min_points
         )
         
         # Processing config
+        self.processing = processing_config
         self.adaptive_mode = processing_config.adaptive_mode
         self.frame_skip_idle = processing_config.frame_skip_idle
         self.frame_skip_active = processing_config.frame_skip_active
         self.empty_threshold = processing_config.empty_threshold
         
+        # Umumiy scheduler (berilsa qaysi frame qayta ishlanishini u hal qiladi)
+        self.scheduler = scheduler
+        self.priority = 0
+        if scheduler is not None:
+            scheduler.register(self.camera_id, self.video_fps)
+        
+        # Operator oynasi (frame faqat havola sifatida beriladi)
+        self.display = display
+        if display is not None:
+            display.add(self.camera_id)
+        self.preview = preview
+        if preview is not None:
+            preview.add(self.camera_id, self.camera_name)
+        
+        # Muzlagan oqim (takroriy frame'larda inference qilinmaydi)
+        self.freeze = None
+        if freeze_config is not None and freeze_config.enabled:
+            self.freeze = FreezeDetector(self.camera_id, freeze_config)
+        self.paused_frames = 0  # Muzlagan paytdagi frame'lar (tracker soatiga qo'shilmaydi)
+        
+        # Config o'zgarishlari (kamera thread'ida, frame'lar orasida qo'llanadi)
+        self._updates = deque()
+        
         # FPS
         self.fps_start_time = time.time()
         self.fps_frame_count = 0
@@ -89,11 +191,81 @@ class PolygonCamera:
         self.frame_counter = 0
         self.consecutive_empty_frames = 0
         
-        # Thresholds
-        self.threshold_warning = thresholds_config.warning
-        self.threshold_violation = thresholds_config.violation
+        # Thresholds (umumiy obyekt - config qayta yuklanganda joyida yangilanadi)
+        self.thresholds = thresholds_config
+        
+        self.startup_stats['init'] = time.time() - self.created_at
+        logger.info(f"Kamera {self.camera_id} - {self.camera_name} tayyor ({self.startup_stats['init']:.2f}s)")
+    
+    @property
+    def threshold_warning(self) -> float:
+        return self.thresholds.warning
+    
+    @property
+    def threshold_violation(self) -> float:
+        return self.thresholds.violation
+    
+    def submit_update(self, update: Callable[[], None], requested_at: Optional[float] = None):
+        """
+        O'zgarishni kamera thread'ida qo'llash uchun navbatga qo'yish
         
-        logger.info(f"Kamera {self.camera_id} - {self.camera_name} tayyor")
+        Args:
+            update: Argumentsiz funksiya
+            requested_at: O'zgarish aniqlangan vaqt (apply kechikishini log qilish uchun)
+        """
+        self._updates.append((update, requested_at if requested_at is not None else time.time()))
+    
+    def _apply_updates(self):
+        """Navbatdagi config o'zgarishlarini qo'llash"""
+        while self._updates:
+            update, requested_at = self._updates.popleft()
+            try:
+                update()
+                logger.info(f"Kamera {self.camera_id}: config o'zgarishi qo'llandi "
+                            f"({(time.time() - requested_at) * 1000:.0f} ms)")
+            except Exception as e:
+                logger.error(f"Kamera {self.camera_id}: config o'zgarishi qo'llanmadi: {e}")
+    
+    def apply_processing(self, processing_config: ProcessingConfig):
+        """
+        Ishlash sozlamalarini yangilash (kamera thread'ida chaqiriladi)
+        
+        Args:
+            processing_config: Yangi ProcessingConfig
+        """
+        previous = self.processing
+        self.processing = processing_config
+        self.adaptive_mode = processing_config.adaptive_mode
+        self.frame_skip_idle = processing_config.frame_skip_idle
+        self.frame_skip_active = processing_config.frame_skip_active
+        self.empty_threshold = processing_config.empty_threshold
+        if self.adaptive_mode and self.consecutive_empty_frames < self.empty_threshold:
+            self.current_frame_skip = self.frame_skip_active
+        else:
+            self.current_frame_skip = self.frame_skip_idle
+        
+        self.tracker.timeout_seconds = processing_config.timeout_seconds
+        self.tracker.trajectory_size = processing_config.trajectory_size
+        self.tracker.slow_min_points = processing_config.slow_min_points
+        # Kalibrovka faqat o'lchamlar yoki trayektoriya uzunligi o'zgarsa almashadi (trayektoriyalar tozalanadi)
+        if ((previous.polygon_length, previous.polygon_width, previous.trajectory_size) !=
+                (processing_config.polygon_length, processing_config.polygon_width, processing_config.trajectory_size)):
+            self.tracker.set_calibration(create_calibration(self.polygon_utils, processing_config))
+    
+    def set_polygon(self, polygon_file: str):
+        """
+        Polygon'ni almashtirish (kamera thread'ida chaqiriladi, track holati saqlanadi)
+        
+        Args:
+            polygon_file: Yangi polygon JSON fayli
+        """
+        polygon_utils = PolygonUtils(polygon_file, self.frame_width, self.frame_height)
+        self.polygon_utils = polygon_utils
+        self.tracker.set_polygon(polygon_utils, create_calibration(polygon_utils, self.processing))
+        if self.gate is not None:
+            self.gate.set_polygon(polygon_utils.polygon_points)
+        if self.tiled is not None:
+            self.tiled.set_polygon(polygon_utils.polygon_points)
     
     def _update_fps(self):
         """FPS hisoblash"""
@@ -106,12 +278,33 @@ class PolygonCamera:
         self.fps_frame_count = 0
         self.fps_start_time = current_time
     
+    def _record_first_frame(self, detect_seconds: float):
+        """Birinchi qayta ishlangan frame'gacha bo'lgan vaqtni yozish"""
+        stats = self.startup_stats
+        stats['first_detect'] = detect_seconds
+        stats['time_to_first_frame'] = time.time() - self.created_at
+        logger.info(
+            f"Kamera {self.camera_id}: birinchi frame {stats['time_to_first_frame']:.2f}s da qayta ishlandi "
+            f"(decoder {stats['decoder_open']:.2f}s, model {stats['model_load']:.2f}s, "
+            f"warm-up {stats['warmup']:.2f}s, birinchi detect {detect_seconds:.3f}s)"
+        )
+    
     def run(self):
         """Asosiy loop"""
         logger.info(f"Kamera {self.camera_id} - {self.camera_name} boshlandi")
         
         while self.running:
+            # Config o'zgarishlari
+            if self._updates:
+                self._apply_updates()
+            
+            # CPU thread rejasi (kameralar soni o'zgarsa qayta hisoblanadi)
+            if self._bound_threads != self.execution.threads:
+                self._bound_threads = self.execution.threads
+                self.execution.bind_thread()
+            
             # Frame o'qish
+            read_start = time.time()
             success, frame = self.decoder.read()
             
             if not success:
@@ -123,18 +316,64 @@ class PolygonCamera:
                 continue
             
             self.frame_count += 1
-            current_time = self.frame_count / self.video_fps
+            trace = None
+            if self.latency is not None:
+                trace = FrameTrace(self.camera_id, self.frame_count, read_start, time.time())
+            
+            # Takroriy frame (muzlagan oqim yoki appsink qaytargan eski buffer)
+            duplicate = False
+            if self.freeze is not None:
+                was_frozen = self.freeze.frozen
+                duplicate = self.freeze.check(frame)
+                if self.freeze.frozen:
+                    # Muzlagan paytda tracker soati to'xtaydi - dwell vaqti qotgan rasmda o'smaydi
+                    self.paused_frames += 1 if was_frozen else self.freeze.run_length
+                    if self.freeze.should_reconnect():
+                        logger.warning(f"Kamera {self.camera_id} oqimi muzlagan. Qayta ulanish...")
+                        self.freeze.on_reconnect()
+                        if not self.decoder.reopen():
+                            logger.error(f"Kamera {self.camera_id} qayta ulanmadi")
+            
+            current_time = (self.frame_count - self.paused_frames) / self.video_fps
             self.frame_counter += 1
             self._update_fps()
             
+            # Ring buffer (annotatsiyadan oldin)
+            if self.clip_recorder is not None and not duplicate:
+                self.clip_recorder.push(frame, current_time)
+            
             # Frame qayta ishlash kerakmi?
-            process_this_frame = self.frame_counter % self.current_frame_skip == 0
+            if duplicate:
+                process_this_frame = False
+            elif self.scheduler is not None:
+                process_this_frame = self.scheduler.acquire(self.camera_id)
+            else:
+                process_this_frame = self.frame_counter % self.current_frame_skip == 0
+            detected_count = 0
             
             if process_this_frame:
                 self.process_count += 1
+                if self.model_manager is not None:
+                    self.model_manager.observe(frame)
                 
-                # Detection
-                detection_result = self.detector.detect(frame)
+                # Detection (kaskad "bo'sh" desa frame bo'sh deb hisoblanadi)
+                detect_start = time.time()
+                if self.gate is None or self.gate.should_run(frame, len(self.tracker.vehicles) > 0):
+                    detection_result = self.detector.detect(frame)
+                    detect_end = time.time()
+                    detect_seconds = detect_end - detect_start
+                    if self.gate is not None:
+                        self.gate.record_full(detection_result)
+                    if 'first_detect' not in self.startup_stats:
+                        self._record_first_frame(detect_seconds)
+                    elif self.scheduler is not None:
+                        # Birinchi (sovuq) inference narxga qo'shilmaydi
+                        self.scheduler.record_cost(self.camera_id, detect_seconds)
+                else:
+                    detection_result = None
+                    detect_end = time.time()
+                if trace is not None:
+                    trace.inferred = detect_end
                 
                 if detection_result is not None:
                     detected_count = len(detection_result.boxes)
@@ -149,18 +388,25 @@ class PolygonCamera:
                             self.consecutive_empty_frames = 0
                             self.current_frame_skip = self.frame_skip_active
                     
-                    # Tracking va event handling
-                    for i in range(len(detection_result.boxes)):
-                        track_id = detection_result.track_ids[i]
-                        class_id = detection_result.class_ids[i]
-                        box = tuple(detection_result.boxes[i].astype(int))
-                        
-                        # Update tracker va hodisalarni olish
-                        events = self.tracker.update(track_id, class_id, box, current_time, frame)
-                        
-                        # Hodisalarni saqlash
-                        for event in events:
-                            self.image_saver.add_to_queue(event)
+                    # Tracking va event handling (frame'dagi barcha deteksiyalar birga)
+                    events = self.tracker.update_many(
+                        detection_result.track_ids,
+                        detection_result.class_ids,
+                        detection_result.boxes,
+                        current_time,
+                        frame
+                    )
+                    
+                    # Hodisalarni saqlash (frame izi ImageSaver'gacha boradi)
+                    if trace is not None:
+                        trace.tracked = time.time()
+                    for event in events:
+                        event.trace = trace
+                        self.image_saver.add_to_queue(event)
+                        if self.event_bus is not None:
+                            self.event_bus.publish(event)
+                        if self.clip_recorder is not None:
+                            self.clip_recorder.on_event(event, current_time)
                 else:
                     # Bo'sh frame
                     if self.adaptive_mode:
@@ -170,26 +416,56 @@ class PolygonCamera:
                 
                 # Eski tracklarni tozalash
                 self.tracker.cleanup_expired(current_time)
+                if trace is not None and trace.tracked is None:
+                    trace.tracked = time.time()
+                
+                if self.scheduler is not None:
+                    self._report_priority(detected_count)
             
-            # Vizualizatsiya
-            self._draw_visualization(frame, detection_result if process_this_frame else None)
-            
-            # Display
-            H, W = frame.shape[:2]
-            frame_resized = cv2.resize(frame, (W // 2, H // 2))
-            
-            window_name = f"Camera {self.camera_id} - {self.camera_name}"
-            cv2.imshow(window_name, frame_resized)
+            if trace is not None:
+                self.latency.record_frame(trace)
             
-            if cv2.waitKey(1) & 0xFF == ord("q"):
-                self.running = False
-                break
+            # Vizualizatsiya faqat ko'ruvchi bo'lsa (kichraytirish/kodlash boshqa thread'larda)
+            send_preview = self.preview is not None and self.preview.wants_frame(self.camera_id)
+            if self.display is not None or send_preview:
+                self._draw_visualization(frame, detection_result if process_this_frame else None)
+                if self.display is not None:
+                    self.display.submit(self.camera_id, frame)
+                if send_preview:
+                    self.preview.submit(self.camera_id, frame)
         
         # Cleanup
+        if self.clip_recorder is not None:
+            self.clip_recorder.flush()
+        if self.scheduler is not None:
+            self.scheduler.unregister(self.camera_id)
+        if self.display is not None:
+            self.display.remove(self.camera_id)
+        if self.preview is not None:
+            self.preview.remove(self.camera_id)
+        if self.gate is not None:
+            stats = self.gate.get_stats()
+            logger.info(f"Kamera {self.camera_id} kaskad: {stats['skipped']}/{stats['frames']} frame o'tkazib yuborildi "
+                        f"(1-bosqich {stats['stage1_ms']:.2f} ms, audit'da topilgan {stats['missed_presence_rate']:.1%})")
+        if self.tiled is not None:
+            logger.info(f"Kamera {self.camera_id} plitkalash: {self.tiled.get_stats()}")
+        if self.remote is not None:
+            logger.info(f"Kamera {self.camera_id} masofaviy inference: {self.remote.get_stats()}")
         self.decoder.release()
-        cv2.destroyWindow(f"Camera {self.camera_id} - {self.camera_name}")
         logger.info(f"Kamera {self.camera_id} to'xtatildi")
     
+    def _report_priority(self, detected_count: int):
+        """Tracker holatidan prioritetni aniqlab scheduler'ga xabar qilish"""
+        _, max_time, objects_count = self.tracker.get_polygon_state()
+        self.priority = classify_priority(
+            objects_count,
+            max_time,
+            detected_count,
+            self.threshold_violation,
+            self.scheduler.config.near_ratio
+        )
+        self.scheduler.report(self.camera_id, self.priority)
+    
     def _draw_visualization(self, frame, detection_result):
         """Vizualizatsiya chizish"""
         # Polygon holati
@@ -219,7 +495,15 @@ class PolygonCamera:
         cv2.putText(frame, f"Count: {self.tracker.passed_count}  | Inside: {objects_count}", 
                    (10, self.frame_height - 90), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
         
-        if self.adaptive_mode:
+        if self.freeze is not None and self.freeze.frozen:
+            cv2.putText(frame, "MUZLAGAN OQIM", (10, 90), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
+        
+        if self.scheduler is not None:
+            allocation = self.scheduler.get_allocation().get(self.camera_id)
+            if allocation is not None:
+                mode_text = f"{PRIORITY_NAMES[self.priority].upper()} ({allocation['fps']:.1f}/s)"
+                cv2.putText(frame, mode_text, (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
+        elif self.adaptive_mode:
             mode_text = f"{'ACTIVE' if self.current_frame_skip <= 2 else 'IDLE'} (1/{self.current_frame_skip})"
             cv2.putText(frame, mode_text, (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
     
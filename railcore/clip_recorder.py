@@ -0,0 +1,269 @@
+"""
+ClipRecorder - hodisa atrofidagi (pre/post) videoklipni yozish
+"""
+import cv2
+import threading
+import numpy as np
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from queue import Queue, Empty
+from pathlib import Path
+from typing import Deque, List, Optional
+from railcore.types import ClipConfig, FrameEvent
+from railcore.retention import RetentionManager
+from railcore.logging_setup import setup_logger
+
+logger = setup_logger(__name__)
+
+class _RingFrame:
+    """Ring buffer elementi: kichraytirilgan frame, siqilgandan keyin JPEG baytlari"""
+
+    __slots__ = ('time', 'payload', 'nbytes', 'encoding', 'evicted')
+
+    def __init__(self, time: float, payload: np.ndarray):
+        self.time = time
+        self.payload = payload
+        self.nbytes = payload.nbytes
+        self.encoding: Optional[Future] = None
+        self.evicted = False
+
+class _PendingClip:
+    """Post-event frame'larini kutayotgan klip"""
+
+    def __init__(self, event: FrameEvent, start_time: float, end_time: float):
+        self.event = event
+        self.start_time = start_time
+        self.end_time = end_time
+
+class ClipWriter:
+    """Kliplarni alohida thread'da MP4 ga yozish (barcha kameralar uchun bitta)"""
+
+    def __init__(self, config: ClipConfig, retention: Optional[RetentionManager] = None):
+        """
+        Args:
+            config: Klip konfiguratsiyasi
+            retention: Yozilgan kliplarni disk kvotasi uchun indekslash (ixtiyoriy)
+        """
+        self.config = config
+        self.retention = retention
+        self.output_dir = Path(config.output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        # Ring buffer frame'larini siqish pool'i (kamera thread'idan tashqarida)
+        self.pool = ThreadPoolExecutor(max_workers=max(1, config.encode_workers),
+                                       thread_name_prefix='ClipEncode') if config.compress else None
+        self.queue = Queue()
+        self.running = True
+        self.written = 0
+        self.thread = threading.Thread(target=self._worker, daemon=True)
+        self.thread.start()
+        logger.info(f"ClipWriter ishga tushdi: {self.output_dir}")
+
+    def encode(self, frame: np.ndarray) -> Optional[bytes]:
+        """
+        Frame'ni JPEG'ga siqish (pool thread'ida)
+
+        Args:
+            frame: Kichraytirilgan frame
+
+        Returns:
+            Optional[bytes]: JPEG baytlari (xato bo'lsa None)
+        """
+        ok, buf = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.config.jpeg_quality])
+        return buf.tobytes() if ok else None
+
+    def submit(self, event: FrameEvent, frames: List[_RingFrame], fps: float):
+        """
+        Klipni yozish navbatiga qo'shish
+
+        Args:
+            event: Klip tegishli hodisa
+            frames: Ring buffer elementlari
+            fps: Klip FPS
+        """
+        self.queue.put((event, frames, fps))
+
+    def _worker(self):
+        """Navbatdagi kliplarni yozish"""
+        while self.running or not self.queue.empty():
+            try:
+                event, frames, fps = self.queue.get(timeout=0.5)
+            except Empty:
+                continue
+            try:
+                self._write_clip(event, frames, fps)
+            except Exception as e:
+                logger.error(f"Klip yozishda xato (kamera {event.camera_id}, ID {event.track_id}): {e}")
+
+    def clip_path(self, event: FrameEvent) -> Path:
+        """
+        Klip fayl yo'li (rasm nomi bilan bir xil)
+
+        Args:
+            event: FrameEvent
+
+        Returns:
+            Path: saved_clips/camera_<id>/<event>/<nom>.mp4
+        """
+        return self.output_dir / event.image_relpath(extension='mp4')
+
+    def _write_clip(self, event: FrameEvent, frames: List[_RingFrame], fps: float):
+        """Frame'larni MP4 faylga yozish (dasturiy encoder)"""
+        if not frames:
+            return
+
+        path = self.clip_path(event)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        writer = None
+        try:
+            for item in frames:
+                # Siqish tugamagan bo'lsa xom frame yoziladi
+                payload = item.payload
+                if isinstance(payload, bytes):
+                    frame = cv2.imdecode(np.frombuffer(payload, np.uint8), cv2.IMREAD_COLOR)
+                else:
+                    frame = payload
+                if writer is None:
+                    h, w = frame.shape[:2]
+                    fourcc = cv2.VideoWriter_fourcc(*self.config.codec)
+                    writer = cv2.VideoWriter(str(path), fourcc, fps, (w, h))
+                    if not writer.isOpened():
+                        raise IOError(f"VideoWriter ochilmadi: {path}")
+                writer.write(frame)
+        finally:
+            if writer is not None:
+                writer.release()
+
+        self.written += 1
+        if self.retention is not None:
+            self.retention.record(event.camera_id, event.event_type, [path])
+        duration = frames[-1].time - frames[0].time
+        logger.info(f"Klip saqlandi: {path} ({len(frames)} frame, {duration:.1f}s)")
+
+    def stop(self):
+        """Writer'ni to'xtatish (navbatdagi kliplar yoziladi)"""
+        logger.info("ClipWriter to'xtatilmoqda...")
+        self.running = False
+        self.thread.join()
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+        logger.info(f"ClipWriter to'xtatildi ({self.written} ta klip)")
+
+class ClipRecorder:
+    """Bitta kamera uchun xotirasi cheklangan ring buffer va klip yig'uvchi"""
+
+    def __init__(self, camera_id: int, fps: float, writer: ClipWriter):
+        """
+        Args:
+            camera_id: Kamera ID
+            fps: Video FPS (klip FPS'i)
+            writer: Umumiy ClipWriter
+        """
+        self.camera_id = camera_id
+        self.config = writer.config
+        self.writer = writer
+        self.fps = fps
+        self.max_bytes = int(self.config.max_memory_mb * 1024 * 1024)
+
+        # Ring buffer va faol kliplar bitta deque'ni bo'lishadi:
+        # eng eski faol klip boshlanishidan (yoki pre_seconds'dan) hozirgacha
+        self.frames: Deque[_RingFrame] = deque()
+        self.memory_bytes = 0
+        self.pending: List[_PendingClip] = []
+        # Siqilishi kutilayotgan frame'lar (pool'ga berilgan tartibda)
+        self.encoding: Deque[_RingFrame] = deque()
+
+    def _prepare(self, frame: np.ndarray) -> np.ndarray:
+        """Frame'ni kichraytirish (siqish pool'da bajariladi)"""
+        scale = self.config.scale
+        if scale != 1.0:
+            h, w = frame.shape[:2]
+            return cv2.resize(frame, (int(w * scale) & ~1, int(h * scale) & ~1),
+                              interpolation=cv2.INTER_AREA)
+        return frame.copy()
+
+    def _collect_encoded(self):
+        """Siqilib bo'lgan frame'larning xom nusxasini JPEG baytlari bilan almashtirish"""
+        while self.encoding and self.encoding[0].encoding.done():
+            item = self.encoding.popleft()
+            future, item.encoding = item.encoding, None
+            if item.evicted or future.cancelled() or future.exception() is not None:
+                continue
+            data = future.result()
+            if data is None:
+                continue
+            self.memory_bytes += len(data) - item.nbytes
+            item.payload = data
+            item.nbytes = len(data)
+
+    def _pop_oldest(self):
+        item = self.frames.popleft()
+        self.memory_bytes -= item.nbytes
+        item.evicted = True
+        if item.encoding is not None:
+            item.encoding.cancel()
+
+    def push(self, frame: np.ndarray, current_time: float):
+        """
+        Yangi frame'ni ring buffer'ga qo'shish va tugagan kliplarni yozishga berish
+
+        Args:
+            frame: Annotatsiyasiz frame
+            current_time: Video vaqti (sekund)
+        """
+        item = _RingFrame(current_time, self._prepare(frame))
+        self.frames.append(item)
+        self.memory_bytes += item.nbytes
+        if self.writer.pool is not None:
+            try:
+                item.encoding = self.writer.pool.submit(self.writer.encode, item.payload)
+                self.encoding.append(item)
+            except RuntimeError:
+                # Pool yopilgan (to'xtatilmoqda)
+                pass
+        self._collect_encoded()
+
+        # Post qismi to'lgan kliplar
+        for clip in [c for c in self.pending if current_time >= c.end_time]:
+            self._finish(clip)
+
+        # Kerak bo'lmagan eski frame'lar
+        keep_from = current_time - self.config.pre_seconds
+        if self.pending:
+            keep_from = min(keep_from, min(c.start_time for c in self.pending))
+        while self.frames and self.frames[0].time < keep_from:
+            self._pop_oldest()
+
+        # Xotira chegarasi: eski frame'ni ushlab turgan klip erta yopiladi
+        while self.memory_bytes > self.max_bytes and len(self.frames) > 1:
+            holder = next((c for c in self.pending if c.start_time <= self.frames[0].time), None)
+            if holder is not None:
+                logger.warning(f"Kamera {self.camera_id}: klip xotira chegarasiga yetdi, erta yopilmoqda")
+                self._finish(holder)
+            else:
+                self._pop_oldest()
+
+    def on_event(self, event: FrameEvent, current_time: float):
+        """
+        Hodisa bo'yicha klip yig'ishni boshlash
+
+        Args:
+            event: FrameEvent
+            current_time: Hodisa vaqti (video vaqti)
+        """
+        if event.event_type not in self.config.event_types:
+            return
+        # Buffer boshqa klip uchun pre_seconds'dan uzoqroqqa ushlab turilgan bo'lishi mumkin
+        start_time = max(self.frames[0].time, current_time - self.config.pre_seconds) if self.frames else current_time
+        self.pending.append(_PendingClip(event, start_time, current_time + self.config.post_seconds))
+
+    def _finish(self, clip: _PendingClip):
+        """Klip frame'larini yig'ib writer'ga berish"""
+        self.pending.remove(clip)
+        frames = [item for item in self.frames if clip.start_time <= item.time <= clip.end_time]
+        self.writer.submit(clip.event, frames, self.fps)
+
+    def flush(self):
+        """Barcha faol kliplarni (post qismi to'lmagan bo'lsa ham) yozishga berish"""
+        for clip in list(self.pending):
+            self._finish(clip)
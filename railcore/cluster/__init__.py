@@ -0,0 +1,12 @@
+"""
+Cluster moduli - kameralarni bir nechta node'ga taqsimlash
+
+    python -m railcore.cluster coordinator --config config/config.yaml
+    python -m railcore.cluster worker --name w1 --coordinator 10.0.0.5:7700 --config config/config.yaml
+    python -m railcore.cluster status --coordinator 10.0.0.5:7700
+    python -m railcore.cluster local --workers 4   # localhost'da simulyatsiya
+"""
+from railcore.cluster.coordinator import Coordinator, place_cameras
+from railcore.cluster.worker import ClusterSink, SimulatedEngine, SystemEngine, Worker
+
+__all__ = ['Coordinator', 'Worker', 'SystemEngine', 'SimulatedEngine', 'ClusterSink', 'place_cameras']
@@ -0,0 +1,183 @@
+"""
+Cluster CLI
+
+    python -m railcore.cluster coordinator [--config config/config.yaml] [--port 7700]
+    python -m railcore.cluster worker --name w1 [--coordinator host:port] [--capacity 40] [--simulate]
+    python -m railcore.cluster status [--coordinator host:port]
+    python -m railcore.cluster local [--workers 4] [--cameras 8] [--kill-after 15] [--duration 30]
+
+'local' - coordinator shu jarayonda, worker'lar alohida jarayonlarda (--simulate) ishga tushadi.
+Oxirgi worker e'lon qilganidan sekin ishlaydi (--throttle) - orqada qoladi va kamerasi ko'chiriladi;
+birinchi worker --kill-after sekunddan keyin o'ldiriladi - kameralari qayta taqsimlanadi.
+"""
+import argparse
+import json
+import signal
+import subprocess
+import sys
+import time
+from railcore.types import ClusterConfig
+from railcore.config import load_config
+from railcore.cluster.protocol import parse_address, request
+from railcore.cluster.coordinator import Coordinator
+from railcore.cluster.worker import SimulatedEngine, SystemEngine, Worker
+from railcore.logging_setup import setup_logger
+
+logger = setup_logger(__name__)
+
+def parse_cluster_config(cluster: dict) -> ClusterConfig:
+    """Config'ning 'cluster' bo'limidan ClusterConfig"""
+    defaults = ClusterConfig()
+    return ClusterConfig(
+        host=cluster.get('host', defaults.host),
+        port=cluster.get('port', defaults.port),
+        heartbeat_interval=cluster.get('heartbeat_interval', defaults.heartbeat_interval),
+        dead_after=cluster.get('dead_after', defaults.dead_after),
+        rebalance_interval=cluster.get('rebalance_interval', defaults.rebalance_interval),
+        camera_demand=cluster.get('camera_demand', defaults.camera_demand),
+        overload_ratio=cluster.get('overload_ratio', defaults.overload_ratio),
+        overload_seconds=cluster.get('overload_seconds', defaults.overload_seconds),
+        move_cooldown=cluster.get('move_cooldown', defaults.move_cooldown),
+        events_file=cluster.get('events_file', defaults.events_file)
+    )
+
+def format_status(status: dict) -> str:
+    """Status'ni jadval ko'rinishida"""
+    lines = [f"{'worker':>10} {'sig`im':>8} {'yuk':>7} {'orqada':>7} {'hodisa':>7}  kameralar"]
+    for name, w in status['workers'].items():
+        lines.append(f"{name:>10} {w['capacity']:>8.1f} {w['load']:>7.1f} {'ha' if w['lagging'] else '-':>7} "
+                     f"{w['events']:>7}  {w['cameras']}")
+    if status['unassigned']:
+        lines.append(f"egasiz: {status['unassigned']}")
+    lines.append(f"ko'chirishlar: {status['moves']}")
+    return '\n'.join(lines)
+
+def run_coordinator(args, config: dict):
+    cluster = parse_cluster_config(config.get('cluster', {}))
+    if args.port is not None:
+        cluster.port = args.port
+    if args.host:
+        cluster.host = args.host
+    coordinator = Coordinator(cluster, config['cameras']).start()
+    try:
+        while True:
+            time.sleep(30)
+            logger.info("Cluster holati:\n" + format_status(coordinator.get_status()))
+    except KeyboardInterrupt:
+        coordinator.stop()
+
+def run_worker(args, config: dict):
+    cluster = parse_cluster_config(config.get('cluster', {}) if config else {})
+    if args.heartbeat:
+        cluster.heartbeat_interval = args.heartbeat
+    host, port = parse_address(args.coordinator, cluster.port) if args.coordinator else (cluster.host, cluster.port)
+    worker = Worker(args.name, host, port, cluster)
+    if args.simulate:
+        engine = SimulatedEngine(worker.send_events, capacity=args.capacity or 50.0, throttle=args.throttle)
+    else:
+        engine = SystemEngine(args.config, worker.send_events, capacity=args.capacity or 0.0)
+
+    signal.signal(signal.SIGTERM, lambda *_: worker.stop())
+    try:
+        worker.run(engine)
+    except KeyboardInterrupt:
+        worker.stop()
+
+def run_local(args):
+    """Coordinator + simulyatsiya qilingan worker jarayonlari (localhost)"""
+    cluster = ClusterConfig(port=0, heartbeat_interval=0.5, dead_after=2.0, rebalance_interval=0.5,
+                            overload_seconds=3.0, move_cooldown=3.0)
+    cameras = [
+        {'id': i + 1, 'name': f"sim{i + 1}", 'demand': 6.0 + 3.0 * (i % 4), 'video_fps': 25.0}
+        for i in range(args.cameras)
+    ]
+    coordinator = Coordinator(cluster, cameras).start()
+    _, port = coordinator.address
+
+    processes = []
+    for index in range(args.workers):
+        # Oxirgi worker e'lon qilganidan sekin - orqada qoladi va kamerasi ko'chiriladi
+        throttle = 0.4 if index == args.workers - 1 and args.workers > 1 else 1.0
+        processes.append(subprocess.Popen([
+            sys.executable, '-m', 'railcore.cluster', 'worker', '--simulate',
+            '--name', f"w{index + 1}", '--coordinator', f"127.0.0.1:{port}",
+            '--capacity', str(args.capacity), '--throttle', str(throttle), '--heartbeat', '0.5'
+        ]))
+
+    killed = False
+    start = time.time()
+    try:
+        while time.time() - start < args.duration:
+            time.sleep(2.0)
+            if not killed and args.kill_after > 0 and time.time() - start >= args.kill_after and processes:
+                processes[0].kill()
+                killed = True
+                print(">>> w1 o'ldirildi")
+            print(format_status(coordinator.get_status()), end='\n\n', flush=True)
+    finally:
+        status = coordinator.get_status()
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=5)
+        coordinator.stop()
+    print(json.dumps({'assignment': status['assignment'], 'unassigned': status['unassigned'],
+                      'moves': status['moves'], 'events': status['events']}, indent=2))
+
+def main():
+    parser = argparse.ArgumentParser(description="RailSafe cluster")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    coordinator_p = sub.add_parser('coordinator', help="Coordinator'ni ishga tushirish")
+    coordinator_p.add_argument('--config', default='config/config.yaml')
+    coordinator_p.add_argument('--host')
+    coordinator_p.add_argument('--port', type=int)
+
+    worker_p = sub.add_parser('worker', help="Worker node")
+    worker_p.add_argument('--name', required=True)
+    worker_p.add_argument('--coordinator', help="host:port (standart - config'dagi cluster.host/port)")
+    worker_p.add_argument('--config', default='config/config.yaml')
+    worker_p.add_argument('--capacity', type=float, help="Sig'im, inference FPS (standart - o'lchanadi)")
+    worker_p.add_argument('--heartbeat', type=float)
+    worker_p.add_argument('--simulate', action='store_true', help="Model va kamerasiz simulyatsiya")
+    worker_p.add_argument('--throttle', type=float, default=1.0,
+                          help="Simulyatsiya: sig'imning haqiqatda mavjud ulushi")
+
+    status_p = sub.add_parser('status', help="Cluster holati")
+    status_p.add_argument('--coordinator')
+    status_p.add_argument('--config', default='config/config.yaml')
+    status_p.add_argument('--json', action='store_true')
+
+    local_p = sub.add_parser('local', help="Localhost'da simulyatsiya (coordinator + worker jarayonlari)")
+    local_p.add_argument('--workers', type=int, default=4)
+    local_p.add_argument('--cameras', type=int, default=8)
+    local_p.add_argument('--capacity', type=float, default=45.0)
+    local_p.add_argument('--kill-after', type=float, default=15.0)
+    local_p.add_argument('--duration', type=float, default=30.0)
+
+    args = parser.parse_args()
+
+    if args.command == 'local':
+        run_local(args)
+        return
+    if args.command == 'worker':
+        run_worker(args, load_config(args.config) if not args.simulate else {})
+        return
+
+    config = load_config(args.config)
+    if args.command == 'coordinator':
+        run_coordinator(args, config)
+        return
+
+    cluster = parse_cluster_config(config.get('cluster', {}))
+    host, port = parse_address(args.coordinator, cluster.port) if args.coordinator else (cluster.host, cluster.port)
+    try:
+        status = request(host, port, {'type': 'status'})
+    except OSError as e:
+        sys.exit(f"Coordinator'ga ulanib bo'lmadi ({host}:{port}): {e}")
+    if status is None:
+        sys.exit(f"Coordinator javob bermadi ({host}:{port})")
+    print(json.dumps(status, indent=2) if args.json else format_status(status))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,358 @@
+"""
+Coordinator - kameralarni worker node'lar orasida taqsimlash
+
+- Kamera talabi (inference FPS): worker heartbeat'laridagi processed_fps (o'lchanmaguncha
+  kamera yozuvidagi 'demand' yoki cluster.camera_demand)
+- Worker sig'imi: hello'da e'lon qilingan/o'lchangan, so'ng heartbeat'lardan aniqlanadi
+  (kameralar orqada qolsa sig'im = haqiqatda qayta ishlangan FPS)
+- Yangi/egasiz kameralar eng ko'p bo'sh sig'imli worker'ga beriladi (talab bo'yicha kamayish tartibida)
+- Worker uzilsa yoki dead_after davomida heartbeat bo'lmasa uning kameralari boshqalarga o'tadi
+- Worker overload_seconds davomida orqada qolsa (fps < overload_ratio * video_fps) uning
+  eng kichik talabli kamerasi sig'imi yetadigan boshqa worker'ga ko'chiriladi (move_cooldown bilan)
+
+Mavjud kameralar yangi worker qo'shilganda ko'chirilmaydi - faqat egasizlari taqsimlanadi.
+"""
+import json
+import socketserver
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+from railcore.types import ClusterConfig
+from railcore.cluster.protocol import Connection
+from railcore.logging_setup import setup_logger
+
+logger = setup_logger(__name__)
+
+def place_cameras(cameras: List[int], demand: Dict[int, float],
+                  headroom: Dict[str, float]) -> Dict[int, str]:
+    """
+    Kameralarni bo'sh sig'im bo'yicha joylashtirish (eng katta talabli kamera birinchi,
+    eng ko'p bo'sh sig'imli worker'ga)
+
+    Args:
+        cameras: Joylashtiriladigan kamera ID'lar
+        demand: camera_id -> talab (inference FPS)
+        headroom: worker -> bo'sh sig'im (o'zgartiriladi)
+
+    Returns:
+        Dict[int, str]: camera_id -> worker (worker bo'lmasa bo'sh)
+    """
+    placement: Dict[int, str] = {}
+    if not headroom:
+        return placement
+    for camera_id in sorted(cameras, key=lambda c: (-demand[c], c)):
+        worker = max(headroom, key=lambda w: (headroom[w], w))
+        placement[camera_id] = worker
+        headroom[worker] -= demand[camera_id]
+    return placement
+
+class _Worker:
+    """Coordinator'dagi worker holati"""
+
+    def __init__(self, name: str, connection: Connection, address: str, capacity: float):
+        self.name = name
+        self.connection = connection
+        self.address = address
+        self.declared_capacity = capacity
+        self.capacity = capacity
+        self.cameras: Set[int] = set()
+        self.metrics: Dict[int, dict] = {}
+        self.last_seen = time.time()
+        self.lagging_since: Optional[float] = None
+        self.last_move = 0.0
+        self.dirty = True  # Tayinlash yuborilishi kerak
+        self.events = 0
+
+class Coordinator:
+    """Cluster coordinator (TCP server)"""
+
+    def __init__(self, config: ClusterConfig, cameras: List[dict]):
+        """
+        Args:
+            config: Cluster konfiguratsiyasi
+            cameras: Config'dagi kamera yozuvlari (faqat yoqilganlari taqsimlanadi)
+        """
+        self.config = config
+        self.cameras: Dict[int, dict] = {c['id']: dict(c) for c in cameras if c.get('enabled', True)}
+        self.demand: Dict[int, float] = {
+            camera_id: float(c.get('demand', config.camera_demand)) for camera_id, c in self.cameras.items()
+        }
+        self.assignment: Dict[int, str] = {}
+        self.workers: Dict[str, _Worker] = {}
+        self._lock = threading.Lock()
+        self.running = False
+
+        # Statistika
+        self.moves = 0
+        self.event_counts: Dict[int, Dict[str, int]] = {}
+        self._events_file = None
+        if config.events_file:
+            Path(config.events_file).parent.mkdir(parents=True, exist_ok=True)
+            self._events_file = open(config.events_file, 'a', encoding='utf-8')
+
+        self.server = socketserver.ThreadingTCPServer((config.host, config.port), self._make_handler())
+        self.server.daemon_threads = True
+        self.thread: Optional[threading.Thread] = None
+        self.monitor_thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """(host, port)"""
+        return self.server.server_address[:2]
+
+    def start(self) -> 'Coordinator':
+        """Server va monitor thread'larini ishga tushirish"""
+        self.running = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.monitor_thread = threading.Thread(target=self._monitor, daemon=True)
+        self.monitor_thread.start()
+        host, port = self.address
+        logger.info(f"Coordinator: {host}:{port}, {len(self.cameras)} ta kamera")
+        return self
+
+    # --- Worker sessiyasi ---
+
+    def _make_handler(self):
+        coordinator = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                connection = Connection(self.request)
+                # Worker o'qimasa _monitor'dagi assign yuborish dead_after'dan ortiq to'xtamaydi
+                connection.set_send_timeout(coordinator.config.dead_after)
+                messages = connection.messages()
+                worker = None
+                try:
+                    first = next(messages, None)
+                    if first is None:
+                        return
+                    if first.get('type') == 'status':
+                        connection.send(coordinator.get_status())
+                        return
+                    if first.get('type') != 'hello':
+                        return
+                    address = f"{self.client_address[0]}:{self.client_address[1]}"
+                    worker = coordinator._register(first, connection, address)
+                    for message in messages:
+                        coordinator._on_message(worker, message)
+                except (OSError, ValueError) as e:
+                    logger.debug(f"Ulanish xatosi ({self.client_address[0]}): {e}")
+                finally:
+                    if worker is not None:
+                        coordinator._unregister(worker, "ulanish uzildi")
+                    connection.close()
+
+        return Handler
+
+    def _register(self, hello: dict, connection: Connection, address: str) -> _Worker:
+        """Yangi worker (shu nomdagi eski ulanish yopiladi)"""
+        name = str(hello['worker'])
+        worker = _Worker(name, connection, address, float(hello.get('capacity', 0.0)))
+        with self._lock:
+            old = self.workers.get(name)
+            if old is not None:
+                self._release(old)
+            self.workers[name] = worker
+            # Worker allaqachon ishlatayotgan egasiz kameralar o'zida qoladi
+            for camera_id in hello.get('running', []):
+                if camera_id in self.cameras and camera_id not in self.assignment:
+                    self.assignment[camera_id] = name
+                    worker.cameras.add(camera_id)
+        if old is not None:
+            old.connection.close()
+        logger.info(f"Worker {name} ulandi ({address}, sig'im {worker.capacity:.1f} FPS, "
+                     f"ishlayotgan kameralar: {sorted(worker.cameras)})")
+        return worker
+
+    def _release(self, worker: _Worker):
+        """Worker kameralarini egasiz qilish (lock ostida)"""
+        for camera_id in worker.cameras:
+            if self.assignment.get(camera_id) == worker.name:
+                del self.assignment[camera_id]
+        worker.cameras.clear()
+
+    def _unregister(self, worker: _Worker, reason: str):
+        with self._lock:
+            if self.workers.get(worker.name) is not worker:
+                return
+            del self.workers[worker.name]
+            orphaned = sorted(worker.cameras)
+            self._release(worker)
+        worker.connection.close()
+        logger.warning(f"Worker {worker.name} chiqarildi ({reason}), kameralari qayta taqsimlanadi: {orphaned}")
+
+    def _on_message(self, worker: _Worker, message: dict):
+        kind = message.get('type')
+        if kind == 'heartbeat':
+            self._on_heartbeat(worker, message)
+        elif kind == 'events':
+            self._on_events(worker, message.get('records', []))
+
+    def _on_heartbeat(self, worker: _Worker, message: dict):
+        """Metrikalar: kamera talabi, worker sig'imi va orqada qolish"""
+        now = time.time()
+        metrics = {int(k): v for k, v in message.get('cameras', {}).items()}
+        with self._lock:
+            worker.last_seen = now
+            worker.metrics = metrics
+            if message.get('capacity'):
+                worker.declared_capacity = float(message['capacity'])
+
+            lagging = [
+                camera_id for camera_id, m in metrics.items()
+                if m.get('video_fps', 0) > 0 and m.get('fps', 0) < self.config.overload_ratio * m['video_fps']
+            ]
+            processed = sum(m.get('processed_fps', 0.0) for m in metrics.values())
+            for camera_id, m in metrics.items():
+                if camera_id not in self.demand or m.get('processed_fps', 0) <= 0:
+                    continue
+                if lagging:
+                    # To'yingan worker'da talab o'lchanmaydi - faqat oshishi mumkin
+                    self.demand[camera_id] = max(self.demand[camera_id], m['processed_fps'])
+                else:
+                    self.demand[camera_id] = m['processed_fps']
+
+            if lagging:
+                if worker.lagging_since is None:
+                    worker.lagging_since = now
+                if processed > 0:
+                    # To'yingan worker - haqiqiy sig'im shu
+                    worker.capacity = min(worker.declared_capacity, processed) if worker.declared_capacity > 0 else processed
+            else:
+                # Orqada qolganda o'lchangan sig'im saqlanadi - faqat kuzatilgan tezlik bilan oshadi
+                worker.lagging_since = None
+                worker.capacity = max(worker.capacity, processed)
+
+    def _on_events(self, worker: _Worker, records: List[dict]):
+        """Worker hodisalari: hisoblash va (ixtiyoriy) JSONL faylga yozish"""
+        with self._lock:
+            worker.events += len(records)
+            for record in records:
+                counts = self.event_counts.setdefault(int(record.get('camera_id', -1)), {})
+                event_type = record.get('event_type', '?')
+                counts[event_type] = counts.get(event_type, 0) + 1
+            if self._events_file is not None:
+                for record in records:
+                    self._events_file.write(json.dumps(dict(record, worker=worker.name), ensure_ascii=False) + '\n')
+                self._events_file.flush()
+
+    # --- Taqsimlash ---
+
+    def _load(self, worker: _Worker) -> float:
+        return sum(self.demand[c] for c in worker.cameras)
+
+    def _monitor(self):
+        """Davriy: o'lik worker'lar, orqada qolish, egasiz kameralar, tayinlashlarni yuborish"""
+        while self.running:
+            time.sleep(self.config.rebalance_interval)
+            now = time.time()
+            with self._lock:
+                dead = [w for w in self.workers.values() if now - w.last_seen > self.config.dead_after]
+            for worker in dead:
+                self._unregister(worker, f"{self.config.dead_after:g}s heartbeat yo'q")
+
+            with self._lock:
+                self._relieve_overloaded(now)
+                self._place_orphans()
+                pending = [w for w in self.workers.values() if w.dirty]
+                messages = {}
+                for worker in pending:
+                    worker.dirty = False
+                    messages[worker.name] = [self.cameras[c] for c in sorted(worker.cameras)]
+            for worker in pending:
+                try:
+                    worker.connection.send({'type': 'assign', 'cameras': messages[worker.name]})
+                except OSError as e:
+                    self._unregister(worker, f"yuborib bo'lmadi: {e}")
+
+    def _place_orphans(self):
+        """Egasiz kameralarni joylashtirish (lock ostida)"""
+        orphans = [c for c in self.cameras if c not in self.assignment]
+        if not orphans or not self.workers:
+            return
+        headroom = {name: w.capacity - self._load(w) for name, w in self.workers.items()}
+        for camera_id, name in place_cameras(orphans, self.demand, headroom).items():
+            worker = self.workers[name]
+            self.assignment[camera_id] = name
+            worker.cameras.add(camera_id)
+            worker.dirty = True
+            logger.info(f"Kamera {camera_id} -> worker {name} (talab {self.demand[camera_id]:.1f} FPS)")
+        for name, free in headroom.items():
+            if free < 0:
+                logger.warning(f"Worker {name} sig'imdan {-free:.1f} FPS oshiq yuklandi (bo'sh sig'im yo'q)")
+
+    def _relieve_overloaded(self, now: float):
+        """Uzoq orqada qolgan worker'dan bitta kamerani ko'chirish (lock ostida)"""
+        for worker in list(self.workers.values()):
+            if worker.lagging_since is None or now - worker.lagging_since < self.config.overload_seconds:
+                continue
+            if now - worker.last_move < self.config.move_cooldown or len(worker.cameras) <= 1:
+                continue
+            others = {name: w.capacity - self._load(w) for name, w in self.workers.items()
+                      if w is not worker and w.lagging_since is None}
+            for camera_id in sorted(worker.cameras, key=lambda c: (self.demand[c], c)):
+                fits = [name for name, free in others.items() if free >= self.demand[camera_id]]
+                if not fits:
+                    continue
+                target = self.workers[max(fits, key=lambda name: others[name])]
+                worker.cameras.discard(camera_id)
+                target.cameras.add(camera_id)
+                self.assignment[camera_id] = target.name
+                worker.dirty = target.dirty = True
+                worker.last_move = now
+                worker.lagging_since = None  # Yangi o'lchovlarni kutish
+                self.moves += 1
+                logger.warning(f"Worker {worker.name} orqada qolmoqda - kamera {camera_id} "
+                               f"worker {target.name} ga ko'chirildi")
+                break
+
+    # --- Holat ---
+
+    def get_status(self) -> dict:
+        """
+        Cluster holati (status so'roviga javob)
+
+        Returns:
+            dict: workers, assignment, unassigned, demand, events, moves
+        """
+        now = time.time()
+        with self._lock:
+            workers = {
+                name: {
+                    'address': w.address,
+                    'capacity': round(w.capacity, 1),
+                    'load': round(self._load(w), 1),
+                    'cameras': sorted(w.cameras),
+                    'lagging': w.lagging_since is not None,
+                    'last_seen': round(now - w.last_seen, 1),
+                    'events': w.events,
+                    'metrics': {str(k): v for k, v in w.metrics.items()},
+                }
+                for name, w in sorted(self.workers.items())
+            }
+            return {
+                'type': 'status',
+                'workers': workers,
+                'assignment': {str(k): v for k, v in sorted(self.assignment.items())},
+                'unassigned': sorted(c for c in self.cameras if c not in self.assignment),
+                'demand': {str(k): round(v, 1) for k, v in sorted(self.demand.items())},
+                'events': {str(k): v for k, v in sorted(self.event_counts.items())},
+                'moves': self.moves,
+            }
+
+    def stop(self):
+        """Coordinator'ni to'xtatish (worker'lar o'z kameralarini ishlatishda davom etadi)"""
+        self.running = False
+        if self.thread is not None:
+            self.server.shutdown()
+            self.thread = None
+        self.server.server_close()
+        with self._lock:
+            workers = list(self.workers.values())
+        for worker in workers:
+            worker.connection.close()
+        if self._events_file is not None:
+            self._events_file.close()
+        logger.info("Coordinator to'xtatildi")
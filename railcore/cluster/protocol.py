@@ -0,0 +1,135 @@
+"""
+Cluster protokoli - TCP ustida qator bilan ajratilgan JSON (JSON lines)
+
+Worker -> coordinator:
+    {"type": "hello", "worker": "w1", "capacity": 40.0, "running": [1, 2]}
+    {"type": "heartbeat", "cameras": {"1": {...}}, "capacity": 40.0}
+    {"type": "events", "records": [...]}
+
+Coordinator -> worker:
+    {"type": "assign", "cameras": [<config'dagi kamera yozuvlari>]}
+
+Har qanday mijoz -> coordinator:
+    {"type": "status"}  ->  {"type": "status", ...}
+"""
+import json
+import socket
+import struct
+import threading
+from typing import Iterator, Optional, Tuple
+
+MAX_LINE = 16 * 1024 * 1024  # Bitta xabar chegarasi (hodisalar batch'i uchun yetarli)
+
+def parse_address(address: str, default_port: int = 7700) -> Tuple[str, int]:
+    """
+    'host:port' yoki 'host' ni (host, port) ga aylantirish
+
+    Args:
+        address: Manzil
+        default_port: Port ko'rsatilmagan bo'lsa
+
+    Returns:
+        Tuple[str, int]
+    """
+    host, _, port = address.rpartition(':')
+    if not host:
+        return address, default_port
+    return host, int(port)
+
+def encode(message: dict) -> bytes:
+    """Xabarni bitta JSON qatoriga aylantirish"""
+    return json.dumps(message, separators=(',', ':')).encode('utf-8') + b'\n'
+
+def read_messages(sock: socket.socket) -> Iterator[dict]:
+    """
+    Socket'dan xabarlarni o'qish (ulanish yopilguncha)
+
+    Yields:
+        dict: Har bir JSON qator
+    """
+    stream = sock.makefile('rb')
+    try:
+        while True:
+            line = stream.readline(MAX_LINE)
+            if not line:
+                return
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+    finally:
+        stream.close()
+
+class Connection:
+    """Bir nechta thread'dan xavfsiz yuboriladigan TCP ulanish"""
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self._send_lock = threading.Lock()
+        self.closed = False
+
+    @classmethod
+    def connect(cls, host: str, port: int, timeout: float = 5.0, send_timeout: float = 0.0) -> 'Connection':
+        """
+        Server'ga ulanish
+
+        Args:
+            send_timeout: Server o'qimasa send() shuncha sekunddan keyin OSError (0 = cheklanmagan)
+        """
+        sock = socket.create_connection((host, port), timeout=timeout)
+        sock.settimeout(None)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        connection = cls(sock)
+        connection.set_send_timeout(send_timeout)
+        return connection
+
+    def set_send_timeout(self, seconds: float):
+        """
+        Qarshi tomon o'qimasa send() shuncha sekunddan keyin OSError bilan tugaydi
+
+        Args:
+            seconds: Timeout (0 = cheklanmagan)
+        """
+        if seconds > 0:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDTIMEO,
+                                 struct.pack('ll', int(seconds), int((seconds % 1) * 1e6)))
+
+    def send(self, message: dict):
+        """
+        Xabar yuborish
+
+        Raises:
+            OSError: Ulanish uzilgan bo'lsa
+        """
+        data = encode(message)
+        with self._send_lock:
+            self.sock.sendall(data)
+
+    def messages(self) -> Iterator[dict]:
+        """Kelgan xabarlar (ulanish yopilguncha)"""
+        return read_messages(self.sock)
+
+    def close(self):
+        """Ulanishni yopish (o'qiyotgan thread uyg'onadi)"""
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+def request(host: str, port: int, message: dict, timeout: float = 5.0) -> Optional[dict]:
+    """
+    Bitta so'rov - bitta javob (status kabi)
+
+    Returns:
+        dict yoki None (javob kelmasa)
+    """
+    connection = Connection.connect(host, port, timeout)
+    try:
+        connection.sock.settimeout(timeout)
+        connection.send(message)
+        return next(connection.messages(), None)
+    finally:
+        connection.close()
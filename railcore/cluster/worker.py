@@ -0,0 +1,280 @@
+"""
+Worker - coordinator tayinlagan kameralarni ishlatish
+
+Engine'lar:
+    SystemEngine    - MultiCameraSystem (kameralar apply_config() bilan qo'shiladi/olib tashlanadi,
+                      hodisalar ClusterSink orqali coordinator'ga boradi)
+    SimulatedEngine - model va kamerasiz: sig'im va kamera talabidan FPS hisoblaydi, sun'iy
+                      hodisalar chiqaradi (localhost'da cluster'ni uchidan-uchigacha sinash uchun)
+
+Coordinator bilan ulanish uzilsa kameralar ishlashda davom etadi va worker qayta ulanadi
+(hello'da ishlayotgan kameralar yuboriladi - coordinator ularni shu worker'da qoldiradi).
+"""
+import asyncio
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+from railcore.types import ClusterConfig
+from railcore.sinks.base import EventSink
+from railcore.cluster.protocol import Connection
+from railcore.logging_setup import setup_logger
+
+logger = setup_logger(__name__)
+
+class ClusterSink(EventSink):
+    """Hodisalarni worker ulanishi orqali coordinator'ga yuboradigan sink"""
+
+    def __init__(self, send: Callable[[List[dict]], None], **kwargs):
+        """
+        Args:
+            send: Yozuvlarni yuboruvchi funksiya (ulanish yo'q bo'lsa ConnectionError)
+        """
+        kwargs.setdefault('max_retries', 1000000)  # Coordinator qaytguncha bufer saqlanadi
+        super().__init__('cluster', **kwargs)
+        self._send = send
+
+    async def write_batch(self, records: List[dict]):
+        await asyncio.to_thread(self._send, records)
+
+class SystemEngine:
+    """MultiCameraSystem ustidagi engine"""
+
+    def __init__(self, config_path: str, send_events: Callable[[List[dict]], None], capacity: float = 0.0):
+        """
+        Args:
+            config_path: Worker config fayli (kameralar coordinator'dan keladi)
+            send_events: Hodisalarni coordinator'ga yuborish
+            capacity: Sig'im (inference FPS, 0 = o'lchanadi)
+        """
+        from railcore.system import MultiCameraSystem
+
+        self.system = MultiCameraSystem(config_path, cameras=[], extra_sinks=[ClusterSink(send_events)])
+        self.capacity = capacity or self._measure_capacity()
+        self._counters: Dict[int, tuple] = {}
+        self.system.launch()
+
+    def _measure_capacity(self, frames: int = 10) -> float:
+        """Bitta detector'ning ketma-ket inference tezligi (FPS)"""
+        import numpy as np
+        from railcore.vision.yolo_detector import YOLODetector
+
+        detector = YOLODetector(self.system.model_config, camera_id=-1, execution=self.system.execution)
+        detector.execution.bind_thread()
+        dummy = np.zeros((self.system.model_config.imgsz, self.system.model_config.imgsz, 3), dtype=np.uint8)
+        start = time.perf_counter()
+        with detector.execution.autocast():
+            for _ in range(frames):
+                detector.model.predict(dummy, imgsz=self.system.model_config.imgsz, verbose=False,
+                                       **detector.execution.predict_args())
+        capacity = frames / (time.perf_counter() - start)
+        logger.info(f"Worker sig'imi o'lchandi: {capacity:.1f} FPS")
+        return capacity
+
+    def running_cameras(self) -> List[int]:
+        return sorted(dict(self.system.cameras))
+
+    def assign(self, cameras: List[dict]):
+        """Tayinlangan kameralar to'plamini qo'llash"""
+        self.system.apply_config(dict(self.system.config, cameras=cameras))
+
+    def metrics(self) -> Dict[int, dict]:
+        """
+        Kamera bo'yicha o'tgan heartbeat'dan beri o'lchangan tezliklar
+
+        Returns:
+            Dict[int, dict]: camera_id -> {fps, processed_fps, video_fps}
+        """
+        now = time.time()
+        cameras = dict(self.system.cameras)
+        result = {}
+        counters = {}
+        for camera_id, camera in cameras.items():
+            frames, processed = camera.frame_count, camera.process_count
+            previous = self._counters.get(camera_id)
+            counters[camera_id] = (camera, frames, processed, now)
+            if previous is None or previous[0] is not camera or now <= previous[3]:
+                continue
+            elapsed = now - previous[3]
+            result[camera_id] = {
+                'fps': round((frames - previous[1]) / elapsed, 2),
+                'processed_fps': round((processed - previous[2]) / elapsed, 2),
+                'video_fps': camera.video_fps,
+            }
+        self._counters = counters
+        return result
+
+    def stop(self):
+        self.system.stop()
+
+class SimulatedEngine:
+    """Model va kamerasiz engine: kameralar sig'imni talab bo'yicha bo'lishadi"""
+
+    def __init__(self, send_events: Callable[[List[dict]], None], capacity: float = 50.0,
+                 event_interval: float = 1.0, throttle: float = 1.0):
+        """
+        Args:
+            send_events: Hodisalarni coordinator'ga yuborish
+            capacity: E'lon qilinadigan sig'im (inference FPS)
+            event_interval: Har bir kamera uchun sun'iy 'enter' hodisasi oralig'i (sekund)
+            throttle: Sig'imning haqiqatda mavjud ulushi (<1 - host boshqa yuk bilan band,
+                      worker e'lon qilganidan sekin ishlaydi)
+        """
+        self.capacity = capacity
+        self.throttle = throttle
+        self.send_events = send_events
+        self.event_interval = event_interval
+        self.cameras: Dict[int, dict] = {}
+        self._lock = threading.Lock()
+        self._track_id = 0
+        self.running = True
+        self.thread = threading.Thread(target=self._events_loop, daemon=True)
+        self.thread.start()
+
+    def running_cameras(self) -> List[int]:
+        with self._lock:
+            return sorted(self.cameras)
+
+    def assign(self, cameras: List[dict]):
+        with self._lock:
+            self.cameras = {c['id']: c for c in cameras}
+        logger.info(f"Simulyatsiya: kameralar {sorted(self.cameras)}")
+
+    def metrics(self) -> Dict[int, dict]:
+        with self._lock:
+            cameras = list(self.cameras.values())
+        demand = sum(float(c.get('demand', 10.0)) for c in cameras)
+        scale = min(1.0, self.capacity * self.throttle / demand) if demand > 0 else 1.0
+        return {
+            c['id']: {
+                'fps': round(float(c.get('video_fps', 25.0)) * scale, 2),
+                'processed_fps': round(float(c.get('demand', 10.0)) * scale, 2),
+                'video_fps': float(c.get('video_fps', 25.0)),
+            }
+            for c in cameras
+        }
+
+    def _events_loop(self):
+        while self.running:
+            time.sleep(self.event_interval)
+            with self._lock:
+                cameras = list(self.cameras.values())
+            records = []
+            for camera in cameras:
+                self._track_id += 1
+                records.append({
+                    'camera_id': camera['id'],
+                    'camera_name': camera.get('name', ''),
+                    'track_id': self._track_id,
+                    'event_type': 'enter',
+                    'timestamp': time.time(),
+                })
+            if records:
+                try:
+                    self.send_events(records)
+                except ConnectionError:
+                    pass
+
+    def stop(self):
+        self.running = False
+
+class Worker:
+    """Coordinator'ga ulanib, tayinlangan kameralarni engine'da ishlatadigan node"""
+
+    def __init__(self, name: str, host: str, port: int, config: ClusterConfig):
+        """
+        Args:
+            name: Worker nomi (cluster ichida yagona)
+            host: Coordinator manzili
+            port: Coordinator porti
+            config: Cluster konfiguratsiyasi (heartbeat_interval)
+        """
+        self.name = name
+        self.host = host
+        self.port = port
+        self.config = config
+        self.engine = None
+        self.connection: Optional[Connection] = None
+        self.running = False
+        self.heartbeat_thread: Optional[threading.Thread] = None
+
+    def send_events(self, records: List[dict]):
+        """
+        Hodisalarni coordinator'ga yuborish
+
+        Raises:
+            ConnectionError: Coordinator bilan ulanish yo'q
+        """
+        connection = self.connection
+        if connection is None:
+            raise ConnectionError("coordinator bilan ulanish yo'q")
+        try:
+            connection.send({'type': 'events', 'records': records})
+        except OSError as e:
+            connection.close()  # Xabar qisman yuborilgan bo'lishi mumkin - worker qayta ulanadi
+            raise ConnectionError(str(e)) from e
+
+    def _heartbeat(self):
+        while self.running:
+            time.sleep(self.config.heartbeat_interval)
+            connection = self.connection
+            if connection is None:
+                continue
+            try:
+                connection.send({
+                    'type': 'heartbeat',
+                    'cameras': {str(k): v for k, v in self.engine.metrics().items()},
+                    'capacity': self.engine.capacity,
+                })
+            except OSError:
+                connection.close()
+
+    def run(self, engine):
+        """
+        Coordinator bilan ishlash (to'xtatilguncha, uzilsa qayta ulanadi)
+
+        Args:
+            engine: SystemEngine yoki SimulatedEngine
+        """
+        self.engine = engine
+        self.running = True
+        self.heartbeat_thread = threading.Thread(target=self._heartbeat, daemon=True)
+        self.heartbeat_thread.start()
+
+        delay = 1.0
+        while self.running:
+            try:
+                # Coordinator dead_after davomida o'qimasa yuborish to'xtab qolmaydi
+                connection = Connection.connect(self.host, self.port, send_timeout=self.config.dead_after)
+            except OSError as e:
+                logger.warning(f"Coordinator'ga ulanib bo'lmadi ({self.host}:{self.port}): {e}. "
+                               f"{delay:.0f}s dan keyin qayta urinish")
+                time.sleep(delay)
+                delay = min(delay * 2, 30.0)
+                continue
+
+            delay = 1.0
+            try:
+                connection.send({'type': 'hello', 'worker': self.name, 'capacity': engine.capacity,
+                                 'running': engine.running_cameras()})
+                self.connection = connection
+                logger.info(f"Worker {self.name}: coordinator'ga ulandi ({self.host}:{self.port})")
+                for message in connection.messages():
+                    if message.get('type') == 'assign':
+                        engine.assign(message.get('cameras', []))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Worker {self.name}: coordinator bilan ulanish xatosi: {e}")
+            finally:
+                self.connection = None
+                connection.close()
+            if self.running:
+                logger.warning(f"Worker {self.name}: coordinator bilan ulanish uzildi, kameralar ishlashda davom etadi")
+                time.sleep(1.0)
+
+    def stop(self):
+        """Worker'ni to'xtatish"""
+        self.running = False
+        connection = self.connection
+        if connection is not None:
+            connection.close()
+        if self.engine is not None:
+            self.engine.stop()
@@ -0,0 +1,225 @@
+"""
+Config yuklash va tekshirish (torch/cv2'siz - tez ishga tushadi)
+
+Ishlatish:
+    python -m railcore.config config/config.yaml
+    python -m railcore.config config/config.yaml --no-files
+"""
+import sys
+import argparse
+from pathlib import Path
+from typing import List
+
+import yaml
+
+def load_config(config_path: str) -> dict:
+    """
+    YAML config'ni o'qish
+
+    Args:
+        config_path: Config fayl yo'li
+
+    Returns:
+        dict: Config
+    """
+    with open(config_path, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f) or {}
+
+def parse_model(model: dict):
+    """
+    Config'ning 'model' bo'limidan ModelConfig
+
+    Args:
+        model: config['model']
+
+    Returns:
+        ModelConfig
+    """
+    from railcore.types import ModelConfig
+
+    return ModelConfig(
+        path=model['path'],
+        target_classes=model['target_classes'],
+        class_names=model['class_names'],
+        conf=model.get('conf', 0.35),
+        iou=model.get('iou', 0.5),
+        imgsz=model.get('imgsz', 640),
+        cache_dir=model.get('cache_dir', 'cache/models'),
+        export_format=model.get('export_format', ''),
+        warmup_frames=model.get('warmup_frames', 3)
+    )
+
+def parse_processing(processing: dict):
+    """
+    Config'ning 'processing' bo'limidan ProcessingConfig
+
+    Args:
+        processing: config['processing']
+
+    Returns:
+        ProcessingConfig
+    """
+    from railcore.types import ProcessingConfig
+
+    return ProcessingConfig(
+        adaptive_mode=processing.get('adaptive_mode', True),
+        frame_skip_idle=processing.get('frame_skip_idle', 3),
+        frame_skip_active=processing.get('frame_skip_active', 2),
+        timeout_seconds=processing.get('timeout_seconds', 3.0),
+        empty_threshold=processing.get('empty_threshold', 3),
+        polygon_length=processing.get('polygon_length', 0.0),
+        polygon_width=processing.get('polygon_width', 0.0),
+        trajectory_size=processing.get('trajectory_size', 16),
+        slow_min_points=processing.get('slow_min_points', 5)
+    )
+
+def _is_stream(source: str) -> bool:
+    return '://' in source or source.isdigit()
+
+def validate_config(config: dict, check_files: bool = True) -> List[str]:
+    """
+    Config'dagi xatolarni topish
+
+    Args:
+        config: load_config() natijasi
+        check_files: Model, video va polygon fayllari mavjudligini tekshirish
+
+    Returns:
+        List[str]: Xatolar ro'yxati (bo'sh bo'lsa config to'g'ri)
+    """
+    errors = []
+
+    for section in ('model', 'thresholds', 'processing', 'cameras'):
+        if section not in config:
+            errors.append(f"'{section}' bo'limi yo'q")
+
+    model = config.get('model') or {}
+    for key in ('path', 'target_classes', 'class_names'):
+        if key not in model:
+            errors.append(f"model.{key} ko'rsatilmagan")
+    if check_files and model.get('path') and not Path(model['path']).exists():
+        errors.append(f"Model fayli topilmadi: {model['path']}")
+
+    thresholds = config.get('thresholds') or {}
+    warning, violation = thresholds.get('warning'), thresholds.get('violation')
+    if warning is None or violation is None:
+        errors.append("thresholds.warning va thresholds.violation ko'rsatilishi kerak")
+    elif warning > violation:
+        errors.append(f"thresholds.warning ({warning}) violation'dan ({violation}) katta")
+
+    processing = config.get('processing') or {}
+    for key in ('frame_skip_idle', 'frame_skip_active', 'empty_threshold'):
+        if key in processing and int(processing[key]) < 1:
+            errors.append(f"processing.{key} 1 dan kichik bo'lmasligi kerak")
+    if processing.get('polygon_length', 0) < 0:
+        errors.append("processing.polygon_length manfiy")
+
+    scheduler = config.get('scheduler') or {}
+    if scheduler.get('budget_fps', 0) < 0:
+        errors.append("scheduler.budget_fps manfiy")
+    if not 0 < scheduler.get('near_ratio', 0.5) <= 1:
+        errors.append("scheduler.near_ratio (0, 1] oralig'ida bo'lishi kerak")
+
+    cascade = config.get('cascade') or {}
+    if cascade.get('enabled', False):
+        backend = cascade.get('backend', 'motion')
+        if backend not in ('motion', 'model'):
+            errors.append(f"cascade.backend noma'lum: {backend}")
+        elif backend == 'model' and not cascade.get('presence_model'):
+            errors.append("cascade.backend 'model' uchun cascade.presence_model kerak")
+        elif backend == 'model' and check_files and not Path(cascade['presence_model']).exists():
+            errors.append(f"cascade.presence_model topilmadi: {cascade['presence_model']}")
+
+    execution = config.get('execution') or {}
+    device = str(execution.get('device', 'auto'))
+    if device not in ('auto', 'cpu') and not device.isdigit():
+        errors.append(f"execution.device noma'lum: {device} (auto, cpu yoki GPU raqami)")
+    for key in ('cpu_threads', 'interop_threads', 'reserved_cores'):
+        if int(execution.get(key, 0)) < 0:
+            errors.append(f"execution.{key} manfiy")
+    if int(execution.get('processes', 1)) < 1:
+        errors.append("execution.processes 1 dan kichik bo'lmasligi kerak")
+
+    tiling = config.get('tiling') or {}
+    if not 0 <= tiling.get('overlap', 0.2) < 0.5:
+        errors.append("tiling.overlap [0, 0.5) oralig'ida bo'lishi kerak")
+    if tiling.get('nms_metric', 'ios') not in ('ios', 'iou'):
+        errors.append(f"tiling.nms_metric noma'lum: {tiling['nms_metric']}")
+    if int(tiling.get('max_tiles', 6)) < 1:
+        errors.append("tiling.max_tiles 1 dan kichik bo'lmasligi kerak")
+
+    remote = config.get('remote_inference') or {}
+    if remote.get('encoding', 'jpeg') not in ('jpeg', 'raw'):
+        errors.append(f"remote_inference.encoding noma'lum: {remote['encoding']} (jpeg yoki raw)")
+    for key in ('address', 'listen'):
+        address = str(remote.get(key, '127.0.0.1:7800'))
+        if not address.startswith('unix:') and not address.rpartition(':')[2].isdigit():
+            errors.append(f"remote_inference.{key} noto'g'ri: {address} ('host:port' yoki 'unix:/yo'l')")
+    if remote.get('timeout_ms', 300.0) <= 0:
+        errors.append("remote_inference.timeout_ms musbat bo'lishi kerak")
+    if int(remote.get('max_batch', 8)) < 1 or int(remote.get('max_inflight', 16)) < 1:
+        errors.append("remote_inference.max_batch va max_inflight 1 dan kichik bo'lmasligi kerak")
+
+    swap = config.get('model_swap') or {}
+    if not 0 <= swap.get('shadow_fraction', 0.1) <= 1:
+        errors.append("model_swap.shadow_fraction [0, 1] oralig'ida bo'lishi kerak")
+    if not 0 <= swap.get('min_f1', 0.8) <= 1:
+        errors.append("model_swap.min_f1 [0, 1] oralig'ida bo'lishi kerak")
+    if int(swap.get('shadow_frames', 200)) < 1:
+        errors.append("model_swap.shadow_frames 1 dan kichik bo'lmasligi kerak")
+
+    cluster = config.get('cluster') or {}
+    if not 0 <= int(cluster.get('port', 7700)) <= 65535:
+        errors.append("cluster.port [0, 65535] oralig'ida bo'lishi kerak")
+    if not 0 < cluster.get('overload_ratio', 0.8) <= 1:
+        errors.append("cluster.overload_ratio (0, 1] oralig'ida bo'lishi kerak")
+    if cluster.get('dead_after', 8.0) <= cluster.get('heartbeat_interval', 2.0):
+        errors.append("cluster.dead_after heartbeat_interval dan katta bo'lishi kerak")
+
+    cameras = config.get('cameras') or []
+    seen_ids = set()
+    for index, camera in enumerate(cameras):
+        label = f"cameras[{index}]"
+        for key in ('id', 'name', 'source', 'polygon_file'):
+            if key not in camera:
+                errors.append(f"{label}.{key} ko'rsatilmagan")
+        camera_id = camera.get('id')
+        if camera_id in seen_ids:
+            errors.append(f"{label}: kamera ID {camera_id} takrorlangan")
+        seen_ids.add(camera_id)
+
+        if not check_files or not camera.get('enabled', True):
+            continue
+        if camera.get('polygon_file') and not Path(camera['polygon_file']).exists():
+            errors.append(f"{label}: polygon fayli topilmadi: {camera['polygon_file']}")
+        source = str(camera.get('source', ''))
+        if source and not _is_stream(source) and not Path(source).exists():
+            errors.append(f"{label}: video fayli topilmadi: {source}")
+
+    if cameras and not any(c.get('enabled', True) for c in cameras):
+        errors.append("Yoqilgan kamera yo'q")
+
+    return errors
+
+def main():
+    parser = argparse.ArgumentParser(description="RailSafe config tekshiruvi")
+    parser.add_argument('config', nargs='?', default='config/config.yaml')
+    parser.add_argument('--no-files', action='store_true', help="Fayllar mavjudligini tekshirmaslik")
+    args = parser.parse_args()
+
+    try:
+        config = load_config(args.config)
+    except (OSError, yaml.YAMLError) as e:
+        print(f"Config o'qilmadi: {e}")
+        sys.exit(2)
+
+    errors = validate_config(config, check_files=not args.no_files)
+    for error in errors:
+        print(f"XATO: {error}")
+    if errors:
+        sys.exit(1)
+    enabled = sum(1 for c in config.get('cameras', []) if c.get('enabled', True))
+    print(f"Config to'g'ri: {args.config} ({enabled} ta kamera yoqilgan)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+ConfigWatcher - config va polygon fayllari o'zgarishini kuzatish (mtime polling)
+"""
+import os
+import threading
+from typing import Callable, Dict, Iterable, List, Optional
+from railcore.config import load_config, validate_config
+from railcore.logging_setup import setup_logger
+
+logger = setup_logger(__name__)
+
+class ConfigWatcher:
+    """Fayllar o'zgarsa yangi config'ni tekshirib callback'ga berish"""
+
+    def __init__(self,
+                 config_path: str,
+                 on_change: Callable[[dict], None],
+                 extra_files: Optional[Callable[[], Iterable[str]]] = None,
+                 interval: float = 2.0):
+        """
+        Args:
+            config_path: Config fayl yo'li
+            on_change: Yangi (tekshirilgan) config bilan chaqiriladi
+            extra_files: Qo'shimcha kuzatiladigan fayllar (masalan, polygon JSON'lar)
+            interval: Tekshirish oralig'i (sekund)
+        """
+        self.config_path = config_path
+        self.on_change = on_change
+        self.extra_files = extra_files
+        self.interval = interval
+
+        self.reloads = 0
+        self.rejected = 0
+        self.changed_files: List[str] = []
+        self._mtimes = self._snapshot()
+        self._stop = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def _snapshot(self) -> Dict[str, float]:
+        """Kuzatiladigan fayllarning mtime'lari (yo'q fayl - 0)"""
+        paths = [self.config_path]
+        if self.extra_files is not None:
+            paths.extend(self.extra_files())
+        mtimes = {}
+        for path in paths:
+            try:
+                mtimes[path] = os.stat(path).st_mtime
+            except OSError:
+                mtimes[path] = 0.0
+        return mtimes
+
+    def start(self) -> 'ConfigWatcher':
+        """Kuzatuv thread'ini ishga tushirish"""
+        self.thread = threading.Thread(target=self._worker, daemon=True)
+        self.thread.start()
+        logger.info(f"Config kuzatilmoqda: {self.config_path} (har {self.interval:g}s)")
+        return self
+
+    def _worker(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"Config kuzatishda xato: {e}")
+
+    def check(self) -> bool:
+        """
+        Bir marta tekshirish
+
+        Returns:
+            bool: Yangi config qo'llanildimi
+        """
+        mtimes = self._snapshot()
+        if mtimes == self._mtimes:
+            return False
+        changed = sorted(path for path in mtimes if mtimes[path] != self._mtimes.get(path))
+        self._mtimes = mtimes
+        self.changed_files = changed
+        logger.info(f"O'zgargan fayllar: {', '.join(changed)}")
+
+        try:
+            config = load_config(self.config_path)
+        except Exception as e:
+            self.rejected += 1
+            logger.error(f"Yangi config o'qilmadi, eski config qoladi: {e}")
+            return False
+
+        errors = validate_config(config)
+        if errors:
+            self.rejected += 1
+            for error in errors:
+                logger.error(f"Yangi config xato: {error}")
+            logger.error("Yangi config qo'llanilmadi, eski config qoladi")
+            return False
+
+        self.on_change(config)
+        self.reloads += 1
+        # Callback yangi polygon fayllarini qo'shgan bo'lishi mumkin
+        self._mtimes = self._snapshot()
+        return True
+
+    def stop(self):
+        """Kuzatuvni to'xtatish"""
+        self._stop.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
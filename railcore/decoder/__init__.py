@@ -1,13 +1,31 @@
 """
 Decoder moduli
+
+Konkret decoder'lar (cv2) birinchi murojaatda yuklanadi.
 """
+import importlib
 from railcore.decoder.base import VideoDecoder
-from railcore.decoder.gst_nvdec import GStreamerNVDECDecoder
-from railcore.decoder.ffmpeg_cpu import FFMPEGCPUDecoder
 from railcore.logging_setup import setup_logger
 
 logger = setup_logger(__name__)
 
+_LAZY = {
+    'GStreamerNVDECDecoder': 'railcore.decoder.gst_nvdec',
+    'FFMPEGCPUDecoder': 'railcore.decoder.ffmpeg_cpu',
+    'FreezeDetector': 'railcore.decoder.freeze',
+}
+
+def __getattr__(name: str):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module 'railcore.decoder' has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
 def create_decoder(source: str) -> VideoDecoder:
     """
     Video decoder yaratish (GStreamer yoki FFMPEG)
@@ -18,6 +36,9 @@ def create_decoder(source: str) -> VideoDecoder:
     Returns:
         VideoDecoder: Decoder instance
     """
+    from railcore.decoder.gst_nvdec import GStreamerNVDECDecoder
+    from railcore.decoder.ffmpeg_cpu import FFMPEGCPUDecoder
+    
     # Avval GStreamer NVDEC'ni sinab ko'rish
     try:
         decoder = GStreamerNVDECDecoder(source)
@@ -31,4 +52,4 @@ def create_decoder(source: str) -> VideoDecoder:
     logger.info("FFMPEG CPU decoder ishlatilmoqda")
     return FFMPEGCPUDecoder(source)
 
-__all__ = ['VideoDecoder', 'GStreamerNVDECDecoder', 'FFMPEGCPUDecoder', 'create_decoder']
\ No newline at end of file
+__all__ = ['VideoDecoder', 'GStreamerNVDECDecoder', 'FFMPEGCPUDecoder', 'FreezeDetector', 'create_decoder']
\ No newline at end of file
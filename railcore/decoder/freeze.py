@@ -0,0 +1,146 @@
+"""
+FreezeDetector - takroriy (muzlagan) frame'larni arzon fingerprint bilan aniqlash
+
+Fingerprint: frame qadam bilan siyraklashtiriladi (nusxasiz view), so'ng INTER_AREA
+bilan kichik to'rga (standart 32x18) kichraytiriladi. diff_threshold = 0 bo'lsa
+to'r baytlarining hash'i taqqoslanadi (faqat aynan bir xil frame'lar takroriy -
+harakatsiz, lekin jonli sahna shovqin tufayli takroriy hisoblanmaydi).
+"""
+import time
+import cv2
+import numpy as np
+from typing import Optional
+from railcore.types import FreezeConfig
+from railcore.logging_setup import setup_logger
+
+logger = setup_logger(__name__)
+
+def frame_fingerprint(frame: np.ndarray, width: int = 32, height: int = 18) -> np.ndarray:
+    """
+    Frame'ning kichik (width x height) nusxasi
+
+    Args:
+        frame: BGR frame
+        width: To'r kengligi
+        height: To'r balandligi
+
+    Returns:
+        np.ndarray: height x width x C, uint8
+    """
+    frame_height, frame_width = frame.shape[:2]
+    step = max(1, min(frame_width // (width * 4), frame_height // (height * 4)))
+    sampled = np.ascontiguousarray(frame[::step, ::step])
+    return cv2.resize(sampled, (width, height), interpolation=cv2.INTER_AREA)
+
+class FreezeDetector:
+    """Kamera oqimining takroriy frame'lari va muzlash holati"""
+
+    def __init__(self, camera_id: int, config: FreezeConfig):
+        """
+        Args:
+            camera_id: Kamera ID (logging uchun)
+            config: Muzlashni aniqlash konfiguratsiyasi
+        """
+        self.camera_id = camera_id
+        self.config = config
+
+        self._last_hash: Optional[int] = None
+        self._last_grid: Optional[np.ndarray] = None
+
+        self.run_length = 0  # Ketma-ket takroriy frame'lar
+        self.run_started: Optional[float] = None
+        self.frozen = False
+        self.frozen_since: Optional[float] = None
+        self.last_reconnect = 0.0
+
+        # Statistika
+        self.duplicate_frames = 0
+        self.frozen_events = 0
+        self.frozen_seconds = 0.0  # Tugagan muzlashlar
+        self.reconnects = 0
+
+    def _is_duplicate(self, frame: np.ndarray) -> bool:
+        grid = frame_fingerprint(frame, self.config.grid_width, self.config.grid_height)
+        if self.config.diff_threshold <= 0:
+            digest = hash(grid.tobytes())
+            duplicate = digest == self._last_hash
+            self._last_hash = digest
+            return duplicate
+
+        previous, self._last_grid = self._last_grid, grid
+        if previous is None or previous.shape != grid.shape:
+            return False
+        return float(cv2.absdiff(grid, previous).mean()) <= self.config.diff_threshold
+
+    def check(self, frame: np.ndarray, now: Optional[float] = None) -> bool:
+        """
+        Frame oldingisining takrorimi
+
+        Args:
+            frame: Yangi frame
+            now: Joriy vaqt (standart - time.time())
+
+        Returns:
+            bool: True - takroriy frame (inference va tracker yangilanishi kerak emas)
+        """
+        if now is None:
+            now = time.time()
+
+        if not self._is_duplicate(frame):
+            if self.frozen:
+                duration = now - self.frozen_since
+                self.frozen_seconds += duration
+                logger.info(f"Kamera {self.camera_id}: oqim tiklandi ({duration:.1f}s muzlagan edi)")
+            self.frozen = False
+            self.frozen_since = None
+            self.run_length = 0
+            self.run_started = None
+            return False
+
+        self.duplicate_frames += 1
+        self.run_length += 1
+        if self.run_started is None:
+            self.run_started = now
+        if not self.frozen and self.run_length >= self.config.frozen_frames:
+            self.frozen = True
+            self.frozen_since = self.run_started
+            self.frozen_events += 1
+            logger.warning(f"Kamera {self.camera_id}: oqim muzlagan "
+                           f"({self.run_length} ta bir xil frame, {now - self.run_started:.1f}s)")
+        return True
+
+    def should_reconnect(self, now: Optional[float] = None) -> bool:
+        """Muzlagan oqim qayta ulanishi kerakmi (reconnect_interval'da bir marta)"""
+        if not self.frozen or not self.config.reconnect:
+            return False
+        if now is None:
+            now = time.time()
+        return now - self.last_reconnect >= self.config.reconnect_interval
+
+    def on_reconnect(self, now: Optional[float] = None):
+        """
+        Qayta ulanish qilindi
+
+        Fingerprint saqlanadi: qayta ulangandan keyin ham o'sha rasm kelsa oqim
+        muzlagan holatda qoladi va keyingi urinish reconnect_interval'dan keyin bo'ladi.
+        """
+        self.last_reconnect = time.time() if now is None else now
+        self.reconnects += 1
+
+    def get_stats(self, now: Optional[float] = None) -> dict:
+        """
+        Muzlash statistikasi
+
+        Returns:
+            dict: frozen, frozen_seconds (joriy muzlash bilan), frozen_events, duplicate_frames, reconnects
+        """
+        if now is None:
+            now = time.time()
+        current = now - self.frozen_since if self.frozen else 0.0
+        return {
+            'frozen': self.frozen,
+            'frozen_seconds': round(self.frozen_seconds + current, 1),
+            'frozen_events': self.frozen_events,
+            'duplicate_frames': self.duplicate_frames,
+            'reconnects': self.reconnects,
+        }
@@ -0,0 +1,197 @@
+"""
+MosaicDisplay - barcha kameralarni bitta oynada ko'rsatish (bitta compositor thread)
+
+Kamera thread'lari faqat submit() chaqiradi: oxirgi annotatsiyalangan frame'ga
+havola saqlanadi (nusxa ham, resize ham yo'q). Compositor thread belgilangan
+tezlikda har bir kameraning eng yangi frame'ini oldindan ajratilgan tile'ga
+bir marta kichraytiradi va mozaikani ko'rsatadi. cv2.imshow/waitKey faqat shu
+thread'da chaqiriladi - sekin display kameralarni sekinlashtirmaydi.
+"""
+import math
+import threading
+import time
+import cv2
+import numpy as np
+from typing import Callable, Dict, Optional, Tuple
+from railcore.types import DisplayConfig
+from railcore.logging_setup import setup_logger
+
+logger = setup_logger(__name__)
+
+class _Tile:
+    """Bitta kamera uchun oldindan ajratilgan tile"""
+
+    __slots__ = ('camera_id', 'frame', 'seq', 'drawn_seq', 'source_shape', 'buffer', 'offset')
+
+    def __init__(self, camera_id: int):
+        self.camera_id = camera_id
+        self.frame: Optional[np.ndarray] = None
+        self.seq = 0  # submit() soni
+        self.drawn_seq = 0  # Mozaikaga oxirgi chizilgan frame
+        self.source_shape: Optional[Tuple[int, int]] = None
+        self.buffer: Optional[np.ndarray] = None  # Kichraytirilgan frame (nisbat saqlanadi)
+        self.offset = (0, 0)  # Tile ichidagi joy (x, y)
+
+class MosaicDisplay:
+    """Ko'p kamerali mozaika oynasi"""
+
+    def __init__(self, config: DisplayConfig, on_quit: Optional[Callable[[], None]] = None):
+        """
+        Args:
+            config: Display konfiguratsiyasi
+            on_quit: 'q' bosilganda chaqiriladi
+        """
+        self.config = config
+        self.on_quit = on_quit
+        self.tile_width = config.tile_width
+        self.tile_height = config.tile_height
+
+        self._tiles: Dict[int, _Tile] = {}
+        self._lock = threading.Lock()
+        self._layout_dirty = True
+        self._canvas: Optional[np.ndarray] = None
+        self._positions: Dict[int, Tuple[int, int]] = {}
+
+        self.shown = 0
+        self.resized = 0
+        self.running = False
+        self.thread: Optional[threading.Thread] = None
+
+    def add(self, camera_id: int):
+        """Kamera uchun tile qo'shish"""
+        with self._lock:
+            if camera_id not in self._tiles:
+                self._tiles[camera_id] = _Tile(camera_id)
+                self._layout_dirty = True
+
+    def remove(self, camera_id: int):
+        """Kamera tile'ini olib tashlash (mozaika qayta joylashtiriladi)"""
+        with self._lock:
+            if self._tiles.pop(camera_id, None) is not None:
+                self._layout_dirty = True
+
+    def submit(self, camera_id: int, frame: np.ndarray):
+        """
+        Kameraning oxirgi frame'ini berish (bloklamaydi)
+
+        Frame'ga havola saqlanadi - chaqiruvchi uni keyin o'zgartirmasligi kerak.
+
+        Args:
+            camera_id: Kamera ID
+            frame: Annotatsiyalangan frame (BGR)
+        """
+        tile = self._tiles.get(camera_id)
+        if tile is None:
+            self.add(camera_id)
+            tile = self._tiles[camera_id]
+        tile.frame = frame
+        tile.seq += 1
+
+    def start(self) -> 'MosaicDisplay':
+        """Compositor thread'ini ishga tushirish"""
+        self.running = True
+        self.thread = threading.Thread(target=self._worker, daemon=True)
+        self.thread.start()
+        logger.info(f"Mozaika oynasi ishga tushdi ({self.config.fps:g} FPS, tile {self.tile_width}x{self.tile_height})")
+        return self
+
+    def _relayout(self):
+        """Tile'lar soniga qarab mozaika canvas'ini qayta ajratish"""
+        camera_ids = sorted(self._tiles)
+        count = max(1, len(camera_ids))
+        columns = self.config.columns if self.config.columns > 0 else math.ceil(math.sqrt(count))
+        columns = min(columns, count)
+        rows = math.ceil(count / columns)
+
+        self._canvas = np.zeros((rows * self.tile_height, columns * self.tile_width, 3), dtype=np.uint8)
+        self._positions = {
+            camera_id: ((index % columns) * self.tile_width, (index // columns) * self.tile_height)
+            for index, camera_id in enumerate(camera_ids)
+        }
+        for tile in self._tiles.values():
+            tile.drawn_seq = 0
+        self._layout_dirty = False
+
+    def _fit(self, tile: _Tile, shape: Tuple[int, int]):
+        """Frame o'lchami o'zgarganda tile buffer'ini nisbat saqlangan holda ajratish"""
+        height, width = shape
+        scale = min(self.tile_width / width, self.tile_height / height)
+        fit_width, fit_height = max(1, int(width * scale)), max(1, int(height * scale))
+        tile.source_shape = shape
+        tile.buffer = np.empty((fit_height, fit_width, 3), dtype=np.uint8)
+        tile.offset = ((self.tile_width - fit_width) // 2, (self.tile_height - fit_height) // 2)
+
+    def compose(self) -> Optional[np.ndarray]:
+        """
+        Yangi frame'lari bor tile'larni canvas'ga chizish
+
+        Returns:
+            np.ndarray yoki None (hali kamera yo'q)
+        """
+        with self._lock:
+            if self._layout_dirty:
+                self._relayout()
+            tiles = list(self._tiles.values())
+            positions = self._positions
+        if not tiles:
+            return None
+
+        canvas = self._canvas
+        for tile in tiles:
+            # seq avval o'qiladi: submit() orasida kelsa frame keyingi safar qayta chiziladi
+            seq = tile.seq
+            frame = tile.frame
+            position = positions.get(tile.camera_id)
+            if frame is None or seq == tile.drawn_seq or position is None:
+                continue
+            if tile.source_shape != frame.shape[:2]:
+                self._fit(tile, frame.shape[:2])
+                x, y = position
+                canvas[y:y + self.tile_height, x:x + self.tile_width] = 0
+
+            cv2.resize(frame, (tile.buffer.shape[1], tile.buffer.shape[0]),
+                       dst=tile.buffer, interpolation=cv2.INTER_AREA)
+            x = position[0] + tile.offset[0]
+            y = position[1] + tile.offset[1]
+            canvas[y:y + tile.buffer.shape[0], x:x + tile.buffer.shape[1]] = tile.buffer
+            tile.drawn_seq = seq
+            self.resized += 1
+        return canvas
+
+    def _worker(self):
+        """Belgilangan tezlikda mozaikani ko'rsatish"""
+        interval = 1.0 / max(self.config.fps, 1e-3)
+        next_time = time.time()
+        while self.running:
+            try:
+                canvas = self.compose()
+                if canvas is not None:
+                    cv2.imshow(self.config.window_name, canvas)
+                    self.shown += 1
+                if cv2.waitKey(1) & 0xFF == ord("q"):
+                    logger.info("Mozaika oynasida 'q' bosildi")
+                    self.running = False
+                    if self.on_quit is not None:
+                        self.on_quit()
+                    break
+            except Exception as e:
+                logger.error(f"Mozaika oynasida xato: {e}")
+
+            next_time += interval
+            delay = next_time - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_time = time.time()
+
+        try:
+            cv2.destroyWindow(self.config.window_name)
+        except cv2.error:
+            pass
+
+    def stop(self):
+        """Compositor'ni to'xtatish"""
+        self.running = False
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout=2.0)
+        self.thread = None
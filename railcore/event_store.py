@@ -0,0 +1,336 @@
+"""
+EventStore - hodisalarni indekslangan SQLite bazada saqlash va so'rash
+
+Ishlatish (CLI):
+    python -m railcore.event_store --db events/events.db --camera 3 --type violation \\
+        --since "2025-10-14" --until "2025-10-15"
+    python -m railcore.event_store --db events/events.db --track 14 --format json
+"""
+import sqlite3
+import threading
+import time
+import json
+import argparse
+from queue import Queue, Empty
+from pathlib import Path
+from datetime import datetime
+from typing import List, Optional, Union
+from railcore.types import FrameEvent
+from railcore.logging_setup import setup_logger
+
+logger = setup_logger(__name__)
+
+_COLUMNS = (
+    'camera_id', 'camera_name', 'track_id', 'event_type', 'timestamp',
+    'x1', 'y1', 'x2', 'y2', 'time_in_polygon', 'class_id', 'image_path',
+    'speed_kmh', 'heading'
+)
+
+# Keyin qo'shilgan ustunlar (eski bazalar ALTER TABLE bilan yangilanadi)
+_MIGRATIONS = (
+    ('image_path', 'TEXT'),
+    ('speed_kmh', 'REAL'),
+    ('heading', 'REAL'),
+)
+
+_INSERT_SQL = (
+    f"INSERT INTO events ({', '.join(_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(_COLUMNS))})"
+)
+
+def init_schema(conn: sqlite3.Connection):
+    """
+    Jadval va indekslarni yaratish (WAL rejimi bilan)
+
+    Args:
+        conn: SQLite ulanish
+    """
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS events ("
+        "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+        "camera_id INTEGER NOT NULL, "
+        "camera_name TEXT, "
+        "track_id INTEGER NOT NULL, "
+        "event_type TEXT NOT NULL, "
+        "timestamp REAL NOT NULL, "
+        "x1 INTEGER, y1 INTEGER, x2 INTEGER, y2 INTEGER, "
+        "time_in_polygon REAL, "
+        "class_id INTEGER, "
+        "image_path TEXT, "
+        "speed_kmh REAL, "
+        "heading REAL)"
+    )
+
+    # Eski bazalarni yangilash
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(events)")}
+    for name, sql_type in _MIGRATIONS:
+        if name not in columns:
+            conn.execute(f"ALTER TABLE events ADD COLUMN {name} {sql_type}")
+
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_events_camera_type_ts "
+        "ON events (camera_id, event_type, timestamp)"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_events_track ON events (track_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_events_image ON events (image_path)")
+    conn.commit()
+
+def insert_records(conn: sqlite3.Connection, records: List[dict]):
+    """
+    Yozuvlarni bitta tranzaksiyada qo'shish
+
+    Args:
+        conn: SQLite ulanish
+        records: event_to_record() formatidagi yozuvlar
+    """
+    rows = [
+        (r['camera_id'], r.get('camera_name'), r['track_id'], r['event_type'],
+         r['timestamp'], *r['box'], r.get('time_in_polygon', 0.0),
+         r.get('class_id', 0), r.get('image_path'), r.get('speed_kmh'), r.get('heading'))
+        for r in records
+    ]
+    with conn:
+        conn.executemany(_INSERT_SQL, rows)
+
+def _to_epoch(value: Union[None, float, str, datetime]) -> Optional[float]:
+    """Vaqtni (ISO satr, datetime yoki epoch) epoch sekundga aylantirish"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, str):
+        return datetime.fromisoformat(value).timestamp()
+    return float(value)
+
+class EventStore:
+    """Hodisalarni SQLite bazaga writer thread orqali batch bilan yozish"""
+
+    def __init__(self,
+                 db_path: str = 'events/events.db',
+                 batch_size: int = 500,
+                 flush_interval: float = 0.5):
+        """
+        Args:
+            db_path: Baza fayli yo'li
+            batch_size: Bitta tranzaksiyadagi maksimal yozuvlar soni
+            flush_interval: Batch to'lmasa ham yozish oralig'i (sekund)
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        # Har bir thread o'z ulanishidan foydalanadi (query uchun)
+        self._local = threading.local()
+        init_schema(self._connection())
+
+        self.queue = Queue()
+        self.running = False
+        self.thread: Optional[threading.Thread] = None
+        self.written = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        """Joriy thread uchun ulanish"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path))
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def start(self) -> 'EventStore':
+        """Writer thread'ni ishga tushirish"""
+        self.running = True
+        self.thread = threading.Thread(target=self._writer, daemon=True)
+        self.thread.start()
+        logger.info(f"EventStore ishga tushdi: {self.db_path}")
+        return self
+
+    def add(self, event: FrameEvent, image_path: Optional[str] = None):
+        """
+        Hodisani yozish navbatiga qo'shish (bloklamaydi)
+
+        Args:
+            event: FrameEvent ma'lumotlari
+            image_path: Rasmning save_dir'ga nisbatan yo'li
+        """
+        # railcore.sinks -> sqlite_sink -> event_store sirkulyar importidan qochish
+        from railcore.sinks.base import event_to_record
+        record = event_to_record(event)
+        record['image_path'] = image_path
+        self.queue.put(record)
+
+    def add_record(self, record: dict):
+        """
+        Tayyor yozuvni navbatga qo'shish
+
+        Args:
+            record: event_to_record() formatidagi yozuv
+        """
+        self.queue.put(record)
+
+    def _writer(self):
+        """Navbatdan yozuvlarni yig'ib batch bilan yozish"""
+        conn = self._connection()
+        while self.running or not self.queue.empty():
+            try:
+                batch = [self.queue.get(timeout=self.flush_interval)]
+            except Empty:
+                continue
+
+            deadline = time.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=timeout))
+                except Empty:
+                    break
+
+            try:
+                insert_records(conn, batch)
+                self.written += len(batch)
+            except Exception as e:
+                logger.error(f"EventStore {len(batch)} ta yozuvni yoza olmadi: {e}")
+
+    def write_records(self, records: List[dict]):
+        """
+        Yozuvlarni darhol (joriy thread'da) yozish
+
+        Args:
+            records: event_to_record() formatidagi yozuvlar
+        """
+        insert_records(self._connection(), records)
+
+    def clear_images(self, image_paths: List[str]) -> int:
+        """
+        Diskdan o'chirilgan rasmlar yozuvlarida image_path'ni NULL qilish (hodisa o'zi qoladi)
+
+        Args:
+            image_paths: save_dir'ga nisbatan yo'llar
+
+        Returns:
+            int: Yangilangan yozuvlar soni
+        """
+        conn = self._connection()
+        with conn:
+            cursor = conn.executemany("UPDATE events SET image_path = NULL WHERE image_path = ?",
+                                      [(path,) for path in image_paths])
+        return cursor.rowcount
+
+    def _where(self, camera_id, event_type, since, until, track_id):
+        """WHERE qismini yig'ish"""
+        clauses, params = [], []
+        if camera_id is not None:
+            clauses.append("camera_id = ?")
+            params.append(int(camera_id))
+        if event_type is not None:
+            clauses.append("event_type = ?")
+            params.append(event_type)
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(_to_epoch(since))
+        if until is not None:
+            clauses.append("timestamp < ?")
+            params.append(_to_epoch(until))
+        if track_id is not None:
+            clauses.append("track_id = ?")
+            params.append(int(track_id))
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def query(self,
+              camera_id: Optional[int] = None,
+              event_type: Optional[str] = None,
+              since: Union[None, float, str, datetime] = None,
+              until: Union[None, float, str, datetime] = None,
+              track_id: Optional[int] = None,
+              limit: Optional[int] = 1000,
+              newest_first: bool = False) -> List[dict]:
+        """
+        Hodisalarni qidirish (indekslar orqali)
+
+        Args:
+            camera_id: Kamera ID
+            event_type: 'enter', 'exit', 'violation'
+            since: Boshlanish vaqti (shu vaqt ham kiradi)
+            until: Tugash vaqti (kirmaydi)
+            track_id: Track ID
+            limit: Maksimal natijalar soni (None = cheklovsiz)
+            newest_first: Yangi hodisalar birinchi
+
+        Returns:
+            List[dict]: Hodisalar
+        """
+        where, params = self._where(camera_id, event_type, since, until, track_id)
+        order = "DESC" if newest_first else "ASC"
+        sql = f"SELECT * FROM events{where} ORDER BY timestamp {order}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        return [dict(row) for row in self._connection().execute(sql, params)]
+
+    def count(self,
+              camera_id: Optional[int] = None,
+              event_type: Optional[str] = None,
+              since: Union[None, float, str, datetime] = None,
+              until: Union[None, float, str, datetime] = None,
+              track_id: Optional[int] = None) -> int:
+        """
+        Hodisalar sonini olish
+
+        Returns:
+            int: Mos hodisalar soni
+        """
+        where, params = self._where(camera_id, event_type, since, until, track_id)
+        return self._connection().execute(f"SELECT COUNT(*) FROM events{where}", params).fetchone()[0]
+
+    def stop(self):
+        """Writer thread'ni to'xtatish (navbat bo'shaguncha yozadi)"""
+        if self.thread is not None:
+            logger.info("EventStore to'xtatilmoqda...")
+            self.running = False
+            self.thread.join()
+            self.thread = None
+            logger.info(f"EventStore to'xtatildi ({self.written} ta yozuv)")
+
+def main():
+    parser = argparse.ArgumentParser(description="RailSafe hodisalarini qidirish")
+    parser.add_argument('--db', default='events/events.db', help="Baza fayli")
+    parser.add_argument('--camera', type=int, help="Kamera ID")
+    parser.add_argument('--type', dest='event_type', help="enter / exit / violation")
+    parser.add_argument('--since', help="Boshlanish (ISO, masalan 2025-10-14 yoki 2025-10-14T08:00)")
+    parser.add_argument('--until', help="Tugash (ISO, kirmaydi)")
+    parser.add_argument('--track', type=int, help="Track ID")
+    parser.add_argument('--limit', type=int, default=100)
+    parser.add_argument('--count', action='store_true', help="Faqat sonini chiqarish")
+    parser.add_argument('--format', choices=['table', 'json'], default='table')
+    args = parser.parse_args()
+
+    if not Path(args.db).exists():
+        parser.error(f"Baza topilmadi: {args.db}")
+
+    store = EventStore(args.db)
+    start = time.perf_counter()
+    if args.count:
+        n = store.count(args.camera, args.event_type, args.since, args.until, args.track)
+        print(n)
+        rows = []
+    else:
+        rows = store.query(args.camera, args.event_type, args.since, args.until, args.track, args.limit)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    if args.format == 'json':
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+    else:
+        for row in rows:
+            ts = datetime.fromtimestamp(row['timestamp']).isoformat(sep=' ', timespec='milliseconds')
+            print(f"{ts}  cam{row['camera_id']:<3} {row['event_type']:<10} id{row['track_id']:<6} "
+                  f"{row['time_in_polygon']:6.1f}s  {row['image_path'] or '-'}")
+        print(f"-- {len(rows)} ta natija, {elapsed_ms:.1f} ms")
+
+if __name__ == "__main__":
+    main()
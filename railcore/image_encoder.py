@@ -0,0 +1,192 @@
+"""
+ImageEncoder - JPEG/WebP encode bosqichi (sifat, qirqim, thumbnail va statistika)
+"""
+import cv2
+import time
+import threading
+import numpy as np
+from typing import Dict, List, Tuple
+from railcore.types import SaverConfig
+
+_EXTENSIONS = {'jpg': '.jpg', 'jpeg': '.jpg', 'webp': '.webp'}
+
+class EncodeStats:
+    """Encode tezligi va yozilgan baytlar statistikasi (thread-safe)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Hisoblagichlarni nolga qaytarish"""
+        with self._lock:
+            self.started = time.time()
+            self.events: Dict[str, int] = {}
+            self.bytes: Dict[str, int] = {}
+            self.encode_seconds = 0.0
+            self.images = 0
+            self.failures = 0
+
+    def add(self, event_type: str, nbytes: int, encode_seconds: float, images: int):
+        """
+        Bitta hodisa natijasini qo'shish
+
+        Args:
+            event_type: Hodisa turi
+            nbytes: Diskka yozilgan baytlar (barcha chiqishlar)
+            encode_seconds: Encode'ga ketgan vaqt
+            images: Encode qilingan rasmlar soni
+        """
+        with self._lock:
+            self.events[event_type] = self.events.get(event_type, 0) + 1
+            self.bytes[event_type] = self.bytes.get(event_type, 0) + nbytes
+            self.encode_seconds += encode_seconds
+            self.images += images
+
+    def add_failure(self):
+        """Saqlanmagan hodisani hisoblash"""
+        with self._lock:
+            self.failures += 1
+
+    def summary(self) -> dict:
+        """
+        Statistikani olish
+
+        Returns:
+            dict: events, images, failures, encode_fps, events_per_sec,
+                  bytes_per_event (hodisa turi bo'yicha), total_bytes
+        """
+        with self._lock:
+            elapsed = max(time.time() - self.started, 1e-6)
+            total_events = sum(self.events.values())
+            return {
+                'events': total_events,
+                'images': self.images,
+                'failures': self.failures,
+                # Bitta encode thread'i sekundiga nechta rasm encode qiladi
+                'encode_fps': self.images / self.encode_seconds if self.encode_seconds > 0 else 0.0,
+                'events_per_sec': total_events / elapsed,
+                'bytes_per_event': {
+                    t: self.bytes[t] / n for t, n in self.events.items() if n > 0
+                },
+                'total_bytes': sum(self.bytes.values())
+            }
+
+class ImageEncoder:
+    """Hodisa rasmlarini config bo'yicha encode qilish"""
+
+    def __init__(self, config: SaverConfig):
+        """
+        Args:
+            config: Saqlash konfiguratsiyasi
+        """
+        self.config = config
+        self.thumbnail_ext = _EXTENSIONS.get(config.thumbnail_format.lower(), '.jpg')
+        self.stats = EncodeStats()
+
+    def quality_for(self, event_type: str) -> int:
+        """Hodisa turi uchun JPEG sifati"""
+        return int(self.config.quality.get(event_type, self.config.default_quality))
+
+    def is_crop_only(self, event_type: str) -> bool:
+        """Faqat avtomobil qirqimi saqlanadimi"""
+        return event_type in self.config.crop_only
+
+    def crop_region(self,
+                    shape: Tuple[int, ...],
+                    box: Tuple[int, int, int, int]) -> Tuple[int, int, int, int]:
+        """
+        Box atrofidagi padding bilan qirqim sohasi
+
+        Args:
+            shape: Frame shakli (H, W, ...)
+            box: Box koordinatalari (x1, y1, x2, y2)
+
+        Returns:
+            Tuple: (cx1, cy1, cx2, cy2) frame chegarasida
+        """
+        h, w = shape[:2]
+        x1, y1, x2, y2 = box
+        pad_x = int((x2 - x1) * self.config.crop_padding)
+        pad_y = int((y2 - y1) * self.config.crop_padding)
+        # Matn box ustiga yoziladi, shuning uchun yuqoriga ko'proq joy
+        return (max(0, x1 - pad_x), max(0, y1 - pad_y - 70),
+                min(w, x2 + pad_x), min(h, y2 + pad_y))
+
+    def encode_jpeg(self, img: np.ndarray, quality: int) -> bytes:
+        """
+        JPEG encode (OpenCV GIL'ni qo'yib yuboradi)
+
+        Raises:
+            IOError: Encode muvaffaqiyatsiz bo'lsa
+        """
+        ok, buf = cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, int(quality)])
+        if not ok:
+            raise IOError("JPEG encode muvaffaqiyatsiz")
+        return buf.tobytes()
+
+    def encode_thumbnail(self, img: np.ndarray) -> bytes:
+        """
+        Dashboard uchun kichik rasm (JPEG yoki WebP)
+
+        Raises:
+            IOError: Encode muvaffaqiyatsiz bo'lsa
+        """
+        h, w = img.shape[:2]
+        width = min(self.config.thumbnail_width, w)
+        height = max(1, int(h * width / w))
+        thumb = cv2.resize(img, (width, height), interpolation=cv2.INTER_AREA)
+        if self.thumbnail_ext == '.webp':
+            params = [cv2.IMWRITE_WEBP_QUALITY, int(self.config.thumbnail_quality)]
+        else:
+            params = [cv2.IMWRITE_JPEG_QUALITY, int(self.config.thumbnail_quality)]
+        ok, buf = cv2.imencode(self.thumbnail_ext, thumb, params)
+        if not ok:
+            raise IOError("Thumbnail encode muvaffaqiyatsiz")
+        return buf.tobytes()
+
+    def encode_event(self,
+                     img: np.ndarray,
+                     event_type: str,
+                     box: Tuple[int, int, int, int]) -> Tuple[bytes, bytes, Tuple[int, int, int, int]]:
+        """
+        Hodisa rasmini barcha chiqishlar uchun encode qilish
+
+        Args:
+            img: Annotatsiya qilingan frame
+            event_type: Hodisa turi
+            box: Box koordinatalari
+
+        Returns:
+            Tuple: (asosiy rasm, thumbnail yoki b'', asosiy rasm sohasi frame'da)
+        """
+        start = time.perf_counter()
+        h, w = img.shape[:2]
+        region = (0, 0, w, h)
+        if self.is_crop_only(event_type):
+            cx1, cy1, cx2, cy2 = self.crop_region(img.shape, box)
+            # Bo'sh qirqim (box frame tashqarisida) - butun frame saqlanadi
+            if cx2 > cx1 and cy2 > cy1:
+                region = (cx1, cy1, cx2, cy2)
+                img = img[cy1:cy2, cx1:cx2]
+
+        main = self.encode_jpeg(img, self.quality_for(event_type))
+        thumb = self.encode_thumbnail(img) if self.config.thumbnail_width > 0 else b''
+        elapsed = time.perf_counter() - start
+
+        self.stats.add(event_type, len(main) + len(thumb), elapsed, 2 if thumb else 1)
+        return main, thumb, region
+
+    def thumbnail_relpath(self, relpath: str) -> str:
+        """
+        Asosiy rasm yo'lidan thumbnail yo'lini olish
+
+        Args:
+            relpath: camera_<id>/<event>/<fayl>.jpg
+
+        Returns:
+            str: camera_<id>/<event>/thumbs/<fayl>.<ext>
+        """
+        parts: List[str] = relpath.rsplit('/', 1)
+        stem = parts[-1].rsplit('.', 1)[0]
+        return f"{parts[0]}/thumbs/{stem}{self.thumbnail_ext}"
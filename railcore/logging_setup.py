@@ -1,48 +1,226 @@
 """
 Logger konfiguratsiyasi
+
+Barcha modullar bitta QueueHandler orqali yozadi; fayl va konsolga yozish
+alohida QueueListener thread'ida bajariladi. Takrorlanuvchi WARNING/ERROR
+xabarlari (masalan, uzilgan kameradan har frame'da) vaqt oralig'i bo'yicha
+cheklanadi.
 """
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
+import threading
+import time
 from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+_FORMAT = '%(asctime)s | %(name)s | %(levelname)s | %(message)s'
+_DATEFMT = '%Y-%m-%d %H:%M:%S'
+
+class RateLimitFilter(logging.Filter):
+    """Bir xil xabarni (logger, daraja, matn) interval ichida faqat bir marta o'tkazish"""
+
+    def __init__(self, interval: float = 10.0, level: int = logging.WARNING, max_keys: int = 1024):
+        """
+        Args:
+            interval: Bir xil xabar uchun minimal oraliq (sekund, 0 = cheklanmaydi)
+            level: Shu darajadan boshlab cheklanadi (INFO xabarlari o'tkaziladi)
+            max_keys: Eslab qolinadigan turli xabarlar soni
+        """
+        super().__init__()
+        self.interval = interval
+        self.level = level
+        self.max_keys = max_keys
+        # kalit -> (oxirgi o'tkazilgan vaqt, shundan beri tashlanganlar soni)
+        self._seen: Dict[Tuple[str, int, str], Tuple[float, int]] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.interval <= 0 or record.levelno < self.level:
+            return True
+
+        message = record.getMessage()
+        key = (record.name, record.levelno, message)
+        now = time.monotonic()
+        with self._lock:
+            last, suppressed = self._seen.get(key, (0.0, 0))
+            if last and now - last < self.interval:
+                self._seen[key] = (last, suppressed + 1)
+                return False
+
+            if len(self._seen) >= self.max_keys:
+                cutoff = now - self.interval
+                self._seen = {k: v for k, v in self._seen.items() if v[0] >= cutoff}
+            self._seen[key] = (now, 0)
+
+        if suppressed:
+            record.msg = f"{message} (oxirgi {self.interval:g}s ichida yana {suppressed} marta)"
+            record.args = None
+        return True
+
+class _NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Navbat to'lsa yozuvni tashlaydi (chaqiruvchi thread hech qachon kutmaydi)"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._reported = 0
+        # Hisoblagichlar bir nechta thread'dan o'zgartiriladi
+        self._counter_lock = threading.Lock()
+
+    def enqueue(self, record: logging.LogRecord):
+        with self._counter_lock:
+            lost = self.dropped - self._reported
+            if lost > 0:
+                # Tashlangan yozuvlar haqida bitta xabar
+                notice = logging.LogRecord(
+                    'railcore.logging', logging.WARNING, __file__, 0,
+                    f"Log navbati to'lgan: {lost} ta yozuv tashlandi", None, None
+                )
+                try:
+                    self.queue.put_nowait(notice)
+                    self._reported += lost
+                except queue.Full:
+                    pass
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                self.dropped += 1
+
+class _LoggingState:
+    """Jarayon bo'yicha umumiy navbat, handler'lar va listener"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.queue_handler: Optional[_NonBlockingQueueHandler] = None
+        self.listener: Optional[logging.handlers.QueueListener] = None
+        self.rate_filter = RateLimitFilter()
+        self.log_file = 'logs/railsafe.log'
+        self.max_bytes = 50 * 1024 * 1024
+        self.backup_count = 5
+        self.queue_size = 10000
+
+_state = _LoggingState()
+
+def _build_handlers():
+    """Listener uchun konsol va aylanma fayl handler'lari"""
+    formatter = logging.Formatter(_FORMAT, datefmt=_DATEFMT)
+
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(formatter)
+
+    log_path = Path(_state.log_file)
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_path, maxBytes=_state.max_bytes, backupCount=_state.backup_count, encoding='utf-8'
+    )
+    file_handler.setFormatter(formatter)
+    return console_handler, file_handler
+
+def _start_listener():
+    """Listener'ni ishga tushirish (lock ichida chaqiriladi)"""
+    _state.listener = logging.handlers.QueueListener(
+        _state.queue_handler.queue, *_build_handlers(), respect_handler_level=True
+    )
+    _state.listener.start()
+
+def _get_queue_handler(log_file: str) -> _NonBlockingQueueHandler:
+    """Umumiy QueueHandler (birinchi chaqiruvda listener ishga tushadi)"""
+    with _state.lock:
+        if _state.queue_handler is None:
+            _state.log_file = log_file
+            _state.queue_handler = _NonBlockingQueueHandler(queue.Queue(maxsize=_state.queue_size))
+            _state.queue_handler.addFilter(_state.rate_filter)
+            _start_listener()
+            atexit.register(shutdown_logging)
+        return _state.queue_handler
 
 def setup_logger(name: str, log_file: str = 'logs/railsafe.log', level=logging.INFO):
     """
     Logger yaratish va sozlash
-    
+
     Args:
         name: Logger nomi
-        log_file: Log fayl yo'li
+        log_file: Log fayl yo'li (birinchi chaqiruvdagisi ishlatiladi - fayl umumiy)
         level: Logging darajasi
-    
+
     Returns:
         logging.Logger
     """
-    # Logs papkasini yaratish
-    log_path = Path(log_file)
-    log_path.parent.mkdir(parents=True, exist_ok=True)
-    
     # Logger yaratish
     logger = logging.getLogger(name)
     logger.setLevel(level)
-    
+
     # Agar handler allaqachon qo'shilgan bo'lsa, qaytadan qo'shmaslik
     if logger.handlers:
         return logger
-    
-    # Format
-    formatter = logging.Formatter(
-        '%(asctime)s | %(name)s | %(levelname)s | %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    
-    # Console handler
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-    
-    # File handler
-    file_handler = logging.FileHandler(log_file, encoding='utf-8')
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
-    
-    return logger
\ No newline at end of file
+
+    logger.addHandler(_get_queue_handler(log_file))
+    # Ota logger (masalan railcore.decoder) ham shu navbatga yozadi - takrorlanmasligi uchun
+    logger.propagate = False
+    return logger
+
+def configure_logging(log_file: Optional[str] = None,
+                      max_bytes: Optional[int] = None,
+                      backup_count: Optional[int] = None,
+                      rate_limit_interval: Optional[float] = None,
+                      rate_limit_level: Optional[str] = None):
+    """
+    Umumiy logging sozlamalarini o'zgartirish (config.yaml 'logging' bo'limi)
+
+    Fayl handler'i qayta ochiladi; mavjud logger'lar o'zgarishsiz qoladi.
+
+    Args:
+        log_file: Log fayl yo'li
+        max_bytes: Bitta fayl hajmi (bayt) - oshsa aylantiriladi
+        backup_count: Saqlanadigan eski fayllar soni
+        rate_limit_interval: Bir xil xabar uchun minimal oraliq (sekund, 0 = o'chirilgan)
+        rate_limit_level: Cheklash boshlanadigan daraja ('WARNING', 'ERROR', ...)
+    """
+    _get_queue_handler(log_file or _state.log_file)
+    with _state.lock:
+        if rate_limit_interval is not None:
+            _state.rate_filter.interval = float(rate_limit_interval)
+        if rate_limit_level is not None:
+            _state.rate_filter.level = logging.getLevelName(rate_limit_level.upper())
+
+        if log_file is None and max_bytes is None and backup_count is None:
+            return
+        _state.log_file = log_file or _state.log_file
+        if max_bytes is not None:
+            _state.max_bytes = int(max_bytes)
+        if backup_count is not None:
+            _state.backup_count = int(backup_count)
+
+        # Navbatdagi yozuvlar eski handler'larga yoziladi, keyin yangilari ochiladi
+        if _state.listener is not None:
+            _state.listener.stop()
+            for old in _state.listener.handlers:
+                old.close()
+        _start_listener()
+
+def get_logging_stats() -> dict:
+    """
+    Logging statistikasi
+
+    Returns:
+        dict: queued, dropped
+    """
+    handler = _state.queue_handler
+    if handler is None:
+        return {'queued': 0, 'dropped': 0}
+    with handler._counter_lock:
+        dropped = handler.dropped
+    return {'queued': handler.queue.qsize(), 'dropped': dropped}
+
+def shutdown_logging():
+    """Navbatdagi yozuvlarni yozib, listener'ni to'xtatish (atexit'da chaqiriladi)"""
+    with _state.lock:
+        if _state.listener is None:
+            return
+        _state.listener.stop()
+        for handler in _state.listener.handlers:
+            handler.close()
+        _state.listener = None
@@ -0,0 +1,291 @@
+"""
+PreviewServer - kameralarning annotatsiyalangan ko'rinishini HTTP orqali MJPEG oqim sifatida berish
+
+Endpoint'lar:
+    /                      - kameralar ro'yxati (brauzer uchun)
+    /camera/<id>.mjpg      - MJPEG oqim (multipart/x-mixed-replace)
+    /camera/<id>.jpg       - oxirgi kadr
+    /stats                 - JSON statistika
+
+Kamera thread'i faqat tomoshabin bo'lsa va navbatdagi kadr vaqti kelgan bo'lsa
+frame beradi (wants_frame). Kadr bitta encoder thread'ida bir marta kichraytirilib
+JPEG qilinadi, so'ng barcha ulangan mijozlarga o'sha baytlar yuboriladi.
+"""
+import html
+import json
+import re
+import threading
+import time
+import cv2
+import numpy as np
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from railcore.types import PreviewConfig
+from railcore.logging_setup import setup_logger
+
+logger = setup_logger(__name__)
+
+_BOUNDARY = 'railsafeframe'
+_PATH_RE = re.compile(r'^/camera/(\d+)\.(mjpg|jpg)$')
+
+class _Channel:
+    """Bitta kamera oqimi"""
+
+    def __init__(self, camera_id: int, name: str):
+        self.camera_id = camera_id
+        self.name = name
+        self.viewers = 0
+        self.pending: Optional[np.ndarray] = None  # Kodlanishi kerak bo'lgan oxirgi frame
+        self.jpeg: Optional[bytes] = None
+        self.seq = 0  # Kodlangan kadrlar soni
+        self.next_due = 0.0  # Keyingi kadr qabul qilinadigan vaqt
+        self.encoded = 0
+        self.sent = 0
+        self.cond = threading.Condition()
+
+class PreviewServer:
+    """Encode-once fan-out MJPEG server"""
+
+    def __init__(self, config: PreviewConfig):
+        """
+        Args:
+            config: Preview konfiguratsiyasi
+        """
+        self.config = config
+        self.interval = 1.0 / max(config.fps, 0.1)
+        self._channels: Dict[int, _Channel] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self.running = False
+        self.encode_seconds = 0.0
+
+        self.server = ThreadingHTTPServer((config.host, config.port), self._make_handler())
+        self.server.daemon_threads = True
+        self.thread: Optional[threading.Thread] = None
+        self.encoder_thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """(host, port)"""
+        return self.server.server_address[:2]
+
+    def add(self, camera_id: int, name: str):
+        """Kamera kanalini qo'shish"""
+        with self._lock:
+            if camera_id not in self._channels:
+                self._channels[camera_id] = _Channel(camera_id, name)
+
+    def remove(self, camera_id: int):
+        """Kamera kanalini olib tashlash (ulangan mijozlar uziladi)"""
+        with self._lock:
+            channel = self._channels.pop(camera_id, None)
+        if channel is not None:
+            with channel.cond:
+                channel.cond.notify_all()
+
+    def wants_frame(self, camera_id: int, now: Optional[float] = None) -> bool:
+        """
+        Kamera shu frame'ni berishi kerakmi (tomoshabin bor va FPS chegarasi ruxsat beradi)
+
+        Tomoshabin bo'lmasa bu bitta dict qidiruvi va taqqoslash - kamera loop'iga ta'siri yo'q.
+        """
+        channel = self._channels.get(camera_id)
+        if channel is None or channel.viewers <= 0:
+            return False
+        if now is None:
+            now = time.time()
+        return now >= channel.next_due
+
+    def submit(self, camera_id: int, frame: np.ndarray, now: Optional[float] = None):
+        """
+        Annotatsiyalangan frame'ni kodlash navbatiga berish (bloklamaydi, nusxa olinmaydi)
+
+        Args:
+            camera_id: Kamera ID
+            frame: BGR frame (chaqiruvchi keyin o'zgartirmasligi kerak)
+            now: Joriy vaqt
+        """
+        channel = self._channels.get(camera_id)
+        if channel is None:
+            return
+        if now is None:
+            now = time.time()
+        channel.next_due = now + self.interval
+        channel.pending = frame
+        self._wake.set()
+
+    def start(self) -> 'PreviewServer':
+        """HTTP va encoder thread'larini ishga tushirish"""
+        self.running = True
+        self.encoder_thread = threading.Thread(target=self._encoder, daemon=True)
+        self.encoder_thread.start()
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        host, port = self.address
+        logger.info(f"Preview server: http://{host}:{port}/ "
+                    f"({self.config.fps:g} FPS, {self.config.max_width}px, JPEG {self.config.quality})")
+        return self
+
+    def _encode(self, frame: np.ndarray) -> Optional[bytes]:
+        """Kichraytirish va JPEG kodlash"""
+        height, width = frame.shape[:2]
+        if self.config.max_width > 0 and width > self.config.max_width:
+            scale = self.config.max_width / width
+            frame = cv2.resize(frame, (self.config.max_width, max(1, int(height * scale))),
+                               interpolation=cv2.INTER_AREA)
+        ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.config.quality])
+        return buffer.tobytes() if ok else None
+
+    def _encoder(self):
+        """Kutilayotgan frame'larni bir marta kodlab, mijozlarni uyg'otish"""
+        while self.running:
+            if not self._wake.wait(0.5):
+                continue
+            self._wake.clear()
+            with self._lock:
+                channels = list(self._channels.values())
+            for channel in channels:
+                frame, channel.pending = channel.pending, None
+                if frame is None:
+                    continue
+                try:
+                    start = time.time()
+                    jpeg = self._encode(frame)
+                    self.encode_seconds += time.time() - start
+                except Exception as e:
+                    logger.error(f"Preview kodlashda xato (kamera {channel.camera_id}): {e}")
+                    continue
+                if jpeg is None:
+                    continue
+                with channel.cond:
+                    channel.jpeg = jpeg
+                    channel.seq += 1
+                    channel.encoded += 1
+                    channel.cond.notify_all()
+
+    def _stream(self, handler: BaseHTTPRequestHandler, channel: _Channel):
+        """Bitta mijozga MJPEG oqim (yangi kadr kelishini kutadi, oraliqdagilari tashlanadi)"""
+        handler.send_response(200)
+        handler.send_header('Content-Type', f'multipart/x-mixed-replace; boundary={_BOUNDARY}')
+        handler.send_header('Cache-Control', 'no-cache, private')
+        handler.send_header('Pragma', 'no-cache')
+        handler.end_headers()
+
+        # Eski (tomoshabinsiz paytdagi) kadr yuborilmaydi - faqat ulangandan keyingilari
+        with channel.cond:
+            channel.viewers += 1
+            last_seq = channel.seq
+        logger.info(f"Preview: kamera {channel.camera_id} tomoshabini ulandi ({handler.client_address[0]})")
+        try:
+            while self.running and self._channels.get(channel.camera_id) is channel:
+                with channel.cond:
+                    if channel.seq == last_seq:
+                        channel.cond.wait(timeout=1.0)
+                    if channel.seq == last_seq:
+                        continue
+                    jpeg, last_seq = channel.jpeg, channel.seq
+                handler.wfile.write(
+                    f"--{_BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                    f"Content-Length: {len(jpeg)}\r\n\r\n".encode('ascii')
+                )
+                handler.wfile.write(jpeg)
+                handler.wfile.write(b"\r\n")
+                channel.sent += 1
+        except (BrokenPipeError, ConnectionResetError, ConnectionAbortedError):
+            pass
+        finally:
+            with channel.cond:
+                channel.viewers -= 1
+            logger.info(f"Preview: kamera {channel.camera_id} tomoshabini uzildi")
+
+    def _index(self) -> bytes:
+        with self._lock:
+            channels = sorted(self._channels.values(), key=lambda c: c.camera_id)
+        items = ''.join(
+            f'<div><h3>{c.camera_id} - {html.escape(c.name)}</h3><img src="/camera/{c.camera_id}.mjpg"></div>'
+            for c in channels
+        )
+        return (f'<html><head><meta charset="utf-8"><title>RailSafe</title></head>'
+                f'<body>{items or "Kamera yo&#39;q"}</body></html>').encode('utf-8')
+
+    def get_stats(self) -> dict:
+        """
+        Preview statistikasi
+
+        Returns:
+            dict: encode_seconds va kamera bo'yicha viewers/encoded/sent
+        """
+        with self._lock:
+            channels = list(self._channels.values())
+        return {
+            'encode_seconds': round(self.encode_seconds, 3),
+            'cameras': {
+                c.camera_id: {'viewers': c.viewers, 'encoded': c.encoded, 'sent': c.sent}
+                for c in channels
+            }
+        }
+
+    def _make_handler(self):
+        preview = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split('?', 1)[0]
+                if path == '/':
+                    self._reply(200, 'text/html; charset=utf-8', preview._index())
+                    return
+                if path == '/stats':
+                    self._reply(200, 'application/json', json.dumps(preview.get_stats()).encode('utf-8'))
+                    return
+
+                match = _PATH_RE.match(path)
+                channel = preview._channels.get(int(match.group(1))) if match else None
+                if channel is None:
+                    self._reply(404, 'text/plain', b'not found')
+                    return
+                if match.group(2) == 'mjpg':
+                    preview._stream(self, channel)
+                    return
+
+                # Bitta kadr: tomoshabin sifatida yangi kadrni qisqa muddat kutish
+                with channel.cond:
+                    channel.viewers += 1
+                    try:
+                        seq = channel.seq
+                        channel.cond.wait_for(lambda: channel.seq != seq, timeout=2.0)
+                        jpeg = channel.jpeg
+                    finally:
+                        channel.viewers -= 1
+                if jpeg is None:
+                    self._reply(503, 'text/plain', b'no frame yet')
+                else:
+                    self._reply(200, 'image/jpeg', jpeg)
+
+            def _reply(self, status: int, content_type: str, body: bytes):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def stop(self):
+        """Serverni to'xtatish"""
+        self.running = False
+        self._wake.set()
+        if self.thread is not None:
+            self.server.shutdown()
+            self.thread = None
+        self.server.server_close()
+        with self._lock:
+            channels = list(self._channels.values())
+        for channel in channels:
+            with channel.cond:
+                channel.cond.notify_all()
+        if self.encoder_thread is not None:
+            self.encoder_thread.join(timeout=2.0)
+        logger.info("Preview server to'xtatildi")
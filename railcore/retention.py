@@ -0,0 +1,281 @@
+"""
+RetentionManager - saqlangan rasmlar uchun disk kvotasi va eski fayllarni o'chirish
+"""
+import re
+import time
+import shutil
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+from railcore.types import RetentionConfig
+from railcore.logging_setup import setup_logger
+
+logger = setup_logger(__name__)
+
+_GB = 1024 ** 3
+
+# camera_<id>/<event_type>/... yo'lidan kalitni olish
+_PATH_RE = re.compile(r'camera_(\d+)[/\\]([^/\\]+)[/\\]')
+
+class _Entry:
+    """Bitta hodisaga tegishli fayllar (rasm, txt, thumbnail, klip)"""
+
+    __slots__ = ('created', 'paths', 'nbytes')
+
+    def __init__(self, created: float, paths: List[Path], nbytes: int):
+        self.created = created
+        self.paths = paths
+        self.nbytes = nbytes
+
+class RetentionManager:
+    """Yozilgan fayllarning inkremental indeksi bo'yicha kvotalarni saqlash"""
+
+    def __init__(self, config: RetentionConfig, roots: List[str], event_store=None):
+        """
+        Args:
+            config: Retention konfiguratsiyasi
+            roots: Nazorat qilinadigan papkalar (saved_images, saved_clips)
+            event_store: O'chirilgan rasmlar yozuvlarida image_path tozalanadi (ixtiyoriy)
+        """
+        self.config = config
+        self.roots = [Path(root) for root in roots]
+        self.event_store = event_store
+
+        # (camera_id, event_type) -> yozilish tartibidagi fayllar
+        self.index: Dict[Tuple[int, str], Deque[_Entry]] = {}
+        self.bytes_by_key: Dict[Tuple[int, str], int] = {}
+        self._lock = threading.Lock()
+
+        self.deleted_files = 0
+        self.deleted_bytes = 0
+        self.running = False
+        self._wake = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def record(self, camera_id: int, event_type: str, paths: List[Path], created: Optional[float] = None):
+        """
+        Yangi yozilgan fayllarni indeksga qo'shish (ImageSaver/ClipWriter chaqiradi)
+
+        Args:
+            camera_id: Kamera ID
+            event_type: Hodisa turi
+            paths: Yozilgan fayllar
+            created: Yozilgan vaqt (epoch, standart - hozir)
+        """
+        nbytes = 0
+        for path in paths:
+            try:
+                nbytes += path.stat().st_size
+            except OSError:
+                pass
+        entry = _Entry(created if created is not None else time.time(), list(paths), nbytes)
+        key = (int(camera_id), event_type)
+        with self._lock:
+            self.index.setdefault(key, deque()).append(entry)
+            self.bytes_by_key[key] = self.bytes_by_key.get(key, 0) + nbytes
+
+    def _seed(self):
+        """Ishga tushganda mavjud fayllarni bir marta indekslash"""
+        found: Dict[Tuple[int, str], List[_Entry]] = {}
+        for root in self.roots:
+            if not root.exists():
+                continue
+            for path in root.rglob('*'):
+                if not path.is_file():
+                    continue
+                match = _PATH_RE.search(path.relative_to(root).as_posix() + '/')
+                if match is None:
+                    continue
+                stat = path.stat()
+                key = (int(match.group(1)), match.group(2))
+                found.setdefault(key, []).append(_Entry(stat.st_mtime, [path], stat.st_size))
+
+        with self._lock:
+            for key, entries in found.items():
+                # Seed paytida record() orqali qo'shilgan fayllar oxirida qoladi
+                existing = self.index.get(key, deque())
+                known = {path for entry in existing for path in entry.paths}
+                entries = sorted((e for e in entries if e.paths[0] not in known), key=lambda e: e.created)
+                self.index[key] = deque(entries) + existing
+                self.bytes_by_key[key] = sum(e.nbytes for e in self.index[key])
+
+        total = sum(len(e) for e in found.values())
+        logger.info(f"Retention indeksi: {total} ta fayl, {len(found)} ta kamera/hodisa guruhi")
+
+    def start(self) -> 'RetentionManager':
+        """Fon thread'ini ishga tushirish"""
+        self.running = True
+        self.thread = threading.Thread(target=self._worker, daemon=True)
+        self.thread.start()
+        return self
+
+    def _worker(self):
+        self._seed()
+        while self.running:
+            try:
+                self.enforce()
+            except Exception as e:
+                logger.error(f"Retention xato: {e}")
+            self._wake.wait(self.config.check_interval)
+            self._wake.clear()
+
+    def _pop_oldest(self, keys: List[Tuple[int, str]],
+                    eligible: Optional[Callable[[Tuple[int, str], _Entry], bool]] = None) -> Optional[_Entry]:
+        """Berilgan guruhlar ichidan eng eski (mos) yozuvni olish (lock ichida chaqiriladi)"""
+        oldest_key = None
+        for key in keys:
+            queue = self.index.get(key)
+            if not queue or (eligible is not None and not eligible(key, queue[0])):
+                continue
+            if oldest_key is None or queue[0].created < self.index[oldest_key][0].created:
+                oldest_key = key
+        if oldest_key is None:
+            return None
+        entry = self.index[oldest_key].popleft()
+        self.bytes_by_key[oldest_key] -= entry.nbytes
+        return entry
+
+    def _tiers(self, keys: List[Tuple[int, str]]) -> List[List[Tuple[int, str]]]:
+        """Kalitlarni o'chirish tartibida guruhlash: avval himoyalanmagan, keyin himoyalangan"""
+        protected = set(self.config.protected_types)
+        return [
+            [k for k in keys if k[1] not in protected],
+            [k for k in keys if k[1] in protected]
+        ]
+
+    def _pop_by_priority(self, keys: List[Tuple[int, str]],
+                         eligible: Optional[Callable[[Tuple[int, str], _Entry], bool]] = None) -> Optional[_Entry]:
+        """
+        Eng eski enter/exit, ular tugagach eng eski violation (lock ichida chaqiriladi)
+
+        Himoyalangan turlar faqat keys ichidagi himoyalanmagan fayllar butunlay tugaganda
+        o'chiriladi - qoida (yosh, kvota) faqat violation'ga tegishli bo'lsa ham.
+
+        Args:
+            keys: Ko'rib chiqiladigan (camera_id, event_type) guruhlari
+            eligible: Qoidaga mos yozuv (guruh navbatining boshi uchun chaqiriladi; None = hammasi)
+        """
+        unprotected, protected = self._tiers(keys)
+        entry = self._pop_oldest(unprotected, eligible)
+        if entry is not None or any(self.index.get(k) for k in unprotected):
+            return entry
+        return self._pop_oldest(protected, eligible)
+
+    def enforce(self):
+        """Barcha kvotalarni bir marta tekshirish va kerakli fayllarni o'chirish"""
+        victims: List[_Entry] = []
+        now = time.time()
+
+        def expired(key: Tuple[int, str], entry: _Entry) -> bool:
+            max_days = self.config.max_age_days.get(key[1], 0)
+            return bool(max_days) and entry.created < now - max_days * 86400
+
+        with self._lock:
+            cameras = {camera_id: [k for k in self.index if k[0] == camera_id] for camera_id in {k[0] for k in self.index}}
+
+            # 1. Yosh bo'yicha
+            for keys in cameras.values():
+                while True:
+                    entry = self._pop_by_priority(keys, expired)
+                    if entry is None:
+                        break
+                    victims.append(entry)
+
+            # 2. Kamera ichida hodisa turi bo'yicha kvota
+            for keys in cameras.values():
+                for key in keys:
+                    limit_gb = self.config.event_max_gb.get(key[1], 0)
+                    while limit_gb and self.bytes_by_key[key] > limit_gb * _GB:
+                        entry = self._pop_by_priority(keys, lambda k, e, key=key: k == key)
+                        if entry is None:
+                            break
+                        victims.append(entry)
+
+            # 3. Kamera kvotasi (enter/exit birinchi)
+            if self.config.camera_max_gb:
+                limit = self.config.camera_max_gb * _GB
+                for keys in cameras.values():
+                    while sum(self.bytes_by_key[k] for k in keys) > limit:
+                        entry = self._pop_by_priority(keys)
+                        if entry is None:
+                            break
+                        victims.append(entry)
+
+            # 4. Bo'sh joy chegarasi (barcha kameralar bo'yicha, enter/exit birinchi)
+            if self.config.min_free_gb and self.roots:
+                free = self._free_bytes() + sum(e.nbytes for e in victims)
+                needed = self.config.min_free_gb * _GB - free
+                keys = list(self.index)
+                while needed > 0:
+                    entry = self._pop_by_priority(keys)
+                    if entry is None:
+                        logger.warning("Bo'sh joy kam, lekin o'chiriladigan fayl qolmadi")
+                        break
+                    victims.append(entry)
+                    needed -= entry.nbytes
+
+        self._delete(victims)
+
+    def _free_bytes(self) -> int:
+        """Birinchi mavjud root joylashgan diskdagi bo'sh joy"""
+        for root in self.roots:
+            if root.exists():
+                return shutil.disk_usage(root).free
+        return 0
+
+    def _delete(self, victims: List[_Entry]):
+        """Fayllarni o'chirish (lock'dan tashqarida)"""
+        if not victims:
+            return
+        files, nbytes = 0, 0
+        removed: List[str] = []
+        for entry in victims:
+            for path in entry.paths:
+                try:
+                    path.unlink()
+                    files += 1
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    logger.warning(f"O'chirib bo'lmadi: {path}: {e}")
+                    continue
+                removed.append(self._relpath(path))
+            nbytes += entry.nbytes
+        self.deleted_files += files
+        self.deleted_bytes += nbytes
+        logger.info(f"Retention: {files} ta fayl o'chirildi ({nbytes / 1024 / 1024:.1f} MB)")
+
+        # Bazadagi hodisalar qoladi, lekin endi mavjud bo'lmagan rasmga ishora qilmaydi
+        if self.event_store is not None and removed:
+            try:
+                self.event_store.clear_images(removed)
+            except Exception as e:
+                logger.error(f"Bazada o'chirilgan rasmlar belgilanmadi: {e}")
+
+    def _relpath(self, path: Path) -> str:
+        """Root'ga nisbatan yo'l (EventStore'dagi image_path formati)"""
+        for root in self.roots:
+            try:
+                return path.relative_to(root).as_posix()
+            except ValueError:
+                continue
+        return path.as_posix()
+
+    def get_usage(self) -> Dict[Tuple[int, str], int]:
+        """
+        Indeks bo'yicha band qilingan joy
+
+        Returns:
+            dict: (camera_id, event_type) -> bayt
+        """
+        with self._lock:
+            return dict(self.bytes_by_key)
+
+    def stop(self):
+        """Fon thread'ini to'xtatish"""
+        self.running = False
+        self._wake.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
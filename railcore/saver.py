@@ -4,10 +4,15 @@ ImageSaver - Alohida thread'da rasmlarni saqlash
 import cv2
 import time
 import threading
-from queue import Queue
+from queue import Queue, Empty
 from pathlib import Path
-from datetime import datetime
-from railcore.types import FrameEvent
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from railcore.types import FrameEvent, SaverConfig
+from railcore.event_store import EventStore
+from railcore.image_encoder import ImageEncoder
+from railcore.retention import RetentionManager
+from railcore.tracing import LatencyStats
 from railcore.logging_setup import setup_logger
 
 logger = setup_logger(__name__)
@@ -15,30 +20,91 @@ logger = setup_logger(__name__)
 class ImageSaver:
     """Alohida thread'da rasmlarni saqlash uchun"""
     
-    def __init__(self, save_dir: str = 'saved_images'):
+    def __init__(self,
+                 save_dir: str = 'saved_images',
+                 event_store: Optional[EventStore] = None,
+                 config: Optional[SaverConfig] = None,
+                 retention: Optional[RetentionManager] = None,
+                 latency: Optional[LatencyStats] = None):
         """
         Args:
             save_dir: Rasmlarni saqlash papkasi
+            event_store: Saqlangan hodisalarni indekslash uchun baza (ixtiyoriy)
+            config: Encode sozlamalari (sifat, qirqim, thumbnail, thread'lar soni)
+            retention: Yozilgan fayllarni disk kvotasi uchun indekslash (ixtiyoriy)
+            latency: Hodisa frame'idan diskgacha kechikish statistikasi (ixtiyoriy)
         """
+        self.config = config or SaverConfig(save_dir=save_dir)
         self.save_dir = Path(save_dir)
+        self.event_store = event_store
+        self.retention = retention
+        self.latency = latency
         self.save_dir.mkdir(exist_ok=True)
+        
+        # Encode bosqichi (OpenCV encode vaqtida GIL'ni qo'yib yuboradi)
+        self.encoder = ImageEncoder(self.config)
+        workers = max(1, self.config.workers)
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ImageEncode')
+        # Pool'dagi kutilayotgan ishlarni cheklash (xotira o'smasligi uchun)
+        self._inflight = threading.BoundedSemaphore(workers * 2)
+        self._last_stats_time = time.time()
+        
         self.queue = Queue()
         self.running = True
         self.thread = threading.Thread(target=self._worker, daemon=True)
         self.thread.start()
-        logger.info(f"ImageSaver ishga tushdi: {self.save_dir}")
+        logger.info(f"ImageSaver ishga tushdi: {self.save_dir} ({workers} ta encode thread)")
     
     def _worker(self):
-        """Queue'dan rasmlarni olish va saqlash"""
-        while self.running:
+        """Queue'dan hodisalarni olib encode pool'ga berish"""
+        while self.running or not self.queue.empty():
             try:
-                if not self.queue.empty():
-                    event = self.queue.get(timeout=1)
-                    self._save_image(event)
-                else:
-                    time.sleep(0.01)
-            except Exception as e:
-                logger.error(f"ImageSaver xato: {e}")
+                event = self.queue.get(timeout=0.5)
+            except Empty:
+                self._maybe_log_stats()
+                continue
+            
+            self._inflight.acquire()
+            try:
+                self.pool.submit(self._save_task, event)
+            except RuntimeError:
+                # Pool yopilgan
+                self._inflight.release()
+                break
+            self._maybe_log_stats()
+    
+    def _save_task(self, event: FrameEvent):
+        """Pool ichida bitta hodisani saqlash"""
+        try:
+            self._save_image(event)
+        except Exception as e:
+            self.encoder.stats.add_failure()
+            logger.error(f"ImageSaver xato: {e}")
+        finally:
+            self._inflight.release()
+    
+    def _maybe_log_stats(self):
+        """Encode statistikasini davriy log qilish"""
+        interval = self.config.stats_interval
+        if interval <= 0 or time.time() - self._last_stats_time < interval:
+            return
+        self._last_stats_time = time.time()
+        stats = self.encoder.stats.summary()
+        if stats['events'] == 0:
+            return
+        per_event = ", ".join(f"{t}: {b / 1024:.0f}KB" for t, b in stats['bytes_per_event'].items())
+        logger.info(f"ImageSaver: {stats['events']} hodisa, encode {stats['encode_fps']:.1f} rasm/s/thread, "
+                    f"{stats['events_per_sec']:.2f} hodisa/s, o'rtacha hajm [{per_event}], "
+                    f"xatolar: {stats['failures']}")
+    
+    def get_stats(self) -> dict:
+        """
+        Encode statistikasini olish
+        
+        Returns:
+            dict: ImageEncoder statistikasi
+        """
+        return self.encoder.stats.summary()
     
     def _save_image(self, event: FrameEvent):
         """
@@ -47,21 +113,26 @@ class ImageSaver:
         Args:
             event: FrameEvent ma'lumotlari
         """
+        save_started = time.time()
         frame = event.frame
         camera_id = event.camera_id
         camera_name = event.camera_name
         track_id = event.track_id
         event_type = event.event_type
-        timestamp = event.timestamp
         box_coords = event.box_coords
         time_in_polygon = event.time_in_polygon
         class_id = event.class_id
         
-        # Frame nusxasini olish
+        # Chizish uchun o'z nusxasi (event.frame boshqa sink'lar bilan umumiy bo'lishi mumkin)
         img = frame.copy()
         
-        # Box koordinatalari
-        x1, y1, x2, y2 = box_coords
+        # Box koordinatalari (frame ichida, kamida 1 piksel)
+        height_px, width_px = img.shape[:2]
+        x1, y1, x2, y2 = (int(v) for v in box_coords)
+        x1 = min(max(x1, 0), width_px - 1)
+        y1 = min(max(y1, 0), height_px - 1)
+        x2 = min(max(x2, x1 + 1), width_px)
+        y2 = min(max(y2, y1 + 1), height_px)
         
         # Rang va matn tanlash
         if event_type == 'enter':
@@ -73,6 +144,9 @@ class ImageSaver:
         elif event_type == 'violation':
             color = (0, 0, 255)  # Qizil
             event_text = "QOIDABUZARLIK"
+        elif event_type == 'slow':
+            color = (0, 165, 255)  # To'q sariq
+            event_text = "SEKIN O'TISH"
         else:
             color = (255, 255, 255)
             event_text = event_type.upper()
@@ -88,27 +162,37 @@ class ImageSaver:
         if time_in_polygon > 0:
             cv2.putText(img, f"Vaqt: {time_in_polygon:.1f}s", (x1, y1 - 10), 
                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
+        if event.speed_kmh is not None:
+            cv2.putText(img, f"{event.speed_kmh:.1f} km/h", (x1, y2 + 25), 
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
         
-        # Fayl nomini yaratish
-        timestamp_str = timestamp.strftime("%Y%m%d_%H%M%S_%f")[:-3]
-        filename = f"cam{camera_id}_{event_type}_id{track_id}_{timestamp_str}.jpg"
+        # Fayl yo'li (save_dir'ga nisbatan)
+        relpath = event.image_relpath()
+        filepath = self.save_dir / relpath
         
         # Papkalar yaratish
-        camera_dir = self.save_dir / f"camera_{camera_id}"
-        camera_dir.mkdir(exist_ok=True)
-        
-        event_dir = camera_dir / event_type
-        event_dir.mkdir(exist_ok=True)
-        
-        filepath = event_dir / filename
-        
-        # Rasm saqlash
-        cv2.imwrite(str(filepath), img)
-        
-        # TXT fayl saqlash (YOLO format)
-        h, w = frame.shape[:2]
-        x_center = ((x1 + x2) / 2) / w
-        y_center = ((y1 + y2) / 2) / h
+        event_dir = filepath.parent
+        event_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Encode (sifat, qirqim, thumbnail) va saqlash
+        main_bytes, thumb_bytes, region = self.encoder.encode_event(img, event_type, (x1, y1, x2, y2))
+        filepath.write_bytes(main_bytes)
+        if self.latency is not None and event.trace is not None:
+            self.latency.record_saved(event.trace, save_started, time.time())
+        
+        written = [filepath]
+        if thumb_bytes:
+            thumb_path = self.save_dir / self.encoder.thumbnail_relpath(relpath)
+            thumb_path.parent.mkdir(exist_ok=True)
+            thumb_path.write_bytes(thumb_bytes)
+            written.append(thumb_path)
+        
+        # TXT fayl saqlash (YOLO format, saqlangan rasmga nisbatan)
+        rx1, ry1, rx2, ry2 = region
+        w = rx2 - rx1
+        h = ry2 - ry1
+        x_center = ((x1 + x2) / 2 - rx1) / w
+        y_center = ((y1 + y2) / 2 - ry1) / h
         width = (x2 - x1) / w
         height = (y2 - y1) / h
         
@@ -117,6 +201,14 @@ class ImageSaver:
         
         with open(txt_path, 'w') as f:
             f.write(f"{class_id} {x_center:.6f} {y_center:.6f} {width:.6f} {height:.6f}\n")
+        written.append(txt_path)
+        
+        if self.retention is not None:
+            self.retention.record(camera_id, event_type, written)
+        
+        # Bazaga yozish (rasm yo'li bilan)
+        if self.event_store is not None:
+            self.event_store.add(event, relpath)
         
         logger.debug(f"Saqlandi: {camera_name} - {event_text} - ID:{track_id} -> {filepath}")
     
@@ -134,4 +226,7 @@ class ImageSaver:
         logger.info("ImageSaver to'xtatilmoqda...")
         self.running = False
         self.thread.join()
+        self.pool.shutdown(wait=True)
+        self._last_stats_time = 0.0
+        self._maybe_log_stats()
         logger.info("ImageSaver to'xtatildi")
\ No newline at end of file
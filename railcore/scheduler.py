@@ -0,0 +1,272 @@
+"""
+FrameScheduler - kameralar o'rtasida umumiy inference byudjetini (frame/sekund) taqsimlash
+
+Har bir kamera o'z holatini (prioritet) xabar qiladi, scheduler esa byudjetni
+prioritet bo'yicha bo'ladi:
+    CRITICAL    - polygon ichida avtomobil violation chegarasiga yaqin
+    INSIDE      - polygon ichida avtomobil bor
+    APPROACHING - avtomobil ko'rinmoqda, lekin polygon tashqarisida
+    IDLE        - kadrda hech narsa yo'q
+
+Byudjet berilmagan bo'lsa o'lchangan inference narxidan (EMA) hisoblanadi.
+Kameralar token bucket orqali frame oladi - bucket ulushiga qarab to'ladi.
+"""
+import threading
+import time
+from typing import Dict, Optional
+from railcore.types import SchedulerConfig
+from railcore.logging_setup import setup_logger
+
+logger = setup_logger(__name__)
+
+PRIORITY_IDLE = 0
+PRIORITY_APPROACHING = 1
+PRIORITY_INSIDE = 2
+PRIORITY_CRITICAL = 3
+
+PRIORITY_NAMES = {
+    PRIORITY_IDLE: 'idle',
+    PRIORITY_APPROACHING: 'approaching',
+    PRIORITY_INSIDE: 'inside',
+    PRIORITY_CRITICAL: 'critical',
+}
+
+def classify_priority(objects_inside: int,
+                      max_time: float,
+                      detected_count: int,
+                      violation: float,
+                      near_ratio: float) -> int:
+    """
+    Kamera holatidan prioritet
+
+    Args:
+        objects_inside: Polygon ichidagi tracklar soni
+        max_time: Ichidagi tracklarning eng katta vaqti (sekund)
+        detected_count: Oxirgi frame'dagi deteksiyalar soni
+        violation: Violation chegarasi (sekund)
+        near_ratio: max_time >= near_ratio * violation bo'lsa CRITICAL
+
+    Returns:
+        int: PRIORITY_* qiymati
+    """
+    if objects_inside > 0:
+        if max_time >= near_ratio * violation:
+            return PRIORITY_CRITICAL
+        return PRIORITY_INSIDE
+    if detected_count > 0:
+        return PRIORITY_APPROACHING
+    return PRIORITY_IDLE
+
+class _CameraSlot:
+    """Scheduler ichidagi bitta kamera holati"""
+
+    __slots__ = ('camera_id', 'max_fps', 'priority', 'fps', 'tokens',
+                 'last_refill', 'granted', 'denied', 'cost')
+
+    def __init__(self, camera_id: int, max_fps: float, now: float):
+        self.camera_id = camera_id
+        self.max_fps = max_fps
+        self.priority = PRIORITY_IDLE
+        self.fps = 0.0
+        self.tokens = 1.0  # Birinchi frame darhol qayta ishlanadi
+        self.last_refill = now
+        self.granted = 0
+        self.denied = 0
+        self.cost = 0.0
+
+class FrameScheduler:
+    """Umumiy inference byudjeti va kameralar bo'yicha token bucket'lar"""
+
+    def __init__(self, config: SchedulerConfig):
+        """
+        Args:
+            config: Scheduler konfiguratsiyasi
+        """
+        self.config = config
+        self._cameras: Dict[int, _CameraSlot] = {}
+        self._lock = threading.Lock()
+
+        # O'lchangan inference narxi (sekund/frame, barcha kameralar bo'yicha EMA)
+        self.cost_ema: Optional[float] = None
+        self.budget_fps = config.budget_fps
+
+        self._last_rebalance = 0.0
+        self._last_stats = time.time()
+
+    def register(self, camera_id: int, max_fps: float):
+        """
+        Kamerani ro'yxatga olish
+
+        Args:
+            camera_id: Kamera ID
+            max_fps: Oqim FPS'i (kameraga bundan ko'p frame berilmaydi)
+        """
+        with self._lock:
+            self._cameras[camera_id] = _CameraSlot(camera_id, max_fps, time.time())
+            self._last_rebalance = 0.0
+        logger.info(f"Scheduler: kamera {camera_id} qo'shildi ({max_fps:.1f} FPS)")
+
+    def unregister(self, camera_id: int):
+        """Kamerani ro'yxatdan olib tashlash (ulushi boshqalarga o'tadi)"""
+        with self._lock:
+            self._cameras.pop(camera_id, None)
+            self._last_rebalance = 0.0
+
+    def report(self, camera_id: int, priority: int):
+        """
+        Kamera prioritetini yangilash (qayta ishlangan frame'dan keyin)
+
+        Prioritet oshsa taqsimot darhol qayta hisoblanadi - violation'ga yaqin
+        kamera keyingi rebalance'ni kutmaydi.
+        """
+        with self._lock:
+            slot = self._cameras.get(camera_id)
+            if slot is None or slot.priority == priority:
+                return
+            raised = priority > slot.priority
+            slot.priority = priority
+            if raised:
+                self._last_rebalance = 0.0
+
+    def record_cost(self, camera_id: int, seconds: float):
+        """
+        Bitta inference vaqtini qayd qilish
+
+        Args:
+            camera_id: Kamera ID
+            seconds: detect() vaqti
+        """
+        alpha = self.config.cost_alpha
+        with self._lock:
+            if self.cost_ema is None:
+                self.cost_ema = seconds
+            else:
+                self.cost_ema += alpha * (seconds - self.cost_ema)
+            slot = self._cameras.get(camera_id)
+            if slot is not None:
+                slot.cost = seconds if slot.cost == 0.0 else slot.cost + alpha * (seconds - slot.cost)
+
+    def acquire(self, camera_id: int, now: Optional[float] = None) -> bool:
+        """
+        Kamera shu frame'ni qayta ishlashi mumkinmi (token bo'lsa sarflanadi)
+
+        Args:
+            camera_id: Kamera ID
+            now: Joriy vaqt (standart - time.time())
+
+        Returns:
+            bool: True - inference qilish, False - frame'ni o'tkazib yuborish
+        """
+        if now is None:
+            now = time.time()
+        with self._lock:
+            slot = self._cameras.get(camera_id)
+            if slot is None:
+                return True
+            if now - self._last_rebalance >= self.config.rebalance_interval:
+                self._rebalance(now)
+
+            burst = max(1.0, slot.fps * self.config.burst_seconds)
+            slot.tokens = min(burst, slot.tokens + slot.fps * (now - slot.last_refill))
+            slot.last_refill = now
+            if slot.tokens >= 1.0:
+                slot.tokens -= 1.0
+                slot.granted += 1
+                return True
+            slot.denied += 1
+            return False
+
+    def _total_budget(self) -> float:
+        """Umumiy byudjet (frame/sekund)"""
+        if self.config.budget_fps > 0:
+            return self.config.budget_fps
+        if not self.cost_ema:
+            # Narx hali o'lchanmagan - cheklamaslik
+            return sum(slot.max_fps for slot in self._cameras.values())
+        return self.config.utilization / self.cost_ema
+
+    def _demand(self, slot: _CameraSlot) -> float:
+        """Kameraning prioritetiga qarab kerakli FPS"""
+        divisor = self.config.fps_divisor.get(PRIORITY_NAMES[slot.priority], 1)
+        return slot.max_fps / max(1, divisor)
+
+    def _rebalance(self, now: float):
+        """
+        Byudjetni qayta taqsimlash (lock ostida chaqiriladi)
+
+        Avval har bir kameraga min_fps (yangi avtomobil kirib kelishini o'tkazib
+        yubormaslik uchun), so'ng qolgan byudjet prioritet bo'yicha yuqoridan
+        pastga: bitta prioritet ichida talabga proporsional bo'linadi.
+        """
+        self._last_rebalance = now
+        slots = list(self._cameras.values())
+        if not slots:
+            return
+
+        budget = self._total_budget()
+        self.budget_fps = budget
+
+        floor = min(self.config.min_fps, budget / len(slots))
+        remaining = budget
+        for slot in slots:
+            slot.fps = min(floor, self._demand(slot))
+            remaining -= slot.fps
+
+        for priority in (PRIORITY_CRITICAL, PRIORITY_INSIDE, PRIORITY_APPROACHING, PRIORITY_IDLE):
+            group = [slot for slot in slots if slot.priority == priority]
+            if not group or remaining <= 0:
+                continue
+            wants = [self._demand(slot) - slot.fps for slot in group]
+            total_want = sum(wants)
+            if total_want <= 0:
+                continue
+            share = min(1.0, remaining / total_want)
+            for slot, want in zip(group, wants):
+                slot.fps += want * share
+            remaining -= total_want * share
+
+        if self.config.stats_interval > 0 and now - self._last_stats >= self.config.stats_interval:
+            self._last_stats = now
+            self._log_allocation()
+
+    def _log_allocation(self):
+        parts = [f"{slot.camera_id}:{PRIORITY_NAMES[slot.priority]} {slot.fps:.1f}/s"
+                 for slot in sorted(self._cameras.values(), key=lambda s: s.camera_id)]
+        cost = f"{self.cost_ema * 1000:.1f} ms" if self.cost_ema else "-"
+        logger.info(f"Scheduler: byudjet {self.budget_fps:.1f} FPS, inference {cost} | {', '.join(parts)}")
+
+    def get_allocation(self) -> Dict[int, dict]:
+        """
+        Kameralar bo'yicha joriy taqsimot
+
+        Returns:
+            Dict[int, dict]: camera_id -> priority, fps, max_fps, cost_ms, granted, denied
+        """
+        with self._lock:
+            return {
+                slot.camera_id: {
+                    'priority': PRIORITY_NAMES[slot.priority],
+                    'fps': round(slot.fps, 2),
+                    'max_fps': slot.max_fps,
+                    'cost_ms': round(slot.cost * 1000, 2),
+                    'granted': slot.granted,
+                    'denied': slot.denied,
+                }
+                for slot in self._cameras.values()
+            }
+
+    def get_stats(self) -> dict:
+        """
+        Umumiy statistika
+
+        Returns:
+            dict: budget_fps, allocated_fps, cost_ms, cameras
+        """
+        with self._lock:
+            allocated = sum(slot.fps for slot in self._cameras.values())
+            return {
+                'budget_fps': round(self.budget_fps, 2),
+                'allocated_fps': round(allocated, 2),
+                'cost_ms': round(self.cost_ema * 1000, 2) if self.cost_ema else None,
+                'cameras': len(self._cameras),
+            }
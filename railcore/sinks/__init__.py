@@ -0,0 +1,36 @@
+"""
+Event sink moduli
+"""
+from railcore.sinks.base import EventSink, event_to_record
+from railcore.sinks.bus import EventBus
+from railcore.sinks.file_sink import JsonlFileSink
+from railcore.sinks.sqlite_sink import SQLiteSink
+from railcore.sinks.webhook_sink import WebhookSink
+
+_SINK_TYPES = {
+    'file': JsonlFileSink,
+    'sqlite': SQLiteSink,
+    'webhook': WebhookSink
+}
+
+def create_sink(sink_config: dict) -> EventSink:
+    """
+    Config bo'yicha sink yaratish
+
+    Args:
+        sink_config: Sink sozlamalari ({'type': 'file', ...})
+
+    Returns:
+        EventSink: Sink instance
+    """
+    params = dict(sink_config)
+    sink_type = params.pop('type')
+    params.pop('enabled', None)
+    if sink_type not in _SINK_TYPES:
+        raise ValueError(f"Noma'lum sink turi: {sink_type}")
+    return _SINK_TYPES[sink_type](**params)
+
+__all__ = [
+    'EventSink', 'EventBus', 'JsonlFileSink', 'SQLiteSink', 'WebhookSink',
+    'create_sink', 'event_to_record'
+]
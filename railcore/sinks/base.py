@@ -0,0 +1,82 @@
+"""
+Event sink base interface
+"""
+from abc import ABC, abstractmethod
+from typing import List
+from railcore.types import FrameEvent
+
+def event_to_record(event: FrameEvent) -> dict:
+    """
+    FrameEvent'ni sink'lar uchun yengil dict'ga aylantirish (frame'siz)
+
+    Args:
+        event: FrameEvent ma'lumotlari
+
+    Returns:
+        dict: JSON'ga yoziladigan yozuv
+    """
+    x1, y1, x2, y2 = event.box_coords
+    return {
+        'camera_id': int(event.camera_id),
+        'camera_name': event.camera_name,
+        'track_id': int(event.track_id),
+        'event_type': event.event_type,
+        'timestamp': event.timestamp.timestamp(),
+        'timestamp_iso': event.timestamp.isoformat(timespec='milliseconds'),
+        'box': [int(x1), int(y1), int(x2), int(y2)],
+        'time_in_polygon': float(event.time_in_polygon),
+        'class_id': int(event.class_id),
+        'image_path': event.image_relpath(),
+        'speed_kmh': None if event.speed_kmh is None else round(float(event.speed_kmh), 2),
+        'heading': None if event.heading is None else round(float(event.heading), 1)
+    }
+
+class EventSink(ABC):
+    """Event sink interface (asyncio loop ichida ishlaydi)"""
+
+    def __init__(self,
+                 name: str,
+                 batch_size: int = 50,
+                 flush_interval: float = 1.0,
+                 max_buffer: int = 1000,
+                 max_retries: int = 5,
+                 backoff_base: float = 0.5,
+                 backoff_max: float = 10.0):
+        """
+        Args:
+            name: Sink nomi (logging uchun)
+            batch_size: Bitta yozishdagi maksimal yozuvlar soni
+            flush_interval: Batch to'lmasa ham yozish oralig'i (sekund)
+            max_buffer: Bufer hajmi (to'lsa eng eski yozuv tashlanadi)
+            max_retries: Xato bo'lganda qayta urinishlar soni
+            backoff_base: Birinchi kutish vaqti (sekund)
+            backoff_max: Maksimal kutish vaqti (sekund)
+        """
+        self.name = name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    async def open(self):
+        """Sink'ni ochish (ixtiyoriy)"""
+        pass
+
+    @abstractmethod
+    async def write_batch(self, records: List[dict]):
+        """
+        Yozuvlar batch'ini yozish
+
+        Args:
+            records: event_to_record() natijalari
+
+        Raises:
+            Exception: Yozish muvaffaqiyatsiz bo'lsa (bus qayta urinadi)
+        """
+        pass
+
+    async def close(self):
+        """Sink'ni yopish (ixtiyoriy)"""
+        pass
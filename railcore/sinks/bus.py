@@ -0,0 +1,187 @@
+"""
+EventBus - hodisalarni asyncio loop'dagi sink'larga tarqatish
+"""
+import asyncio
+import threading
+from typing import Dict, List
+from railcore.types import FrameEvent
+from railcore.sinks.base import EventSink, event_to_record
+from railcore.logging_setup import setup_logger
+
+logger = setup_logger(__name__)
+
+class EventBus:
+    """Hodisalarni alohida thread'dagi asyncio loop orqali sink'larga yuborish"""
+
+    def __init__(self, sinks: List[EventSink]):
+        """
+        Args:
+            sinks: Event sink'lar ro'yxati
+        """
+        self.sinks = sinks
+        self.loop = asyncio.new_event_loop()
+        self.queues: Dict[str, asyncio.Queue] = {}
+        self.tasks: List[asyncio.Task] = []
+        self.running = True
+
+        # Statistika (sink nomi bo'yicha)
+        self.stats: Dict[str, Dict[str, int]] = {
+            sink.name: {'written': 0, 'dropped': 0, 'failed': 0, 'retries': 0}
+            for sink in sinks
+        }
+
+        self._ready = threading.Event()
+        self.thread = threading.Thread(target=self._run_loop, daemon=True)
+        self.thread.start()
+        self._ready.wait()
+        logger.info(f"EventBus ishga tushdi: {[sink.name for sink in sinks]}")
+
+    def _run_loop(self):
+        """Asyncio loop'ni thread ichida ishga tushirish"""
+        asyncio.set_event_loop(self.loop)
+        for sink in self.sinks:
+            queue = asyncio.Queue(maxsize=sink.max_buffer)
+            self.queues[sink.name] = queue
+            self.tasks.append(self.loop.create_task(self._sink_worker(sink, queue)))
+        self.loop.call_soon(self._ready.set)
+        self.loop.run_forever()
+
+        # Loop to'xtagandan keyin qolgan task'larni tugatish
+        pending = asyncio.all_tasks(self.loop)
+        for task in pending:
+            task.cancel()
+        if pending:
+            self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        self.loop.close()
+
+    def publish(self, event: FrameEvent):
+        """
+        Hodisani barcha sink'larga yuborish (thread-safe, bloklamaydi)
+
+        Args:
+            event: FrameEvent ma'lumotlari
+        """
+        if not self.running:
+            return
+        record = event_to_record(event)
+        try:
+            self.loop.call_soon_threadsafe(self._enqueue, record)
+        except RuntimeError:
+            # Loop allaqachon yopilgan
+            pass
+
+    def _enqueue(self, record: dict):
+        """Yozuvni har bir sink buferiga qo'shish (loop thread'ida)"""
+        for sink in self.sinks:
+            queue = self.queues[sink.name]
+            if queue.full():
+                # Bufer to'lgan - eng eski yozuvni tashlash
+                queue.get_nowait()
+                queue.task_done()
+                self.stats[sink.name]['dropped'] += 1
+            queue.put_nowait(record)
+
+    async def _sink_worker(self, sink: EventSink, queue: asyncio.Queue):
+        """
+        Bitta sink uchun batch yig'ish va yozish
+
+        Args:
+            sink: Event sink
+            queue: Sink buferi
+        """
+        try:
+            await sink.open()
+        except Exception as e:
+            logger.error(f"Sink '{sink.name}' ochilmadi: {e}")
+
+        while True:
+            record = await queue.get()
+            batch = [record]
+
+            # Batch'ni to'ldirish (flush_interval ichida)
+            deadline = self.loop.time() + sink.flush_interval
+            while len(batch) < sink.batch_size:
+                timeout = deadline - self.loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._write_with_retry(sink, batch)
+            for _ in batch:
+                queue.task_done()
+
+    async def _write_with_retry(self, sink: EventSink, batch: List[dict]):
+        """
+        Batch'ni exponential backoff bilan yozish
+
+        Args:
+            sink: Event sink
+            batch: Yozuvlar
+        """
+        stats = self.stats[sink.name]
+        for attempt in range(sink.max_retries + 1):
+            try:
+                await sink.write_batch(batch)
+                stats['written'] += len(batch)
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if attempt >= sink.max_retries:
+                    stats['failed'] += len(batch)
+                    logger.error(f"Sink '{sink.name}' {len(batch)} ta yozuvni yoza olmadi: {e}")
+                    return
+                delay = min(sink.backoff_max, sink.backoff_base * (2 ** attempt))
+                stats['retries'] += 1
+                logger.warning(f"Sink '{sink.name}' xato ({e}), {delay:.1f}s dan keyin qayta urinish")
+                await asyncio.sleep(delay)
+
+    async def _drain(self, timeout: float):
+        """Buferlardagi yozuvlar yozilishini kutish"""
+        waits = [queue.join() for queue in self.queues.values()]
+        try:
+            await asyncio.wait_for(asyncio.gather(*waits), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("EventBus: ba'zi yozuvlar yozilmay qoldi")
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        for sink in self.sinks:
+            try:
+                await sink.close()
+            except Exception as e:
+                logger.error(f"Sink '{sink.name}' yopishda xato: {e}")
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Sink statistikasini olish
+
+        Returns:
+            dict: sink nomi -> {written, dropped, failed, retries, buffered}
+        """
+        result = {}
+        for name, stats in self.stats.items():
+            queue = self.queues.get(name)
+            result[name] = dict(stats, buffered=queue.qsize() if queue else 0)
+        return result
+
+    def stop(self, timeout: float = 5.0):
+        """
+        EventBus'ni to'xtatish
+
+        Args:
+            timeout: Buferlarni yozib tugatish uchun maksimal vaqt
+        """
+        logger.info("EventBus to'xtatilmoqda...")
+        self.running = False
+        future = asyncio.run_coroutine_threadsafe(self._drain(timeout), self.loop)
+        try:
+            future.result(timeout + 5.0)
+        except Exception as e:
+            logger.error(f"EventBus to'xtatishda xato: {e}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        logger.info(f"EventBus to'xtatildi: {self.get_stats()}")
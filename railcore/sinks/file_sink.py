@@ -0,0 +1,47 @@
+"""
+Fayl sink - hodisalarni JSON Lines fayllarga yozish
+"""
+import json
+import asyncio
+from pathlib import Path
+from datetime import datetime
+from typing import List
+from railcore.sinks.base import EventSink
+
+class JsonlFileSink(EventSink):
+    """Hodisalarni kunlik .jsonl fayllarga yozish"""
+
+    def __init__(self, directory: str = 'events', name: str = 'file', **kwargs):
+        """
+        Args:
+            directory: Fayllar papkasi
+            name: Sink nomi
+            **kwargs: EventSink parametrlari (batch_size, max_buffer, ...)
+        """
+        super().__init__(name, **kwargs)
+        self.directory = Path(directory)
+
+    async def open(self):
+        """Papkani yaratish"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    async def write_batch(self, records: List[dict]):
+        """
+        Batch'ni fayl(lar)ga yozish (disk I/O thread pool'da)
+
+        Args:
+            records: Yozuvlar
+        """
+        await asyncio.to_thread(self._write, records)
+
+    def _write(self, records: List[dict]):
+        """Yozuvlarni kun bo'yicha guruhlab fayllarga qo'shish"""
+        by_day = {}
+        for record in records:
+            day = datetime.fromtimestamp(record['timestamp']).strftime("%Y%m%d")
+            by_day.setdefault(day, []).append(json.dumps(record, ensure_ascii=False))
+
+        for day, lines in by_day.items():
+            path = self.directory / f"events_{day}.jsonl"
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write('\n'.join(lines) + '\n')
@@ -0,0 +1,52 @@
+"""
+SQLite sink - hodisalarni SQLite bazaga yozish
+"""
+import sqlite3
+import asyncio
+from pathlib import Path
+from typing import List, Optional
+from railcore.sinks.base import EventSink
+from railcore.event_store import init_schema, insert_records
+
+class SQLiteSink(EventSink):
+    """Hodisalarni SQLite bazaga batch bilan yozish (EventStore sxemasi bilan)"""
+
+    def __init__(self, path: str = 'events/events.db', name: str = 'sqlite', **kwargs):
+        """
+        Args:
+            path: Baza fayli yo'li
+            name: Sink nomi
+            **kwargs: EventSink parametrlari (batch_size, max_buffer, ...)
+        """
+        super().__init__(name, **kwargs)
+        self.path = Path(path)
+        self.conn: Optional[sqlite3.Connection] = None
+
+    async def open(self):
+        """Bazani ochish va jadvalni yaratish"""
+        await asyncio.to_thread(self._open)
+
+    def _open(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        init_schema(self.conn)
+
+    async def write_batch(self, records: List[dict]):
+        """
+        Batch'ni bitta tranzaksiyada yozish
+
+        Args:
+            records: Yozuvlar
+        """
+        await asyncio.to_thread(self._write, records)
+
+    def _write(self, records: List[dict]):
+        if self.conn is None:
+            self._open()
+        insert_records(self.conn, records)
+
+    async def close(self):
+        """Bazani yopish"""
+        if self.conn is not None:
+            await asyncio.to_thread(self.conn.close)
+            self.conn = None
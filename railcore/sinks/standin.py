@@ -0,0 +1,107 @@
+"""
+Webhook sink uchun lokal stand-in server
+
+Ishlatish:
+    python -m railcore.sinks.standin --port 8081 [--fail-rate 0.3] [--delay 0.5]
+"""
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional, Tuple
+
+class StandInServer:
+    """Kelgan hodisalarni xotirada saqlaydigan oddiy HTTP server"""
+
+    def __init__(self,
+                 host: str = '127.0.0.1',
+                 port: int = 0,
+                 fail_rate: float = 0.0,
+                 delay: float = 0.0):
+        """
+        Args:
+            host: Tinglash manzili
+            port: Port (0 = bo'sh port tanlanadi)
+            fail_rate: 503 qaytarish ehtimoli (retry'ni sinash uchun)
+            delay: Har bir javobdan oldin kutish (sekin sink'ni sinash uchun)
+        """
+        self.records: List[dict] = []
+        self.batch_sizes: List[int] = []  # Qabul qilingan har bir so'rovdagi yozuvlar soni
+        self.requests = 0
+        self.failures = 0
+        self.fail_rate = fail_rate
+        self.delay = delay
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._make_handler())
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """(host, port)"""
+        return self.server.server_address[:2]
+
+    @property
+    def url(self) -> str:
+        """Webhook sink uchun URL"""
+        host, port = self.address
+        return f"http://{host}:{port}/events"
+
+    def _make_handler(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                body = self.rfile.read(length)
+                if standin.delay > 0:
+                    time.sleep(standin.delay)
+                with standin._lock:
+                    standin.requests += 1
+                    fail = random.random() < standin.fail_rate
+                    if fail:
+                        standin.failures += 1
+                    else:
+                        batch = json.loads(body)
+                        standin.records.extend(batch)
+                        standin.batch_sizes.append(len(batch))
+                self.send_response(503 if fail else 200)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> 'StandInServer':
+        """Serverni fon thread'ida ishga tushirish"""
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Serverni to'xtatish"""
+        self.server.shutdown()
+        self.server.server_close()
+
+def main():
+    parser = argparse.ArgumentParser(description="RailSafe webhook stand-in server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--fail-rate', type=float, default=0.0)
+    parser.add_argument('--delay', type=float, default=0.0)
+    args = parser.parse_args()
+
+    standin = StandInServer(args.host, args.port, args.fail_rate, args.delay).start()
+    print(f"Stand-in server: {standin.url}")
+    try:
+        while True:
+            time.sleep(5)
+            print(f"so'rovlar={standin.requests} xatolar={standin.failures} yozuvlar={len(standin.records)}")
+    except KeyboardInterrupt:
+        standin.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Webhook sink - hodisalarni HTTP POST orqali yuborish
+"""
+import json
+import asyncio
+import urllib.request
+from typing import List, Optional
+from railcore.sinks.base import EventSink
+
+class WebhookSink(EventSink):
+    """Hodisalarni JSON massiv sifatida HTTP endpoint'ga yuborish"""
+
+    def __init__(self,
+                 url: str,
+                 name: str = 'webhook',
+                 timeout: float = 5.0,
+                 headers: Optional[dict] = None,
+                 **kwargs):
+        """
+        Args:
+            url: Endpoint URL (masalan, http://127.0.0.1:8081/events)
+            name: Sink nomi
+            timeout: HTTP so'rov timeout'i (sekund)
+            headers: Qo'shimcha HTTP header'lar
+            **kwargs: EventSink parametrlari (batch_size, max_buffer, ...)
+        """
+        super().__init__(name, **kwargs)
+        self.url = url
+        self.timeout = timeout
+        self.headers = {'Content-Type': 'application/json'}
+        self.headers.update(headers or {})
+
+    async def write_batch(self, records: List[dict]):
+        """
+        Batch'ni bitta POST so'rovida yuborish
+
+        Args:
+            records: Yozuvlar
+
+        Raises:
+            IOError: Server 2xx bo'lmagan javob qaytarsa
+        """
+        await asyncio.to_thread(self._post, records)
+
+    def _post(self, records: List[dict]):
+        body = json.dumps(records, ensure_ascii=False).encode('utf-8')
+        request = urllib.request.Request(self.url, data=body, headers=self.headers, method='POST')
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            if not 200 <= response.status < 300:
+                raise IOError(f"HTTP {response.status}")
@@ -0,0 +1,226 @@
+"""
+Threshold/polygon parametrlarini keshlangan deteksiyalar ustida parallel sinash
+
+Ishlatish:
+    python -m railcore.sweep --cache cache/detections/<kalit> \\
+        --polygon paligons/a.json paligons/b.json \\
+        --warning 5 10 --violation 10 15 20 --timeout 2 3 \\
+        --frame-skip-active 1 2 --workers 8 --csv sweep.csv
+
+Tezlik kalibrovkasi (polygon_length/width, trajectory_size, slow_min_points) --config'dagi
+processing bo'limidan olinadi - 'slow' hodisalari jonli tizimdagidek hisoblanadi.
+"""
+import csv
+import time
+import argparse
+import itertools
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from railcore.types import ThresholdsConfig
+from railcore.config import load_config, parse_processing
+
+# Har bir worker process'da bir marta ochiladi (mmap + polygon mask)
+_CACHES: Dict[str, object] = {}
+_POLYGONS: Dict[Tuple[str, int, int], object] = {}
+
+def _get_cache(path: str):
+    from railcore.vision.detection_cache import DetectionCache
+    if path not in _CACHES:
+        _CACHES[path] = DetectionCache(path)
+    return _CACHES[path]
+
+def _get_polygon(path: str, width: int, height: int):
+    from railcore.utils_polygon import PolygonUtils
+    key = (path, width, height)
+    if key not in _POLYGONS:
+        _POLYGONS[key] = PolygonUtils(path, width, height)
+    return _POLYGONS[key]
+
+def dwell_stats(dwell: List[float]) -> dict:
+    """
+    Polygon ichidagi vaqt taqsimoti
+
+    Args:
+        dwell: Chiqish hodisalaridagi time_in_polygon qiymatlari
+
+    Returns:
+        dict: dwell_n, dwell_mean, dwell_p50, dwell_p90, dwell_p99, dwell_max
+    """
+    if not dwell:
+        return {'dwell_n': 0, 'dwell_mean': 0.0, 'dwell_p50': 0.0,
+                'dwell_p90': 0.0, 'dwell_p99': 0.0, 'dwell_max': 0.0}
+    values = np.asarray(dwell, dtype=np.float64)
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return {
+        'dwell_n': len(values),
+        'dwell_mean': float(values.mean()),
+        'dwell_p50': float(p50),
+        'dwell_p90': float(p90),
+        'dwell_p99': float(p99),
+        'dwell_max': float(values.max())
+    }
+
+def run_combination(job: dict) -> dict:
+    """
+    Bitta parametr kombinatsiyasini replay qilish (worker process'da)
+
+    Args:
+        job: cache, polygon, warning, violation va config'ning processing maydonlari
+
+    Returns:
+        dict: Parametrlar, hodisa sonlari va dwell statistikasi
+    """
+    from railcore.vision.detection_cache import replay
+
+    cache = _get_cache(job['cache'])
+    width, height = cache.frame_size
+    polygon = _get_polygon(job['polygon'], width, height)
+    thresholds = ThresholdsConfig(warning=job['warning'], violation=job['violation'])
+    processing = parse_processing(job)
+
+    result = replay(cache, polygon, thresholds, processing)
+    counts = result.counts()
+    row = dict(job)
+    row.update(
+        enter_events=counts.get('enter', 0),
+        exit_events=counts.get('exit', 0),
+        violation_events=counts.get('violation', 0),
+        slow_events=counts.get('slow', 0),
+        frames=result.frames_processed,
+        replay_fps=result.frames_processed / max(result.elapsed, 1e-9)
+    )
+    row.update(dwell_stats([e.time_in_polygon for e in result.events if e.event_type == 'exit']))
+    return row
+
+def build_grid(caches: List[str],
+               polygons: List[str],
+               warnings: List[float],
+               violations: List[float],
+               timeouts: List[float],
+               skips_idle: List[int],
+               skips_active: List[int],
+               empty_thresholds: List[int],
+               adaptive: List[bool],
+               processing: Optional[dict] = None) -> List[dict]:
+    """
+    Barcha kombinatsiyalar ro'yxati (warning > violation bo'lganlari tashlanadi)
+
+    Args:
+        processing: Config'ning processing bo'limi (kalibrovka maydonlari har bir job'ga qo'shiladi)
+
+    Returns:
+        List[dict]: run_combination() uchun job'lar
+    """
+    base = parse_processing(processing or {})
+    calibration = {
+        'polygon_length': base.polygon_length,
+        'polygon_width': base.polygon_width,
+        'trajectory_size': base.trajectory_size,
+        'slow_min_points': base.slow_min_points
+    }
+    jobs = []
+    for (cache, polygon, warning, violation, timeout, idle, active, empty, adaptive_mode) in itertools.product(
+            caches, polygons, warnings, violations, timeouts, skips_idle, skips_active,
+            empty_thresholds, adaptive):
+        if warning > violation:
+            continue
+        jobs.append({
+            'cache': cache,
+            'polygon': polygon,
+            'warning': warning,
+            'violation': violation,
+            'timeout_seconds': timeout,
+            'frame_skip_idle': idle,
+            'frame_skip_active': active,
+            'empty_threshold': empty,
+            'adaptive_mode': adaptive_mode,
+            **calibration
+        })
+    return jobs
+
+def run_sweep(jobs: List[dict], workers: Optional[int] = None) -> List[dict]:
+    """
+    Job'larni process pool'da ishlatish
+
+    Args:
+        jobs: build_grid() natijasi
+        workers: Process'lar soni (None = CPU soni)
+
+    Returns:
+        List[dict]: Natijalar (job tartibida)
+    """
+    if workers == 1:
+        return [run_combination(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Bitta cache/polygon'ga tegishli job'lar bir process'ga tushishi uchun chunk
+        chunksize = max(1, len(jobs) // ((workers or 4) * 4))
+        return list(pool.map(run_combination, jobs, chunksize=chunksize))
+
+_TABLE_COLUMNS = [
+    ('polygon', 'polygon', '{}'),
+    ('warning', 'warn', '{:.1f}'),
+    ('violation', 'viol', '{:.1f}'),
+    ('timeout_seconds', 'tmo', '{:.1f}'),
+    ('frame_skip_idle', 'idle', '{}'),
+    ('frame_skip_active', 'act', '{}'),
+    ('enter_events', 'enter', '{}'),
+    ('exit_events', 'exit', '{}'),
+    ('violation_events', 'VIOL', '{}'),
+    ('slow_events', 'slow', '{}'),
+    ('dwell_p50', 'p50', '{:.1f}'),
+    ('dwell_p90', 'p90', '{:.1f}'),
+    ('dwell_max', 'max', '{:.1f}'),
+]
+
+def format_table(rows: List[dict]) -> str:
+    """Natijalarni terminal jadvaliga aylantirish"""
+    lines = []
+    header = [title for _, title, _ in _TABLE_COLUMNS]
+    body = []
+    for row in rows:
+        values = dict(row, polygon=row['polygon'].rsplit('/', 1)[-1])
+        body.append([fmt.format(values[key]) for key, _, fmt in _TABLE_COLUMNS])
+    widths = [max(len(h), *(len(r[i]) for r in body)) if body else len(h) for i, h in enumerate(header)]
+    lines.append('  '.join(h.rjust(w) for h, w in zip(header, widths)))
+    for r in body:
+        lines.append('  '.join(v.rjust(w) for v, w in zip(r, widths)))
+    return '\n'.join(lines)
+
+def _bool(value: str) -> bool:
+    return value.lower() in ('1', 'true', 'yes', 'ha')
+
+def main():
+    parser = argparse.ArgumentParser(description="RailSafe threshold/polygon sweep")
+    parser.add_argument('--cache', nargs='+', required=True, help="Deteksiya kesh papkalari")
+    parser.add_argument('--config', default='config/config.yaml', help="processing kalibrovkasi uchun")
+    parser.add_argument('--polygon', nargs='+', required=True, help="Polygon JSON fayllari")
+    parser.add_argument('--warning', nargs='+', type=float, default=[10.0])
+    parser.add_argument('--violation', nargs='+', type=float, default=[15.0])
+    parser.add_argument('--timeout', nargs='+', type=float, default=[3.0])
+    parser.add_argument('--frame-skip-idle', nargs='+', type=int, default=[3])
+    parser.add_argument('--frame-skip-active', nargs='+', type=int, default=[1])
+    parser.add_argument('--empty-threshold', nargs='+', type=int, default=[3])
+    parser.add_argument('--adaptive', nargs='+', type=_bool, default=[True])
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--csv', help="Natijalarni CSV faylga yozish")
+    args = parser.parse_args()
+
+    jobs = build_grid(args.cache, args.polygon, args.warning, args.violation, args.timeout,
+                      args.frame_skip_idle, args.frame_skip_active, args.empty_threshold, args.adaptive,
+                      load_config(args.config).get('processing', {}))
+    start = time.time()
+    rows = run_sweep(jobs, args.workers)
+    elapsed = time.time() - start
+
+    print(format_table(rows))
+    print(f"-- {len(rows)} ta kombinatsiya, {elapsed:.1f}s")
+
+    if args.csv:
+        with open(args.csv, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()) if rows else [])
+            writer.writeheader()
+            writer.writerows(rows)
+
+if __name__ == "__main__":
+    main()
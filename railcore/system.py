@@ -1,126 +1,638 @@
 """
 MultiCameraSystem - ko'p kamerali tizim
 """
-import yaml
-import torch
 import threading
 import time
-import cv2
-from typing import List
+from typing import Dict, List, Optional
 from railcore.camera import PolygonCamera
 from railcore.saver import ImageSaver
-from railcore.types import CameraConfig, ModelConfig, ThresholdsConfig, ProcessingConfig
-from railcore.logging_setup import setup_logger
+from railcore.event_store import EventStore
+from railcore.sinks import EventBus, EventSink, create_sink
+from railcore.clip_recorder import ClipWriter
+from railcore.retention import RetentionManager
+from railcore.scheduler import FrameScheduler
+from railcore.display import MosaicDisplay
+from railcore.preview_server import PreviewServer
+from railcore.tracing import LatencyStats
+from railcore.vision.execution import ExecutionProfile
+from railcore.vision.remote import RemoteClient
+from railcore.vision.model_manager import ModelManager
+from railcore.types import CameraConfig, ModelConfig, ThresholdsConfig, SaverConfig, ClipConfig, RetentionConfig, SchedulerConfig, DisplayConfig, PreviewConfig, FreezeConfig, TracingConfig, CascadeConfig, TilingConfig, ExecutionConfig, RemoteInferenceConfig, ModelSwapConfig
+from railcore.config import load_config, parse_model, parse_processing
+from railcore.config_watcher import ConfigWatcher
+from railcore.logging_setup import setup_logger, configure_logging
 
 logger = setup_logger(__name__)
 
 class MultiCameraSystem:
     """Ko'p kamerali monitoring tizimi"""
     
-    def __init__(self, config_path: str = 'config/config.yaml'):
+    def __init__(self,
+                 config_path: str = 'config/config.yaml',
+                 cameras: Optional[List[dict]] = None,
+                 extra_sinks: Optional[List[EventSink]] = None):
         """
         Args:
             config_path: Config fayl yo'li
+            cameras: Config'dagi kameralar o'rniga (cluster worker - kameralar tashqaridan
+                boshqariladi, config fayli kuzatilmaydi)
+            extra_sinks: Config'dagilardan tashqari event sink'lar
         """
         logger.info(f"Config yuklanmoqda: {config_path}")
         
-        with open(config_path, 'r', encoding='utf-8') as f:
-            self.config = yaml.safe_load(f)
+        self.config_path = config_path
+        self.config = load_config(config_path)
+        self.managed = cameras is not None
+        if self.managed:
+            self.config['cameras'] = list(cameras)
+        self._quit = threading.Event()  # Mozaika oynasida 'q' bosilganda
+        
+        # Logging (umumiy aylanma fayl va takroriy xabarlarni cheklash)
+        logging_config = self.config.get('logging', {})
+        if logging_config:
+            configure_logging(
+                max_bytes=int(logging_config.get('max_mb', 50) * 1024 * 1024),
+                backup_count=logging_config.get('backup_count', 5),
+                rate_limit_interval=logging_config.get('rate_limit_seconds', 10.0),
+                rate_limit_level=logging_config.get('rate_limit_level', 'WARNING')
+            )
+        
+        # Event store (indekslangan SQLite baza)
+        self.event_store = None
+        store_config = self.config.get('event_store', {})
+        if store_config.get('enabled', False):
+            self.event_store = EventStore(
+                db_path=store_config.get('path', 'events/events.db'),
+                batch_size=store_config.get('batch_size', 500),
+                flush_interval=store_config.get('flush_interval', 0.5)
+            ).start()
+        
+        # Saver config
+        saver_dict = self.config.get('saver', {})
+        defaults = SaverConfig()
+        self.saver_config = SaverConfig(
+            save_dir=saver_dict.get('save_dir', defaults.save_dir),
+            workers=saver_dict.get('workers', defaults.workers),
+            quality=saver_dict.get('quality', defaults.quality),
+            default_quality=saver_dict.get('default_quality', defaults.default_quality),
+            crop_only=saver_dict.get('crop_only', defaults.crop_only),
+            crop_padding=saver_dict.get('crop_padding', defaults.crop_padding),
+            thumbnail_width=saver_dict.get('thumbnail_width', defaults.thumbnail_width),
+            thumbnail_format=saver_dict.get('thumbnail_format', defaults.thumbnail_format),
+            thumbnail_quality=saver_dict.get('thumbnail_quality', defaults.thumbnail_quality),
+            stats_interval=saver_dict.get('stats_interval', defaults.stats_interval)
+        )
+        
+        # Hodisa kliplari
+        clips_dict = self.config.get('clips', {})
+        clip_defaults = ClipConfig()
+        self.clip_config = ClipConfig(
+            enabled=clips_dict.get('enabled', clip_defaults.enabled),
+            output_dir=clips_dict.get('output_dir', clip_defaults.output_dir),
+            event_types=clips_dict.get('event_types', clip_defaults.event_types),
+            pre_seconds=clips_dict.get('pre_seconds', clip_defaults.pre_seconds),
+            post_seconds=clips_dict.get('post_seconds', clip_defaults.post_seconds),
+            scale=clips_dict.get('scale', clip_defaults.scale),
+            compress=clips_dict.get('compress', clip_defaults.compress),
+            jpeg_quality=clips_dict.get('jpeg_quality', clip_defaults.jpeg_quality),
+            encode_workers=clips_dict.get('encode_workers', clip_defaults.encode_workers),
+            max_memory_mb=clips_dict.get('max_memory_mb', clip_defaults.max_memory_mb),
+            codec=clips_dict.get('codec', clip_defaults.codec)
+        )
+        
+        # Disk retention (saved_images va saved_clips kvotalari)
+        retention_dict = self.config.get('retention', {})
+        retention_defaults = RetentionConfig()
+        self.retention_config = RetentionConfig(
+            enabled=retention_dict.get('enabled', retention_defaults.enabled),
+            check_interval=retention_dict.get('check_interval', retention_defaults.check_interval),
+            max_age_days=retention_dict.get('max_age_days', retention_defaults.max_age_days),
+            camera_max_gb=retention_dict.get('camera_max_gb', retention_defaults.camera_max_gb),
+            event_max_gb=retention_dict.get('event_max_gb', retention_defaults.event_max_gb),
+            min_free_gb=retention_dict.get('min_free_gb', retention_defaults.min_free_gb),
+            protected_types=retention_dict.get('protected_types', retention_defaults.protected_types)
+        )
+        self.retention = None
+        if self.retention_config.enabled:
+            self.retention = RetentionManager(
+                self.retention_config,
+                [self.saver_config.save_dir, self.clip_config.output_dir],
+                event_store=self.event_store
+            ).start()
+        
+        self.clip_writer = ClipWriter(self.clip_config, self.retention) if self.clip_config.enabled else None
+        
+        # Kechikish kuzatuvi (frame o'qilgandan hodisa rasmi diskka yozilguncha)
+        self.latency = None
+        tracing_dict = self.config.get('tracing', {})
+        if tracing_dict.get('enabled', False):
+            tracing_defaults = TracingConfig()
+            self.latency = LatencyStats(TracingConfig(
+                enabled=True,
+                window=tracing_dict.get('window', tracing_defaults.window),
+                percentiles=tracing_dict.get('percentiles', tracing_defaults.percentiles),
+                stats_interval=tracing_dict.get('stats_interval', tracing_defaults.stats_interval)
+            ))
         
         # Image saver yaratish (bitta umumiy)
-        self.image_saver = ImageSaver(save_dir='saved_images')
+        self.image_saver = ImageSaver(
+            save_dir=self.saver_config.save_dir,
+            event_store=self.event_store,
+            config=self.saver_config,
+            retention=self.retention,
+            latency=self.latency
+        )
+        
+        # Event bus (tashqi tizimlarga hodisa yuborish)
+        self.event_bus = self._create_event_bus(self.config.get('events', {}), extra_sinks or [])
         
         # Model config
-        self.model_config = ModelConfig(
-            path=self.config['model']['path'],
-            target_classes=self.config['model']['target_classes'],
-            class_names=self.config['model']['class_names'],
-            conf=self.config['model'].get('conf', 0.35),
-            iou=self.config['model'].get('iou', 0.5),
-            imgsz=self.config['model'].get('imgsz', 640)
-        )
+        self.model_config = parse_model(self.config['model'])
         
-        # Thresholds config
+        # Thresholds config (barcha kameralar uchun bitta obyekt - qayta yuklashda joyida yangilanadi)
         self.thresholds_config = ThresholdsConfig(
             warning=self.config['thresholds']['warning'],
             violation=self.config['thresholds']['violation']
         )
         
         # Processing config
-        self.processing_config = ProcessingConfig(
-            adaptive_mode=self.config['processing'].get('adaptive_mode', True),
-            frame_skip_idle=self.config['processing'].get('frame_skip_idle', 3),
-            frame_skip_active=self.config['processing'].get('frame_skip_active', 2),
-            timeout_seconds=self.config['processing'].get('timeout_seconds', 3.0),
-            empty_threshold=self.config['processing'].get('empty_threshold', 3)
+        self.processing_config = parse_processing(self.config['processing'])
+        
+        # Takroriy/muzlagan frame'larni aniqlash
+        freeze_dict = self.config.get('freeze', {})
+        freeze_defaults = FreezeConfig()
+        self.freeze_config = FreezeConfig(
+            enabled=freeze_dict.get('enabled', freeze_defaults.enabled),
+            grid_width=freeze_dict.get('grid_width', freeze_defaults.grid_width),
+            grid_height=freeze_dict.get('grid_height', freeze_defaults.grid_height),
+            diff_threshold=freeze_dict.get('diff_threshold', freeze_defaults.diff_threshold),
+            frozen_frames=freeze_dict.get('frozen_frames', freeze_defaults.frozen_frames),
+            reconnect=freeze_dict.get('reconnect', freeze_defaults.reconnect),
+            reconnect_interval=freeze_dict.get('reconnect_interval', freeze_defaults.reconnect_interval)
+        )
+        
+        # Kaskad: arzon "bor/yo'q" tekshiruvi to'liq detector'ni boshqaradi
+        cascade_dict = self.config.get('cascade', {})
+        cascade_defaults = CascadeConfig()
+        self.cascade_config = CascadeConfig(
+            enabled=cascade_dict.get('enabled', cascade_defaults.enabled),
+            backend=cascade_dict.get('backend', cascade_defaults.backend),
+            presence_model=cascade_dict.get('presence_model', cascade_defaults.presence_model),
+            presence_imgsz=cascade_dict.get('presence_imgsz', cascade_defaults.presence_imgsz),
+            presence_conf=cascade_dict.get('presence_conf', cascade_defaults.presence_conf),
+            crop_padding=cascade_dict.get('crop_padding', cascade_defaults.crop_padding),
+            motion_width=cascade_dict.get('motion_width', cascade_defaults.motion_width),
+            motion_diff=cascade_dict.get('motion_diff', cascade_defaults.motion_diff),
+            motion_threshold=cascade_dict.get('motion_threshold', cascade_defaults.motion_threshold),
+            background_alpha=cascade_dict.get('background_alpha', cascade_defaults.background_alpha),
+            hold_frames=cascade_dict.get('hold_frames', cascade_defaults.hold_frames),
+            audit_every=cascade_dict.get('audit_every', cascade_defaults.audit_every)
+        )
+        
+        # Plitkali inference
+        tiling_dict = self.config.get('tiling', {})
+        tiling_defaults = TilingConfig()
+        self.tiling_config = TilingConfig(
+            enabled=tiling_dict.get('enabled', tiling_defaults.enabled),
+            tile_size=tiling_dict.get('tile_size', tiling_defaults.tile_size),
+            overlap=tiling_dict.get('overlap', tiling_defaults.overlap),
+            padding=tiling_dict.get('padding', tiling_defaults.padding),
+            max_tiles=tiling_dict.get('max_tiles', tiling_defaults.max_tiles),
+            full_frame=tiling_dict.get('full_frame', tiling_defaults.full_frame),
+            nms_threshold=tiling_dict.get('nms_threshold', tiling_defaults.nms_threshold),
+            nms_metric=tiling_dict.get('nms_metric', tiling_defaults.nms_metric),
+            latency_budget_ms=tiling_dict.get('latency_budget_ms', tiling_defaults.latency_budget_ms),
+            fallback_frames=tiling_dict.get('fallback_frames', tiling_defaults.fallback_frames),
+            cost_alpha=tiling_dict.get('cost_alpha', tiling_defaults.cost_alpha)
         )
         
-        # CUDA optimizatsiyasi
+        # Umumiy frame scheduler (kameralar o'rtasida inference byudjeti)
+        self.scheduler = None
+        scheduler_dict = self.config.get('scheduler', {})
+        if scheduler_dict.get('enabled', False):
+            scheduler_defaults = SchedulerConfig()
+            self.scheduler = FrameScheduler(SchedulerConfig(
+                enabled=True,
+                budget_fps=scheduler_dict.get('budget_fps', scheduler_defaults.budget_fps),
+                utilization=scheduler_dict.get('utilization', scheduler_defaults.utilization),
+                min_fps=scheduler_dict.get('min_fps', scheduler_defaults.min_fps),
+                near_ratio=scheduler_dict.get('near_ratio', scheduler_defaults.near_ratio),
+                fps_divisor={**scheduler_defaults.fps_divisor, **scheduler_dict.get('fps_divisor', {})},
+                rebalance_interval=scheduler_dict.get('rebalance_interval', scheduler_defaults.rebalance_interval),
+                burst_seconds=scheduler_dict.get('burst_seconds', scheduler_defaults.burst_seconds),
+                cost_alpha=scheduler_dict.get('cost_alpha', scheduler_defaults.cost_alpha),
+                stats_interval=scheduler_dict.get('stats_interval', scheduler_defaults.stats_interval)
+            ))
+        
+        # Operator oynasi (barcha kameralar bitta mozaikada, bitta thread)
+        self.display = None
+        display_dict = self.config.get('display', {})
+        display_defaults = DisplayConfig()
+        if display_dict.get('enabled', display_defaults.enabled):
+            self.display = MosaicDisplay(DisplayConfig(
+                enabled=True,
+                window_name=display_dict.get('window_name', display_defaults.window_name),
+                fps=display_dict.get('fps', display_defaults.fps),
+                tile_width=display_dict.get('tile_width', display_defaults.tile_width),
+                tile_height=display_dict.get('tile_height', display_defaults.tile_height),
+                columns=display_dict.get('columns', display_defaults.columns)
+            ), on_quit=self._quit.set)
+        
+        # HTTP MJPEG preview (masofadan ko'rish, faqat tomoshabin bo'lsa kodlanadi)
+        self.preview = None
+        preview_dict = self.config.get('preview', {})
+        if preview_dict.get('enabled', False):
+            preview_defaults = PreviewConfig()
+            try:
+                self.preview = PreviewServer(PreviewConfig(
+                    enabled=True,
+                    host=preview_dict.get('host', preview_defaults.host),
+                    port=preview_dict.get('port', preview_defaults.port),
+                    fps=preview_dict.get('fps', preview_defaults.fps),
+                    max_width=preview_dict.get('max_width', preview_defaults.max_width),
+                    quality=preview_dict.get('quality', preview_defaults.quality)
+                ))
+            except OSError as e:
+                logger.error(f"Preview server ochilmadi: {e}")
+        
+        # Model bajarilishi: device, CPU thread rejasi (torch faqat shu yerda kerak - import kechiktiriladi)
+        execution_dict = self.config.get('execution', {})
+        execution_defaults = ExecutionConfig()
+        self.execution_config = ExecutionConfig(
+            device=str(execution_dict.get('device', execution_defaults.device)),
+            half=execution_dict.get('half', execution_defaults.half),
+            cpu_threads=execution_dict.get('cpu_threads', execution_defaults.cpu_threads),
+            interop_threads=execution_dict.get('interop_threads', execution_defaults.interop_threads),
+            reserved_cores=execution_dict.get('reserved_cores', execution_defaults.reserved_cores),
+            processes=execution_dict.get('processes', execution_defaults.processes),
+            channels_last=execution_dict.get('channels_last', execution_defaults.channels_last),
+            bf16=execution_dict.get('bf16', execution_defaults.bf16),
+            compile=execution_dict.get('compile', execution_defaults.compile)
+        )
+        import torch
         if torch.cuda.is_available():
-            logger.info(f"CUDA mavjud: {torch.cuda.get_device_name(0)}")
             torch.multiprocessing.set_start_method('spawn', force=True)
+        enabled_cameras = sum(1 for c in self.config['cameras'] if c.get('enabled', True))
+        self.execution = ExecutionProfile(self.execution_config, max(1, enabled_cameras))
+        if self.execution.cuda:
+            logger.info(f"CUDA: {torch.cuda.get_device_name(self.execution.device)} ({self.execution.describe()})")
         else:
-            logger.warning("CUDA mavjud emas. CPU ishlatiladi")
+            logger.warning(f"CUDA ishlatilmaydi. CPU: {self.execution.describe()}")
+        
+        # Masofaviy inference (detector yaqindagi server'da, barcha kameralar uchun bitta ulanish)
+        remote_dict = self.config.get('remote_inference', {})
+        remote_defaults = RemoteInferenceConfig()
+        self.remote_config = RemoteInferenceConfig(
+            enabled=remote_dict.get('enabled', remote_defaults.enabled),
+            address=remote_dict.get('address', remote_defaults.address),
+            encoding=remote_dict.get('encoding', remote_defaults.encoding),
+            jpeg_quality=remote_dict.get('jpeg_quality', remote_defaults.jpeg_quality),
+            max_side=remote_dict.get('max_side', remote_defaults.max_side),
+            timeout_ms=remote_dict.get('timeout_ms', remote_defaults.timeout_ms),
+            connect_timeout=remote_dict.get('connect_timeout', remote_defaults.connect_timeout),
+            local_fallback=remote_dict.get('local_fallback', remote_defaults.local_fallback),
+            retry_seconds=remote_dict.get('retry_seconds', remote_defaults.retry_seconds),
+            max_inflight=remote_dict.get('max_inflight', remote_defaults.max_inflight)
+        )
+        self.remote = None
+        if self.remote_config.enabled:
+            self.remote = RemoteClient(self.remote_config)
+            fallback = "lokal fallback bilan" if self.remote_config.local_fallback else "lokal fallback'siz"
+            logger.info(f"Masofaviy inference: {self.remote_config.address} "
+                        f"({self.remote_config.encoding}, timeout {self.remote_config.timeout_ms:g} ms, {fallback})")
+        
+        # Modelni ish vaqtida almashtirish (model.path o'zgarsa shadow baholash va hot-swap)
+        swap_dict = self.config.get('model_swap', {})
+        swap_defaults = ModelSwapConfig()
+        self.model_swap_config = ModelSwapConfig(
+            enabled=swap_dict.get('enabled', swap_defaults.enabled),
+            shadow_fraction=swap_dict.get('shadow_fraction', swap_defaults.shadow_fraction),
+            shadow_frames=swap_dict.get('shadow_frames', swap_defaults.shadow_frames),
+            shadow_timeout=swap_dict.get('shadow_timeout', swap_defaults.shadow_timeout),
+            min_f1=swap_dict.get('min_f1', swap_defaults.min_f1),
+            max_latency_ratio=swap_dict.get('max_latency_ratio', swap_defaults.max_latency_ratio),
+            match_iou=swap_dict.get('match_iou', swap_defaults.match_iou),
+            report_file=swap_dict.get('report_file', swap_defaults.report_file)
+        )
+        self.models = None
+        if self.model_swap_config.enabled:
+            self.models = ModelManager(self.model_config, self.model_swap_config, self.execution,
+                                       self._camera_snapshot, on_swap=self._on_model_swap)
         
-        # Kameralarni yaratish
-        self.cameras: List[PolygonCamera] = []
-        self.threads: List[threading.Thread] = []
+        # Kameralarni yaratish (ID bo'yicha - config qayta yuklanganda alohida boshqariladi)
+        self.cameras: Dict[int, PolygonCamera] = {}
+        self.threads: Dict[int, threading.Thread] = {}
+        self.camera_dicts: Dict[int, dict] = {}
+        self._lock = threading.Lock()
+        self.running = False
         
         for cam_config_dict in self.config['cameras']:
             if cam_config_dict.get('enabled', True):
-                try:
-                    cam_config = CameraConfig(
-                        id=cam_config_dict['id'],
-                        name=cam_config_dict['name'],
-                        source=cam_config_dict['source'],
-                        polygon_file=cam_config_dict['polygon_file'],
-                        enabled=cam_config_dict.get('enabled', True)
-                    )
-                    
-                    camera = PolygonCamera(
-                        cam_config,
-                        self.model_config,
-                        self.thresholds_config,
-                        self.processing_config,
-                        self.image_saver
-                    )
-                    
-                    self.cameras.append(camera)
-                    logger.info(f"Kamera {cam_config.id} - {cam_config.name} qo'shildi")
-                    
-                except Exception as e:
-                    logger.error(f"Kamera {cam_config_dict['id']} xato: {e}")
+                self._create_camera(cam_config_dict)
+        
+        # Config watcher (ixtiyoriy)
+        self.watcher: Optional[ConfigWatcher] = None
+        reload_config = self.config.get('reload', {})
+        if reload_config.get('enabled', False) and not self.managed:
+            self.watcher = ConfigWatcher(
+                config_path,
+                self.apply_config,
+                extra_files=self._polygon_files,
+                interval=reload_config.get('interval', 2.0)
+            )
+    
+    def _create_camera(self, cam_config_dict: dict) -> Optional[PolygonCamera]:
+        """
+        Kamera yaratish va ro'yxatga qo'shish
+        
+        Args:
+            cam_config_dict: Config'dagi kamera yozuvi
+        
+        Returns:
+            PolygonCamera yoki None (xato bo'lsa)
+        """
+        try:
+            cam_config = CameraConfig(
+                id=cam_config_dict['id'],
+                name=cam_config_dict['name'],
+                source=cam_config_dict['source'],
+                polygon_file=cam_config_dict['polygon_file'],
+                enabled=cam_config_dict.get('enabled', True)
+            )
+            
+            camera = PolygonCamera(
+                cam_config,
+                self.model_config,
+                self.thresholds_config,
+                self.processing_config,
+                self.image_saver,
+                self.event_bus,
+                self.clip_writer,
+                self.scheduler,
+                self.display,
+                self.preview,
+                self.freeze_config,
+                self.latency,
+                self.cascade_config,
+                self.tiling_config,
+                self.execution,
+                self.remote,
+                self.models
+            )
+            
+            with self._lock:
+                self.cameras[cam_config.id] = camera
+                self.camera_dicts[cam_config.id] = dict(cam_config_dict)
+                count = len(self.cameras)
+            if self.running:
+                self.execution.set_consumers(count)
+            logger.info(f"Kamera {cam_config.id} - {cam_config.name} qo'shildi")
+            return camera
+            
+        except Exception as e:
+            logger.error(f"Kamera {cam_config_dict['id']} xato: {e}")
+            return None
+    
+    def _start_camera(self, camera: PolygonCamera):
+        """Kamera thread'ini ishga tushirish"""
+        thread = threading.Thread(target=camera.run, daemon=True)
+        thread.start()
+        with self._lock:
+            self.threads[camera.camera_id] = thread
+    
+    def _stop_camera(self, camera_id: int, timeout: float = 10.0):
+        """Bitta kamerani to'xtatish va ro'yxatdan olib tashlash (boshqalariga ta'sir qilmaydi)"""
+        with self._lock:
+            camera = self.cameras.pop(camera_id, None)
+            thread = self.threads.pop(camera_id, None)
+            self.camera_dicts.pop(camera_id, None)
+            count = len(self.cameras)
+        if camera is None:
+            return
+        if self.running:
+            self.execution.set_consumers(max(1, count))
+        camera.stop()
+        if thread is not None:
+            thread.join(timeout)
+            if thread.is_alive():
+                logger.warning(f"Kamera {camera_id} thread'i {timeout:g}s ichida to'xtamadi")
+        logger.info(f"Kamera {camera_id} to'xtatildi (config)")
+    
+    def _polygon_files(self):
+        """Config watcher kuzatadigan polygon fayllari"""
+        with self._lock:
+            return [d['polygon_file'] for d in self.camera_dicts.values()]
+    
+    def _on_model_swap(self, model_config: ModelConfig):
+        """Almashtirilgan model config'i (keyin yaratiladigan kameralar uchun)"""
+        self.model_config = model_config
+    
+    def _camera_snapshot(self) -> Dict[int, PolygonCamera]:
+        """Ishlayotgan kameralar (ModelManager uchun)"""
+        with self._lock:
+            return dict(self.cameras)
+    
+    def apply_config(self, config: dict):
+        """
+        Yangi config'ni ishlayotgan tizimga qo'llash (o'zgarmagan kameralar to'xtamaydi)
+        
+        - thresholds: umumiy ThresholdsConfig joyida yangilanadi
+        - processing: har bir kamera thread'ida frame'lar orasida qo'llanadi
+        - cameras: yangi/yoqilgan kameralar ishga tushadi, o'chirilganlari to'xtaydi,
+          source o'zgarsa qayta ishga tushadi, polygon o'zgarsa PolygonUtils almashtiriladi
+        - model.path (model_swap yoqilgan bo'lsa): kandidat shadow'da baholanib almashtiriladi
+        
+        Args:
+            config: Tekshirilgan yangi config
+        """
+        start = time.time()
+        changes = []
+        
+        # Thresholds
+        thresholds = config['thresholds']
+        if (thresholds['warning'], thresholds['violation']) != (
+                self.thresholds_config.warning, self.thresholds_config.violation):
+            self.thresholds_config.warning = thresholds['warning']
+            self.thresholds_config.violation = thresholds['violation']
+            changes.append(f"thresholds {thresholds['warning']}/{thresholds['violation']}")
+        
+        # Processing
+        processing = parse_processing(config['processing'])
+        processing_changed = processing != self.processing_config
+        if processing_changed:
+            self.processing_config = processing
+            changes.append("processing")
+        
+        # Kameralar (polygon fayli yo'li bir xil bo'lsa ham mazmuni o'zgargan bo'lishi mumkin)
+        changed_files = set(self.watcher.changed_files) if self.watcher is not None else set()
+        wanted = {c['id']: c for c in config['cameras'] if c.get('enabled', True)}
+        with self._lock:
+            current = dict(self.camera_dicts)
+        
+        for camera_id in current:
+            if camera_id not in wanted:
+                self._stop_camera(camera_id)
+                changes.append(f"kamera {camera_id} o'chirildi")
+        
+        for camera_id, cam_dict in wanted.items():
+            old = current.get(camera_id)
+            if old is not None and old.get('source') != cam_dict.get('source'):
+                self._stop_camera(camera_id)
+                changes.append(f"kamera {camera_id} qayta ulandi")
+                old = None
+            
+            if old is None:
+                camera = self._create_camera(cam_dict)
+                if camera is not None:
+                    if self.running:
+                        self._start_camera(camera)
+                    changes.append(f"kamera {camera_id} qo'shildi")
+                continue
+            
+            camera = self.cameras[camera_id]
+            if processing_changed:
+                camera.submit_update(lambda c=camera, p=processing: c.apply_processing(p), start)
+            if old.get('polygon_file') != cam_dict['polygon_file'] or cam_dict['polygon_file'] in changed_files:
+                camera.submit_update(lambda c=camera, f=cam_dict['polygon_file']: c.set_polygon(f), start)
+                changes.append(f"kamera {camera_id} polygon")
+            if old.get('name') != cam_dict.get('name'):
+                camera.camera_name = cam_dict['name']
+                camera.tracker.camera_name = cam_dict['name']
+            with self._lock:
+                self.camera_dicts[camera_id] = dict(cam_dict)
+        
+        # Model fayli (boshqa model sozlamalari o'zgarmagan bo'lsa - hot-swap)
+        hot_swap = False
+        old_model, new_model = self.config.get('model', {}), config.get('model', {})
+        if self.models is not None and old_model != new_model:
+            if {k: v for k, v in old_model.items() if k != 'path'} == {k: v for k, v in new_model.items() if k != 'path'}:
+                self.models.stage(new_model['path'])
+                changes.append(f"model {new_model['path']} (shadow)")
+                hot_swap = True
+        
+        for section in ('model', 'saver', 'clips', 'retention', 'event_store', 'events', 'scheduler', 'display', 'preview', 'freeze', 'tracing', 'cascade', 'tiling', 'execution', 'remote_inference', 'model_swap'):
+            if section == 'model' and hot_swap:
+                continue
+            if config.get(section) != self.config.get(section):
+                logger.warning(f"'{section}' bo'limi o'zgardi - qo'llash uchun qayta ishga tushirish kerak")
+        
+        self.config = config
+        elapsed = (time.time() - start) * 1000
+        summary = ', '.join(changes) if changes else "o'zgarish yo'q"
+        logger.info(f"Config qayta yuklandi ({elapsed:.0f} ms): {summary}")
+        
+    def _create_event_bus(self, events_config: dict, extra_sinks: List[EventSink]):
+        """
+        Config bo'yicha EventBus yaratish
+        
+        Args:
+            events_config: 'events' bo'limi
+            extra_sinks: Qo'shimcha sink'lar (events o'chirilgan bo'lsa ham ishlatiladi)
+        
+        Returns:
+            EventBus yoki None
+        """
+        sinks = list(extra_sinks)
+        if not events_config or not events_config.get('enabled', False):
+            return EventBus(sinks) if sinks else None
+        
+        for sink_config in events_config.get('sinks', []):
+            if not sink_config.get('enabled', True):
+                continue
+            try:
+                sinks.append(create_sink(sink_config))
+            except Exception as e:
+                logger.error(f"Sink yaratilmadi ({sink_config.get('type')}): {e}")
+        
+        if not sinks:
+            logger.warning("Event bus yoqilgan, lekin faol sink yo'q")
+            return None
+        
+        return EventBus(sinks)
     
     def start(self):
         """Tizimni ishga tushirish"""
-        if not self.cameras:
+        if not self.cameras and self.watcher is None:
             logger.error("Hech qanday faol kamera topilmadi!")
             return
         
-        logger.info(f"{len(self.cameras)} ta kamera ishga tushirilmoqda...")
-        
-        # Har bir kamera uchun thread yaratish
-        for camera in self.cameras:
-            thread = threading.Thread(target=camera.run, daemon=True)
-            thread.start()
-            self.threads.append(thread)
-            time.sleep(0.05)  # Threadlar orasida kichik pauza
-        
+        self.launch()
         logger.info("Barcha kameralar ishga tushdi. To'xtatish uchun Ctrl+C bosing...")
         
-        # Barcha threadlarni kutish
+        # Kamera threadlarini kutish (config kuzatilsa - to'xtatilguncha)
         try:
-            for thread in self.threads:
-                thread.join()
+            while self.watcher is not None or any(t.is_alive() for t in list(self.threads.values())):
+                if self._quit.wait(0.5):
+                    break
+            if self._quit.is_set():
+                logger.info("Dastur to'xtatilmoqda...")
+                self._stop_all()
         except KeyboardInterrupt:
             logger.info("Dastur to'xtatilmoqda...")
             self._stop_all()
     
+    def launch(self):
+        """Kamera, oyna va watcher thread'larini ishga tushirish (bloklamaydi)"""
+        logger.info(f"{len(self.cameras)} ta kamera ishga tushirilmoqda...")
+        self.running = True
+        if self.display is not None:
+            self.display.start()
+        if self.preview is not None:
+            self.preview.start()
+        
+        # Har bir kamera uchun thread yaratish
+        for camera in list(self.cameras.values()):
+            self._start_camera(camera)
+            time.sleep(0.05)  # Threadlar orasida kichik pauza
+        
+        if self.watcher is not None:
+            self.watcher.start()
+    
+    def get_freeze_stats(self) -> Dict[int, dict]:
+        """
+        Kameralar bo'yicha muzlash statistikasi
+        
+        Returns:
+            Dict[int, dict]: camera_id -> FreezeDetector.get_stats()
+        """
+        with self._lock:
+            cameras = list(self.cameras.values())
+        return {c.camera_id: c.freeze.get_stats() for c in cameras if c.freeze is not None}
+    
+    def stop(self):
+        """Tizimni to'xtatish (launch() bilan ishga tushirilgan bo'lsa)"""
+        self._stop_all()
+    
     def _stop_all(self):
         """Barcha kameralarni to'xtatish"""
-        for camera in self.cameras:
+        self.running = False
+        if self.watcher is not None:
+            self.watcher.stop()
+        if self.models is not None:
+            self.models.stop()
+        for camera_id, stats in self.get_freeze_stats().items():
+            if stats['frozen_events'] > 0:
+                logger.info(f"Kamera {camera_id}: {stats['frozen_seconds']:.1f}s muzlagan "
+                            f"({stats['frozen_events']} marta, {stats['reconnects']} qayta ulanish, "
+                            f"{stats['duplicate_frames']} takroriy frame)")
+        for camera in list(self.cameras.values()):
             camera.stop()
+        if self.display is not None:
+            self.display.stop()
+        if self.preview is not None:
+            self.preview.stop()
         
         self.image_saver.stop()
-        cv2.destroyAllWindows()
+        if self.latency is not None:
+            self.latency.log_summary()
+        if self.clip_writer is not None:
+            self.clip_writer.stop()
+        if self.remote is not None:
+            self.remote.close()
+        if self.event_bus is not None:
+            self.event_bus.stop()
+        if self.event_store is not None:
+            self.event_store.stop()
+        if self.retention is not None:
+            self.retention.stop()
         logger.info("Barcha kameralar to'xtatildi")
\ No newline at end of file
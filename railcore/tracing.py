@@ -0,0 +1,129 @@
+"""
+LatencyStats - frame'dan diskdagi hodisa rasmigacha kechikishlarni yig'ish
+
+Bosqichlar (ms):
+    decode       - read() chaqirilgandan frame qaytguncha (oqimni kutish + decode)
+    inference    - decode tugagandan detect() tugaguncha
+    tracker      - detect() tugagandan tracker/hodisalar tayyor bo'lguncha
+    frame_total  - read() chaqirilgandan tracker tugaguncha
+    save_queue   - tracker tugagandan ImageSaver hodisani olguncha (navbat + pool)
+    save_write   - annotatsiya, encode va rasm diskka yozilguncha
+    event_total  - hodisa frame'i o'qila boshlagandan rasm diskda bo'lguncha
+"""
+import threading
+import time
+import numpy as np
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+from railcore.types import FrameTrace, TracingConfig
+from railcore.logging_setup import setup_logger
+
+logger = setup_logger(__name__)
+
+STAGES = ('decode', 'inference', 'tracker', 'frame_total', 'save_queue', 'save_write', 'event_total')
+
+class LatencyStats:
+    """Kamera va bosqich bo'yicha kechikish percentile'lari (oxirgi `window` o'lchov)"""
+
+    def __init__(self, config: Optional[TracingConfig] = None):
+        """
+        Args:
+            config: Tracing konfiguratsiyasi
+        """
+        self.config = config or TracingConfig(enabled=True)
+        self._samples: Dict[Tuple[int, str], Deque[float]] = {}
+        self._lock = threading.Lock()
+        self._last_log = time.time()
+
+    def record(self, camera_id: int, stage: str, seconds: float):
+        """
+        Bitta o'lchovni qo'shish
+
+        Args:
+            camera_id: Kamera ID
+            stage: Bosqich nomi
+            seconds: Davomiylik (sekund)
+        """
+        key = (camera_id, stage)
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.config.window)
+            samples.append(seconds)
+            due = self._log_due()
+        if due:
+            self.log_summary()
+
+    def record_frame(self, trace: FrameTrace):
+        """Frame bosqichlarini qo'shish (qayta ishlanmagan frame'da faqat decode)"""
+        camera_id = trace.camera_id
+        self.record(camera_id, 'decode', trace.decoded - trace.received)
+        if trace.inferred is None:
+            return
+        self.record(camera_id, 'inference', trace.inferred - trace.decoded)
+        if trace.tracked is not None:
+            self.record(camera_id, 'tracker', trace.tracked - trace.inferred)
+            self.record(camera_id, 'frame_total', trace.tracked - trace.received)
+
+    def record_saved(self, trace: FrameTrace, save_started: float, written: float):
+        """
+        Hodisa rasmi diskka yozilgandan keyin (ImageSaver pool thread'ida)
+
+        Args:
+            trace: Hodisa frame'ining izi
+            save_started: ImageSaver hodisani qayta ishlay boshlagan vaqt
+            written: Rasm diskka yozilgan vaqt
+        """
+        camera_id = trace.camera_id
+        if trace.tracked is not None:
+            self.record(camera_id, 'save_queue', save_started - trace.tracked)
+        self.record(camera_id, 'save_write', written - save_started)
+        self.record(camera_id, 'event_total', written - trace.received)
+
+    def percentiles(self) -> Dict[int, Dict[str, dict]]:
+        """
+        Kamera va bosqich bo'yicha percentile'lar
+
+        Returns:
+            Dict[int, Dict[str, dict]]: camera_id -> stage -> {'count', 'p50', 'p90', ...} (ms)
+        """
+        with self._lock:
+            snapshot = {key: list(samples) for key, samples in self._samples.items()}
+
+        result: Dict[int, Dict[str, dict]] = {}
+        for (camera_id, stage), samples in snapshot.items():
+            if not samples:
+                continue
+            values = np.percentile(np.asarray(samples) * 1000.0, self.config.percentiles)
+            row = {'count': len(samples)}
+            for p, value in zip(self.config.percentiles, values):
+                row[f"p{p:g}"] = round(float(value), 2)
+            result.setdefault(camera_id, {})[stage] = row
+
+        # Bosqichlar tartibi STAGES bo'yicha
+        order = {stage: index for index, stage in enumerate(STAGES)}
+        return {
+            camera_id: dict(sorted(stages.items(), key=lambda item: order.get(item[0], len(order))))
+            for camera_id, stages in sorted(result.items())
+        }
+
+    def _log_due(self) -> bool:
+        """Percentile'larni log qilish vaqti keldimi (lock ostida chaqiriladi)"""
+        interval = self.config.stats_interval
+        if interval <= 0:
+            return False
+        now = time.time()
+        if now - self._last_log < interval:
+            return False
+        self._last_log = now
+        return True
+
+    def log_summary(self):
+        """Percentile'larni log qilish (kamera boshiga bitta qator)"""
+        for camera_id, stages in self.percentiles().items():
+            parts: List[str] = []
+            for stage, row in stages.items():
+                values = '/'.join(f"{v:.0f}" for k, v in row.items() if k != 'count')
+                parts.append(f"{stage} {values}")
+            labels = '/'.join(f"p{p:g}" for p in self.config.percentiles)
+            logger.info(f"Kamera {camera_id} kechikish ms ({labels}): {', '.join(parts)}")
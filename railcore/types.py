@@ -24,6 +24,9 @@ class ModelConfig:
     conf: float = 0.35
     iou: float = 0.5
     imgsz: int = 640
+    cache_dir: str = 'cache/models'  # Eksport qilingan model keshi ('' = keshsiz)
+    export_format: str = ''  # '' = fuse qilingan .pt; 'engine', 'onnx', 'openvino', ...
+    warmup_frames: int = 3  # Ishga tushishda dummy frame'lar soni (0 = warm-up yo'q)
 
 @dataclass
 class ThresholdsConfig:
@@ -39,6 +42,191 @@ class ProcessingConfig:
     frame_skip_active: int = 2
     timeout_seconds: float = 3.0
     empty_threshold: int = 3
+    polygon_length: float = 0.0  # Polygon uzunligi (metr, 0 = tezlik hisoblanmaydi)
+    polygon_width: float = 0.0  # Polygon kengligi (metr, 0 = noma'lum)
+    trajectory_size: int = 16  # Track boshiga trayektoriya nuqtalari
+    slow_min_points: int = 5  # 'slow' hodisasi uchun minimal nuqtalar soni
+
+@dataclass
+class FreezeConfig:
+    """Takroriy/muzlagan frame'larni aniqlash konfiguratsiyasi"""
+    enabled: bool = True
+    grid_width: int = 32  # Fingerprint to'ri
+    grid_height: int = 18
+    diff_threshold: float = 0.0  # 0 = faqat aynan bir xil frame'lar; >0 = to'r bo'yicha o'rtacha farq
+    frozen_frames: int = 50  # Shuncha ketma-ket takroriy frame - oqim muzlagan
+    reconnect: bool = True  # Muzlagan oqimni qayta ulash
+    reconnect_interval: float = 30.0  # Qayta ulanishlar orasidagi minimal vaqt (sekund)
+
+@dataclass
+class SchedulerConfig:
+    """Kameralar o'rtasida umumiy inference byudjeti konfiguratsiyasi"""
+    enabled: bool = False
+    budget_fps: float = 0.0  # Umumiy byudjet (frame/sekund, 0 = o'lchangan inference narxidan)
+    utilization: float = 0.9  # budget_fps = 0 bo'lsa: utilization / inference_vaqti
+    min_fps: float = 1.0  # Har bir kameraga kafolatlangan minimal FPS
+    near_ratio: float = 0.5  # max_time >= near_ratio * violation -> critical
+    fps_divisor: dict = field(default_factory=lambda: {'critical': 1, 'inside': 1, 'approaching': 2, 'idle': 5})
+    rebalance_interval: float = 0.5
+    burst_seconds: float = 0.5  # Token bucket sig'imi (ulush * burst_seconds)
+    cost_alpha: float = 0.1  # Inference narxi EMA koeffitsienti
+    stats_interval: float = 60.0
+
+@dataclass
+class DisplayConfig:
+    """Operator oynasi (mozaika) konfiguratsiyasi"""
+    enabled: bool = True
+    window_name: str = 'RailSafe'
+    fps: float = 15.0  # Mozaikani yangilash tezligi
+    tile_width: int = 640
+    tile_height: int = 360
+    columns: int = 0  # 0 = kameralar soniga qarab avtomatik
+
+@dataclass
+class PreviewConfig:
+    """HTTP MJPEG preview server konfiguratsiyasi"""
+    enabled: bool = False
+    host: str = '127.0.0.1'
+    port: int = 8090
+    fps: float = 5.0  # Har bir kamera uchun maksimal preview FPS
+    max_width: int = 960  # Kattaroq frame'lar shu kenglikka kichraytiriladi (0 = asl o'lcham)
+    quality: int = 70  # JPEG sifati
+
+@dataclass
+class TracingConfig:
+    """Kechikish (latency) kuzatuvi konfiguratsiyasi"""
+    enabled: bool = False
+    window: int = 2048  # Har bir (kamera, bosqich) uchun oxirgi o'lchovlar
+    percentiles: List[float] = field(default_factory=lambda: [50.0, 90.0, 99.0])
+    stats_interval: float = 60.0  # Percentile'larni log qilish oralig'i (0 = log qilinmaydi)
+
+@dataclass
+class ExecutionConfig:
+    """Model bajarilishi konfiguratsiyasi (device, CPU thread'lar)"""
+    device: str = 'auto'  # 'auto' (CUDA bo'lsa 0), 'cpu', '0', '1', ...
+    half: bool = True  # FP16 (faqat CUDA'da)
+    cpu_threads: int = 0  # Detector boshiga intra-op thread'lar (0 = yadrolar / kameralar)
+    interop_threads: int = 1  # Jarayon uchun inter-op thread'lar (0 = torch standarti)
+    reserved_cores: int = 1  # Decode, saqlash va boshqa thread'lar uchun qoldiriladigan yadrolar
+    processes: int = 1  # Shu hostda yadrolarni bo'lishadigan RailSafe jarayonlari
+    channels_last: bool = True
+    bf16: bool = False  # CPU bf16 autocast (faqat avx512_bf16/AMX bo'lsa)
+    compile: bool = False  # torch.compile (CPU)
+
+@dataclass
+class CascadeConfig:
+    """Ikki bosqichli kaskad: arzon "bor/yo'q" tekshiruvi to'liq detector'ni boshqaradi"""
+    enabled: bool = False
+    backend: str = 'motion'  # 'motion' (fon ayirmasi) yoki 'model' (kichik YOLO)
+    presence_model: str = ''  # 'model' backend uchun, masalan models/yolov8n.pt
+    presence_imgsz: int = 256
+    presence_conf: float = 0.25
+    crop_padding: float = 0.15  # Polygon atrofidagi qirqim zaxirasi (o'lchamga nisbatan)
+    motion_width: int = 160  # 'motion' backend qirqim kengligi (piksel)
+    motion_diff: float = 25.0  # Fondan farq (kulrang daraja)
+    motion_threshold: float = 0.005  # Polygon ichidagi o'zgargan piksellar ulushi
+    background_alpha: float = 0.05  # Fon yangilanish tezligi
+    hold_frames: int = 5  # "Bor" deyilgandan keyin to'liq detector ishlaydigan frame'lar
+    audit_every: int = 25  # Shuncha o'tkazib yuborilgan frame'dan keyin majburiy to'liq detector (0 = yo'q)
+
+@dataclass
+class TilingConfig:
+    """Plitkali (tiled) inference konfiguratsiyasi"""
+    enabled: bool = False
+    tile_size: int = 640  # Plitka tomoni (manba piksellarida)
+    overlap: float = 0.2  # Qo'shni plitkalar qoplanishi (plitka o'lchamiga nisbatan)
+    padding: float = 0.1  # Polygon atrofidagi zaxira (o'lchamga nisbatan)
+    max_tiles: int = 6  # Oshsa plitka kattalashtiriladi
+    full_frame: bool = True  # Katta (yaqin) avtomobillar uchun butun frame ham batch'ga qo'shiladi
+    nms_threshold: float = 0.5
+    nms_metric: str = 'ios'  # 'ios' (kesishma / kichik box) yoki 'iou'
+    latency_budget_ms: float = 0.0  # Plitkali inference byudjeti (0 = cheklanmagan)
+    fallback_frames: int = 50  # Byudjetdan oshganda shuncha frame bitta plitka, so'ng qayta sinov
+    cost_alpha: float = 0.2  # Inference vaqti EMA koeffitsienti
+
+@dataclass
+class ModelSwapConfig:
+    """Modelni ish vaqtida almashtirish (shadow baholash bilan) konfiguratsiyasi"""
+    enabled: bool = False  # model.path o'zgarsa qayta ishga tushirish o'rniga hot-swap
+    shadow_fraction: float = 0.1  # Shadow'da tekshiriladigan frame'lar ulushi (0 = shadow'siz almashtirish)
+    shadow_frames: int = 200  # Qaror uchun yig'iladigan frame'lar
+    shadow_timeout: float = 600.0  # Shuncha vaqtda yig'ilmasa mavjud frame'lar bo'yicha qaror (sekund)
+    min_f1: float = 0.8  # Jonli model bilan moslik shundan past bo'lsa almashtirilmaydi (0 = tekshirilmaydi)
+    max_latency_ratio: float = 1.5  # Kandidat / jonli inference vaqti (p50) chegarasi (0 = tekshirilmaydi)
+    match_iou: float = 0.5  # Box'lar mos deb hisoblanadigan IoU
+    report_file: str = 'logs/model_swaps.jsonl'  # Har bir almashtirish hisoboti ('' = faqat log)
+
+@dataclass
+class ClusterConfig:
+    """Cluster rejimi (coordinator + worker node'lar) konfiguratsiyasi"""
+    host: str = '127.0.0.1'  # Coordinator manzili
+    port: int = 7700
+    heartbeat_interval: float = 2.0
+    dead_after: float = 8.0  # Shuncha heartbeat bo'lmasa worker o'lik hisoblanadi
+    rebalance_interval: float = 1.0
+    camera_demand: float = 10.0  # O'lchanmagan kamera talabi (inference FPS)
+    overload_ratio: float = 0.8  # fps < overload_ratio * video_fps - kamera orqada qolmoqda
+    overload_seconds: float = 10.0  # Shuncha orqada qolsa kamera ko'chiriladi
+    move_cooldown: float = 30.0  # Bitta worker'dan ko'chirishlar orasidagi minimal vaqt
+    events_file: str = ''  # Coordinator hodisalarni JSONL faylga yozadi ('' = yozilmaydi)
+
+@dataclass
+class RemoteInferenceConfig:
+    """Masofaviy inference (detector boshqa hostdagi server'da) konfiguratsiyasi"""
+    enabled: bool = False
+    address: str = '127.0.0.1:7800'  # Server: 'host:port' yoki 'unix:/yo'l/socket'
+    encoding: str = 'jpeg'  # 'jpeg' yoki 'raw' (Unix socket'da siqishsiz)
+    jpeg_quality: int = 85
+    max_side: int = 1280  # Yuborishdan oldin uzun tomon shungacha kichraytiriladi (0 = asl o'lcham)
+    timeout_ms: float = 300.0  # Javob shuncha kechiksa lokal inference
+    connect_timeout: float = 2.0
+    local_fallback: bool = True  # Lokal model yuklanadi va timeout/xatoda ishlatiladi
+    retry_seconds: float = 5.0  # Timeout/ulanish xatosidan keyin server shuncha vaqt chetlab o'tiladi
+    max_inflight: int = 16  # Ulanishdagi javobsiz so'rovlar chegarasi
+    # Server tomoni (python -m railcore.vision.remote serve)
+    listen: str = '127.0.0.1:7800'  # Tarmoqdan ulanish uchun '0.0.0.0:7800' (autentifikatsiya yo'q)
+    max_batch: int = 8
+    batch_wait_ms: float = 4.0  # Batch to'lishini shuncha kutish
+
+@dataclass
+class SaverConfig:
+    """Rasm saqlash (encode) konfiguratsiyasi"""
+    save_dir: str = 'saved_images'
+    workers: int = 4
+    quality: dict = field(default_factory=lambda: {'enter': 80, 'exit': 80, 'violation': 95})
+    default_quality: int = 90
+    crop_only: List[str] = field(default_factory=list)  # Faqat avtomobil qirqimi saqlanadigan hodisalar
+    crop_padding: float = 0.2
+    thumbnail_width: int = 0  # 0 = thumbnail o'chirilgan
+    thumbnail_format: str = 'jpg'  # 'jpg' yoki 'webp'
+    thumbnail_quality: int = 70
+    stats_interval: float = 60.0
+
+@dataclass
+class ClipConfig:
+    """Hodisa videoklipi (pre/post ring buffer) konfiguratsiyasi"""
+    enabled: bool = False
+    output_dir: str = 'saved_clips'
+    event_types: List[str] = field(default_factory=lambda: ['violation'])
+    pre_seconds: float = 5.0
+    post_seconds: float = 5.0
+    scale: float = 0.5  # Ring buffer'dagi frame o'lchami (1.0 = asl)
+    compress: bool = True  # Ring buffer'da JPEG ko'rinishida saqlash (fon pool'ida siqiladi)
+    jpeg_quality: int = 85
+    encode_workers: int = 2  # Siqish pool'i thread'lari (barcha kameralar uchun)
+    max_memory_mb: float = 256.0  # Har bir kamera uchun
+    codec: str = 'mp4v'
+
+@dataclass
+class RetentionConfig:
+    """Disk retention (eski rasmlarni o'chirish) konfiguratsiyasi"""
+    enabled: bool = False
+    check_interval: float = 30.0
+    max_age_days: dict = field(default_factory=lambda: {'enter': 7, 'exit': 7, 'violation': 90})
+    camera_max_gb: float = 0.0  # Har bir kamera uchun (0 = cheklovsiz)
+    event_max_gb: dict = field(default_factory=dict)  # Kamera ichida hodisa turi bo'yicha
+    min_free_gb: float = 0.0  # Diskda kamida shuncha bo'sh joy qolishi kerak (0 = tekshirilmaydi)
+    protected_types: List[str] = field(default_factory=lambda: ['violation'])
 
 @dataclass
 class VehicleTrackData:
@@ -51,19 +239,49 @@ class VehicleTrackData:
     last_seen_time: float = 0.0
     violation_saved: bool = False
     exit_saved: bool = False
+    slow_saved: bool = False
+    speed_kmh: float = 0.0
+    heading: float = 0.0
+
+@dataclass
+class FrameTrace:
+    """Bitta frame'ning bosqichlar bo'yicha vaqt belgilari (time.time(), sekund)"""
+    camera_id: int
+    frame_index: int
+    received: float  # decoder.read() chaqirilgan vaqt (frame kutish boshlandi)
+    decoded: float  # read() frame qaytardi
+    inferred: Optional[float] = None  # detect() tugadi
+    tracked: Optional[float] = None  # Tracker va hodisalar tayyor
 
 @dataclass
 class FrameEvent:
     """Frame hodisasi ma'lumotlari"""
-    frame: np.ndarray
+    frame: Optional[np.ndarray]  # Keshdan replay qilinganda None
     camera_id: int
     camera_name: str
     track_id: int
-    event_type: str  # 'enter', 'exit', 'violation'
+    event_type: str  # 'enter', 'exit', 'violation', 'slow'
     timestamp: datetime
     box_coords: Tuple[int, int, int, int]  # (x1, y1, x2, y2)
     time_in_polygon: float = 0.0
     class_id: int = 0
+    speed_kmh: Optional[float] = None  # polygon_length sozlanmagan bo'lsa None
+    heading: Optional[float] = None  # Gradus, 0 = p0 -> p3 yo'nalishi
+    trace: Optional[FrameTrace] = None  # Hodisa frame'ining kechikish belgilari
+    
+    def image_relpath(self, extension: str = 'jpg') -> str:
+        """
+        Saqlanadigan rasmning save_dir'ga nisbatan yo'li
+        
+        Args:
+            extension: Fayl kengaytmasi
+        
+        Returns:
+            str: camera_<id>/<event_type>/cam<id>_<event>_id<track>_<timestamp>.<ext>
+        """
+        timestamp_str = self.timestamp.strftime("%Y%m%d_%H%M%S_%f")[:-3]
+        filename = f"cam{self.camera_id}_{self.event_type}_id{self.track_id}_{timestamp_str}.{extension}"
+        return f"camera_{self.camera_id}/{self.event_type}/{filename}"
 
 @dataclass
 class DetectionResult:
@@ -78,4 +296,19 @@ class PolygonState:
     """Polygon holati"""
     state: str  # 'empty', 'detected', 'violation'
     max_time: float = 0.0
-    objects_count: int = 0
\ No newline at end of file
+    objects_count: int = 0
+
+@dataclass
+class ReplayResult:
+    """Keshlangan deteksiyalar ustida tracker replay natijasi"""
+    events: List[FrameEvent]
+    frames_total: int
+    frames_processed: int
+    elapsed: float  # Replay vaqti (sekund)
+    
+    def counts(self) -> dict:
+        """Hodisa turi bo'yicha sonlar"""
+        result = {}
+        for event in self.events:
+            result[event.event_type] = result.get(event.event_type, 0) + 1
+        return result
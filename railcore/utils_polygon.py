@@ -4,7 +4,6 @@ Polygon mask, point-in-polygon va chizish funksiyalari
 import cv2
 import numpy as np
 import json
-from pathlib import Path
 from typing import Tuple
 
 class PolygonUtils:
@@ -67,7 +66,25 @@ class PolygonUtils:
         if 0 <= iy < self.frame_height and 0 <= ix < self.frame_width:
             return self.polygon_mask[iy, ix] > 0
         return False
-    
+
+    def points_in_polygon(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """
+        Bir nechta nuqtani bir vaqtda tekshirish (point_in_polygon bilan bir xil natija)
+
+        Args:
+            xs: X koordinatalar (N)
+            ys: Y koordinatalar (N)
+
+        Returns:
+            np.ndarray: bool maska (N)
+        """
+        ix = np.trunc(xs).astype(np.int64)
+        iy = np.trunc(ys).astype(np.int64)
+        valid = (ix >= 0) & (ix < self.frame_width) & (iy >= 0) & (iy < self.frame_height)
+        result = np.zeros(len(ix), dtype=bool)
+        result[valid] = self.polygon_mask[iy[valid], ix[valid]] > 0
+        return result
+
     def draw_polygon(self, frame: np.ndarray, state: str, max_time: float = 0.0) -> np.ndarray:
         """
         Polygon va holatini chizish
@@ -1,7 +1,27 @@
 """
 Vision moduli
+
+YOLODetector (torch/ultralytics) faqat birinchi murojaatda yuklanadi.
 """
-from railcore.vision.yolo_detector import YOLODetector
-from railcore.vision.tracking import VehicleTracker
+import importlib
+
+_LAZY = {
+    'YOLODetector': 'railcore.vision.yolo_detector',
+    'VehicleTracker': 'railcore.vision.tracking',
+    'PresenceGate': 'railcore.vision.cascade',
+    'TiledDetector': 'railcore.vision.tiling',
+    'RemoteDetector': 'railcore.vision.remote',
+}
+
+__all__ = ['YOLODetector', 'VehicleTracker', 'PresenceGate', 'TiledDetector', 'RemoteDetector']
+
+def __getattr__(name: str):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module 'railcore.vision' has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
 
-__all__ = ['YOLODetector', 'VehicleTracker']
\ No newline at end of file
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,425 @@
+"""
+PresenceGate - ikki bosqichli kaskad: arzon "bor/yo'q" tekshiruvi to'liq detector'ni boshqaradi
+
+1-bosqich polygon atrofidagi qirqimda ishlaydi:
+    motion - kichraytirilgan kulrang qirqimda fon ayirmasi (model kerak emas)
+    model  - kichik YOLO modeli past imgsz'da (masalan yolov8n, 256)
+
+To'liq detector/tracker faqat 1-bosqich "bor" desa, tracklar faol bo'lsa yoki
+hold_frames davomida ishlaydi. Har audit_every ta o'tkazib yuborilgan frame'dan
+keyin to'liq detector majburan ishlatiladi - o'tkazib yuborilgan avtomobillar
+ulushi (missed presence) shu audit'lardan baholanadi.
+
+Yozib olingan video ustida baholash (ground truth - deteksiya keshi):
+    python -m railcore.vision.cascade --video videos/x.mp4 --polygon p.json [--cache cache/detections/<kalit>]
+"""
+import time
+import argparse
+import cv2
+import numpy as np
+from typing import Callable, List, Optional, Tuple
+from railcore.types import CascadeConfig, DetectionResult, ModelConfig, ProcessingConfig, ThresholdsConfig
+from railcore.logging_setup import setup_logger
+
+logger = setup_logger(__name__)
+
+def polygon_roi(polygon_points: np.ndarray, frame_width: int, frame_height: int,
+                padding: float) -> Tuple[int, int, int, int]:
+    """
+    Polygon atrofidagi to'g'ri to'rtburchak (padding - o'lchamga nisbatan)
+
+    Returns:
+        Tuple[int, int, int, int]: (x1, y1, x2, y2)
+    """
+    x, y, w, h = cv2.boundingRect(polygon_points.astype(np.int32))
+    pad_x, pad_y = int(w * padding), int(h * padding)
+    return (max(0, x - pad_x), max(0, y - pad_y),
+            min(frame_width, x + w + pad_x), min(frame_height, y + h + pad_y))
+
+def boxes_in_roi(result: Optional[DetectionResult], roi: Tuple[int, int, int, int]) -> int:
+    """Markazi ROI ichidagi deteksiyalar soni"""
+    if result is None or len(result.boxes) == 0:
+        return 0
+    boxes = np.asarray(result.boxes, dtype=np.float32)
+    cx = (boxes[:, 0] + boxes[:, 2]) * 0.5
+    cy = (boxes[:, 1] + boxes[:, 3]) * 0.5
+    x1, y1, x2, y2 = roi
+    return int(np.count_nonzero((cx >= x1) & (cx < x2) & (cy >= y1) & (cy < y2)))
+
+class MotionPresence:
+    """Fon ayirmasi bo'yicha harakat ulushi (polygon maskasi ichida)"""
+
+    def __init__(self, config: CascadeConfig, polygon_points: np.ndarray, roi: Tuple[int, int, int, int]):
+        self.config = config
+        x1, y1, x2, y2 = roi
+        self.roi = roi
+        self.width = max(8, min(config.motion_width, x2 - x1))
+        self.height = max(8, int(round((y2 - y1) * self.width / max(1, x2 - x1))))
+
+        # Polygon maskasi qirqim o'lchamida
+        scale = np.array([self.width / max(1, x2 - x1), self.height / max(1, y2 - y1)])
+        points = ((polygon_points - np.array([x1, y1])) * scale).astype(np.int32)
+        self.mask = np.zeros((self.height, self.width), dtype=np.uint8)
+        cv2.fillPoly(self.mask, [points], 255)
+        self.mask_area = max(1, int(np.count_nonzero(self.mask)))
+
+        self.background: Optional[np.ndarray] = None
+        self._gray = np.empty((self.height, self.width), dtype=np.uint8)
+
+    def score(self, frame: np.ndarray) -> float:
+        """
+        Polygon ichidagi o'zgargan piksellar ulushi (0..1)
+
+        Args:
+            frame: To'liq BGR frame
+
+        Returns:
+            float: Harakat ulushi
+        """
+        x1, y1, x2, y2 = self.roi
+        small = cv2.resize(frame[y1:y2, x1:x2], (self.width, self.height), interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(small, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        gray = self._gray.astype(np.float32)
+        if self.background is None:
+            self.background = gray.copy()
+            return 1.0  # Birinchi frame - fon yo'q, to'liq detector ishlasin
+
+        diff = cv2.absdiff(gray, self.background)
+        moving = (diff > self.config.motion_diff) & (self.mask > 0)
+        cv2.accumulateWeighted(gray, self.background, self.config.background_alpha)
+        return float(np.count_nonzero(moving)) / self.mask_area
+
+class ModelPresence:
+    """Kichik YOLO modeli bilan qirqimda eng yuqori ishonch"""
+
+    def __init__(self, config: CascadeConfig, target_classes: List[int], roi: Tuple[int, int, int, int],
+                 execution=None):
+        from ultralytics import YOLO
+        from railcore.vision.execution import ExecutionProfile
+
+        self.config = config
+        self.target_classes = target_classes
+        self.roi = roi
+        self.execution = execution if execution is not None else ExecutionProfile()
+        self.model = YOLO(config.presence_model)
+        self.model.fuse()
+        self.execution.prepare(self.model)
+
+    def score(self, frame: np.ndarray) -> float:
+        """
+        Qirqimdagi eng yuqori ishonch (0..1)
+
+        Args:
+            frame: To'liq BGR frame
+
+        Returns:
+            float: Maksimal confidence (deteksiya bo'lmasa 0)
+        """
+        x1, y1, x2, y2 = self.roi
+        with self.execution.autocast():
+            results = self.model.predict(
+                frame[y1:y2, x1:x2],
+                imgsz=self.config.presence_imgsz,
+                classes=self.target_classes,
+                conf=self.config.presence_conf,
+                verbose=False,
+                **self.execution.predict_args()
+            )
+        boxes = results[0].boxes
+        if boxes is None or len(boxes) == 0:
+            return 0.0
+        return float(boxes.conf.max())
+
+class PresenceGate:
+    """To'liq detector'ni qachon ishlatishni hal qiluvchi kaskad"""
+
+    def __init__(self,
+                 config: CascadeConfig,
+                 polygon_points: np.ndarray,
+                 frame_width: int,
+                 frame_height: int,
+                 target_classes: Optional[List[int]] = None,
+                 camera_id: int = 0,
+                 execution=None):
+        """
+        Args:
+            config: Kaskad konfiguratsiyasi
+            polygon_points: Polygon nuqtalari (N, 2)
+            frame_width: Frame kengligi
+            frame_height: Frame balandligi
+            target_classes: 'model' backend uchun klasslar
+            camera_id: Kamera ID (logging uchun)
+            execution: 'model' backend uchun ExecutionProfile (standart - avtomatik)
+        """
+        self.config = config
+        self.camera_id = camera_id
+        self.execution = execution
+        self.frame_width = frame_width
+        self.frame_height = frame_height
+        self.target_classes = target_classes or []
+        self.stage1 = None
+        self.set_polygon(polygon_points)
+
+        self.hold = 0  # "Bor" deyilgandan keyin yana shuncha frame to'liq detector
+        self.since_audit = 0
+        self.last_decision = 'full'
+
+        # Statistika
+        self.frames = 0
+        self.stage1_calls = 0
+        self.stage1_seconds = 0.0
+        self.full_runs = 0
+        self.skipped = 0
+        self.audits = 0
+        self.audit_misses = 0  # Audit'da to'liq detector ROI ichida avtomobil topdi
+
+    def set_polygon(self, polygon_points: np.ndarray):
+        """
+        ROI va 1-bosqichni yangi polygon uchun qayta qurish (statistika saqlanadi)
+
+        Args:
+            polygon_points: Yangi polygon nuqtalari (N, 2)
+        """
+        config = self.config
+        self.roi = polygon_roi(polygon_points, self.frame_width, self.frame_height, config.crop_padding)
+        if config.backend == 'model':
+            if self.stage1 is None:
+                self.stage1 = ModelPresence(config, self.target_classes, self.roi, self.execution)
+            self.stage1.roi = self.roi
+            self.threshold = config.presence_conf
+        elif config.backend == 'motion':
+            self.stage1 = MotionPresence(config, polygon_points, self.roi)
+            self.threshold = config.motion_threshold
+        else:
+            raise ValueError(f"Noma'lum kaskad backend: {config.backend}")
+        self.hold = config.hold_frames  # Yangi fon o'rganilguncha to'liq detector
+
+    def should_run(self, frame: np.ndarray, tracks_active: bool) -> bool:
+        """
+        Shu frame'da to'liq detector ishlashi kerakmi
+
+        Args:
+            frame: To'liq BGR frame
+            tracks_active: Tracker'da faol tracklar bor
+
+        Returns:
+            bool: True - to'liq detector/tracker, False - frame bo'sh deb hisoblanadi
+        """
+        self.frames += 1
+        if tracks_active:
+            self.last_decision = 'tracks'
+            return self._full()
+        if self.hold > 0:
+            self.hold -= 1
+            self.last_decision = 'hold'
+            return self._full()
+
+        start = time.perf_counter()
+        score = self.stage1.score(frame)
+        self.stage1_seconds += time.perf_counter() - start
+        self.stage1_calls += 1
+
+        if score >= self.threshold:
+            self.hold = self.config.hold_frames
+            self.last_decision = 'present'
+            return self._full()
+
+        self.since_audit += 1
+        if self.config.audit_every > 0 and self.since_audit >= self.config.audit_every:
+            self.since_audit = 0
+            self.audits += 1
+            self.last_decision = 'audit'
+            return self._full()
+
+        self.skipped += 1
+        self.last_decision = 'skip'
+        return False
+
+    def _full(self) -> bool:
+        self.full_runs += 1
+        return True
+
+    def record_full(self, result: Optional[DetectionResult]):
+        """
+        To'liq detector natijasi (audit frame'larida o'tkazib yuborish xatosini hisoblash uchun)
+
+        Args:
+            result: detect() natijasi
+        """
+        if boxes_in_roi(result, self.roi) == 0:
+            return
+        if self.last_decision == 'audit':
+            self.audit_misses += 1
+            # Avtomobil bor - keyingi frame'larni o'tkazib yubormaslik
+            self.hold = self.config.hold_frames
+
+    def get_stats(self) -> dict:
+        """
+        Kaskad statistikasi
+
+        Returns:
+            dict: frames, skip_rate, stage1_ms, audits, missed_presence_rate
+        """
+        return {
+            'frames': self.frames,
+            'full_runs': self.full_runs,
+            'skipped': self.skipped,
+            'skip_rate': round(self.skipped / self.frames, 4) if self.frames else 0.0,
+            'stage1_ms': round(self.stage1_seconds / self.stage1_calls * 1000, 3) if self.stage1_calls else 0.0,
+            'audits': self.audits,
+            'missed_presence_rate': round(self.audit_misses / self.audits, 4) if self.audits else 0.0,
+        }
+
+def create_gate(config: CascadeConfig, polygon_utils, model_config: ModelConfig,
+                camera_id: int = 0, execution=None) -> Optional[PresenceGate]:
+    """
+    Config bo'yicha PresenceGate (o'chirilgan bo'lsa None)
+
+    Args:
+        config: Kaskad konfiguratsiyasi
+        polygon_utils: PolygonUtils
+        model_config: To'liq model konfiguratsiyasi (target_classes)
+        camera_id: Kamera ID
+        execution: To'liq detector bilan umumiy ExecutionProfile
+
+    Returns:
+        PresenceGate yoki None
+    """
+    if config is None or not config.enabled:
+        return None
+    return PresenceGate(config, polygon_utils.polygon_points, polygon_utils.frame_width,
+                        polygon_utils.frame_height, model_config.target_classes, camera_id, execution)
+
+def _run_tracker(cache, polygon_utils, thresholds: ThresholdsConfig, processing: ProcessingConfig,
+                 decide: Callable[[int, bool], bool]) -> Tuple[list, np.ndarray]:
+    """
+    Keshdagi har bir frame'da tracker'ni ishlatish, decide() False bo'lsa frame bo'sh
+
+    Returns:
+        Tuple[list, np.ndarray]: (hodisalar, to'liq detector ishlagan frame'lar maskasi)
+    """
+    from railcore.vision.tracking import VehicleTracker
+    from railcore.vision.motion import create_calibration
+
+    tracker = VehicleTracker(0, 'cascade', polygon_utils, thresholds, processing.timeout_seconds,
+                             calibration=create_calibration(polygon_utils, processing),
+                             trajectory_size=processing.trajectory_size,
+                             slow_min_points=processing.slow_min_points)
+    fps = cache.fps
+    events = []
+    ran = np.zeros(len(cache), dtype=bool)
+    for index in range(len(cache)):
+        current_time = (index + 1) / fps
+        if decide(index, len(tracker.vehicles) > 0):
+            ran[index] = True
+            result = cache.get(index)
+            if result is not None:
+                events.extend(tracker.update_many(result.track_ids, result.class_ids,
+                                                  result.boxes, current_time, None))
+        tracker.cleanup_expired(current_time)
+    return events, ran
+
+def evaluate(video_path: str, cache, polygon_utils, config: CascadeConfig, model_config: ModelConfig,
+             thresholds: ThresholdsConfig, processing: ProcessingConfig) -> dict:
+    """
+    Yozib olingan video ustida kaskadni baholash (ground truth - to'liq detector keshi)
+
+    Returns:
+        dict: stage1 narxi, skip rate, missed presence rate, hodisalar taqqoslashi
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise ValueError(f"Video ochilmadi: {video_path}")
+    gate = create_gate(config, polygon_utils, model_config)
+
+    stage1_times: List[float] = []
+    present = np.zeros(len(cache), dtype=bool)
+    for index in range(len(cache)):
+        present[index] = boxes_in_roi(cache.get(index), gate.roi) > 0
+
+    def decide(index: int, tracks_active: bool) -> bool:
+        success, frame = cap.read()
+        if not success:
+            return True
+        calls = gate.stage1_calls
+        start = time.perf_counter()
+        run = gate.should_run(frame, tracks_active)
+        if gate.stage1_calls > calls:
+            stage1_times.append(time.perf_counter() - start)
+        if run:
+            gate.record_full(cache.get(index))
+        return run
+
+    baseline_events, _ = _run_tracker(cache, polygon_utils, thresholds, processing, lambda i, a: True)
+    cascade_events, ran = _run_tracker(cache, polygon_utils, thresholds, processing, decide)
+    cap.release()
+
+    def by_type(events) -> dict:
+        counts = {}
+        for event in events:
+            counts[event.event_type] = counts.get(event.event_type, 0) + 1
+        return counts
+
+    baseline_violations = {e.track_id for e in baseline_events if e.event_type == 'violation'}
+    cascade_violations = {e.track_id for e in cascade_events if e.event_type == 'violation'}
+    missed = int(np.count_nonzero(present & ~ran))
+    times_ms = np.asarray(stage1_times) * 1000 if stage1_times else np.zeros(1)
+    return {
+        'frames': len(cache),
+        'full_runs': int(ran.sum()),
+        'skip_rate': round(1.0 - float(ran.mean()), 4) if len(ran) else 0.0,
+        'stage1_ms_mean': round(float(times_ms.mean()), 3),
+        'stage1_ms_p95': round(float(np.percentile(times_ms, 95)), 3),
+        'presence_frames': int(present.sum()),
+        'missed_presence_frames': missed,
+        'missed_presence_rate': round(missed / max(1, int(present.sum())), 4),
+        'events_baseline': by_type(baseline_events),
+        'events_cascade': by_type(cascade_events),
+        'missed_violations': sorted(baseline_violations - cascade_violations),
+        'gate': gate.get_stats(),
+    }
+
+def main():
+    from railcore.config import load_config, parse_model, parse_processing
+    from railcore.utils_polygon import PolygonUtils
+    from railcore.vision.detection_cache import DetectionCache, build_cache
+
+    parser = argparse.ArgumentParser(description="RailSafe kaskad baholash")
+    parser.add_argument('--video', required=True)
+    parser.add_argument('--polygon', required=True)
+    parser.add_argument('--cache', help="Deteksiya keshi (bo'lmasa to'liq model bilan yaratiladi)")
+    parser.add_argument('--config', default='config/config.yaml')
+    parser.add_argument('--backend', choices=['motion', 'model'], help="config'dagi backend o'rniga")
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    model_config = parse_model(config['model'])
+    cascade_config = CascadeConfig(**config.get('cascade', {}))
+    cascade_config.enabled = True
+    if args.backend:
+        cascade_config.backend = args.backend
+
+    cache = DetectionCache(args.cache) if args.cache else build_cache(args.video, model_config)
+    width, height = cache.frame_size
+    result = evaluate(
+        args.video,
+        cache,
+        PolygonUtils(args.polygon, width, height),
+        cascade_config,
+        model_config,
+        ThresholdsConfig(warning=config['thresholds']['warning'], violation=config['thresholds']['violation']),
+        parse_processing(config.get('processing', {}))
+    )
+
+    print(f"Backend: {cascade_config.backend}")
+    print(f"Frame'lar: {result['frames']}, to'liq detector: {result['full_runs']} "
+          f"(skip rate {result['skip_rate']:.1%})")
+    print(f"1-bosqich: o'rtacha {result['stage1_ms_mean']:.2f} ms, p95 {result['stage1_ms_p95']:.2f} ms")
+    print(f"Avtomobil bor frame'lar: {result['presence_frames']}, o'tkazib yuborilgan: "
+          f"{result['missed_presence_frames']} ({result['missed_presence_rate']:.2%})")
+    print(f"Hodisalar: to'liq {result['events_baseline']} | kaskad {result['events_cascade']}")
+    if result['missed_violations']:
+        print(f"O'tkazib yuborilgan violation track'lar: {result['missed_violations']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,360 @@
+"""
+DetectionCache - yozib olingan video uchun YOLO deteksiyalarini keshlash va replay
+
+Kesh kaliti: (video hash, model hash, conf/iou/imgsz/classes). Har bir kesh papkasida
+ustunlar alohida .npy fayl sifatida saqlanadi va o'qishda memory-map qilinadi:
+    offsets.npy      int64 (n_frames + 1)  - frame i deteksiyalari [offsets[i], offsets[i+1])
+    boxes.npy        float32 (N, 4)
+    track_ids.npy    int32 (N)
+    class_ids.npy    int16 (N)
+    confidences.npy  float32 (N)
+    meta.json
+
+Ishlatish:
+    python -m railcore.vision.detection_cache build --video videos/x.mp4 [--config config/config.yaml]
+    python -m railcore.vision.detection_cache replay --cache cache/detections/<kalit> --polygon p.json
+"""
+import json
+import time
+import hashlib
+import argparse
+import numpy as np
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+from railcore.types import (DetectionResult, ModelConfig, ThresholdsConfig,
+                            ProcessingConfig, ReplayResult)
+from railcore.logging_setup import setup_logger
+
+logger = setup_logger(__name__)
+
+_FORMAT_VERSION = 1
+_HASH_CHUNK = 4 * 1024 * 1024
+
+def file_sha256(path: str) -> str:
+    """
+    Fayl mazmunining SHA-256 hash'i
+
+    Args:
+        path: Fayl yo'li
+
+    Returns:
+        str: hex hash
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def cache_key(video_hash: str, model_hash: str, model_config: ModelConfig) -> str:
+    """
+    Kesh kalitini hisoblash
+
+    Args:
+        video_hash: Video mazmuni hash'i
+        model_hash: Model og'irliklari hash'i
+        model_config: conf/iou/imgsz/target_classes
+
+    Returns:
+        str: Kesh papkasi nomi
+    """
+    params = json.dumps({
+        'video': video_hash,
+        'model': model_hash,
+        'conf': model_config.conf,
+        'iou': model_config.iou,
+        'imgsz': model_config.imgsz,
+        'classes': sorted(model_config.target_classes),
+        'version': _FORMAT_VERSION
+    }, sort_keys=True)
+    return hashlib.sha256(params.encode('utf-8')).hexdigest()[:24]
+
+class DetectionCacheWriter:
+    """Frame bo'yicha deteksiyalarni yig'ib ustunli formatda yozish"""
+
+    def __init__(self, path: str, meta: dict):
+        """
+        Args:
+            path: Kesh papkasi
+            meta: Video/model ma'lumotlari (width, height, fps, ...)
+        """
+        self.path = Path(path)
+        self.meta = dict(meta)
+        self.counts: List[int] = []
+        self.boxes: List[np.ndarray] = []
+        self.track_ids: List[np.ndarray] = []
+        self.class_ids: List[np.ndarray] = []
+        self.confidences: List[np.ndarray] = []
+
+    def append(self, result: Optional[DetectionResult]):
+        """
+        Keyingi frame deteksiyalarini qo'shish
+
+        Args:
+            result: DetectionResult yoki None (bo'sh frame)
+        """
+        if result is None or len(result.boxes) == 0:
+            self.counts.append(0)
+            return
+        self.counts.append(len(result.boxes))
+        self.boxes.append(np.asarray(result.boxes, dtype=np.float32).reshape(-1, 4))
+        self.track_ids.append(np.asarray(result.track_ids, dtype=np.int32))
+        self.class_ids.append(np.asarray(result.class_ids, dtype=np.int16))
+        self.confidences.append(np.asarray(result.confidences, dtype=np.float32))
+
+    def close(self) -> 'DetectionCache':
+        """
+        Ustunlarni diskka yozish (avval vaqtinchalik papkaga, keyin atomik rename)
+
+        Returns:
+            DetectionCache: Yozilgan keshni o'qish uchun
+        """
+        tmp = self.path.with_name(self.path.name + '.tmp')
+        tmp.mkdir(parents=True, exist_ok=True)
+
+        offsets = np.zeros(len(self.counts) + 1, dtype=np.int64)
+        np.cumsum(self.counts, out=offsets[1:])
+
+        def _concat(parts, dtype, shape):
+            return np.concatenate(parts).astype(dtype) if parts else np.zeros(shape, dtype=dtype)
+
+        np.save(tmp / 'offsets.npy', offsets)
+        np.save(tmp / 'boxes.npy', _concat(self.boxes, np.float32, (0, 4)))
+        np.save(tmp / 'track_ids.npy', _concat(self.track_ids, np.int32, (0,)))
+        np.save(tmp / 'class_ids.npy', _concat(self.class_ids, np.int16, (0,)))
+        np.save(tmp / 'confidences.npy', _concat(self.confidences, np.float32, (0,)))
+
+        self.meta.update(n_frames=len(self.counts), n_detections=int(offsets[-1]), version=_FORMAT_VERSION)
+        with open(tmp / 'meta.json', 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f, ensure_ascii=False, indent=2)
+
+        if self.path.exists():
+            for old in self.path.iterdir():
+                old.unlink()
+            self.path.rmdir()
+        tmp.rename(self.path)
+        logger.info(f"Deteksiya keshi yozildi: {self.path} ({len(self.counts)} frame, {int(offsets[-1])} deteksiya)")
+        return DetectionCache(str(self.path))
+
+class DetectionCache:
+    """Memory-map qilingan deteksiya keshi"""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Kesh papkasi
+        """
+        self.path = Path(path)
+        with open(self.path / 'meta.json', 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.offsets = np.load(self.path / 'offsets.npy', mmap_mode='r')
+        self.boxes = np.load(self.path / 'boxes.npy', mmap_mode='r')
+        self.track_ids = np.load(self.path / 'track_ids.npy', mmap_mode='r')
+        self.class_ids = np.load(self.path / 'class_ids.npy', mmap_mode='r')
+        self.confidences = np.load(self.path / 'confidences.npy', mmap_mode='r')
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def frame_size(self) -> Tuple[int, int]:
+        """(width, height)"""
+        return int(self.meta['width']), int(self.meta['height'])
+
+    @property
+    def fps(self) -> float:
+        return float(self.meta.get('fps') or 25.0)
+
+    def get(self, frame_index: int) -> Optional[DetectionResult]:
+        """
+        Frame deteksiyalarini olish (nusxasiz, mmap view)
+
+        Args:
+            frame_index: Frame indeksi (0 dan)
+
+        Returns:
+            DetectionResult yoki None (bo'sh frame)
+        """
+        start, end = int(self.offsets[frame_index]), int(self.offsets[frame_index + 1])
+        if start == end:
+            return None
+        return DetectionResult(
+            boxes=self.boxes[start:end],
+            track_ids=self.track_ids[start:end],
+            class_ids=self.class_ids[start:end],
+            confidences=self.confidences[start:end]
+        )
+
+    def __iter__(self) -> Iterator[Optional[DetectionResult]]:
+        for i in range(len(self)):
+            yield self.get(i)
+
+def find_cache(cache_root: str, video_path: str, model_config: ModelConfig) -> Tuple[Path, bool]:
+    """
+    Video va model uchun kesh papkasini topish
+
+    Args:
+        cache_root: Keshlar papkasi
+        video_path: Video fayl
+        model_config: Model konfiguratsiyasi
+
+    Returns:
+        Tuple[Path, bool]: (kesh papkasi, mavjudmi)
+    """
+    key = cache_key(file_sha256(video_path), file_sha256(model_config.path), model_config)
+    path = Path(cache_root) / key
+    return path, (path / 'meta.json').exists()
+
+def build_cache(video_path: str, model_config: ModelConfig, cache_root: str = 'cache/detections',
+                force: bool = False) -> DetectionCache:
+    """
+    Video ustida YOLO'ni har bir frame'da ishlatib kesh yaratish (mavjud bo'lsa qayta ishlatadi)
+
+    Args:
+        video_path: Video fayl
+        model_config: Model konfiguratsiyasi
+        cache_root: Keshlar papkasi
+        force: Mavjud keshni qayta yaratish
+
+    Returns:
+        DetectionCache
+    """
+    import cv2
+    from railcore.vision.yolo_detector import YOLODetector
+
+    path, exists = find_cache(cache_root, video_path, model_config)
+    if exists and not force:
+        logger.info(f"Kesh topildi: {path}")
+        return DetectionCache(str(path))
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise ValueError(f"Video ochilmadi: {video_path}")
+
+    meta = {
+        'video': str(video_path),
+        'model': model_config.path,
+        'conf': model_config.conf,
+        'iou': model_config.iou,
+        'imgsz': model_config.imgsz,
+        'target_classes': list(model_config.target_classes),
+        'width': int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        'height': int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        'fps': cap.get(cv2.CAP_PROP_FPS) or 25.0
+    }
+    detector = YOLODetector(model_config, camera_id=0)
+    writer = DetectionCacheWriter(str(path), meta)
+
+    start = time.time()
+    while True:
+        success, frame = cap.read()
+        if not success:
+            break
+        writer.append(detector.detect(frame))
+        if len(writer.counts) % 500 == 0:
+            logger.info(f"Kesh: {len(writer.counts)} frame ({len(writer.counts) / (time.time() - start):.1f} FPS)")
+    cap.release()
+    return writer.close()
+
+def replay(cache: DetectionCache,
+           polygon_utils,
+           thresholds: ThresholdsConfig,
+           processing: ProcessingConfig,
+           camera_id: int = 0,
+           camera_name: str = 'replay') -> ReplayResult:
+    """
+    Keshlangan deteksiyalar ustida VehicleTracker'ni PolygonCamera.run bilan bir xil
+    (adaptive frame skip, cleanup) tartibda ishlatish
+
+    Args:
+        cache: Deteksiya keshi
+        polygon_utils: PolygonUtils (kesh frame o'lchami bilan)
+        thresholds: Vaqt chegaralari
+        processing: Ishlash sozlamalari
+        camera_id: Hodisalar uchun kamera ID
+        camera_name: Hodisalar uchun kamera nomi
+
+    Returns:
+        ReplayResult
+    """
+    from railcore.vision.tracking import VehicleTracker
+    from railcore.vision.motion import create_calibration
+
+    tracker = VehicleTracker(camera_id, camera_name, polygon_utils, thresholds, processing.timeout_seconds,
+                             calibration=create_calibration(polygon_utils, processing),
+                             trajectory_size=processing.trajectory_size,
+                             slow_min_points=processing.slow_min_points)
+    fps = cache.fps
+    events = []
+    processed = 0
+    frame_skip = processing.frame_skip_idle
+    consecutive_empty = 0
+
+    start = time.perf_counter()
+    for index in range(len(cache)):
+        frame_number = index + 1
+        if frame_number % frame_skip != 0:
+            continue
+        processed += 1
+        current_time = frame_number / fps
+        result = cache.get(index)
+
+        if result is not None:
+            if processing.adaptive_mode:
+                consecutive_empty = 0
+                frame_skip = processing.frame_skip_active
+            events.extend(tracker.update_many(result.track_ids, result.class_ids,
+                                              result.boxes, current_time, None))
+        elif processing.adaptive_mode:
+            consecutive_empty += 1
+            if consecutive_empty >= processing.empty_threshold:
+                frame_skip = processing.frame_skip_idle
+
+        tracker.cleanup_expired(current_time)
+
+    return ReplayResult(
+        events=events,
+        frames_total=len(cache),
+        frames_processed=processed,
+        elapsed=time.perf_counter() - start
+    )
+
+def main():
+    from railcore.utils_polygon import PolygonUtils
+    from railcore.config import load_config, parse_model, parse_processing
+
+    parser = argparse.ArgumentParser(description="RailSafe deteksiya keshi")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    build_p = sub.add_parser('build', help="Video uchun kesh yaratish")
+    build_p.add_argument('--video', required=True)
+    build_p.add_argument('--config', default='config/config.yaml')
+    build_p.add_argument('--out', default='cache/detections')
+    build_p.add_argument('--force', action='store_true')
+
+    replay_p = sub.add_parser('replay', help="Kesh ustida tracker'ni ishlatish")
+    replay_p.add_argument('--cache', required=True)
+    replay_p.add_argument('--polygon', required=True)
+    replay_p.add_argument('--config', default='config/config.yaml')
+
+    args = parser.parse_args()
+    config = load_config(args.config)
+
+    if args.command == 'build':
+        cache = build_cache(args.video, parse_model(config['model']), args.out, args.force)
+        print(cache.path)
+        return
+
+    cache = DetectionCache(args.cache)
+    width, height = cache.frame_size
+    result = replay(
+        cache,
+        PolygonUtils(args.polygon, width, height),
+        ThresholdsConfig(warning=config['thresholds']['warning'], violation=config['thresholds']['violation']),
+        parse_processing(config.get('processing', {}))
+    )
+    print(f"{result.frames_processed}/{result.frames_total} frame, {result.elapsed:.2f}s "
+          f"({result.frames_processed / max(result.elapsed, 1e-9):.0f} FPS): {result.counts()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+ExecutionProfile - model qayerda va qanday bajarilishi (device, half, CPU thread'lar)
+
+device: 'auto' bo'lsa CUDA bor bo'lsa 0, aks holda 'cpu'. half faqat CUDA'da ishlatiladi.
+
+CPU'da:
+    - thread rejasi: (mavjud yadrolar / jarayonlar - reserved_cores) / kameralar. Har bir
+      kamera thread'i torch.set_num_threads() ni o'zi chaqiradi (OpenMP soni thread'ga
+      bog'liq), shuning uchun bir nechta detector yadrolarni ortiqcha band qilmaydi
+    - channels_last xotira formati (oneDNN konvolyutsiyalari uchun)
+    - bf16 autocast (faqat CPU AVX512-BF16/AMX qo'llasa)
+    - torch.compile (ixtiyoriy). Trace uchun model.export_format: torchscript
+"""
+import contextlib
+import os
+import threading
+from typing import Optional
+from railcore.types import ExecutionConfig
+from railcore.logging_setup import setup_logger
+
+logger = setup_logger(__name__)
+
+_interop_lock = threading.Lock()
+_interop_set = False
+
+def available_cores() -> int:
+    """Jarayonga ruxsat berilgan CPU yadrolari soni (taskset/cgroup hisobga olinadi)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+def plan_threads(config: ExecutionConfig, consumers: int) -> int:
+    """
+    Bitta detector (kamera) uchun intra-op thread'lar soni
+
+    Args:
+        config: Bajarilish konfiguratsiyasi
+        consumers: Shu jarayondagi detector'lar soni
+
+    Returns:
+        int: Thread'lar soni (kamida 1)
+    """
+    if config.cpu_threads > 0:
+        return config.cpu_threads
+    cores = available_cores() // max(1, config.processes) - config.reserved_cores
+    return max(1, cores // max(1, consumers))
+
+def cpu_supports_bf16() -> bool:
+    """CPU bf16 matmul'ni apparat darajasida qo'llaydimi (avx512_bf16 yoki AMX)"""
+    try:
+        with open('/proc/cpuinfo') as f:
+            flags = f.read()
+    except OSError:
+        return False
+    return 'avx512_bf16' in flags or 'amx_bf16' in flags
+
+def _set_interop_threads(threads: int):
+    """Inter-op thread'lar (jarayonda bir marta, birinchi inference'dan oldin)"""
+    global _interop_set
+    import torch
+
+    with _interop_lock:
+        if _interop_set or threads <= 0:
+            return
+        _interop_set = True
+        try:
+            torch.set_num_interop_threads(threads)
+        except RuntimeError as e:
+            logger.warning(f"Inter-op thread'lar o'rnatilmadi: {e}")
+
+class ExecutionProfile:
+    """Barcha detector'lar uchun umumiy bajarilish profili"""
+
+    def __init__(self, config: Optional[ExecutionConfig] = None, consumers: int = 1):
+        """
+        Args:
+            config: Bajarilish konfiguratsiyasi
+            consumers: Detector'lar soni (thread rejasi uchun)
+        """
+        import torch
+
+        self.config = config or ExecutionConfig()
+        device = self.config.device
+        if device == 'auto':
+            device = 0 if torch.cuda.is_available() else 'cpu'
+        elif isinstance(device, str) and device.isdigit():
+            device = int(device)
+        self.device = device
+        self.cuda = device != 'cpu'
+        self.half = self.config.half and self.cuda
+        self.bf16 = False
+        if not self.cuda and self.config.bf16:
+            self.bf16 = cpu_supports_bf16()
+            if not self.bf16:
+                logger.warning("CPU bf16 ni qo'llamaydi (avx512_bf16/amx yo'q) - fp32 ishlatiladi")
+
+        self.threads = 0
+        self.set_consumers(consumers)
+        if not self.cuda:
+            _set_interop_threads(self.config.interop_threads)
+
+    def set_consumers(self, consumers: int):
+        """Detector'lar soni o'zgardi - thread rejasini qayta hisoblash"""
+        if self.cuda:
+            return
+        threads = plan_threads(self.config, consumers)
+        if threads != self.threads:
+            self.threads = threads
+            logger.info(f"CPU thread rejasi: {consumers} detector x {threads} thread "
+                        f"({available_cores()} yadro, {self.config.processes} jarayon, "
+                        f"{self.config.reserved_cores} zaxira)")
+
+    def bind_thread(self) -> int:
+        """
+        Joriy (kamera) thread'i uchun intra-op thread'lar sonini o'rnatish
+
+        Returns:
+            int: O'rnatilgan son (CUDA'da 0)
+        """
+        if self.cuda:
+            return 0
+        import torch
+        torch.set_num_threads(self.threads)
+        return self.threads
+
+    def predict_args(self) -> dict:
+        """model.predict()/track() uchun device va half"""
+        return {'device': self.device, 'half': self.half}
+
+    def autocast(self):
+        """Inference konteksti (CPU bf16 yoqilgan bo'lsa autocast)"""
+        if not self.bf16:
+            return contextlib.nullcontext()
+        import torch
+        return torch.autocast('cpu', dtype=torch.bfloat16)
+
+    def prepare(self, model):
+        """
+        YOLO modelini CPU uchun tayyorlash (faqat PyTorch og'irliklari - eksport qilinganlar o'zgarmaydi)
+
+        Args:
+            model: ultralytics YOLO
+        """
+        if self.cuda:
+            return
+        import torch
+
+        module = getattr(model, 'model', None)
+        if not isinstance(module, torch.nn.Module):
+            return
+        if self.config.channels_last:
+            module.to(memory_format=torch.channels_last)
+        if self.config.compile:
+            try:
+                model.model = torch.compile(module, dynamic=False)
+            except Exception as e:
+                logger.warning(f"torch.compile ishlamadi, oddiy model ishlatiladi: {e}")
+
+    def describe(self) -> str:
+        """Log uchun qisqa tavsif"""
+        if self.cuda:
+            return f"cuda:{self.device}{' fp16' if self.half else ''}"
+        parts = [f"cpu {self.threads} thread"]
+        if self.config.channels_last:
+            parts.append('channels_last')
+        if self.bf16:
+            parts.append('bf16')
+        if self.config.compile:
+            parts.append('compile')
+        return ', '.join(parts)
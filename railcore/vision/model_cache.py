@@ -0,0 +1,110 @@
+"""
+ModelCache - eksport qilingan modelni og'irliklar hash'i bo'yicha diskda saqlash
+
+Kesh papkasi (standart cache/models):
+    <hash16>_<imgsz>.<format>  - eksport qilingan model (engine, onnx, openvino, ...)
+
+PyTorch checkpoint keshlanmaydi: fuse() qilingan nusxani yuklash faqat
+~30 ms (yolov8n) / ~100 ms (yolov8m) tejaydi.
+"""
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Tuple
+from railcore.types import ModelConfig
+from railcore.vision.detection_cache import file_sha256
+from railcore.logging_setup import setup_logger
+
+logger = setup_logger(__name__)
+
+# Bir nechta kamera bir vaqtda bitta keshni yaratmasligi uchun (kesh fayli bo'yicha)
+_build_locks: Dict[Path, threading.Lock] = {}
+_build_locks_guard = threading.Lock()
+
+# Og'irliklar hash'i (jarayon ichida bir marta hisoblanadi)
+_hashes: Dict[Tuple[str, float], str] = {}
+
+def weights_hash(path: str) -> str:
+    """
+    Model fayli hash'i (mtime o'zgarmagan bo'lsa qayta o'qilmaydi)
+
+    Args:
+        path: Model fayli
+
+    Returns:
+        str: SHA-256 hex
+    """
+    key = (str(Path(path).resolve()), os.path.getmtime(path))
+    if key not in _hashes:
+        _hashes[key] = file_sha256(path)
+    return _hashes[key]
+
+def cached_model_path(config: ModelConfig) -> Path:
+    """
+    Eksport qilingan model uchun kesh fayli yo'li
+
+    Args:
+        config: Model konfiguratsiyasi (export_format bilan)
+
+    Returns:
+        Path: Kesh fayli (mavjud bo'lmasligi mumkin)
+    """
+    key = weights_hash(config.path)[:16]
+    suffix = {'engine': '.engine', 'onnx': '.onnx', 'torchscript': '.torchscript'}.get(
+        config.export_format, f'_{config.export_format}_model')
+    return Path(config.cache_dir) / f"{key}_{config.imgsz}{suffix}"
+
+def _build_lock(path: Path) -> threading.Lock:
+    """Kesh fayli uchun yaratish lock'i"""
+    with _build_locks_guard:
+        return _build_locks.setdefault(path, threading.Lock())
+
+def _export(config: ModelConfig, path: Path):
+    """Modelni eksport qilib kesh fayliga atomar ko'chirish"""
+    from ultralytics import YOLO
+
+    start = time.time()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    logger.info(f"Model eksport qilinmoqda ({config.export_format}, imgsz={config.imgsz})...")
+    exported = Path(YOLO(config.path).export(format=config.export_format, imgsz=config.imgsz, verbose=False))
+    tmp = path.with_name(path.name + '.tmp')
+    if tmp.is_dir():
+        shutil.rmtree(tmp)
+    elif tmp.exists():
+        tmp.unlink()
+    shutil.move(str(exported), str(tmp))
+    os.replace(tmp, path)
+    logger.info(f"Model keshga saqlandi: {path} ({time.time() - start:.1f}s)")
+
+def load_model(config: ModelConfig):
+    """
+    YOLO modelini yuklash (eksport qilingan nusxa keshdan, kesh bo'lmasa yaratiladi)
+
+    Args:
+        config: Model konfiguratsiyasi (cache_dir, export_format)
+
+    Returns:
+        Tuple[YOLO, bool]: (model, keshdan yuklandimi)
+    """
+    from ultralytics import YOLO
+
+    if not config.cache_dir or not config.export_format:
+        model = YOLO(config.path)
+        model.fuse()
+        return model, False
+
+    path = cached_model_path(config)
+    from_cache = path.exists()
+    if not from_cache:
+        # Lock faqat yaratish paytida: tayyor keshni yuklash boshqa kameralarni kutmaydi
+        with _build_lock(path):
+            if path.exists():
+                from_cache = True
+            else:
+                _export(config, path)
+
+    if from_cache:
+        logger.info(f"Model keshdan yuklanmoqda: {path}")
+    return YOLO(str(path), task='detect'), from_cache
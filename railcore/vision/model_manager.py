@@ -0,0 +1,394 @@
+"""
+ModelManager - ishlayotgan kameralarda modelni qayta ishga tushirishsiz almashtirish
+
+Bosqichlar (model.path o'zgarganda, ConfigWatcher orqali):
+    1. loading  - jonli model nusxasi (baseline) va kandidat fonda yuklanib qizdiriladi
+    2. shadow   - kameralar frame'larining shadow_fraction ulushi fon thread'iga beriladi,
+                  baseline va kandidat bir xil frame'da predict() qilinadi: box'lar mosligi
+                  (precision/recall/F1, o'rtacha IoU) va inference vaqti (p50/p95) yig'iladi
+    3. swapping - mezonlar (min_f1, max_latency_ratio) bajarilsa har bir kamera uchun kandidat
+                  nusxasi fonda yuklanadi va kamera thread'ida frame'lar orasida almashtiriladi
+                  (YOLODetector.swap_model - tracker holati saqlanadi, frame tushib qolmaydi)
+
+Shadow jonli natijalar bilan emas, baseline bilan solishtiradi: track() faqat tasdiqlangan
+tracklarni qaytaradi, ikkala model bir xil sharoitda (bitta thread, bir xil frame) o'lchanadi.
+Hisobot logga va report_file'ga (JSON lines) yoziladi.
+"""
+import json
+import time
+import queue
+import random
+import threading
+import dataclasses
+import numpy as np
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from railcore.types import ModelConfig, ModelSwapConfig
+from railcore.vision.execution import ExecutionProfile
+from railcore.logging_setup import setup_logger
+
+logger = setup_logger(__name__)
+
+def match_detections(live_boxes: np.ndarray, live_classes: np.ndarray,
+                     candidate_boxes: np.ndarray, candidate_classes: np.ndarray,
+                     threshold: float) -> Tuple[int, float]:
+    """
+    Ikki model box'larini klass bo'yicha IoU bilan juftlash (greedy, eng katta IoU birinchi)
+
+    Returns:
+        Tuple[int, float]: (juftlar soni, juftlar IoU yig'indisi)
+    """
+    if len(live_boxes) == 0 or len(candidate_boxes) == 0:
+        return 0, 0.0
+    a, b = live_boxes[:, None, :], candidate_boxes[None, :, :]
+    w = np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0])
+    h = np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1])
+    inter = np.maximum(0, w) * np.maximum(0, h)
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    iou = inter / np.maximum(area_a + area_b - inter, 1e-6)
+    iou[live_classes[:, None] != candidate_classes[None, :]] = 0.0
+
+    matched, iou_sum = 0, 0.0
+    while True:
+        index = int(np.argmax(iou))
+        i, j = divmod(index, iou.shape[1])
+        if iou[i, j] < threshold:
+            break
+        matched += 1
+        iou_sum += float(iou[i, j])
+        iou[i, :] = 0.0
+        iou[:, j] = 0.0
+    return matched, iou_sum
+
+class ShadowStats:
+    """Shadow davri ko'rsatkichlari"""
+
+    def __init__(self):
+        self.frames = 0
+        self.dropped = 0
+        self.live_boxes = 0
+        self.candidate_boxes = 0
+        self.matched = 0
+        self.iou_sum = 0.0
+        self.live_ms: List[float] = []
+        self.candidate_ms: List[float] = []
+
+    def add(self, live: Tuple[np.ndarray, np.ndarray], candidate: Tuple[np.ndarray, np.ndarray],
+            live_seconds: float, candidate_seconds: float, threshold: float):
+        """Bitta frame natijasi"""
+        matched, iou_sum = match_detections(live[0], live[1], candidate[0], candidate[1], threshold)
+        self.frames += 1
+        self.live_boxes += len(live[0])
+        self.candidate_boxes += len(candidate[0])
+        self.matched += matched
+        self.iou_sum += iou_sum
+        self.live_ms.append(live_seconds * 1000)
+        self.candidate_ms.append(candidate_seconds * 1000)
+
+    def report(self) -> dict:
+        """
+        Returns:
+            dict: frames, dropped, live_boxes, candidate_boxes, precision, recall, f1, mean_iou,
+                  live_ms_p50/p95, candidate_ms_p50/p95, latency_ratio
+        """
+        precision = self.matched / self.candidate_boxes if self.candidate_boxes else 1.0
+        recall = self.matched / self.live_boxes if self.live_boxes else 1.0
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall > 0 else 0.0
+        report = {
+            'frames': self.frames,
+            'dropped': self.dropped,
+            'live_boxes': self.live_boxes,
+            'candidate_boxes': self.candidate_boxes,
+            'precision': round(precision, 4),
+            'recall': round(recall, 4),
+            'f1': round(f1, 4),
+            'mean_iou': round(self.iou_sum / self.matched, 4) if self.matched else None,
+        }
+        for name, values in (('live_ms', self.live_ms), ('candidate_ms', self.candidate_ms)):
+            report[f'{name}_p50'] = round(float(np.percentile(values, 50)), 2) if values else None
+            report[f'{name}_p95'] = round(float(np.percentile(values, 95)), 2) if values else None
+        if report['live_ms_p50']:
+            report['latency_ratio'] = round(report['candidate_ms_p50'] / report['live_ms_p50'], 3)
+        else:
+            report['latency_ratio'] = None
+        return report
+
+class ModelManager:
+    """Kandidat modelni shadow'da baholab barcha kameralarda almashtirish"""
+
+    def __init__(self,
+                 model_config: ModelConfig,
+                 config: ModelSwapConfig,
+                 execution: ExecutionProfile,
+                 cameras: Callable[[], Dict[int, object]],
+                 on_swap: Optional[Callable[[ModelConfig], None]] = None):
+        """
+        Args:
+            model_config: Jonli model konfiguratsiyasi (o'zgartirilmaydi - almashtirishda
+                          kandidat nusxasi bilan almashtiriladi)
+            config: Almashtirish konfiguratsiyasi
+            execution: Umumiy bajarilish profili
+            cameras: Ishlayotgan kameralar (camera_id -> PolygonCamera)
+            on_swap: Almashtirish boshlanganda yangi ModelConfig bilan chaqiriladi (shundan
+                     keyin yaratilgan kameralar kandidatni yuklashi uchun; ixtiyoriy)
+        """
+        self.model_config = model_config
+        self.config = config
+        self.execution = execution
+        self.cameras = cameras
+        self.on_swap = on_swap
+        self.state = 'idle'
+        self.candidate: Optional[ModelConfig] = None
+        self.stats: Optional[ShadowStats] = None
+        self.last_report: Optional[dict] = None
+        self.queue: queue.Queue = queue.Queue(maxsize=4)
+        self._cancel = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def stage(self, path: str):
+        """
+        Yangi modelni sinash va almashtirishni boshlash (oldingi kandidat bekor qilinadi)
+
+        Args:
+            path: Kandidat model fayli
+        """
+        with self._lock:
+            # Oldingi sinov kutilmaydi (ConfigWatcher thread'i bloklanmaydi) - u bekor qilinganini
+            # keyingi bosqichda ko'radi va umumiy holatga tegmasdan tugaydi
+            self._cancel_rollout()
+            if path == self.model_config.path:
+                logger.info(f"Model {path} allaqachon ishlamoqda")
+                return
+            self.candidate = dataclasses.replace(self.model_config, path=path)
+            self._cancel = threading.Event()
+            self.thread = threading.Thread(target=self._rollout, args=(self.candidate, self._cancel),
+                                           daemon=True)
+            self.thread.start()
+
+    def _cancel_rollout(self) -> Optional[threading.Thread]:
+        """Davom etayotgan sinovga bekor qilish signali (kutmaydi)"""
+        thread = self.thread
+        if thread is None or not thread.is_alive():
+            return None
+        logger.warning(f"Kandidat model {self.candidate.path} bekor qilindi")
+        self._cancel.set()
+        self.state = 'idle'
+        return thread
+
+    def observe(self, frame: np.ndarray):
+        """
+        Kamera thread'idan qayta ishlanadigan frame (shadow davrida ulushi fon thread'iga nusxalanadi)
+
+        Args:
+            frame: BGR frame (annotatsiyadan oldin)
+        """
+        stats = self.stats
+        if self.state != 'shadow' or random.random() >= self.config.shadow_fraction:
+            return
+        try:
+            self.queue.put_nowait(frame.copy())
+        except queue.Full:
+            stats.dropped += 1
+
+    def _predict(self, model, config: ModelConfig, frame: np.ndarray) -> Tuple[np.ndarray, np.ndarray, float]:
+        """Box'lar, klasslar va inference vaqti (sekund)"""
+        start = time.perf_counter()
+        with self.execution.autocast():
+            boxes = model.predict(
+                frame,
+                classes=config.target_classes,
+                conf=config.conf,
+                iou=config.iou,
+                imgsz=config.imgsz,
+                verbose=False,
+                **self.execution.predict_args()
+            )[0].boxes
+        seconds = time.perf_counter() - start
+        if boxes is None or len(boxes) == 0:
+            return np.empty((0, 4), np.float32), np.empty(0, int), seconds
+        return (boxes.xyxy.detach().cpu().numpy().astype(np.float32),
+                boxes.cls.detach().cpu().numpy().astype(int), seconds)
+
+    def _load(self, config: ModelConfig):
+        """Model nusxasini yuklash va qizdirish (predictor yaratiladi - birinchi frame sekin bo'lmaydi)"""
+        from railcore.vision.model_cache import load_model
+
+        model, _ = load_model(config)
+        self.execution.prepare(model)
+        dummy = np.zeros((config.imgsz, config.imgsz, 3), dtype=np.uint8)
+        for _ in range(max(1, config.warmup_frames)):
+            self._predict(model, config, dummy)
+        return model
+
+    def _shadow(self, baseline, candidate_model, candidate: ModelConfig, live_config: ModelConfig,
+                stats: ShadowStats, cancel: threading.Event):
+        """Shadow davri: shadow_frames yig'ilguncha yoki shadow_timeout o'tguncha"""
+        deadline = time.time() + self.config.shadow_timeout
+        self.state = 'shadow'
+        logger.info(f"Shadow: {self.config.shadow_fraction:.0%} frame'lar, {self.config.shadow_frames} ta kerak")
+        while stats.frames < self.config.shadow_frames and time.time() < deadline and not cancel.is_set():
+            try:
+                frame = self.queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            live_boxes, live_classes, live_seconds = self._predict(baseline, live_config, frame)
+            boxes, classes, seconds = self._predict(candidate_model, candidate, frame)
+            stats.add((live_boxes, live_classes), (boxes, classes), live_seconds, seconds,
+                      self.config.match_iou)
+        if cancel.is_set():
+            return  # Navbat va holat endi yangi sinovniki
+        self.state = 'loading'
+        while not self.queue.empty():
+            self.queue.get_nowait()
+
+    def _decide(self, report: dict) -> Tuple[bool, str]:
+        """Shadow natijasi bo'yicha almashtirish qarori"""
+        if self.config.shadow_fraction <= 0:
+            return True, "shadow o'chirilgan"
+        if report['frames'] == 0:
+            return False, "shadow frame'lar yig'ilmadi"
+        if self.config.min_f1 > 0 and report['f1'] < self.config.min_f1:
+            return False, f"F1 {report['f1']:.3f} < {self.config.min_f1}"
+        ratio = report['latency_ratio']
+        if self.config.max_latency_ratio > 0 and ratio is not None and ratio > self.config.max_latency_ratio:
+            return False, f"kechikish x{ratio:.2f} > x{self.config.max_latency_ratio}"
+        return True, "mezonlar bajarildi"
+
+    def _swap(self, candidate: ModelConfig, first_model, cancel: threading.Event) -> dict:
+        """Har bir kamerada modelni almashtirish (kamera thread'ida, frame'lar orasida)"""
+        # Umumiy config o'zgartirilmaydi - kandidat nusxasi jonli bo'ladi, shu paytdan
+        # yaratilgan kameralar uni on_swap orqali oladi
+        old_path = self.model_config.path
+        self.model_config = candidate
+        if self.on_swap is not None:
+            self.on_swap(candidate)
+
+        skipped, pending = [], []
+        model = first_model
+        for camera_id, camera in sorted(self.cameras().items()):
+            if cancel.is_set():
+                break  # Yangi kandidat qolgan kameralarni o'zi almashtiradi
+            detector = camera.detector
+            if not hasattr(detector, 'swap_model'):
+                skipped.append(camera_id)  # Masofaviy inference - model server'da
+                continue
+            if detector.model_path == candidate.path:
+                continue
+            if model is None:
+                model = self._load(candidate)
+            applied = {}
+            event = threading.Event()
+
+            def apply(detector=detector, model=model, applied=applied, event=event):
+                detector.swap_model(model, candidate.path)
+                applied['at'] = time.time()
+                event.set()
+
+            requested_at = time.time()
+            camera.submit_update(apply, requested_at)
+            pending.append((camera_id, requested_at, applied, event))
+            model = None
+
+        swapped, waiting, apply_ms = [], [], []
+        for camera_id, requested_at, applied, event in pending:
+            if event.wait(10.0):
+                swapped.append(camera_id)
+                apply_ms.append((applied['at'] - requested_at) * 1000)
+            else:
+                waiting.append(camera_id)  # Kamera frame o'qiy olmayapti - keyingi frame'da almashadi
+        details = [f"kameralar {swapped}"]
+        if waiting:
+            details.append(f"kutilmoqda {waiting}")
+        if skipped:
+            details.append(f"masofaviy inference {skipped}")
+        logger.info(f"Model almashtirildi: {old_path} -> {candidate.path} ({', '.join(details)})")
+        return {
+            'swapped': swapped,
+            'waiting': waiting,
+            'skipped': skipped,
+            'apply_ms_max': round(max(apply_ms), 1) if apply_ms else None,
+        }
+
+    def _rollout(self, candidate: ModelConfig, cancel: threading.Event):
+        """Kandidatni yuklash, shadow'da baholash va almashtirish"""
+        self.execution.bind_thread()
+        started = time.time()
+        live_config = self.model_config
+        stats = ShadowStats()
+        self.state = 'loading'
+        self.stats = stats
+        report = {'from': live_config.path, 'to': candidate.path, 'started': started}
+        try:
+            logger.info(f"Kandidat model yuklanmoqda: {candidate.path}")
+            load_start = time.time()
+            candidate_model = self._load(candidate)
+            if cancel.is_set():
+                return
+            baseline = self._load(live_config) if self.config.shadow_fraction > 0 else None
+            report['load_seconds'] = round(time.time() - load_start, 2)
+
+            if baseline is not None:
+                self._shadow(baseline, candidate_model, candidate, live_config, stats, cancel)
+                baseline = None
+            if cancel.is_set():
+                return
+            report['shadow'] = stats.report()
+            accepted, reason = self._decide(report['shadow'])
+            report['accepted'] = accepted
+            report['reason'] = reason
+            logger.info(f"Shadow natijasi ({candidate.path}): {report['shadow']}")
+            if not accepted:
+                logger.warning(f"Kandidat model {candidate.path} rad etildi: {reason}. "
+                               f"{live_config.path} ishlashda davom etadi")
+                return
+
+            self.state = 'swapping'
+            report.update(self._swap(candidate, candidate_model, cancel))
+        except Exception as e:
+            logger.error(f"Kandidat model {candidate.path} xato: {e}")
+            report['accepted'] = False
+            report['reason'] = f"xato: {e}"
+        finally:
+            if not cancel.is_set():
+                self.state = 'idle'
+            if 'accepted' in report:
+                report['seconds'] = round(time.time() - started, 2)
+                self.last_report = report
+                self._write_report(report)
+
+    def _write_report(self, report: dict):
+        if not self.config.report_file:
+            return
+        try:
+            path = Path(self.config.report_file)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(report, ensure_ascii=False) + '\n')
+        except OSError as e:
+            logger.error(f"Almashtirish hisoboti yozilmadi: {e}")
+
+    def get_status(self) -> dict:
+        """
+        Joriy holat
+
+        Returns:
+            dict: state, model, candidate, shadow (joriy ko'rsatkichlar), last_report
+        """
+        return {
+            'state': self.state,
+            'model': self.model_config.path,
+            'candidate': self.candidate.path if self.state != 'idle' and self.candidate else None,
+            'shadow': self.stats.report() if self.state == 'shadow' and self.stats else None,
+            'last_report': self.last_report,
+        }
+
+    def stop(self, timeout: float = 5.0):
+        """Davom etayotgan sinovni to'xtatish (model yuklanayotgan bo'lsa timeout'dan ortiq kutilmaydi)"""
+        with self._lock:
+            thread = self._cancel_rollout()
+        if thread is not None:
+            thread.join(timeout)
+            if thread.is_alive():
+                logger.warning(f"Kandidat model thread'i {timeout:g}s ichida to'xtamadi")
@@ -0,0 +1,151 @@
+"""
+Tezlik va trayektoriya - polygon burchaklaridan gomografiya va tracklar uchun ring buffer
+"""
+import cv2
+import numpy as np
+from typing import Optional, Tuple
+from railcore.logging_setup import setup_logger
+
+logger = setup_logger(__name__)
+
+class PolygonCalibration:
+    """Polygon burchaklari va haqiqiy o'lchamlari bo'yicha piksel -> metr gomografiyasi"""
+
+    def __init__(self, polygon_points: np.ndarray, length: float, width: float = 0.0):
+        """
+        Burchaklar p0, p1, p2, p3 tartibida: p0-p1 va p3-p2 - kesishma kengligi bo'ylab,
+        p0 -> p3 - harakat yo'nalishi (polygon_length) bo'ylab.
+
+        Args:
+            polygon_points: Polygon nuqtalari (N, 2); 4 tadan ko'p bo'lsa minimal to'rtburchak olinadi
+            length: Polygon uzunligi (metr, harakat yo'nalishi bo'ylab)
+            width: Polygon kengligi (metr, 0 = noma'lum - faqat uzunlik o'qi ishlatiladi)
+        """
+        corners = np.asarray(polygon_points, dtype=np.float32).reshape(-1, 2)
+        if len(corners) != 4:
+            corners = cv2.boxPoints(cv2.minAreaRect(corners)).astype(np.float32)
+            logger.warning(f"Polygon {len(polygon_points)} nuqtali - kalibrovka uchun minimal to'rtburchak olindi")
+
+        self.length = float(length)
+        self.width = float(width)
+        # Kenglik noma'lum bo'lsa ko'ndalang o'q 1 metr deb olinadi va tezlikka qo'shilmaydi
+        span = self.width if self.width > 0 else 1.0
+        target = np.array([[0, 0], [span, 0], [span, self.length], [0, self.length]], dtype=np.float32)
+        self.homography = cv2.getPerspectiveTransform(corners, target)
+
+    def to_world(self, points: np.ndarray) -> np.ndarray:
+        """
+        Piksel nuqtalarini polygon tekisligidagi metrlarga o'tkazish
+
+        Args:
+            points: Piksel koordinatalari (N, 2)
+
+        Returns:
+            np.ndarray: (N, 2) - (ko'ndalang, uzunlik bo'ylab) metrlar
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        h = self.homography
+        w = points @ h[2, :2] + h[2, 2]
+        x = (points @ h[0, :2] + h[0, 2]) / w
+        y = (points @ h[1, :2] + h[1, 2]) / w
+        if self.width <= 0:
+            x = np.zeros_like(x)
+        return np.stack([x, y], axis=1)
+
+class TrajectoryBuffer:
+    """Har bir track sloti uchun oxirgi K ta (vaqt, x, y) nuqtadan iborat ring buffer"""
+
+    def __init__(self, size: int = 16, capacity: int = 64):
+        """
+        Args:
+            size: Bitta track uchun saqlanadigan nuqtalar soni
+            capacity: Boshlang'ich slotlar soni (TrackTable bilan birga o'sadi)
+        """
+        self.size = max(2, int(size))
+        self.capacity = 0
+        self.times = np.zeros((0, self.size), dtype=np.float64)
+        self.points = np.zeros((0, self.size, 2), dtype=np.float64)
+        self.count = np.zeros(0, dtype=np.int32)
+        self.head = np.zeros(0, dtype=np.int32)
+        self.ensure_capacity(capacity)
+
+    def ensure_capacity(self, capacity: int):
+        """Slotlar sonini TrackTable sig'imiga moslash"""
+        if capacity <= self.capacity:
+            return
+        old = self.capacity
+        for name in ('times', 'points', 'count', 'head'):
+            column = getattr(self, name)
+            grown = np.zeros((capacity,) + column.shape[1:], dtype=column.dtype)
+            grown[:old] = column
+            setattr(self, name, grown)
+        self.capacity = capacity
+
+    def reset(self, slots: np.ndarray):
+        """Yangi (yoki qayta ishlatilgan) slotlar tarixini tozalash"""
+        self.count[slots] = 0
+        self.head[slots] = 0
+
+    def push(self, slots: np.ndarray, current_time: float, points: np.ndarray):
+        """
+        Slotlarga bittadan nuqta qo'shish (slotlar takrorlanmasligi kerak)
+
+        Args:
+            slots: Slot indekslari (N)
+            current_time: Vaqt (sekund)
+            points: Metrdagi koordinatalar (N, 2)
+        """
+        heads = self.head[slots]
+        self.times[slots, heads] = current_time
+        self.points[slots, heads] = points
+        self.head[slots] = (heads + 1) % self.size
+        self.count[slots] = np.minimum(self.count[slots] + 1, self.size)
+
+    def velocity(self, slots: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Oyna bo'yicha eng kichik kvadratlar bilan silliqlangan tezlik vektori
+
+        Args:
+            slots: Slot indekslari (N)
+
+        Returns:
+            Tuple: (vx, vy m/s, nuqtalar soni); nuqta 2 tadan kam bo'lsa tezlik 0
+        """
+        count = self.count[slots]
+        valid = np.arange(self.size)[None, :] < count[:, None]
+        # Ring buffer tartibi ahamiyatsiz - regressiya nuqtalar to'plami bo'yicha
+        t = self.times[slots]
+        p = self.points[slots]
+        n = np.maximum(count, 1)[:, None]
+
+        t_mean = np.where(valid, t, 0.0).sum(axis=1, keepdims=True) / n
+        dt = np.where(valid, t - t_mean, 0.0)
+        var_t = (dt * dt).sum(axis=1)
+
+        p_mean = np.where(valid[:, :, None], p, 0.0).sum(axis=1) / n
+        dp = np.where(valid[:, :, None], p - p_mean[:, None, :], 0.0)
+        cov = (dt[:, :, None] * dp).sum(axis=1)
+
+        ok = (count >= 2) & (var_t > 0)
+        velocity = np.zeros((len(slots), 2))
+        velocity[ok] = cov[ok] / var_t[ok, None]
+        return velocity[:, 0], velocity[:, 1], count
+
+    def last_point(self, slots: np.ndarray) -> np.ndarray:
+        """Har bir slotning oxirgi nuqtasi (N, 2)"""
+        return self.points[slots, (self.head[slots] - 1) % self.size]
+
+def create_calibration(polygon_utils, processing) -> Optional[PolygonCalibration]:
+    """
+    ProcessingConfig bo'yicha kalibrovka yaratish
+
+    Args:
+        polygon_utils: PolygonUtils (polygon_points)
+        processing: ProcessingConfig (polygon_length, polygon_width)
+
+    Returns:
+        PolygonCalibration yoki None (polygon_length sozlanmagan)
+    """
+    if not processing.polygon_length or processing.polygon_length <= 0:
+        return None
+    return PolygonCalibration(polygon_utils.polygon_points, processing.polygon_length, processing.polygon_width)
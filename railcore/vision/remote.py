@@ -0,0 +1,699 @@
+"""
+Masofaviy inference - kuchsiz edge qurilmadagi kameralar uchun detector yaqindagi server'da
+
+Mijoz (RemoteDetector) frame'ni kichraytirib (max_side) JPEG yoki siqishsiz (raw) ko'rinishda
+TCP yoki Unix socket orqali yuboradi va faqat box'larni qaytarib oladi. Tracking (BYTETracker)
+kamera jarayonida qoladi - server holatsiz, bir nechta mijozga xizmat qiladi.
+
+Protokol (binary, big-endian sarlavha):
+    so'rov:  MAGIC, MSG_INFER, encoding, request_id, width, height, payload_size + payload
+    javob:   MAGIC, MSG_RESULT, 0, request_id, count, server_ms + count x DETECTION
+    xato:    MAGIC, MSG_ERROR, 0, request_id, size, 0 + UTF-8 xabar
+
+Bitta ulanishda so'rovlar pipeline qilinadi: mijoz javobni kutmasdan keyingi so'rovni
+yuboradi (shu jarayondagi barcha kameralar bitta ulanishni bo'lishadi), javoblar request_id
+bo'yicha ajratiladi. Server so'rovlarni batch_wait_ms davomida max_batch tagacha yig'ib bitta
+predict() bilan ishlaydi.
+
+Javob timeout_ms ichida kelmasa yoki ulanish uzilsa kamera retry_seconds davomida lokal
+model bilan ishlaydi (local_fallback), so'ng server qayta sinab ko'riladi.
+
+Server:
+    python -m railcore.vision.remote --config config/config.yaml [--listen unix:/tmp/railsafe-infer.sock]
+"""
+import os
+import time
+import queue
+import socket
+import struct
+import argparse
+import threading
+import cv2
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from railcore.types import DetectionResult, ExecutionConfig, ModelConfig, RemoteInferenceConfig
+from railcore.vision.execution import ExecutionProfile
+from railcore.vision.tiling import ByteTrackAdapter
+from railcore.logging_setup import setup_logger
+
+logger = setup_logger(__name__)
+
+MAGIC = b'RSI1'
+MSG_INFER = 1
+MSG_RESULT = 2
+MSG_ERROR = 3
+
+ENCODING_RAW = 0
+ENCODING_JPEG = 1
+
+_REQUEST = struct.Struct('!4sBBIHHI')  # magic, type, encoding, request_id, width, height, payload_size
+_RESPONSE = struct.Struct('!4sBBIIf')  # magic, type, reserved, request_id, count/size, server_ms
+
+MAX_PAYLOAD = 64 * 1024 * 1024  # So'rov payload'i chegarasi (server shundan kattasini o'qimaydi)
+JPEG_OVERHEAD = 4096  # Kichik rasmlarda JPEG sarlavhasi siqishsiz hajmdan oshishi mumkin
+
+DETECTION = np.dtype([('box', '<f4', (4,)), ('conf', '<f4'), ('cls', '<i4')])
+
+def parse_endpoint(address: str) -> Tuple[int, object]:
+    """
+    'host:port' yoki 'unix:/yo'l' manzilini socket oilasi va manzilga aylantirish
+
+    Raises:
+        ValueError: Manzil noto'g'ri
+    """
+    if address.startswith('unix:'):
+        return socket.AF_UNIX, address[len('unix:'):]
+    host, _, port = address.rpartition(':')
+    if not host or not port.isdigit():
+        raise ValueError(f"Noto'g'ri manzil: {address} ('host:port' yoki 'unix:/yo'l')")
+    return socket.AF_INET, (host, int(port))
+
+def _recv_exact(sock: socket.socket, size: int) -> bytearray:
+    """Aynan size bayt o'qish (ulanish yopilsa ConnectionError)"""
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:])
+        if count == 0:
+            raise ConnectionError("ulanish yopildi")
+        received += count
+    return buffer
+
+def encode_frame(frame: np.ndarray, config: RemoteInferenceConfig) -> Tuple[int, bytes, int, int]:
+    """
+    Frame'ni yuborish uchun tayyorlash (kichraytirish va siqish)
+
+    Returns:
+        Tuple: (encoding, payload, width, height) - width/height yuborilgan rasm o'lchami
+    """
+    height, width = frame.shape[:2]
+    longest = max(width, height)
+    if 0 < config.max_side < longest:
+        ratio = config.max_side / longest
+        frame = cv2.resize(frame, (max(1, round(width * ratio)), max(1, round(height * ratio))),
+                           interpolation=cv2.INTER_AREA)
+        height, width = frame.shape[:2]
+    if config.encoding == 'raw':
+        return ENCODING_RAW, np.ascontiguousarray(frame).tobytes(), width, height
+    success, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, config.jpeg_quality])
+    if not success:
+        raise ValueError("JPEG encode xato")
+    return ENCODING_JPEG, buffer.tobytes(), width, height
+
+def payload_limit(encoding: int, width: int, height: int) -> int:
+    """
+    So'rov sarlavhasidagi o'lcham uchun ruxsat etilgan maksimal payload (o'qishdan oldin tekshiriladi)
+
+    Raises:
+        ValueError: O'lcham yoki encoding noto'g'ri
+    """
+    if width == 0 or height == 0:
+        raise ValueError(f"noto'g'ri o'lcham: {width}x{height}")
+    raw = width * height * 3
+    if encoding == ENCODING_RAW:
+        limit = raw
+    elif encoding == ENCODING_JPEG:
+        limit = raw + JPEG_OVERHEAD
+    else:
+        raise ValueError(f"Noma'lum encoding: {encoding}")
+    return min(limit, MAX_PAYLOAD)
+
+def decode_frame(encoding: int, payload: bytes, width: int, height: int) -> np.ndarray:
+    """
+    Kelgan payload'ni BGR rasmga aylantirish
+
+    Raises:
+        ValueError: Payload buzilgan yoki encoding noma'lum
+    """
+    if encoding == ENCODING_RAW:
+        if len(payload) != width * height * 3:
+            raise ValueError(f"raw payload o'lchami noto'g'ri: {len(payload)} != {width}x{height}x3")
+        return np.frombuffer(payload, np.uint8).reshape(height, width, 3)
+    if encoding == ENCODING_JPEG:
+        image = cv2.imdecode(np.frombuffer(payload, np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            raise ValueError("JPEG decode xato")
+        return image
+    raise ValueError(f"Noma'lum encoding: {encoding}")
+
+def _empty_detections() -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    return np.empty((0, 4), np.float32), np.empty(0, np.float32), np.empty(0, int)
+
+class _Pending:
+    """Javob kutilayotgan so'rov"""
+
+    __slots__ = ('request_id', 'scale_x', 'scale_y', 'event', 'detections', 'error', 'server_ms')
+
+    def __init__(self, request_id: int, scale_x: float, scale_y: float):
+        self.request_id = request_id
+        self.scale_x = scale_x
+        self.scale_y = scale_y
+        self.event = threading.Event()
+        self.detections: Optional[np.ndarray] = None
+        self.error: Optional[str] = None
+        self.server_ms = 0.0
+
+class RemoteClient:
+    """Inference server'ga bitta pipeline qilingan ulanish (jarayondagi barcha kameralar uchun umumiy)"""
+
+    def __init__(self, config: RemoteInferenceConfig):
+        """
+        Args:
+            config: Masofaviy inference konfiguratsiyasi
+        """
+        self.config = config
+        self.family, self.target = parse_endpoint(config.address)
+        self.sock: Optional[socket.socket] = None
+        self.pending: Dict[int, _Pending] = {}
+        self._lock = threading.Lock()
+        self._connect_lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._next_id = 0
+        self.down_until = 0.0
+        self.running = True
+
+    def _open(self) -> socket.socket:
+        sock = socket.socket(self.family, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(self.config.connect_timeout)
+            sock.connect(self.target)
+            sock.settimeout(None)
+            if self.family == socket.AF_INET:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            # Server band bo'lsa (backpressure) yuborish timeout'dan ortiq to'xtab qolmasin
+            seconds = self.config.timeout_ms / 1000.0
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDTIMEO,
+                            struct.pack('ll', int(seconds), int((seconds % 1) * 1e6)))
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def _connection(self) -> Optional[socket.socket]:
+        """Joriy ulanish (kerak bo'lsa ulanadi; server chetlab o'tilayotgan bo'lsa None)"""
+        sock = self.sock
+        if sock is not None or not self.running or time.monotonic() < self.down_until:
+            return sock
+        with self._connect_lock:
+            if self.sock is not None:
+                return self.sock
+            if time.monotonic() < self.down_until:
+                return None
+            try:
+                sock = self._open()
+            except OSError as e:
+                self.down_until = time.monotonic() + self.config.retry_seconds
+                logger.warning(f"Inference server'ga ulanib bo'lmadi ({self.config.address}): {e}. "
+                               f"{self.config.retry_seconds:g}s dan keyin qayta urinish")
+                return None
+            self.sock = sock
+            threading.Thread(target=self._read_loop, args=(sock,), daemon=True).start()
+            logger.info(f"Inference server'ga ulandi: {self.config.address}")
+            return sock
+
+    def submit(self, frame: np.ndarray) -> Optional[_Pending]:
+        """
+        Frame'ni yuborish (javobni kutmasdan)
+
+        Returns:
+            _Pending yoki None (ulanish yo'q yoki javobsiz so'rovlar chegarasi to'lgan)
+        """
+        sock = self._connection()
+        if sock is None or len(self.pending) >= self.config.max_inflight:
+            return None
+
+        height, width = frame.shape[:2]
+        encoding, payload, sent_width, sent_height = encode_frame(frame, self.config)
+        with self._lock:
+            self._next_id = (self._next_id + 1) & 0xFFFFFFFF
+            pending = _Pending(self._next_id, width / sent_width, height / sent_height)
+            self.pending[pending.request_id] = pending
+
+        header = _REQUEST.pack(MAGIC, MSG_INFER, encoding, pending.request_id, sent_width, sent_height, len(payload))
+        try:
+            with self._send_lock:
+                sock.sendall(header)
+                sock.sendall(payload)
+        except OSError as e:
+            self._disconnect(sock, e)
+        return pending
+
+    def cancel(self, pending: _Pending):
+        """Javobi endi kerak bo'lmagan so'rov (kech kelgan javob tashlab yuboriladi)"""
+        with self._lock:
+            self.pending.pop(pending.request_id, None)
+
+    def _read_loop(self, sock: socket.socket):
+        """Javoblarni o'qish va kutayotgan so'rovlarga tarqatish"""
+        try:
+            while True:
+                magic, kind, _, request_id, count, server_ms = _RESPONSE.unpack(_recv_exact(sock, _RESPONSE.size))
+                if magic != MAGIC or kind not in (MSG_RESULT, MSG_ERROR):
+                    raise ValueError("server'dan noto'g'ri javob")
+                if kind == MSG_RESULT:
+                    detections = np.frombuffer(_recv_exact(sock, count * DETECTION.itemsize), DETECTION)
+                    error = None
+                else:
+                    detections = None
+                    error = bytes(_recv_exact(sock, count)).decode('utf-8', 'replace')
+                with self._lock:
+                    pending = self.pending.pop(request_id, None)
+                if pending is None:
+                    continue
+                pending.detections = detections
+                pending.error = error
+                pending.server_ms = server_ms
+                pending.event.set()
+        except (OSError, ValueError) as e:
+            self._disconnect(sock, e)
+
+    def _disconnect(self, sock: socket.socket, error: Exception):
+        """Ulanishni yopish va javob kutayotgan so'rovlarni xato bilan tugatish"""
+        with self._lock:
+            current = self.sock is sock
+            if current:
+                self.sock = None
+                failed = list(self.pending.values())
+                self.pending.clear()
+            else:
+                failed = []
+        if current:
+            self.down_until = time.monotonic() + self.config.retry_seconds
+            if self.running:
+                logger.warning(f"Inference server bilan ulanish uzildi ({self.config.address}): {error}")
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        sock.close()
+        for pending in failed:
+            pending.error = f"ulanish uzildi: {error}"
+            pending.event.set()
+
+    def close(self):
+        """Ulanishni yopish"""
+        self.running = False
+        sock = self.sock
+        if sock is not None:
+            self._disconnect(sock, ConnectionError("mijoz yopildi"))
+
+class RemoteDetector:
+    """Masofaviy inference + lokal BYTETracker (YOLODetector bilan bir xil detect() interfeysi)"""
+
+    def __init__(self,
+                 client: RemoteClient,
+                 model_config: ModelConfig,
+                 camera_id: int,
+                 frame_rate: float,
+                 fallback=None,
+                 execution=None,
+                 tracker=None):
+        """
+        Args:
+            client: Umumiy RemoteClient
+            model_config: Model konfiguratsiyasi (klass nomlari, lokal inference parametrlari)
+            camera_id: Kamera ID
+            frame_rate: Video FPS (tracker bufferi uchun)
+            fallback: Lokal YOLODetector (None - timeout'da frame o'tkazib yuboriladi)
+            execution: Bajarilish profili (fallback bo'lmasa; standart - device avtomatik tanlanadi)
+            tracker: update(boxes, scores, class_ids, frame) obyekti (standart - ByteTrackAdapter)
+        """
+        self.client = client
+        self.config = model_config
+        self.camera_id = camera_id
+        self.fallback = fallback
+        if fallback is not None:
+            self.execution = fallback.execution
+        else:
+            self.execution = execution if execution is not None else ExecutionProfile()
+        self.tracker = tracker if tracker is not None else ByteTrackAdapter(frame_rate)
+        self.timeout = client.config.timeout_ms / 1000.0
+        self.local_until = 0.0
+
+        # Statistika
+        self.remote_frames = 0
+        self.local_frames = 0
+        self.skipped_frames = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.rtt_ema: Optional[float] = None
+        self.server_ema: Optional[float] = None
+
+    # YOLODetector bilan mos atributlar
+    @property
+    def load_seconds(self) -> float:
+        return self.fallback.load_seconds if self.fallback is not None else 0.0
+
+    @property
+    def warmup_seconds(self) -> float:
+        return self.fallback.warmup_seconds if self.fallback is not None else 0.0
+
+    def _use_local(self, reason: str):
+        """Server'ni retry_seconds davomida chetlab o'tish"""
+        self.local_until = time.monotonic() + self.client.config.retry_seconds
+        mode = "lokal inference" if self.fallback is not None else "frame'lar o'tkazib yuboriladi"
+        logger.warning(f"Kamera {self.camera_id}: masofaviy inference - {reason}. "
+                       f"{self.client.config.retry_seconds:g}s {mode}")
+
+    def _detect_remote(self, frame: np.ndarray) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Server'dan box'lar (frame koordinatalarida) yoki None"""
+        start = time.monotonic()
+        pending = self.client.submit(frame)
+        if pending is None:
+            return None
+        if not pending.event.wait(self.timeout):
+            self.client.cancel(pending)
+            self.timeouts += 1
+            self._use_local(f"javob {self.client.config.timeout_ms:.0f} ms ichida kelmadi")
+            return None
+        if pending.error is not None:
+            self.errors += 1
+            self._use_local(pending.error)
+            return None
+
+        rtt = (time.monotonic() - start) * 1000
+        self.rtt_ema = rtt if self.rtt_ema is None else self.rtt_ema + 0.1 * (rtt - self.rtt_ema)
+        self.server_ema = pending.server_ms if self.server_ema is None else \
+            self.server_ema + 0.1 * (pending.server_ms - self.server_ema)
+        self.remote_frames += 1
+
+        detections = pending.detections
+        boxes = detections['box'].copy()
+        boxes[:, [0, 2]] *= pending.scale_x
+        boxes[:, [1, 3]] *= pending.scale_y
+        return boxes, detections['conf'].copy(), detections['cls'].astype(int)
+
+    def _detect_local(self, frame: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Lokal model bilan box'lar"""
+        detector = self.fallback
+        with detector.execution.autocast():
+            boxes = detector.model.predict(
+                frame,
+                classes=self.config.target_classes,
+                conf=self.config.conf,
+                iou=self.config.iou,
+                imgsz=self.config.imgsz,
+                verbose=False,
+                **detector.execution.predict_args()
+            )[0].boxes
+        if boxes is None or len(boxes) == 0:
+            return _empty_detections()
+        return (boxes.xyxy.detach().cpu().numpy().astype(np.float32),
+                boxes.conf.detach().cpu().numpy().astype(np.float32),
+                boxes.cls.detach().cpu().numpy().astype(int))
+
+    def detect(self, frame: np.ndarray) -> Optional[DetectionResult]:
+        """
+        Frame'da detection (server'da yoki lokal) va tracking
+
+        Args:
+            frame: Input frame
+
+        Returns:
+            DetectionResult yoki None
+        """
+        try:
+            detections = None
+            if time.monotonic() >= self.local_until:
+                detections = self._detect_remote(frame)
+            if detections is None:
+                if self.fallback is None:
+                    self.skipped_frames += 1
+                    return None
+                detections = self._detect_local(frame)
+                self.local_frames += 1
+            return self.tracker.update(*detections, frame)
+        except Exception as e:
+            logger.error(f"Kamera {self.camera_id} masofaviy detection xato: {e}")
+            return None
+
+    def get_stats(self) -> dict:
+        """
+        Masofaviy inference statistikasi
+
+        Returns:
+            dict: remote_frames, local_frames, skipped_frames, timeouts, errors, rtt_ms, server_ms
+        """
+        return {
+            'remote_frames': self.remote_frames,
+            'local_frames': self.local_frames,
+            'skipped_frames': self.skipped_frames,
+            'timeouts': self.timeouts,
+            'errors': self.errors,
+            'rtt_ms': round(self.rtt_ema, 1) if self.rtt_ema is not None else None,
+            'server_ms': round(self.server_ema, 1) if self.server_ema is not None else None,
+        }
+
+    def get_class_name(self, class_id: int) -> str:
+        return self.config.class_names.get(str(class_id), f"class_{class_id}")
+
+class _ClientConnection:
+    """Server tomonidagi mijoz ulanishi (javoblar batch thread'idan yuboriladi)"""
+
+    def __init__(self, sock: socket.socket, peer: str):
+        self.sock = sock
+        self.peer = peer
+        self._send_lock = threading.Lock()
+
+    def _send(self, header: bytes, payload: bytes):
+        try:
+            with self._send_lock:
+                self.sock.sendall(header)
+                if payload:
+                    self.sock.sendall(payload)
+        except OSError:
+            pass  # Mijoz ketgan - o'qish thread'i ulanishni yopadi
+
+    def send_result(self, request_id: int, detections: np.ndarray, server_ms: float):
+        self._send(_RESPONSE.pack(MAGIC, MSG_RESULT, 0, request_id, len(detections), server_ms),
+                   detections.tobytes())
+
+    def send_error(self, request_id: int, message: str):
+        payload = message.encode('utf-8')
+        self._send(_RESPONSE.pack(MAGIC, MSG_ERROR, 0, request_id, len(payload), 0.0), payload)
+
+    def close(self):
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+class InferenceServer:
+    """Mijozlardan kelgan frame'larni batch qilib inference qiladigan server"""
+
+    def __init__(self, detector, config: RemoteInferenceConfig):
+        """
+        Args:
+            detector: YOLODetector (model, ModelConfig va bajarilish profili shundan olinadi)
+            config: Masofaviy inference konfiguratsiyasi (listen, max_batch, batch_wait_ms)
+        """
+        self.detector = detector
+        self.model = detector.model
+        self.model_config: ModelConfig = detector.config
+        self.execution = detector.execution
+        self.config = config
+        self.family, self.target = parse_endpoint(config.listen)
+        # Chegaralangan navbat: server ulgurmasa o'qish to'xtaydi (TCP backpressure) va mijozlar
+        # timeout'dan keyin lokal inference'ga o'tadi
+        self.queue: queue.Queue = queue.Queue(maxsize=max(1, config.max_batch) * 4)
+        self.sock: Optional[socket.socket] = None
+        self.running = False
+        self.threads: List[threading.Thread] = []
+
+        # Statistika
+        self.requests = 0
+        self.batches = 0
+        self.errors = 0
+        self.clients = 0
+        self.batch_ms_ema: Optional[float] = None
+
+    def start(self) -> 'InferenceServer':
+        """Socket'ni ochish va thread'larni ishga tushirish"""
+        if self.family == socket.AF_UNIX and os.path.exists(self.target):
+            os.unlink(self.target)  # Oldingi jarayondan qolgan socket fayli
+        sock = socket.socket(self.family, socket.SOCK_STREAM)
+        if self.family == socket.AF_INET:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(self.target)
+        sock.listen(64)
+        self.sock = sock
+        self.running = True
+        self.threads = [
+            threading.Thread(target=self._accept_loop, daemon=True),
+            threading.Thread(target=self._batch_loop, daemon=True),
+        ]
+        for thread in self.threads:
+            thread.start()
+        logger.info(f"Inference server: {self.address} (batch <= {self.config.max_batch}, "
+                    f"kutish {self.config.batch_wait_ms:g} ms, {self.execution.describe()})")
+        return self
+
+    @property
+    def address(self) -> str:
+        """Tinglanayotgan manzil (port 0 bo'lsa haqiqiy port bilan)"""
+        if self.family == socket.AF_UNIX:
+            return f"unix:{self.target}"
+        host, port = self.sock.getsockname()[:2]
+        return f"{host}:{port}"
+
+    def _accept_loop(self):
+        while self.running:
+            try:
+                sock, peer = self.sock.accept()
+            except OSError:
+                break
+            if self.family == socket.AF_INET:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            client = _ClientConnection(sock, str(peer) if peer else 'unix')
+            threading.Thread(target=self._read_loop, args=(client,), daemon=True).start()
+
+    def _read_loop(self, client: _ClientConnection):
+        """Mijoz so'rovlarini o'qish, decode qilish va navbatga qo'yish (javobni kutmasdan)"""
+        self.clients += 1
+        logger.info(f"Inference mijozi ulandi: {client.peer}")
+        try:
+            while self.running:
+                magic, kind, encoding, request_id, width, height, size = \
+                    _REQUEST.unpack(_recv_exact(client.sock, _REQUEST.size))
+                if magic != MAGIC or kind != MSG_INFER:
+                    raise ValueError("noto'g'ri so'rov")
+                # Payload o'qilmasdan oldin: sarlavhadagi hajm bilan xotira ajratilmaydi
+                limit = payload_limit(encoding, width, height)
+                if size > limit:
+                    self.errors += 1
+                    raise ValueError(f"payload juda katta: {size} > {limit} bayt ({width}x{height})")
+                payload = _recv_exact(client.sock, size)
+                try:
+                    image = decode_frame(encoding, payload, width, height)
+                except ValueError as e:
+                    self.errors += 1
+                    client.send_error(request_id, str(e))
+                    continue
+                self.queue.put((client, request_id, image))
+        except (OSError, ValueError) as e:
+            if self.running:
+                logger.info(f"Inference mijozi uzildi ({client.peer}): {e}")
+        finally:
+            self.clients -= 1
+            client.close()
+
+    def _batch_loop(self):
+        """Navbatdan batch yig'ib inference qilish"""
+        self.execution.bind_thread()
+        wait = self.config.batch_wait_ms / 1000.0
+        while self.running:
+            try:
+                batch = [self.queue.get(timeout=0.5)]
+            except queue.Empty:
+                continue
+            deadline = time.monotonic() + wait
+            while len(batch) < self.config.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._run_batch(batch)
+
+    def _run_batch(self, batch: List[tuple]):
+        start = time.perf_counter()
+        try:
+            with self.execution.autocast():
+                results = self.model.predict(
+                    [image for _, _, image in batch],
+                    classes=self.model_config.target_classes,
+                    conf=self.model_config.conf,
+                    iou=self.model_config.iou,
+                    imgsz=self.model_config.imgsz,
+                    verbose=False,
+                    **self.execution.predict_args()
+                )
+        except Exception as e:
+            logger.error(f"Inference server: batch ({len(batch)} ta) xato: {e}")
+            self.errors += len(batch)
+            for client, request_id, _ in batch:
+                client.send_error(request_id, f"inference xato: {e}")
+            return
+
+        elapsed = (time.perf_counter() - start) * 1000
+        for (client, request_id, _), result in zip(batch, results):
+            client.send_result(request_id, self._pack(result), elapsed)
+        self.requests += len(batch)
+        self.batches += 1
+        self.batch_ms_ema = elapsed if self.batch_ms_ema is None else self.batch_ms_ema + 0.1 * (elapsed - self.batch_ms_ema)
+
+    @staticmethod
+    def _pack(result) -> np.ndarray:
+        """ultralytics natijasini DETECTION massiviga"""
+        boxes = result.boxes
+        if boxes is None or len(boxes) == 0:
+            return np.empty(0, DETECTION)
+        packed = np.empty(len(boxes), DETECTION)
+        packed['box'] = boxes.xyxy.detach().cpu().numpy()
+        packed['conf'] = boxes.conf.detach().cpu().numpy()
+        packed['cls'] = boxes.cls.detach().cpu().numpy()
+        return packed
+
+    def get_stats(self) -> dict:
+        """
+        Server statistikasi
+
+        Returns:
+            dict: clients, requests, batches, mean_batch, batch_ms, errors, queued
+        """
+        return {
+            'clients': self.clients,
+            'requests': self.requests,
+            'batches': self.batches,
+            'mean_batch': round(self.requests / self.batches, 2) if self.batches else 0.0,
+            'batch_ms': round(self.batch_ms_ema, 1) if self.batch_ms_ema is not None else None,
+            'errors': self.errors,
+            'queued': self.queue.qsize(),
+        }
+
+    def stop(self):
+        """Server'ni to'xtatish"""
+        self.running = False
+        if self.sock is not None:
+            try:
+                self.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self.sock.close()
+        for thread in self.threads:
+            thread.join(timeout=2.0)
+        if self.family == socket.AF_UNIX and os.path.exists(self.target):
+            os.unlink(self.target)
+        logger.info(f"Inference server to'xtatildi: {self.get_stats()}")
+
+def main():
+    from railcore.config import load_config, parse_model
+    from railcore.vision.yolo_detector import YOLODetector
+
+    parser = argparse.ArgumentParser(description="RailSafe inference server")
+    parser.add_argument('--config', default='config/config.yaml')
+    parser.add_argument('--listen', help="config'dagi remote_inference.listen o'rniga")
+    parser.add_argument('--max-batch', type=int)
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    remote_config = RemoteInferenceConfig(**config.get('remote_inference', {}))
+    if args.listen:
+        remote_config.listen = args.listen
+    if args.max_batch:
+        remote_config.max_batch = args.max_batch
+
+    model_config = parse_model(config['model'])
+    execution = ExecutionProfile(ExecutionConfig(**config.get('execution', {})))
+    server = InferenceServer(YOLODetector(model_config, camera_id=-1, execution=execution), remote_config).start()
+    try:
+        while True:
+            time.sleep(60)
+            logger.info(f"Inference server: {server.get_stats()}")
+    except KeyboardInterrupt:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
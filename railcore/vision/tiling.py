@@ -0,0 +1,392 @@
+"""
+TiledDetector - uzoqdagi kichik avtomobillar uchun plitkali (tiled) inference
+
+Polygon atrofidagi hudud bir-birini qoplaydigan plitkalarga bo'linadi (tartib kamera
+uchun bir marta hisoblanadi). Barcha plitkalar bitta batch bilan predict() qilinadi,
+box'lar frame koordinatalariga o'tkaziladi va plitkalar orasidagi NMS bilan
+birlashtiriladi. Tracking ultralytics BYTETracker'i bilan alohida qilinadi
+(model.track() bitta rasm uchun).
+
+latency_budget_ms berilsa va plitkali inference byudjetdan oshsa bitta plitkaga
+(butun frame, oddiy rejim) o'tiladi; har fallback_frames frame'da plitkali rejim
+qayta sinab ko'riladi.
+"""
+import math
+import time
+import numpy as np
+from typing import List, Optional, Tuple
+from railcore.types import DetectionResult, ModelConfig, TilingConfig
+from railcore.vision.cascade import polygon_roi
+from railcore.logging_setup import setup_logger
+
+logger = setup_logger(__name__)
+
+_EDGE_MARGIN = 2  # Plitka chetiga shuncha pikseldan yaqin box kesilgan hisoblanadi
+
+def _axis_starts(start: int, end: int, tile: int, overlap: int, limit: int) -> List[int]:
+    """Bitta o'q bo'yicha plitkalar boshlanishi (oxirgisi hudud oxiriga tekislanadi)"""
+    length = end - start
+    if length <= tile:
+        # Hudud plitkadan kichik - plitka hudud markazida, frame ichida
+        center = (start + end) // 2
+        return [min(max(0, center - tile // 2), max(0, limit - tile))]
+    count = math.ceil((length - overlap) / (tile - overlap))
+    step = (length - tile) / max(1, count - 1)
+    return [start + int(round(i * step)) for i in range(count)]
+
+class TileLayout:
+    """Kamera uchun oldindan hisoblangan plitkalar tartibi"""
+
+    def __init__(self, roi: Tuple[int, int, int, int], frame_width: int, frame_height: int,
+                 tile_size: int, overlap: float, max_tiles: int):
+        """
+        Args:
+            roi: Qoplanadigan hudud (x1, y1, x2, y2)
+            frame_width: Frame kengligi
+            frame_height: Frame balandligi
+            tile_size: Plitka tomoni (manba piksellarida)
+            overlap: Qo'shni plitkalar qoplanishi (0..0.5, plitka o'lchamiga nisbatan)
+            max_tiles: Maksimal plitkalar soni (oshsa plitka kattalashtiriladi)
+        """
+        self.roi = roi
+        x1, y1, x2, y2 = roi
+        tile = min(tile_size, frame_width, frame_height)
+        while True:
+            step_overlap = int(tile * overlap)
+            xs = _axis_starts(x1, x2, min(tile, frame_width), step_overlap, frame_width)
+            ys = _axis_starts(y1, y2, min(tile, frame_height), step_overlap, frame_height)
+            if len(xs) * len(ys) <= max_tiles or tile >= max(frame_width, frame_height):
+                break
+            tile = int(tile * 1.25)
+
+        width, height = min(tile, frame_width), min(tile, frame_height)
+        self.tile_width = width
+        self.tile_height = height
+        self.tiles = np.array([[x, y, x + width, y + height] for y in ys for x in xs], dtype=np.int32)
+        self.offsets = self.tiles[:, :2].astype(np.float32)
+
+        # Frame chegarasiga to'g'ri kelmaydigan (ichki) plitka chetlari
+        self.inner_edges = np.stack([
+            self.tiles[:, 0] > 0,
+            self.tiles[:, 1] > 0,
+            self.tiles[:, 2] < frame_width,
+            self.tiles[:, 3] < frame_height,
+        ], axis=1)
+
+    def __len__(self) -> int:
+        return len(self.tiles)
+
+    def crops(self, frame: np.ndarray) -> List[np.ndarray]:
+        """Plitkalar (nusxasiz view)"""
+        return [frame[y1:y2, x1:x2] for x1, y1, x2, y2 in self.tiles]
+
+    def cut_mask(self, tile_index: int, boxes: np.ndarray) -> np.ndarray:
+        """
+        Plitkaning ichki chetiga tegib turgan (kesilgan) box'lar
+
+        Args:
+            tile_index: Plitka indeksi
+            boxes: Plitka koordinatalaridagi box'lar (N x 4)
+
+        Returns:
+            np.ndarray: N, bool
+        """
+        left, top, right, bottom = self.inner_edges[tile_index]
+        cut = np.zeros(len(boxes), dtype=bool)
+        if left:
+            cut |= boxes[:, 0] <= _EDGE_MARGIN
+        if top:
+            cut |= boxes[:, 1] <= _EDGE_MARGIN
+        if right:
+            cut |= boxes[:, 2] >= self.tile_width - _EDGE_MARGIN
+        if bottom:
+            cut |= boxes[:, 3] >= self.tile_height - _EDGE_MARGIN
+        return cut
+
+def merge_boxes(boxes: np.ndarray, scores: np.ndarray, class_ids: np.ndarray, cut: np.ndarray,
+                threshold: float, metric: str = 'ios') -> np.ndarray:
+    """
+    Plitkalar orasidagi NMS (klass bo'yicha)
+
+    Plitka chetida kesilgan box'lar to'liq box'lardan keyin ko'riladi - bitta avtomobilning
+    bo'lagi uning to'liq box'ini bosib ketmasligi uchun. metric='ios' (kesishma / kichik box
+    maydoni) bo'lak va to'liq box juftligini ham bir xil obyekt deb topadi.
+
+    Args:
+        boxes: N x 4 (x1, y1, x2, y2)
+        scores: N
+        class_ids: N
+        cut: N, plitka chetida kesilgan
+        threshold: Bostirish chegarasi
+        metric: 'ios' yoki 'iou'
+
+    Returns:
+        np.ndarray: Qoldirilgan indekslar
+    """
+    if len(boxes) == 0:
+        return np.empty(0, dtype=np.int64)
+    order = np.lexsort((-scores, cut))
+    areas = np.maximum(0, boxes[:, 2] - boxes[:, 0]) * np.maximum(0, boxes[:, 3] - boxes[:, 1])
+    suppressed = np.zeros(len(boxes), dtype=bool)
+    keep = []
+    for position, i in enumerate(order):
+        if suppressed[i]:
+            continue
+        keep.append(i)
+        rest = order[position + 1:]
+        rest = rest[~suppressed[rest] & (class_ids[rest] == class_ids[i])]
+        if len(rest) == 0:
+            continue
+        w = np.minimum(boxes[i, 2], boxes[rest, 2]) - np.maximum(boxes[i, 0], boxes[rest, 0])
+        h = np.minimum(boxes[i, 3], boxes[rest, 3]) - np.maximum(boxes[i, 1], boxes[rest, 1])
+        inter = np.maximum(0, w) * np.maximum(0, h)
+        if metric == 'iou':
+            overlap = inter / np.maximum(areas[i] + areas[rest] - inter, 1e-6)
+        else:
+            overlap = inter / np.maximum(np.minimum(areas[i], areas[rest]), 1e-6)
+        suppressed[rest[overlap > threshold]] = True
+    return np.asarray(keep, dtype=np.int64)
+
+class _TrackerInput:
+    """BYTETracker.update() kutadigan Boxes interfeysi (numpy massivlar ustida)"""
+
+    def __init__(self, xyxy: np.ndarray, conf: np.ndarray, cls: np.ndarray):
+        self.xyxy = xyxy
+        self.conf = conf
+        self.cls = cls
+
+    @property
+    def xywh(self) -> np.ndarray:
+        xywh = np.empty_like(self.xyxy)
+        xywh[:, 0] = (self.xyxy[:, 0] + self.xyxy[:, 2]) * 0.5
+        xywh[:, 1] = (self.xyxy[:, 1] + self.xyxy[:, 3]) * 0.5
+        xywh[:, 2] = self.xyxy[:, 2] - self.xyxy[:, 0]
+        xywh[:, 3] = self.xyxy[:, 3] - self.xyxy[:, 1]
+        return xywh
+
+    def __len__(self) -> int:
+        return len(self.conf)
+
+    def __getitem__(self, index) -> '_TrackerInput':
+        return _TrackerInput(self.xyxy[index], self.conf[index], self.cls[index])
+
+class ByteTrackAdapter:
+    """Birlashtirilgan deteksiyalar uchun ultralytics BYTETracker"""
+
+    def __init__(self, frame_rate: float, tracker_config: str = 'bytetrack.yaml'):
+        from ultralytics.trackers.byte_tracker import BYTETracker
+        from ultralytics.utils import IterableSimpleNamespace, yaml_load
+        from ultralytics.utils.checks import check_yaml
+
+        args = IterableSimpleNamespace(**yaml_load(check_yaml(tracker_config)))
+        self.tracker = BYTETracker(args=args, frame_rate=int(round(frame_rate)))
+
+    def update(self, boxes: np.ndarray, scores: np.ndarray, class_ids: np.ndarray,
+               frame: np.ndarray) -> Optional[DetectionResult]:
+        """
+        Tracker'ni yangilash
+
+        Returns:
+            DetectionResult (track ID bilan) yoki None
+        """
+        tracks = self.tracker.update(_TrackerInput(boxes, scores, class_ids.astype(np.float32)), frame)
+        if tracks is None or len(tracks) == 0:
+            return None
+        return DetectionResult(
+            boxes=tracks[:, :4].astype(np.float32),
+            track_ids=tracks[:, 4].astype(int),
+            class_ids=tracks[:, 6].astype(int),
+            confidences=tracks[:, 5].astype(np.float32)
+        )
+
+class TiledDetector:
+    """YOLODetector ustidan plitkali inference + BYTETracker (detect() interfeysi bir xil)"""
+
+    def __init__(self,
+                 detector,
+                 config: TilingConfig,
+                 polygon_points: np.ndarray,
+                 frame_width: int,
+                 frame_height: int,
+                 frame_rate: float,
+                 tracker=None):
+        """
+        Args:
+            detector: YOLODetector (model va ModelConfig shundan olinadi)
+            config: Plitkalash konfiguratsiyasi
+            polygon_points: Polygon nuqtalari (N, 2)
+            frame_width: Frame kengligi
+            frame_height: Frame balandligi
+            frame_rate: Video FPS (tracker bufferi uchun)
+            tracker: update(boxes, scores, class_ids, frame) obyekti (standart - ByteTrackAdapter)
+        """
+        self.detector = detector
+        self.model = detector.model
+        self.model_config: ModelConfig = detector.config
+        self.camera_id = detector.camera_id
+        self.config = config
+        self.frame_width = frame_width
+        self.frame_height = frame_height
+        self.tracker = tracker if tracker is not None else ByteTrackAdapter(frame_rate)
+        self.set_polygon(polygon_points)
+
+        # Byudjet holati
+        self.tiled_ema: Optional[float] = None  # Plitkali inference vaqti (sekund, EMA)
+        self.fallback = False
+        self.fallback_left = 0
+
+        # Statistika
+        self.tiled_frames = 0
+        self.single_frames = 0
+        self.fallbacks = 0
+
+    # YOLODetector bilan mos atributlar
+    @property
+    def load_seconds(self) -> float:
+        return self.detector.load_seconds
+
+    @property
+    def warmup_seconds(self) -> float:
+        return self.detector.warmup_seconds
+
+    @property
+    def model_path(self) -> str:
+        return self.detector.model_path
+
+    def swap_model(self, model, path: str):
+        """Modelni almashtirish (tracker holati ByteTrackAdapter'da - o'zgarmaydi)"""
+        self.detector.swap_model(model, path)
+        self.model = model
+
+    def set_polygon(self, polygon_points: np.ndarray):
+        """Plitkalar tartibini yangi polygon uchun qayta hisoblash"""
+        config = self.config
+        roi = polygon_roi(polygon_points, self.frame_width, self.frame_height, config.padding)
+        self.layout = TileLayout(roi, self.frame_width, self.frame_height,
+                                 config.tile_size, config.overlap, config.max_tiles)
+        logger.info(f"Kamera {self.camera_id} plitkalar: {len(self.layout)} ta "
+                    f"{self.layout.tile_width}x{self.layout.tile_height} (hudud {roi})")
+
+    def _predict(self, images: List[np.ndarray]):
+        execution = self.detector.execution
+        with execution.autocast():
+            return self.model.predict(
+                images,
+                classes=self.model_config.target_classes,
+                conf=self.model_config.conf,
+                iou=self.model_config.iou,
+                imgsz=self.model_config.imgsz,
+                verbose=False,
+                **execution.predict_args()
+            )
+
+    def _detect_tiled(self, frame: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Plitkalar (va ixtiyoriy butun frame) bitta batch'da, so'ng NMS"""
+        layout = self.layout
+        images = layout.crops(frame)
+        if self.config.full_frame:
+            images.append(frame)
+        results = self._predict(images)
+
+        all_boxes, all_scores, all_classes, all_cut = [], [], [], []
+        for index, result in enumerate(results):
+            boxes = result.boxes
+            if boxes is None or len(boxes) == 0:
+                continue
+            xyxy = boxes.xyxy.detach().cpu().numpy().astype(np.float32)
+            if index < len(layout):
+                all_cut.append(layout.cut_mask(index, xyxy))
+                xyxy[:, [0, 2]] += layout.offsets[index, 0]
+                xyxy[:, [1, 3]] += layout.offsets[index, 1]
+            else:
+                all_cut.append(np.zeros(len(xyxy), dtype=bool))
+            all_boxes.append(xyxy)
+            all_scores.append(boxes.conf.detach().cpu().numpy().astype(np.float32))
+            all_classes.append(boxes.cls.detach().cpu().numpy().astype(int))
+
+        if not all_boxes:
+            return np.empty((0, 4), np.float32), np.empty(0, np.float32), np.empty(0, int)
+        boxes, scores = np.concatenate(all_boxes), np.concatenate(all_scores)
+        class_ids, cut = np.concatenate(all_classes), np.concatenate(all_cut)
+        keep = merge_boxes(boxes, scores, class_ids, cut, self.config.nms_threshold, self.config.nms_metric)
+        return boxes[keep], scores[keep], class_ids[keep]
+
+    def _detect_single(self, frame: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Bitta plitka - butun frame (oddiy rejim)"""
+        boxes = self._predict([frame])[0].boxes
+        if boxes is None or len(boxes) == 0:
+            return np.empty((0, 4), np.float32), np.empty(0, np.float32), np.empty(0, int)
+        return (boxes.xyxy.detach().cpu().numpy().astype(np.float32),
+                boxes.conf.detach().cpu().numpy().astype(np.float32),
+                boxes.cls.detach().cpu().numpy().astype(int))
+
+    def _use_tiles(self) -> bool:
+        """Shu frame'da plitkali rejimmi (byudjetdan oshgan bo'lsa vaqti-vaqti bilan sinov)"""
+        if not self.fallback:
+            return True
+        self.fallback_left -= 1
+        return self.fallback_left <= 0
+
+    def _record_tiled(self, seconds: float):
+        """Plitkali inference vaqti - byudjet bo'yicha rejimni tanlash"""
+        budget = self.config.latency_budget_ms / 1000.0
+        if budget <= 0:
+            return
+        if self.fallback or self.tiled_ema is None:
+            self.tiled_ema = seconds  # Sinov o'lchovi - eski qiymat eskirgan
+        else:
+            self.tiled_ema += self.config.cost_alpha * (seconds - self.tiled_ema)
+
+        if self.tiled_ema > budget:
+            if not self.fallback:
+                self.fallbacks += 1
+                logger.warning(f"Kamera {self.camera_id}: plitkali inference {self.tiled_ema * 1000:.0f} ms "
+                               f"> byudjet {self.config.latency_budget_ms:.0f} ms, bitta plitkaga o'tildi")
+            self.fallback = True
+            self.fallback_left = self.config.fallback_frames
+        elif self.fallback:
+            self.fallback = False
+            logger.info(f"Kamera {self.camera_id}: plitkali inference tiklandi ({seconds * 1000:.0f} ms)")
+
+    def detect(self, frame: np.ndarray) -> Optional[DetectionResult]:
+        """
+        Frame'da plitkali detection va tracking
+
+        Args:
+            frame: Input frame
+
+        Returns:
+            DetectionResult yoki None
+        """
+        try:
+            if self._use_tiles():
+                start = time.perf_counter()
+                boxes, scores, class_ids = self._detect_tiled(frame)
+                self._record_tiled(time.perf_counter() - start)
+                self.tiled_frames += 1
+            else:
+                boxes, scores, class_ids = self._detect_single(frame)
+                self.single_frames += 1
+            return self.tracker.update(boxes, scores, class_ids, frame)
+        except Exception as e:
+            logger.error(f"Kamera {self.camera_id} plitkali detection xato: {e}")
+            return None
+
+    def get_stats(self) -> dict:
+        """
+        Plitkalash statistikasi
+
+        Returns:
+            dict: tiles, tiled_frames, single_frames, fallbacks, fallback, tiled_ms
+        """
+        return {
+            'tiles': len(self.layout),
+            'tiled_frames': self.tiled_frames,
+            'single_frames': self.single_frames,
+            'fallbacks': self.fallbacks,
+            'fallback': self.fallback,
+            'tiled_ms': round(self.tiled_ema * 1000, 1) if self.tiled_ema is not None else None,
+        }
+
+    def get_class_name(self, class_id: int) -> str:
+        return self.detector.get_class_name(class_id)
@@ -0,0 +1,248 @@
+"""
+TrackTable - tracklar uchun ustunli (struct-of-arrays) jadval
+"""
+import numpy as np
+from typing import Dict, Iterator, List, Optional, Tuple
+from railcore.types import VehicleTrackData
+
+# flags ustuni bitlari
+IN_POLYGON = np.uint8(1)
+ENTERED_POLYGON = np.uint8(2)
+VIOLATION_SAVED = np.uint8(4)
+EXIT_SAVED = np.uint8(8)
+HAS_START = np.uint8(16)
+SLOW_SAVED = np.uint8(32)
+
+_COLUMNS = ('track_id', 'class_id', 'start_time', 'total_time', 'last_seen', 'flags', 'speed', 'heading')
+
+class TrackView:
+    """Jadvaldagi bitta track'ga VehicleTrackData'ga o'xshash kirish"""
+
+    __slots__ = ('_table', '_slot', 'track_id')
+
+    def __init__(self, table: 'TrackTable', slot: int, track_id: int):
+        self._table = table
+        self._slot = slot
+        self.track_id = track_id
+
+    def _flag(self, bit) -> bool:
+        return bool(self._table.flags[self._slot] & bit)
+
+    def _set_flag(self, bit, value: bool):
+        if value:
+            self._table.flags[self._slot] |= bit
+        else:
+            self._table.flags[self._slot] &= ~bit
+
+    @property
+    def class_id(self) -> int:
+        return int(self._table.class_id[self._slot])
+
+    @property
+    def start_time(self) -> Optional[float]:
+        return float(self._table.start_time[self._slot]) if self._flag(HAS_START) else None
+
+    @start_time.setter
+    def start_time(self, value: Optional[float]):
+        self._set_flag(HAS_START, value is not None)
+        self._table.start_time[self._slot] = value if value is not None else 0.0
+
+    @property
+    def total_time(self) -> float:
+        return float(self._table.total_time[self._slot])
+
+    @total_time.setter
+    def total_time(self, value: float):
+        self._table.total_time[self._slot] = value
+
+    @property
+    def last_seen_time(self) -> float:
+        return float(self._table.last_seen[self._slot])
+
+    @last_seen_time.setter
+    def last_seen_time(self, value: float):
+        self._table.last_seen[self._slot] = value
+
+    in_polygon = property(lambda self: self._flag(IN_POLYGON),
+                          lambda self, v: self._set_flag(IN_POLYGON, v))
+    entered_polygon = property(lambda self: self._flag(ENTERED_POLYGON),
+                               lambda self, v: self._set_flag(ENTERED_POLYGON, v))
+    violation_saved = property(lambda self: self._flag(VIOLATION_SAVED),
+                               lambda self, v: self._set_flag(VIOLATION_SAVED, v))
+    exit_saved = property(lambda self: self._flag(EXIT_SAVED),
+                          lambda self, v: self._set_flag(EXIT_SAVED, v))
+    slow_saved = property(lambda self: self._flag(SLOW_SAVED),
+                          lambda self, v: self._set_flag(SLOW_SAVED, v))
+
+    @property
+    def speed_kmh(self) -> float:
+        return float(self._table.speed[self._slot])
+
+    @property
+    def heading(self) -> float:
+        return float(self._table.heading[self._slot])
+
+    def snapshot(self) -> VehicleTrackData:
+        """
+        Mustaqil nusxa (jadval o'zgarsa ham o'zgarmaydi)
+
+        Returns:
+            VehicleTrackData
+        """
+        return VehicleTrackData(
+            class_id=self.class_id,
+            start_time=self.start_time,
+            in_polygon=self.in_polygon,
+            total_time=self.total_time,
+            entered_polygon=self.entered_polygon,
+            last_seen_time=self.last_seen_time,
+            violation_saved=self.violation_saved,
+            exit_saved=self.exit_saved,
+            slow_saved=self.slow_saved,
+            speed_kmh=self.speed_kmh,
+            heading=self.heading
+        )
+
+    def __repr__(self) -> str:
+        return f"TrackView(track_id={self.track_id}, {self.snapshot()})"
+
+class TrackTable:
+    """Oldindan ajratilgan NumPy ustunlari, ID -> slot indeksi va slotlarni qayta ishlatish"""
+
+    def __init__(self, capacity: int = 64):
+        """
+        Args:
+            capacity: Boshlang'ich slotlar soni (to'lsa 2 baravar oshadi)
+        """
+        self.capacity = 0
+        self.track_id = np.zeros(0, dtype=np.int64)
+        self.class_id = np.zeros(0, dtype=np.int32)
+        self.start_time = np.zeros(0, dtype=np.float64)
+        self.total_time = np.zeros(0, dtype=np.float64)
+        self.last_seen = np.zeros(0, dtype=np.float64)
+        self.flags = np.zeros(0, dtype=np.uint8)
+        self.speed = np.zeros(0, dtype=np.float64)  # km/soat
+        self.heading = np.zeros(0, dtype=np.float64)  # gradus
+
+        self._slots: Dict[int, int] = {}
+        self._free: List[int] = []
+        self._grow(max(1, capacity))
+
+    def _grow(self, new_capacity: int):
+        """Ustunlarni kengaytirish"""
+        old = self.capacity
+        for name in _COLUMNS:
+            column = getattr(self, name)
+            grown = np.zeros(new_capacity, dtype=column.dtype)
+            grown[:old] = column
+            setattr(self, name, grown)
+        self.track_id[old:] = -1
+        # Kichik slotlar birinchi ishlatiladi (pop() oxiridan oladi)
+        self._free.extend(range(new_capacity - 1, old - 1, -1))
+        self.capacity = new_capacity
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, track_id: int) -> bool:
+        return track_id in self._slots
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._slots)
+
+    def slot(self, track_id: int) -> Optional[int]:
+        """Track slotini olish (yo'q bo'lsa None)"""
+        return self._slots.get(track_id)
+
+    def add(self, track_id: int, class_id: int, last_seen: float) -> int:
+        """
+        Yangi track qo'shish
+
+        Args:
+            track_id: Track ID
+            class_id: Class ID
+            last_seen: Oxirgi ko'rilgan vaqt
+
+        Returns:
+            int: Slot indeksi
+        """
+        if not self._free:
+            self._grow(self.capacity * 2)
+        slot = self._free.pop()
+        self._slots[track_id] = slot
+        self.track_id[slot] = track_id
+        self.class_id[slot] = class_id
+        self.start_time[slot] = 0.0
+        self.total_time[slot] = 0.0
+        self.last_seen[slot] = last_seen
+        self.flags[slot] = 0
+        self.speed[slot] = 0.0
+        self.heading[slot] = 0.0
+        return slot
+
+    def slots_for(self, track_ids, class_ids, current_time: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Track'lar slotlarini olish, yo'qlarini yaratish
+
+        Args:
+            track_ids: Track ID'lar
+            class_ids: Class ID'lar
+            current_time: Yangi tracklar uchun last_seen
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (slotlar, yangi yaratilganlar maskasi)
+        """
+        n = len(track_ids)
+        slots = np.empty(n, dtype=np.intp)
+        created = np.zeros(n, dtype=bool)
+        for i in range(n):
+            tid = int(track_ids[i])
+            slot = self._slots.get(tid)
+            if slot is None:
+                slot = self.add(tid, int(class_ids[i]), current_time)
+                created[i] = True
+            slots[i] = slot
+        return slots, created
+
+    def remove(self, track_id: int):
+        """
+        Track'ni o'chirish (slot qayta ishlatiladi)
+
+        Args:
+            track_id: Track ID
+        """
+        slot = self._slots.pop(track_id)
+        self.track_id[slot] = -1
+        self.flags[slot] = 0
+        self._free.append(slot)
+
+    def get(self, track_id: int) -> Optional[TrackView]:
+        """
+        Track ko'rinishini olish
+
+        Args:
+            track_id: Track ID
+
+        Returns:
+            TrackView yoki None
+        """
+        slot = self._slots.get(track_id)
+        return TrackView(self, slot, track_id) if slot is not None else None
+
+    def __getitem__(self, track_id: int) -> TrackView:
+        view = self.get(track_id)
+        if view is None:
+            raise KeyError(track_id)
+        return view
+
+    def items(self) -> Iterator[Tuple[int, TrackView]]:
+        for track_id, slot in self._slots.items():
+            yield track_id, TrackView(self, slot, track_id)
+
+    def values(self) -> Iterator[TrackView]:
+        for _, view in self.items():
+            yield view
+
+    def nbytes(self) -> int:
+        """Ustunlar egallagan xotira (bayt)"""
+        return sum(getattr(self, name).nbytes for name in _COLUMNS)
@@ -1,10 +1,17 @@
 """
 Tracking holati va enter/exit/violation mantiqi
 """
-from typing import Dict, List, Tuple, Optional
+import heapq
+import numpy as np
+from typing import List, Set, Tuple, Optional
 from datetime import datetime
-from railcore.types import VehicleTrackData, FrameEvent, ThresholdsConfig
+from railcore.types import FrameEvent, ThresholdsConfig
 from railcore.utils_polygon import PolygonUtils
+from railcore.vision.track_table import (
+    TrackTable, TrackView,
+    IN_POLYGON, ENTERED_POLYGON, VIOLATION_SAVED, EXIT_SAVED, HAS_START, SLOW_SAVED
+)
+from railcore.vision.motion import PolygonCalibration, TrajectoryBuffer
 from railcore.logging_setup import setup_logger
 
 logger = setup_logger(__name__)
@@ -12,12 +19,15 @@ logger = setup_logger(__name__)
 class VehicleTracker:
     """Avtomobil tracking va hodisalarni boshqarish"""
     
-    def __init__(self, 
+    def __init__(self,
                  camera_id: int,
                  camera_name: str,
                  polygon_utils: PolygonUtils,
                  thresholds: ThresholdsConfig,
-                 timeout_seconds: float = 3.0):
+                 timeout_seconds: float = 3.0,
+                 calibration: Optional[PolygonCalibration] = None,
+                 trajectory_size: int = 16,
+                 slow_min_points: int = 5):
         """
         Args:
             camera_id: Kamera ID
@@ -25,6 +35,9 @@ class VehicleTracker:
             polygon_utils: Polygon utilities
             thresholds: Vaqt chegaralari
             timeout_seconds: Timeout vaqti
+            calibration: Piksel -> metr kalibrovka (None = tezlik hisoblanmaydi)
+            trajectory_size: Track boshiga trayektoriya nuqtalari
+            slow_min_points: 'slow' hodisasi uchun minimal trayektoriya nuqtalari
         """
         self.camera_id = camera_id
         self.camera_name = camera_name
@@ -32,132 +45,295 @@ class VehicleTracker:
         self.thresholds = thresholds
         self.timeout_seconds = timeout_seconds
         
-        # Tracking ma'lumotlari
-        self.vehicles: Dict[int, VehicleTrackData] = {}
+        # Tracking ma'lumotlari (ustunli jadval, track_id -> slot)
+        self.vehicles = TrackTable()
+        
+        # Tezlik/trayektoriya (faqat kalibrovka bo'lsa)
+        self.calibration = calibration
+        self.trajectory_size = trajectory_size
+        self.trajectory = TrajectoryBuffer(trajectory_size, self.vehicles.capacity) if calibration else None
+        self.slow_min_points = slow_min_points
+        
+        # Expiry heap: (rejalashtirilgan last_seen_time, track_id). Har bir track'da bitta yozuv;
+        # last_seen_time o'zgarsa yozuv faqat muddati kelganda qayta rejalashtiriladi
+        self._expiry_heap: List[Tuple[float, int]] = []
+        
+        # Polygon ichidagi tracklar va ularning maksimal vaqti (inkremental)
+        self._inside_ids: Set[int] = set()
+        self._max_time = 0.0
+        self._max_time_dirty = False
         
         # Counters
         self.entered_count = 0
         self.passed_count = 0
     
-    def update(self, 
+    def update(self,
                track_id: int,
                class_id: int,
                box: Tuple[int, int, int, int],
                current_time: float,
                frame) -> List[FrameEvent]:
         """
-        Track'ni yangilash va hodisalarni qaytarish
+        Bitta track'ni yangilash va hodisalarni qaytarish
         
         Args:
             track_id: Track ID
             class_id: Class ID
             box: Box koordinatalari (x1, y1, x2, y2)
             current_time: Hozirgi vaqt (sekund)
-            frame: Current frame
+            frame: Current frame (replay rejimida None)
         
         Returns:
             List[FrameEvent]: Hodisalar ro'yxati
         """
-        events = []
+        return self.update_many(
+            np.array([track_id], dtype=np.int64),
+            np.array([class_id], dtype=np.int64),
+            np.array([box], dtype=np.int64),
+            current_time,
+            frame
+        )
+    
+    def update_many(self,
+                    track_ids: np.ndarray,
+                    class_ids: np.ndarray,
+                    boxes: np.ndarray,
+                    current_time: float,
+                    frame) -> List[FrameEvent]:
+        """
+        Frame'dagi barcha deteksiyalarni bir vaqtda yangilash
+        
+        Hodisalar update() ni har bir deteksiya uchun ketma-ket chaqirgandagi
+        tartibda qaytariladi.
+        
+        Args:
+            track_ids: Track ID'lar (N)
+            class_ids: Class ID'lar (N)
+            boxes: Box koordinatalari (N x 4, x1, y1, x2, y2)
+            current_time: Hozirgi vaqt (sekund)
+            frame: Current frame (replay rejimida None)
+        
+        Returns:
+            List[FrameEvent]: Hodisalar ro'yxati
+        """
+        n = len(track_ids)
+        if n == 0:
+            return []
+        track_ids = np.asarray(track_ids, dtype=np.int64)
+        boxes = np.asarray(boxes).astype(np.int64)
+        
+        # Bir frame'da takrorlangan ID - ketma-ket yangilash
+        if n > 1 and len(set(track_ids.tolist())) != n:
+            events = []
+            for i in range(n):
+                events.extend(self.update_many(track_ids[i:i + 1], class_ids[i:i + 1],
+                                               boxes[i:i + 1], current_time, frame))
+            return events
         
-        x1, y1, x2, y2 = box
-        center_x = (x1 + x2) / 2
-        center_y = (y1 + y2) / 2
+        table = self.vehicles
         
-        # Polygon ichida ekanligini tekshirish
-        is_inside = self.polygon_utils.point_in_polygon(center_x, center_y)
+        # Polygon ichida ekanligini tekshirish (box markazi)
+        center_x = (boxes[:, 0] + boxes[:, 2]) / 2
+        center_y = (boxes[:, 1] + boxes[:, 3]) / 2
+        inside = self.polygon_utils.points_in_polygon(center_x, center_y)
         
-        # Yangi track
-        if track_id not in self.vehicles:
-            self.vehicles[track_id] = VehicleTrackData(
-                class_id=class_id,
-                last_seen_time=current_time
+        # Slotlar (yangi tracklar yaratiladi)
+        slots, created = table.slots_for(track_ids, class_ids, current_time)
+        for i in np.flatnonzero(created):
+            heapq.heappush(self._expiry_heap, (current_time, int(track_ids[i])))
+        
+        flags = table.flags[slots]
+        was_inside = (flags & IN_POLYGON) != 0
+        
+        # KIRISH: holat bayroqlari yangilanadi
+        entering = inside & ~was_inside
+        if entering.any():
+            entering_slots = slots[entering]
+            table.start_time[entering_slots] = current_time
+            table.flags[entering_slots] = (
+                (table.flags[entering_slots] | (IN_POLYGON | ENTERED_POLYGON | HAS_START))
+                & ~(VIOLATION_SAVED | EXIT_SAVED | SLOW_SAVED)
             )
+            self._inside_ids.update(track_ids[entering].tolist())
+            entered = int(entering.sum())
+            self.entered_count += entered
+            self.passed_count += entered
         
-        vehicle = self.vehicles[track_id]
-        
-        # Polygon ichida
-        if is_inside:
-            # KIRISH hodisasi
-            if not vehicle.in_polygon:
-                vehicle.start_time = current_time
-                vehicle.in_polygon = True
-                vehicle.entered_polygon = True
-                vehicle.violation_saved = False
-                vehicle.exit_saved = False
-                self.entered_count += 1
-                self.passed_count += 1
-                
-                # KIRISH event
-                events.append(FrameEvent(
-                    frame=frame.copy(),
-                    camera_id=self.camera_id,
-                    camera_name=self.camera_name,
-                    track_id=track_id,
-                    event_type='enter',
-                    timestamp=datetime.now(),
-                    box_coords=box,
-                    time_in_polygon=0.0,
-                    class_id=class_id
-                ))
-            
-            # Vaqtni hisoblash
-            time_in_polygon = current_time - vehicle.start_time
-            vehicle.total_time = time_in_polygon
-            vehicle.last_seen_time = current_time
-            
-            # QOIDABUZARLIK hodisasi (faqat 1 marta)
-            if (time_in_polygon >= self.thresholds.violation and 
-                not vehicle.violation_saved):
-                events.append(FrameEvent(
-                    frame=frame.copy(),
-                    camera_id=self.camera_id,
-                    camera_name=self.camera_name,
-                    track_id=track_id,
-                    event_type='violation',
-                    timestamp=datetime.now(),
-                    box_coords=box,
-                    time_in_polygon=time_in_polygon,
-                    class_id=class_id
-                ))
-                vehicle.violation_saved = True
-        
-        else:  # Tashqarida
-            # CHIQISH hodisasi
-            if vehicle.in_polygon and not vehicle.exit_saved:
-                time_in_polygon = vehicle.total_time
-                events.append(FrameEvent(
-                    frame=frame.copy(),
-                    camera_id=self.camera_id,
-                    camera_name=self.camera_name,
-                    track_id=track_id,
-                    event_type='exit',
-                    timestamp=datetime.now(),
-                    box_coords=box,
-                    time_in_polygon=time_in_polygon,
-                    class_id=class_id
-                ))
-                vehicle.in_polygon = False
-                vehicle.exit_saved = True
+        # Polygon ichidagi vaqt
+        violating = np.zeros(n, dtype=bool)
+        if inside.any():
+            inside_slots = slots[inside]
+            times = current_time - table.start_time[inside_slots]
+            table.total_time[inside_slots] = times
+            max_time = float(times.max())
+            if max_time > self._max_time:
+                self._max_time = max_time
             
-            vehicle.last_seen_time = current_time
+            # QOIDABUZARLIK (faqat 1 marta)
+            violating[inside] = ((times >= self.thresholds.violation)
+                                 & ((table.flags[inside_slots] & VIOLATION_SAVED) == 0))
+            table.flags[slots[violating]] |= VIOLATION_SAVED
+        
+        # Tezlik va sekin o'tish (violation'gacha kutmasdan)
+        slowing = np.zeros(n, dtype=bool)
+        if self.calibration is not None:
+            slowing = self._update_motion(track_ids, boxes, slots, created, inside & ~violating, current_time)
+        
+        # CHIQISH
+        exiting = ~inside & was_inside & ((flags & EXIT_SAVED) == 0)
+        if exiting.any():
+            exiting_slots = slots[exiting]
+            table.flags[exiting_slots] = (table.flags[exiting_slots] & ~IN_POLYGON) | EXIT_SAVED
+            for i in np.flatnonzero(exiting):
+                self._leave_polygon(int(track_ids[i]), float(table.total_time[slots[i]]))
+        
+        table.last_seen[slots] = current_time
+        
+        # Hodisalar (deteksiya tartibida)
+        events = []
+        for i in np.flatnonzero(entering | violating | exiting | slowing):
+            track_id = int(track_ids[i])
+            class_id = int(class_ids[i])
+            box = tuple(boxes[i])
+            time_in_polygon = float(table.total_time[slots[i]])
+            motion = {}
+            if self.calibration is not None:
+                motion = {'speed_kmh': float(table.speed[slots[i]]), 'heading': float(table.heading[slots[i]])}
+            if entering[i]:
+                events.append(self._make_event(frame, track_id, class_id, box, 'enter', 0.0, **motion))
+            if slowing[i]:
+                events.append(self._make_event(frame, track_id, class_id, box, 'slow', time_in_polygon, **motion))
+            if violating[i]:
+                events.append(self._make_event(frame, track_id, class_id, box, 'violation', time_in_polygon, **motion))
+            if exiting[i]:
+                events.append(self._make_event(frame, track_id, class_id, box, 'exit', time_in_polygon, **motion))
         
         return events
     
+    def _update_motion(self,
+                       track_ids: np.ndarray,
+                       boxes: np.ndarray,
+                       slots: np.ndarray,
+                       created: np.ndarray,
+                       candidates: np.ndarray,
+                       current_time: float) -> np.ndarray:
+        """
+        Trayektoriyaga nuqta qo'shish, tezlik/yo'nalishni hisoblash va sekin o'tuvchilarni aniqlash
+        
+        Args:
+            track_ids: Track ID'lar (N)
+            boxes: Box'lar (N x 4)
+            slots: TrackTable slotlari (N)
+            created: Shu frame'da yaratilgan tracklar maskasi
+            candidates: 'slow' tekshiriladigan deteksiyalar (polygon ichida, violation emas)
+            current_time: Hozirgi vaqt (sekund)
+        
+        Returns:
+            np.ndarray: 'slow' hodisasi chiqariladigan deteksiyalar maskasi
+        """
+        table = self.vehicles
+        trajectory = self.trajectory
+        trajectory.ensure_capacity(table.capacity)
+        if created.any():
+            trajectory.reset(slots[created])
+        
+        # Box pastki o'rtasi - yo'l tekisligidagi nuqta
+        ground = np.stack([(boxes[:, 0] + boxes[:, 2]) / 2, boxes[:, 3]], axis=1)
+        world = self.calibration.to_world(ground)
+        trajectory.push(slots, current_time, world)
+        
+        vx, vy, points = trajectory.velocity(slots)
+        table.speed[slots] = np.hypot(vx, vy) * 3.6
+        table.heading[slots] = np.mod(np.round(np.degrees(np.arctan2(vx, vy)), 3), 360.0)
+        
+        # Qolgan masofa / uzunlik bo'yicha tezlik = polygonni tark etishgacha vaqt
+        slowing = (candidates
+                   & (points >= self.slow_min_points)
+                   & ((table.flags[slots] & (VIOLATION_SAVED | SLOW_SAVED)) == 0))
+        if not slowing.any():
+            return slowing
+        length = self.calibration.length
+        position = np.clip(world[:, 1], 0.0, length)
+        remaining = np.where(vy > 0, length - position, position)
+        with np.errstate(divide='ignore'):
+            time_left = np.where(np.abs(vy) > 1e-3, remaining / np.abs(vy), np.inf)
+        projected = table.total_time[slots] + time_left
+        slowing &= projected >= self.thresholds.violation
+        table.flags[slots[slowing]] |= SLOW_SAVED
+        return slowing
+    
+    def _make_event(self, frame, track_id: int, class_id: int, box: Tuple[int, int, int, int],
+                    event_type: str, time_in_polygon: float,
+                    speed_kmh: Optional[float] = None, heading: Optional[float] = None) -> FrameEvent:
+        """FrameEvent yaratish (frame nusxasi bilan)"""
+        return FrameEvent(
+            frame=frame.copy() if frame is not None else None,
+            camera_id=self.camera_id,
+            camera_name=self.camera_name,
+            track_id=track_id,
+            event_type=event_type,
+            timestamp=datetime.now(),
+            box_coords=box,
+            time_in_polygon=time_in_polygon,
+            class_id=class_id,
+            speed_kmh=speed_kmh,
+            heading=heading
+        )
+    
+    def set_polygon(self, polygon_utils: PolygonUtils, calibration: Optional[PolygonCalibration] = None):
+        """
+        Polygon'ni almashtirish (track holati saqlanadi, ichida/tashqarida keyingi update'da qayta aniqlanadi)
+        
+        Args:
+            polygon_utils: Yangi PolygonUtils
+            calibration: Yangi polygon uchun kalibrovka (None = tezlik hisoblanmaydi)
+        """
+        self.polygon_utils = polygon_utils
+        self.set_calibration(calibration)
+    
+    def set_calibration(self, calibration: Optional[PolygonCalibration]):
+        """
+        Kalibrovkani almashtirish (eski koordinatalardagi trayektoriyalar tozalanadi,
+        trajectory_size o'zgargan bo'lsa buffer qayta yaratiladi)
+        
+        Args:
+            calibration: PolygonCalibration yoki None
+        """
+        if calibration is not None:
+            if self.trajectory is None or self.trajectory.size != max(2, int(self.trajectory_size)):
+                self.trajectory = TrajectoryBuffer(self.trajectory_size, self.vehicles.capacity)
+            else:
+                self.trajectory.count[:] = 0
+                self.trajectory.head[:] = 0
+        self.calibration = calibration
+    
+    def _leave_polygon(self, track_id: int, total_time: float):
+        """Track'ni polygon ichidagilar ro'yxatidan chiqarish"""
+        self._inside_ids.discard(track_id)
+        if total_time >= self._max_time:
+            self._max_time_dirty = True
+    
     def cleanup_expired(self, current_time: float):
         """
-        Eski tracklarni tozalash
+        Eski tracklarni tozalash (faqat muddati kelgan heap yozuvlari ko'riladi)
         
         Args:
             current_time: Hozirgi vaqt
         """
-        expired_ids = [
-            tid for tid, data in self.vehicles.items()
-            if current_time - data.last_seen_time > self.timeout_seconds
-        ]
-        
-        for tid in expired_ids:
-            del self.vehicles[tid]
+        heap = self._expiry_heap
+        table = self.vehicles
+        while heap and current_time - heap[0][0] > self.timeout_seconds:
+            _, tid = heapq.heappop(heap)
+            slot = table.slot(tid)
+            last_seen = float(table.last_seen[slot])
+            
+            if current_time - last_seen > self.timeout_seconds:
+                if table.flags[slot] & IN_POLYGON:
+                    self._leave_polygon(tid, float(table.total_time[slot]))
+                table.remove(tid)
+            else:
+                # Track yangilangan - yangi last_seen_time bo'yicha qayta rejalashtirish
+                heapq.heappush(heap, (last_seen, tid))
     
     def get_polygon_state(self) -> Tuple[str, float, int]:
         """
@@ -166,14 +342,17 @@ class VehicleTracker:
         Returns:
             Tuple[str, float, int]: (state, max_time, objects_count)
         """
-        vehicles_inside = 0
-        max_time = 0.0
+        vehicles_inside = len(self._inside_ids)
         
-        for vehicle in self.vehicles.values():
-            if vehicle.in_polygon:
-                vehicles_inside += 1
-                if vehicle.total_time > max_time:
-                    max_time = vehicle.total_time
+        # Maksimal vaqtli track chiqib ketgan bo'lsa - faqat ichidagilar bo'yicha qayta hisoblash
+        if self._max_time_dirty:
+            if self._inside_ids:
+                slots = [self.vehicles.slot(tid) for tid in self._inside_ids]
+                self._max_time = float(self.vehicles.total_time[slots].max())
+            else:
+                self._max_time = 0.0
+            self._max_time_dirty = False
+        max_time = self._max_time
         
         if vehicles_inside == 0:
             state = "empty"
@@ -185,7 +364,22 @@ class VehicleTracker:
         
         return state, max_time, vehicles_inside
     
-    def get_vehicle_data(self, track_id: int) -> Optional[VehicleTrackData]:
+    def get_speed(self, track_id: int) -> Optional[Tuple[float, float]]:
+        """
+        Track'ning oxirgi hisoblangan tezligi
+        
+        Args:
+            track_id: Track ID
+        
+        Returns:
+            Tuple[float, float]: (km/soat, yo'nalish gradusda) yoki None (kalibrovka yo'q / track yo'q)
+        """
+        slot = self.vehicles.slot(int(track_id))
+        if self.calibration is None or slot is None:
+            return None
+        return float(self.vehicles.speed[slot]), float(self.vehicles.heading[slot])
+    
+    def get_vehicle_data(self, track_id: int) -> Optional[TrackView]:
         """
         Track ID bo'yicha vehicle ma'lumotlarini olish
         
@@ -193,6 +387,7 @@ class VehicleTracker:
             track_id: Track ID
         
         Returns:
-            VehicleTrackData yoki None
+            TrackView (VehicleTrackData bilan bir xil maydonlar) yoki None.
+            Mustaqil nusxa kerak bo'lsa - .snapshot()
         """
-        return self.vehicles.get(track_id)
\ No newline at end of file
+        return self.vehicles.get(int(track_id))
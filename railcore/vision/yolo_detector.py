@@ -1,11 +1,13 @@
 """
 YOLO detector wrapper (Ultralytics)
 """
+import time
 import numpy as np
 import torch
-from ultralytics import YOLO
 from typing import Optional
 from railcore.types import ModelConfig, DetectionResult
+from railcore.vision.model_cache import load_model
+from railcore.vision.execution import ExecutionProfile
 from railcore.logging_setup import setup_logger
 
 logger = setup_logger(__name__)
@@ -13,30 +15,92 @@ logger = setup_logger(__name__)
 class YOLODetector:
     """YOLO model wrapper"""
     
-    def __init__(self, config: ModelConfig, camera_id: int):
+    def __init__(self, config: ModelConfig, camera_id: int, execution: Optional[ExecutionProfile] = None):
         """
         Args:
             config: Model konfiguratsiyasi
             camera_id: Kamera ID (logging uchun)
+            execution: Bajarilish profili (standart - device avtomatik tanlanadi)
         """
         self.config = config
         self.camera_id = camera_id
+        self.execution = execution if execution is not None else ExecutionProfile()
         
-        logger.info(f"Kamera {camera_id} uchun YOLO model yuklanmoqda: {config.path}")
-        
-        # Model yuklash
-        self.model = YOLO(config.path)
+        logger.info(f"Kamera {camera_id} uchun YOLO model yuklanmoqda: {config.path} ({self.execution.describe()})")
         
         # CUDA optimizatsiya
-        if torch.cuda.is_available():
+        if self.execution.cuda:
             torch.backends.cudnn.benchmark = True
             torch.backends.cudnn.deterministic = False
             torch.set_float32_matmul_precision("high")
         
-        # Model fuse
-        self.model.fuse()
+        # Model yuklash (eksport qilingan nusxa keshdan)
+        start = time.time()
+        self.model, from_cache = load_model(config)
+        self.model_path = config.path
+        self.execution.prepare(self.model)
+        self.load_seconds = time.time() - start
+        
+        logger.info(f"Kamera {camera_id} uchun YOLO model yuklandi "
+                    f"({self.load_seconds:.2f}s{', keshdan' if from_cache else ''})")
+        
+        # Warm-up (birinchi haqiqiy frame sovuq start narxini to'lamasligi uchun)
+        self.warmup_seconds = 0.0
+        if config.warmup_frames > 0:
+            self.warmup_seconds = self.warmup(config.warmup_frames)
+    
+    def warmup(self, frames: int = 3) -> float:
+        """
+        Dummy frame'lar bilan modelni qizdirish (CUDA kontekst, cuDNN algoritmlari, predictor)
+        
+        Tracker holatiga ta'sir qilmaslik uchun predict() ishlatiladi.
+        
+        Args:
+            frames: Dummy frame'lar soni
+        
+        Returns:
+            float: Warm-up vaqti (sekund)
+        """
+        start = time.time()
+        dummy = np.zeros((self.config.imgsz, self.config.imgsz, 3), dtype=np.uint8)
+        self.execution.bind_thread()
+        with self.execution.autocast():
+            for _ in range(frames):
+                self.model.predict(
+                    dummy,
+                    imgsz=self.config.imgsz,
+                    classes=self.config.target_classes,
+                    verbose=False,
+                    **self.execution.predict_args()
+                )
+        elapsed = time.time() - start
+        logger.info(f"Kamera {self.camera_id} model warm-up: {frames} frame, {elapsed:.2f}s")
+        return elapsed
+    
+    def swap_model(self, model, path: str):
+        """
+        Modelni almashtirish (kamera thread'ida, frame'lar orasida chaqiriladi)
+        
+        ByteTrack holati ultralytics predictor'ida turadi - tracker'lar yangi modelga o'tkaziladi,
+        track ID'lar va avtomobillarning polygon'dagi vaqti uzilmaydi.
         
-        logger.info(f"Kamera {camera_id} uchun YOLO model yuklandi")
+        Args:
+            model: Yuklangan va qizdirilgan YOLO (predict() kamida bir marta chaqirilgan)
+            path: Model fayli
+        """
+        old_predictor = getattr(self.model, 'predictor', None)
+        trackers = getattr(old_predictor, 'trackers', None)
+        if trackers is not None and getattr(model, 'predictor', None) is not None:
+            from ultralytics.trackers import register_tracker
+            
+            register_tracker(model, persist=True)
+            # Warm-up predict() tracker argumentisiz - farq qilsa track() yangi predictor yaratib
+            # tracker'larni yo'qotadi
+            model.predictor.args.tracker = old_predictor.args.tracker
+            model.predictor.trackers = trackers
+            model.predictor.vid_path = getattr(old_predictor, 'vid_path', [None] * len(trackers))
+        self.model = model
+        self.model_path = path
     
     def detect(self, frame: np.ndarray) -> Optional[DetectionResult]:
         """
@@ -50,17 +114,18 @@ class YOLODetector:
         """
         try:
             # YOLO track
-            results = self.model.track(
-                frame,
-                persist=True,
-                classes=self.config.target_classes,
-                conf=self.config.conf,
-                iou=self.config.iou,
-                tracker="bytetrack.yaml",
-                device=0,
-                verbose=False,
-                half=True
-            )
+            with self.execution.autocast():
+                results = self.model.track(
+                    frame,
+                    persist=True,
+                    classes=self.config.target_classes,
+                    conf=self.config.conf,
+                    iou=self.config.iou,
+                    imgsz=self.config.imgsz,
+                    tracker="bytetrack.yaml",
+                    verbose=False,
+                    **self.execution.predict_args()
+                )
             
             # Natijalarni parse qilish
             if results[0].boxes is None or len(results[0].boxes) == 0:
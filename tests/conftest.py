@@ -0,0 +1,7 @@
+"""
+pytest umumiy sozlamalari: repo ildizi import yo'liga qo'shiladi (python -m pytest tests)
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,79 @@
+"""
+ClipRecorder: lokal frame'lardan klip yozish, klip hodisadan pre_seconds oldin boshlanadi
+"""
+import threading
+import time
+from datetime import datetime
+
+import cv2
+import numpy as np
+import pytest
+
+from railcore.clip_recorder import ClipRecorder, ClipWriter
+from railcore.types import ClipConfig, FrameEvent
+
+FPS = 10.0
+
+def _frame(index: int) -> np.ndarray:
+    # Frame raqami yorqinlikda (klipdan qaytarib o'qish uchun)
+    return np.full((120, 160, 3), index * 4, dtype=np.uint8)
+
+def _event() -> FrameEvent:
+    return FrameEvent(frame=None, camera_id=1, camera_name='c', track_id=7, event_type='violation',
+                      timestamp=datetime(2025, 10, 14, 8, 0, 0), box_coords=(0, 0, 10, 10))
+
+def _read_clip(path) -> list:
+    capture = cv2.VideoCapture(str(path))
+    frames = []
+    while True:
+        ok, frame = capture.read()
+        if not ok:
+            break
+        frames.append(frame)
+    capture.release()
+    return frames
+
+@pytest.mark.parametrize('compress', [False, True])
+def test_clip_starts_pre_seconds_before_event(tmp_path, compress):
+    config = ClipConfig(enabled=True, output_dir=str(tmp_path), pre_seconds=1.0, post_seconds=1.0,
+                        scale=1.0, compress=compress, jpeg_quality=95)
+    writer = ClipWriter(config)
+    recorder = ClipRecorder(1, FPS, writer)
+    event = _event()
+
+    for index in range(60):
+        current_time = index / FPS
+        recorder.push(_frame(index), current_time)
+        if index == 40:
+            recorder.on_event(event, current_time)
+    writer.stop()
+
+    frames = _read_clip(writer.clip_path(event))
+    # 3.0s .. 5.0s (pre va post qismi bilan)
+    assert len(frames) == 21
+    assert abs(float(frames[0].mean()) - 30 * 4) < 8
+    assert abs(float(frames[-1].mean()) - 50 * 4) < 8
+
+def test_compression_runs_off_the_push_path(tmp_path):
+    config = ClipConfig(enabled=True, output_dir=str(tmp_path), pre_seconds=1.0, scale=1.0, compress=True)
+    writer = ClipWriter(config)
+    recorder = ClipRecorder(1, FPS, writer)
+    encode, threads = writer.encode, []
+
+    def record_thread(frame):
+        threads.append(threading.current_thread())
+        return encode(frame)
+
+    writer.encode = record_thread
+    recorder.push(_frame(1), 0.0)
+
+    deadline = time.time() + 5.0
+    while recorder.frames[0].encoding is not None and time.time() < deadline:
+        time.sleep(0.01)
+        recorder._collect_encoded()
+    writer.stop()
+
+    # push() faqat kichraytiradi, JPEG pool thread'ida tayyorlanadi
+    assert threads and threading.main_thread() not in threads
+    assert isinstance(recorder.frames[0].payload, bytes)
+    assert recorder.memory_bytes == len(recorder.frames[0].payload)
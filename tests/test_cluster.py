@@ -0,0 +1,115 @@
+"""
+Cluster: coordinator + SystemEngine worker'lari localhost'da; worker o'ldirilganda kameralari
+qayta taqsimlanadi va ularning hodisalari yangi worker'dan coordinator'ga yetib keladi
+
+w1 alohida jarayon (python -m railcore.cluster worker, SIGKILL bilan o'ldiriladi), w2 shu
+jarayonda - uning MultiCameraSystem'i tekshiriladi. Model tasodifiy og'irlikli (yolov8n.yaml),
+shuning uchun hodisalar w2'ning event bus'iga qo'lda beriladi va ClusterSink orqali yuboriladi.
+"""
+import json
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+import yaml
+
+pytest.importorskip('ultralytics')
+
+from railcore.cluster.coordinator import Coordinator
+from railcore.cluster.worker import SystemEngine, Worker
+from railcore.types import ClusterConfig, FrameEvent
+
+ROOT = Path(__file__).resolve().parent.parent
+
+def _wait(predicate, timeout: float = 90.0, message: str = ''):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return
+        time.sleep(0.1)
+    pytest.fail(f"kutish tugadi: {message}")
+
+@pytest.fixture(scope='module')
+def worker_files(tmp_path_factory):
+    """Tasodifiy og'irlikli model, qisqa video, polygon va worker config'i"""
+    from ultralytics import YOLO
+
+    root = tmp_path_factory.mktemp('cluster')
+    model_path = root / 'model.pt'
+    YOLO('yolov8n.yaml').save(str(model_path))
+
+    video_path = root / 'video.mp4'
+    writer = cv2.VideoWriter(str(video_path), cv2.VideoWriter_fourcc(*'mp4v'), 25.0, (160, 120))
+    for index in range(25 * 60):
+        writer.write(np.full((120, 160, 3), index % 200, dtype=np.uint8))
+    writer.release()
+
+    polygon_path = root / 'polygon.json'
+    polygon_path.write_text(json.dumps({'annotations': [{'segmentation': [[10, 10, 150, 10, 150, 110, 10, 110]]}]}))
+
+    config = yaml.safe_load((ROOT / 'config' / 'config.yaml').read_text())
+    config['model'].update(path=str(model_path), imgsz=160, cache_dir='', warmup_frames=0)
+    config['execution'].update(device='cpu', half=False)
+    config['cameras'] = []
+    config['saver']['save_dir'] = str(root / 'images')
+    for section in ('retention', 'event_store', 'display', 'freeze'):
+        config[section]['enabled'] = False
+    config_path = root / 'worker.yaml'
+    config_path.write_text(yaml.safe_dump(config, allow_unicode=True))
+
+    cameras = [{'id': camera_id, 'name': f"cam{camera_id}", 'source': str(video_path),
+                'polygon_file': str(polygon_path), 'video_fps': 25.0} for camera_id in (1, 2)]
+    return config_path, cameras
+
+def test_killed_worker_cameras_are_reassigned(worker_files):
+    config_path, cameras = worker_files
+    cluster = ClusterConfig(port=0, heartbeat_interval=0.3, dead_after=3.0, rebalance_interval=0.2,
+                            overload_seconds=3600.0)
+    coordinator = Coordinator(cluster, cameras).start()
+    _, port = coordinator.address
+
+    w1 = subprocess.Popen(
+        [sys.executable, '-m', 'railcore.cluster', 'worker', '--name', 'w1', '--config', str(config_path),
+         '--coordinator', f"127.0.0.1:{port}", '--capacity', '50', '--heartbeat', '0.3'],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    w2 = None
+    try:
+        # w1 ikkala kamerani ham oladi va ularni haqiqatan ishlatadi (heartbeat metrikalari)
+        _wait(lambda: coordinator.get_status()['assignment'] == {'1': 'w1', '2': 'w1'}, message="w1 tayinlash")
+        _wait(lambda: set(coordinator.get_status()['workers'].get('w1', {}).get('metrics', {})) == {'1', '2'},
+              message="w1 kameralari ishlamoqda")
+
+        # w2: mavjud kameralar yangi worker'ga ko'chirilmaydi
+        w2 = Worker('w2', '127.0.0.1', port, cluster)
+        engine = SystemEngine(str(config_path), w2.send_events, capacity=50.0)
+        threading.Thread(target=w2.run, args=(engine,), daemon=True).start()
+        _wait(lambda: 'w2' in coordinator.get_status()['workers'], message="w2 ulanishi")
+        assert engine.running_cameras() == []
+
+        w1.kill()
+        w1.wait(timeout=10)
+
+        _wait(lambda: coordinator.get_status()['assignment'] == {'1': 'w2', '2': 'w2'}, message="qayta taqsimlash")
+        _wait(lambda: engine.running_cameras() == [1, 2], message="w2 apply_config")
+        assert set(engine.system.cameras) == {1, 2}
+
+        for camera_id in (1, 2):
+            engine.system.event_bus.publish(FrameEvent(
+                frame=None, camera_id=camera_id, camera_name=f"cam{camera_id}", track_id=1,
+                event_type='violation', timestamp=datetime.now(), box_coords=(10, 10, 50, 50)))
+        _wait(lambda: coordinator.get_status()['events'] == {'1': {'violation': 1}, '2': {'violation': 1}},
+              timeout=20.0, message="hodisalar coordinator'ga")
+        assert coordinator.get_status()['workers']['w2']['events'] == 2
+    finally:
+        if w1.poll() is None:
+            w1.kill()
+        if w2 is not None:
+            w2.stop()
+        coordinator.stop()
@@ -0,0 +1,38 @@
+"""
+EventBus + WebhookSink: stand-in server xatolar qaytarsa ham har bir yozuv bir marta yetkaziladi
+"""
+import random
+from datetime import datetime
+
+from railcore.sinks import EventBus, WebhookSink
+from railcore.sinks.standin import StandInServer
+from railcore.types import FrameEvent
+
+def _event(track_id: int) -> FrameEvent:
+    return FrameEvent(frame=None, camera_id=1, camera_name='test', track_id=track_id, event_type='enter',
+                      timestamp=datetime.now(), box_coords=(0, 0, 10, 10))
+
+def test_webhook_delivers_every_record_once_under_failures():
+    random.seed(0)
+    standin = StandInServer(fail_rate=0.4).start()
+    sink = WebhookSink(standin.url, batch_size=10, flush_interval=0.05, max_retries=30,
+                       backoff_base=0.01, backoff_max=0.05)
+    bus = EventBus([sink])
+    try:
+        for track_id in range(200):
+            bus.publish(_event(track_id))
+    finally:
+        bus.stop(timeout=30.0)
+        standin.stop()
+
+    stats = bus.get_stats()['webhook']
+    assert sorted(r['track_id'] for r in standin.records) == list(range(200))
+    assert stats['written'] == 200
+    assert stats['failed'] == 0 and stats['dropped'] == 0 and stats['buffered'] == 0
+
+    # Har bir 503 bitta qayta urinishga, har bir muvaffaqiyatli so'rov bitta batch'ga to'g'ri keladi
+    assert standin.failures > 0
+    assert stats['retries'] == standin.failures
+    assert len(standin.batch_sizes) == standin.requests - standin.failures
+    assert sum(standin.batch_sizes) == 200
+    assert max(standin.batch_sizes) <= sink.batch_size
@@ -0,0 +1,62 @@
+"""
+EventStore: writer thread orqali yozish, indekslangan so'rovlar va eski bazani yangilash
+"""
+import sqlite3
+from datetime import datetime, timedelta
+
+from railcore.event_store import EventStore
+from railcore.types import FrameEvent
+
+BASE = datetime(2025, 10, 14, 8, 0, 0)
+
+def _event(camera_id: int, event_type: str, track_id: int, minutes: int) -> FrameEvent:
+    return FrameEvent(frame=None, camera_id=camera_id, camera_name=f'cam{camera_id}', track_id=track_id,
+                      event_type=event_type, timestamp=BASE + timedelta(minutes=minutes),
+                      box_coords=(1, 2, 3, 4), time_in_polygon=float(minutes), speed_kmh=12.345)
+
+def test_add_query_and_count(tmp_path):
+    store = EventStore(str(tmp_path / 'events.db'), batch_size=7, flush_interval=0.05).start()
+    events = [_event(camera_id=1 + i % 2, event_type=('enter', 'exit', 'violation')[i % 3], track_id=i, minutes=i)
+              for i in range(30)]
+    for event in events:
+        store.add(event, event.image_relpath())
+    store.stop()
+
+    assert store.written == 30
+    assert store.count() == 30
+    assert store.count(camera_id=1) == 15
+    assert store.count(event_type='violation') == 10
+    assert store.count(camera_id=2, event_type='violation') == 5
+
+    # since kiradi, until kirmaydi
+    assert store.count(since=BASE + timedelta(minutes=10), until=BASE + timedelta(minutes=20)) == 10
+    assert store.count(since=(BASE + timedelta(minutes=25)).isoformat()) == 5
+
+    rows = store.query(track_id=4)
+    assert len(rows) == 1
+    row = rows[0]
+    assert (row['camera_id'], row['event_type'], row['x1'], row['y2']) == (1, 'exit', 1, 4)
+    assert row['image_path'] == events[4].image_relpath()
+    assert row['speed_kmh'] == 12.35
+
+    newest = store.query(camera_id=1, limit=3, newest_first=True)
+    assert [r['track_id'] for r in newest] == [28, 26, 24]
+
+def test_old_database_is_migrated(tmp_path):
+    path = tmp_path / 'old.db'
+    conn = sqlite3.connect(str(path))
+    conn.execute("CREATE TABLE events (id INTEGER PRIMARY KEY AUTOINCREMENT, camera_id INTEGER NOT NULL, "
+                 "camera_name TEXT, track_id INTEGER NOT NULL, event_type TEXT NOT NULL, timestamp REAL NOT NULL, "
+                 "x1 INTEGER, y1 INTEGER, x2 INTEGER, y2 INTEGER, time_in_polygon REAL, class_id INTEGER)")
+    conn.execute("INSERT INTO events (camera_id, track_id, event_type, timestamp) VALUES (3, 9, 'enter', 1.0)")
+    conn.commit()
+    conn.close()
+
+    store = EventStore(str(path))
+    store.add_record({'camera_id': 3, 'camera_name': 'c', 'track_id': 10, 'event_type': 'exit', 'timestamp': 2.0,
+                      'box': [0, 0, 1, 1], 'image_path': 'camera_3/exit/a.jpg', 'speed_kmh': 5.0, 'heading': 90.0})
+    store.start().stop()
+
+    rows = store.query(camera_id=3)
+    assert [r['track_id'] for r in rows] == [9, 10]
+    assert rows[0]['image_path'] is None and rows[1]['heading'] == 90.0
@@ -0,0 +1,51 @@
+"""
+Logging: to'lgan navbat va rate-limit hisoblagichlari bir nechta thread'da yo'qolmaydi
+"""
+import logging
+import queue
+import threading
+
+from railcore.logging_setup import RateLimitFilter, _NonBlockingQueueHandler
+
+THREADS = 8
+PER_THREAD = 2000
+
+def _record(message: str) -> logging.LogRecord:
+    return logging.LogRecord('test', logging.WARNING, __file__, 0, message, None, None)
+
+def _run_threads(target):
+    threads = [threading.Thread(target=target) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+def test_dropped_records_are_counted_under_contention():
+    handler = _NonBlockingQueueHandler(queue.Queue(maxsize=16))
+
+    def emit():
+        for i in range(PER_THREAD):
+            handler.enqueue(_record(f"xabar {i}"))
+
+    _run_threads(emit)
+
+    queued = []
+    while not handler.queue.empty():
+        queued.append(handler.queue.get_nowait())
+    records = [r for r in queued if r.name == 'test']
+    assert handler.dropped + len(records) == THREADS * PER_THREAD
+
+def test_rate_limit_counts_every_suppressed_record():
+    rate_filter = RateLimitFilter(interval=3600.0)
+    passed = []
+
+    def emit():
+        for _ in range(PER_THREAD):
+            if rate_filter.filter(_record("kamera uzildi")):
+                passed.append(1)
+
+    _run_threads(emit)
+
+    assert len(passed) == 1
+    (_, suppressed), = rate_filter._seen.values()
+    assert suppressed == THREADS * PER_THREAD - 1
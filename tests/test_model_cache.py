@@ -0,0 +1,53 @@
+"""
+ModelCache: tayyor keshni yuklash boshqa kesh yaratilishini kutmaydi, bitta kesh bir marta yaratiladi
+"""
+import threading
+import time
+
+import pytest
+
+pytest.importorskip('ultralytics')
+import ultralytics
+
+from railcore.types import ModelConfig
+from railcore.vision import model_cache
+
+def _config(tmp_path, imgsz: int) -> ModelConfig:
+    return ModelConfig(path=str(tmp_path / 'w.pt'), target_classes=[0], class_names={0: 'Car'},
+                       imgsz=imgsz, cache_dir=str(tmp_path / 'cache'), export_format='onnx')
+
+def test_cached_load_does_not_wait_for_another_build(tmp_path, monkeypatch):
+    (tmp_path / 'w.pt').write_bytes(b'weights')
+    ready, building = _config(tmp_path, 640), _config(tmp_path, 320)
+    ready_path = model_cache.cached_model_path(ready)
+    ready_path.parent.mkdir(parents=True)
+    ready_path.write_bytes(b'onnx')
+
+    release = threading.Event()
+    exports = []
+
+    def slow_export(config, path):
+        exports.append(path)
+        release.wait(5.0)
+        path.write_bytes(b'onnx')
+
+    monkeypatch.setattr(model_cache, '_export', slow_export)
+    monkeypatch.setattr(ultralytics, 'YOLO', lambda path, task=None: path)
+
+    results = []
+    builders = [threading.Thread(target=lambda: results.append(model_cache.load_model(building)))
+                for _ in range(2)]
+    for thread in builders:
+        thread.start()
+    while not exports:
+        time.sleep(0.01)
+
+    start = time.perf_counter()
+    assert model_cache.load_model(ready) == (str(ready_path), True)
+    assert time.perf_counter() - start < 1.0
+
+    release.set()
+    for thread in builders:
+        thread.join()
+    assert len(exports) == 1
+    assert sorted(from_cache for _, from_cache in results) == [False, True]
@@ -0,0 +1,91 @@
+"""
+Model almashtirish: swap_model'dan keyin ByteTrack holati davom etadi, stage() ConfigWatcher
+thread'ini bloklamaydi va umumiy ModelConfig o'zgartirilmaydi
+"""
+import contextlib
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from railcore.types import ExecutionConfig, ModelConfig, ModelSwapConfig
+from railcore.vision.model_manager import ModelManager
+
+def _model_config(path: str) -> ModelConfig:
+    return ModelConfig(path=path, target_classes=[0], class_names={0: 'Car'}, imgsz=160,
+                       cache_dir='', warmup_frames=1)
+
+def test_swap_model_keeps_tracker_state(tmp_path):
+    pytest.importorskip('ultralytics')
+    pytest.importorskip('lap')
+    from ultralytics import YOLO
+    from railcore.vision.execution import ExecutionProfile
+    from railcore.vision.yolo_detector import YOLODetector
+
+    for name in ('a.pt', 'b.pt'):
+        YOLO('yolov8n.yaml').save(str(tmp_path / name))
+    execution = ExecutionProfile(ExecutionConfig(device='cpu', half=False))
+    detector = YOLODetector(_model_config(str(tmp_path / 'a.pt')), 1, execution)
+    candidate = YOLODetector(_model_config(str(tmp_path / 'b.pt')), 1, execution).model
+
+    frame = np.zeros((120, 160, 3), np.uint8)
+    for _ in range(3):
+        detector.detect(frame)
+    tracker = detector.model.predictor.trackers[0]
+    assert tracker.frame_id == 3
+
+    detector.swap_model(candidate, str(tmp_path / 'b.pt'))
+    detector.detect(frame)
+
+    assert detector.model is candidate
+    assert detector.model_path == str(tmp_path / 'b.pt')
+    assert candidate.predictor.trackers[0] is tracker
+    assert tracker.frame_id == 4
+
+class _StubExecution:
+    def bind_thread(self):
+        return 0
+
+    def autocast(self):
+        return contextlib.nullcontext()
+
+    def predict_args(self):
+        return {}
+
+def test_stage_does_not_wait_and_swaps_a_copy(monkeypatch):
+    live = _model_config('live.pt')
+    swapped = []
+    manager = ModelManager(live, ModelSwapConfig(enabled=True, shadow_fraction=0.0, report_file=''),
+                           _StubExecution(), lambda: {}, on_swap=swapped.append)
+
+    release = threading.Event()
+    loads = []
+
+    def slow_load(config):
+        loads.append(config.path)
+        if config.path == 'first.pt':
+            release.wait(5.0)
+        return object()
+
+    monkeypatch.setattr(manager, '_load', slow_load)
+
+    manager.stage('first.pt')
+    while not loads:
+        time.sleep(0.01)
+    first_thread = manager.thread
+
+    # Birinchi kandidat yuklanayotganda yangisi darhol qabul qilinadi
+    start = time.perf_counter()
+    manager.stage('second.pt')
+    assert time.perf_counter() - start < 0.5
+    manager.thread.join(5.0)
+
+    release.set()
+    first_thread.join(5.0)
+
+    assert live.path == 'live.pt'
+    assert manager.model_config.path == 'second.pt'
+    assert [config.path for config in swapped] == ['second.pt']
+    assert manager.state == 'idle'
+    assert manager.last_report['to'] == 'second.pt' and manager.last_report['accepted']
@@ -0,0 +1,154 @@
+"""
+Masofaviy inference: localhost server'da parallel so'rovlar batch qilinadi, box'lar frame
+o'lchamiga qaytariladi, timeout'da lokal model ishlatiladi, katta payload ulanishni yopadi
+"""
+import contextlib
+import socket
+import threading
+import time
+
+import numpy as np
+
+from railcore.types import ModelConfig, RemoteInferenceConfig
+from railcore.vision.remote import (_REQUEST, ENCODING_RAW, MAGIC, MSG_INFER, InferenceServer,
+                                    RemoteClient, RemoteDetector)
+
+class _Array:
+    """torch tensor'ining detach().cpu().numpy() zanjiri"""
+
+    def __init__(self, values):
+        self.values = np.asarray(values)
+
+    def detach(self):
+        return self
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self.values
+
+class _Boxes:
+    def __init__(self, xyxy):
+        self.xyxy = _Array(np.asarray(xyxy, np.float32).reshape(-1, 4))
+        self.conf = _Array(np.full(len(self.xyxy.values), 0.9, np.float32))
+        self.cls = _Array(np.zeros(len(self.xyxy.values), np.float32))
+
+    def __len__(self):
+        return len(self.xyxy.values)
+
+class _Result:
+    def __init__(self, xyxy):
+        self.boxes = _Boxes(xyxy)
+
+class _StubModel:
+    """Har bir rasm uchun o'lchamiga nisbatan bitta box; batch o'lchamlarini yozadi"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.batch_sizes = []
+
+    def predict(self, images, **kwargs):
+        images = images if isinstance(images, list) else [images]
+        self.batch_sizes.append(len(images))
+        time.sleep(self.delay)
+        return [_Result([image.shape[1] * 0.25, image.shape[0] * 0.25,
+                         image.shape[1] * 0.75, image.shape[0] * 0.5]) for image in images]
+
+class _StubExecution:
+    def bind_thread(self):
+        return 0
+
+    def autocast(self):
+        return contextlib.nullcontext()
+
+    def predict_args(self):
+        return {}
+
+    def describe(self):
+        return 'stub'
+
+class _StubDetector:
+    """YOLODetector o'rniga (server va lokal fallback uchun)"""
+
+    def __init__(self, delay: float = 0.0):
+        self.model = _StubModel(delay)
+        self.config = ModelConfig(path='stub.pt', target_classes=[0], class_names={0: 'Car'})
+        self.execution = _StubExecution()
+        self.load_seconds = 0.0
+        self.warmup_seconds = 0.0
+
+class _StubTracker:
+    def update(self, boxes, scores, class_ids, frame):
+        return boxes
+
+def _start_server(delay: float, **overrides) -> InferenceServer:
+    config = RemoteInferenceConfig(listen='127.0.0.1:0', **overrides)
+    return InferenceServer(_StubDetector(delay), config).start()
+
+def _detector(server: InferenceServer, fallback=None, **overrides) -> RemoteDetector:
+    config = RemoteInferenceConfig(address=server.address, **overrides)
+    return RemoteDetector(RemoteClient(config), _StubDetector().config, camera_id=1, frame_rate=25.0,
+                          fallback=fallback, execution=_StubExecution(), tracker=_StubTracker())
+
+def test_concurrent_requests_are_batched_and_rescaled():
+    server = _start_server(0.02, max_batch=8, batch_wait_ms=20)
+    detector = _detector(server, max_side=320, timeout_ms=2000)
+    frame = np.zeros((480, 640, 3), np.uint8)
+    results = []
+
+    def run():
+        for _ in range(10):
+            results.append(detector.detect(frame))
+
+    threads = [threading.Thread(target=run) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    detector.client.close()
+    server.stop()
+
+    assert detector.get_stats()['remote_frames'] == 80
+    assert detector.get_stats()['timeouts'] == 0
+    # Server 320x240 rasmni ko'rgan, box'lar 640x480 frame koordinatalarida qaytadi
+    for boxes in results:
+        np.testing.assert_allclose(boxes, [[160, 120, 480, 240]], atol=1.0)
+    batch_sizes = server.detector.model.batch_sizes
+    assert sum(batch_sizes) == 80 and max(batch_sizes) <= 8
+    assert server.get_stats()['mean_batch'] > 1
+
+def test_timeout_falls_back_to_local_model():
+    server = _start_server(0.5)
+    fallback = _StubDetector()
+    detector = _detector(server, fallback=fallback, timeout_ms=100, retry_seconds=30)
+    frame = np.zeros((120, 160, 3), np.uint8)
+
+    start = time.monotonic()
+    boxes = detector.detect(frame)
+    assert time.monotonic() - start < 0.4
+    np.testing.assert_allclose(boxes, [[40, 30, 120, 60]])
+    # retry_seconds davomida server'ga so'rov yuborilmaydi
+    detector.detect(frame)
+    detector.client.close()
+    server.stop()
+
+    stats = detector.get_stats()
+    assert (stats['timeouts'], stats['local_frames'], stats['remote_frames']) == (1, 2, 0)
+    assert fallback.model.batch_sizes == [1, 1]
+
+def test_oversized_payload_closes_connection():
+    server = _start_server(0.0)
+    host, port = server.address.rsplit(':', 1)
+    sock = socket.create_connection((host, int(port)), timeout=2.0)
+    # 4x4 raw frame uchun 48 bayt kerak - 1 GB e'lon qilinadi
+    sock.sendall(_REQUEST.pack(MAGIC, MSG_INFER, ENCODING_RAW, 1, 4, 4, 1 << 30))
+    assert sock.recv(1) == b''
+    sock.close()
+
+    # Boshqa mijozlar ishlashda davom etadi
+    detector = _detector(server, timeout_ms=2000)
+    assert detector.detect(np.zeros((8, 8, 3), np.uint8)) is not None
+    detector.client.close()
+    server.stop()
+    assert server.get_stats()['errors'] == 1
@@ -0,0 +1,82 @@
+"""
+RetentionManager: o'chirish tartibi (enter/exit birinchi) va bazadagi rasm yo'llari
+"""
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+
+from railcore.event_store import EventStore
+from railcore.retention import RetentionManager, _GB
+from railcore.types import RetentionConfig
+
+DAY = 86400
+
+def _write(root: Path, camera_id: int, event_type: str, name: str, age_days: float, size: int = 100) -> Path:
+    path = root / f"camera_{camera_id}" / event_type / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b'x' * size)
+    created = time.time() - age_days * DAY
+    os.utime(path, (created, created))
+    return path
+
+def _manager(root: Path, **overrides) -> RetentionManager:
+    overrides.setdefault('max_age_days', {})
+    config = RetentionConfig(enabled=True, min_free_gb=0, **overrides)
+    manager = RetentionManager(config, [str(root)])
+    manager._seed()
+    return manager
+
+def test_age_rule_keeps_violation_while_enter_exit_remain(tmp_path):
+    old_violation = _write(tmp_path, 1, 'violation', 'v.jpg', age_days=100)
+    old_enter = _write(tmp_path, 1, 'enter', 'e_old.jpg', age_days=10)
+    fresh_enter = _write(tmp_path, 1, 'enter', 'e_new.jpg', age_days=1)
+    manager = _manager(tmp_path, max_age_days={'enter': 7, 'violation': 90})
+
+    manager.enforce()
+    assert not old_enter.exists()
+    # Eskirgan violation enter fayllari tugamaguncha o'chirilmaydi
+    assert old_violation.exists() and fresh_enter.exists()
+
+    fresh_enter.unlink()
+    manager.index[(1, 'enter')].clear()
+    manager.enforce()
+    assert not old_violation.exists()
+
+def test_event_quota_on_protected_type_waits_for_enter_exit(tmp_path):
+    violations = [_write(tmp_path, 1, 'violation', f'v{i}.jpg', age_days=10 - i, size=1000) for i in range(3)]
+    enter = _write(tmp_path, 1, 'enter', 'e.jpg', age_days=1)
+    manager = _manager(tmp_path, event_max_gb={'violation': 1500 / _GB})
+
+    manager.enforce()
+    assert all(path.exists() for path in violations) and enter.exists()
+
+    enter.unlink()
+    manager.index[(1, 'enter')].clear()
+    manager.enforce()
+    assert [path.exists() for path in violations] == [False, False, True]
+
+def test_camera_quota_deletes_oldest_enter_exit_first(tmp_path):
+    violation = _write(tmp_path, 1, 'violation', 'v.jpg', age_days=30, size=1000)
+    exits = [_write(tmp_path, 1, 'exit', f'x{i}.jpg', age_days=5 - i, size=1000) for i in range(3)]
+    manager = _manager(tmp_path, camera_max_gb=2500 / _GB)
+
+    manager.enforce()
+    assert violation.exists()
+    assert [path.exists() for path in exits] == [False, False, True]
+
+def test_deleted_images_are_cleared_in_event_store(tmp_path):
+    store = EventStore(str(tmp_path / 'events.db'))
+    relpath = 'camera_1/enter/e.jpg'
+    store.write_records([{'camera_id': 1, 'camera_name': 'c', 'track_id': 7, 'event_type': 'enter',
+                          'timestamp': datetime.now().timestamp(), 'box': (0, 0, 10, 10),
+                          'image_path': relpath}])
+    root = tmp_path / 'saved'
+    _write(root, 1, 'enter', 'e.jpg', age_days=10)
+    manager = RetentionManager(RetentionConfig(enabled=True, max_age_days={'enter': 7}, min_free_gb=0),
+                               [str(root)], event_store=store)
+    manager._seed()
+
+    manager.enforce()
+    rows = store.query(camera_id=1)
+    assert len(rows) == 1 and rows[0]['image_path'] is None
@@ -0,0 +1,35 @@
+"""
+ImageSaver: event.frame o'zgarmaydi, degenerat box'lar bilan ham rasm va YOLO txt yoziladi
+"""
+from datetime import datetime
+
+import cv2
+import numpy as np
+import pytest
+
+from railcore.saver import ImageSaver
+from railcore.types import FrameEvent, SaverConfig
+
+def _save(tmp_path, event_type: str, box, crop_only=()):
+    config = SaverConfig(save_dir=str(tmp_path), workers=1, crop_only=list(crop_only), thumbnail_width=64)
+    saver = ImageSaver(save_dir=str(tmp_path), config=config)
+    frame = np.full((120, 160, 3), 40, dtype=np.uint8)
+    event = FrameEvent(frame=frame, camera_id=1, camera_name='c', track_id=5, event_type=event_type,
+                       timestamp=datetime(2025, 10, 14, 8, 0, 0), box_coords=box)
+    saver.add_to_queue(event)
+    saver.stop()
+    return event, frame, tmp_path / event.image_relpath()
+
+def test_event_frame_is_not_drawn_on(tmp_path):
+    event, frame, image = _save(tmp_path, 'violation', (20, 30, 80, 90))
+    assert image.exists()
+    assert event.frame is frame and (frame == 40).all()
+
+@pytest.mark.parametrize('box', [(50, 50, 50, 90), (50, 50, 90, 50), (200, 10, 240, 60), (-30, -30, -10, -10)])
+@pytest.mark.parametrize('crop_only', [(), ('enter',)])
+def test_degenerate_boxes_are_saved(tmp_path, box, crop_only):
+    _, _, image = _save(tmp_path, 'enter', box, crop_only)
+    assert cv2.imread(str(image)) is not None
+    values = [float(v) for v in image.with_suffix('.txt').read_text().split()[1:]]
+    assert len(values) == 4 and all(np.isfinite(values))
+    assert values[2] > 0 and values[3] > 0